@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# berth_scheduler.py - Çoklu gemi için rıhtım tahsis planlayıcı
+
+import bisect
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+@dataclass
+class BerthCall:
+    """Bir geminin limana uğraması (ETA ve tahmini operasyon süresi)"""
+    call_id: Any
+    ship_id: str
+    eta: datetime
+    handling_hours: float
+    ship_name: str = ''
+    berth_id: Optional[str] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+    @property
+    def waiting_hours(self) -> float:
+        return max((self.start - self.eta).total_seconds() / 3600, 0.0) if self.start else 0.0
+
+@dataclass
+class BerthSchedule:
+    """Planlama sonucu"""
+    calls: List[BerthCall] = field(default_factory=list)
+    total_wait_hours: float = 0.0
+    max_wait_hours: float = 0.0
+    iterations: int = 0
+    elapsed: float = 0.0
+
+class BerthScheduler:
+    """
+    Ayrık rıhtım tahsis problemi için sezgisel çözücü.
+    - Başlangıç: ETA sırasıyla her gemi en erken boşalan rıhtıma atanır.
+    - İyileştirme: bekleyen gemiler diğer rıhtımlara/sıralara taşınır (relocate);
+      sadece etkilenen kuyruk kısmı yeniden hesaplanır ve bekleme süresi azalıyorsa kabul edilir.
+    - ETA değişikliğinde (update_eta) sadece ilgili gemi yeniden yerleştirilir ve
+      yeni ETA çevresindeki zaman penceresinde yerel arama yapılır.
+    Amaç: toplam bekleme süresini (başlangıç - ETA) en aza indirmek.
+    """
+
+    def __init__(self, berth_ids: List[str], calls: List[BerthCall], seed: int = 0):
+        self.berth_ids = list(berth_ids)
+        self.calls = {c.call_id: c for c in calls}
+        self.origin = min((c.eta for c in calls), default=datetime.now())
+        self.eta = {c.call_id: self._hours(c.eta) for c in calls}
+        self.hours = {c.call_id: max(float(c.handling_hours or 0), 0.0) for c in calls}
+        self.sequences = {b: [] for b in self.berth_ids}
+        self.starts = {b: [] for b in self.berth_ids}
+        self.position = {}  # call_id -> berth_id
+        self.rng = random.Random(seed)
+
+    def _hours(self, value: datetime) -> float:
+        return (value - self.origin).total_seconds() / 3600
+
+    # --- Değerlendirme ---
+    def _recompute(self, berth_id: str):
+        seq, starts, t = self.sequences[berth_id], [], float('-inf')
+        for call_id in seq:
+            start = max(self.eta[call_id], t)
+            starts.append(start)
+            t = start + self.hours[call_id]
+        self.starts[berth_id] = starts
+        for call_id in seq:
+            self.position[call_id] = berth_id
+
+    def _end_before(self, berth_id: str, index: int) -> float:
+        if index <= 0:
+            return float('-inf')
+        prev = self.sequences[berth_id][index - 1]
+        return self.starts[berth_id][index - 1] + self.hours[prev]
+
+    def _insertion_delta(self, berth_id: str, index: int, call_id: Any) -> float:
+        """call_id'yi berth_id'nin index konumuna eklemenin toplam beklemeye etkisi"""
+        seq, starts = self.sequences[berth_id], self.starts[berth_id]
+        t = self._end_before(berth_id, index)
+        start = max(self.eta[call_id], t)
+        delta = start - self.eta[call_id]
+        t = start + self.hours[call_id]
+        for k in range(index, len(seq)):
+            other = seq[k]
+            new_start = max(self.eta[other], t)
+            if new_start <= starts[k] + 1e-9:
+                break  # gecikme bir boşlukta emildi, kuyruğun kalanı değişmez
+            delta += new_start - starts[k]
+            t = new_start + self.hours[other]
+        return delta
+
+    def _removal_delta(self, berth_id: str, index: int) -> float:
+        seq, starts = self.sequences[berth_id], self.starts[berth_id]
+        delta = -(starts[index] - self.eta[seq[index]])
+        t = self._end_before(berth_id, index)
+        for k in range(index + 1, len(seq)):
+            other = seq[k]
+            new_start = max(self.eta[other], t)
+            if new_start >= starts[k] - 1e-9:
+                break
+            delta += new_start - starts[k]
+            t = new_start + self.hours[other]
+        return delta
+
+    def _candidate_positions(self, berth_id: str, call_id: Any, spread: int = 3) -> range:
+        etas = [self.eta[c] for c in self.sequences[berth_id]]
+        center = bisect.bisect_left(etas, self.eta[call_id])
+        return range(max(center - spread, 0), min(center + spread, len(etas)) + 1)
+
+    # --- Çözüm adımları ---
+    def _construct(self):
+        available = {b: float('-inf') for b in self.berth_ids}
+        for call_id in sorted(self.calls, key=lambda c: (self.eta[c], str(c))):
+            berth_id = min(self.berth_ids, key=lambda b: (max(available[b], self.eta[call_id]), available[b]))
+            self.sequences[berth_id].append(call_id)
+            available[berth_id] = max(available[berth_id], self.eta[call_id]) + self.hours[call_id]
+        for berth_id in self.berth_ids:
+            self._recompute(berth_id)
+
+    def _try_relocate(self, call_id: Any) -> bool:
+        """Gemiyi en iyi (rıhtım, sıra) konumuna taşı; bekleme azalıyorsa uygula"""
+        src = self.position[call_id]
+        src_index = self.sequences[src].index(call_id)
+        removal = self._removal_delta(src, src_index)
+        best = (-1e-6, None, None)
+        for berth_id in self.berth_ids:
+            for index in self._candidate_positions(berth_id, call_id):
+                if berth_id == src:
+                    if index in (src_index, src_index + 1):
+                        continue
+                    delta = self._same_berth_delta(src, src_index, index)
+                else:
+                    delta = removal + self._insertion_delta(berth_id, index, call_id)
+                if delta < best[0]:
+                    best = (delta, berth_id, index)
+        if best[1] is None:
+            return False
+        _, dst, index = best
+        self.sequences[src].pop(src_index)
+        if dst == src and index > src_index:
+            index -= 1
+        self.sequences[dst].insert(index, call_id)
+        self._recompute(src)
+        if dst != src:
+            self._recompute(dst)
+        return True
+
+    def _same_berth_delta(self, berth_id: str, src_index: int, index: int) -> float:
+        seq = list(self.sequences[berth_id])
+        call_id = seq.pop(src_index)
+        seq.insert(index - 1 if index > src_index else index, call_id)
+        t, wait = float('-inf'), 0.0
+        for other in seq:
+            start = max(self.eta[other], t)
+            wait += start - self.eta[other]
+            t = start + self.hours[other]
+        return wait - self._berth_wait(berth_id)
+
+    def _berth_wait(self, berth_id: str) -> float:
+        return sum(s - self.eta[c] for c, s in zip(self.sequences[berth_id], self.starts[berth_id]))
+
+    def _local_search(self, deadline: float, window: Optional[tuple] = None) -> int:
+        iterations, stale = 0, 0
+        while time.perf_counter() < deadline:
+            waiting = [c for b in self.berth_ids for c, s in zip(self.sequences[b], self.starts[b])
+                       if s - self.eta[c] > 1e-6 and (window is None or window[0] <= self.eta[c] <= window[1])]
+            if not waiting:
+                break
+            improved = False
+            for call_id in self.rng.sample(waiting, min(len(waiting), 64)):
+                iterations += 1
+                if self._try_relocate(call_id):
+                    improved = True
+                if time.perf_counter() >= deadline:
+                    break
+            stale = 0 if improved else stale + 1
+            if stale >= 3:
+                break
+        return iterations
+
+    def _result(self, iterations: int, start_time: float) -> BerthSchedule:
+        result = BerthSchedule(iterations=iterations)
+        for berth_id in self.berth_ids:
+            for call_id, start in zip(self.sequences[berth_id], self.starts[berth_id]):
+                call = self.calls[call_id]
+                call.berth_id = berth_id
+                call.start = self.origin + timedelta(hours=start)
+                call.end = call.start + timedelta(hours=self.hours[call_id])
+                result.calls.append(call)
+                result.total_wait_hours += call.waiting_hours
+                result.max_wait_hours = max(result.max_wait_hours, call.waiting_hours)
+        result.calls.sort(key=lambda c: (c.start, str(c.berth_id)))
+        result.elapsed = time.perf_counter() - start_time
+        return result
+
+    def current_schedule(self) -> BerthSchedule:
+        """Mevcut atamaları (yeniden optimize etmeden) plan olarak döndür"""
+        return self._result(0, time.perf_counter())
+
+    def solve(self, time_budget: float = 2.0) -> BerthSchedule:
+        """Sıfırdan plan oluştur ve süre limiti içinde iyileştir"""
+        start_time = time.perf_counter()
+        if not self.berth_ids:
+            return self._result(0, start_time)
+        self._construct()
+        iterations = self._local_search(start_time + time_budget)
+        return self._result(iterations, start_time)
+
+    def load_assignments(self, assignments: Dict[Any, str]):
+        """Kayıtlı plandan (call_id -> berth_id) devam et; atanmamış gemiler en iyi konuma eklenir"""
+        for berth_id in self.berth_ids:
+            self.sequences[berth_id] = sorted((c for c, b in assignments.items() if b == berth_id and c in self.calls),
+                                              key=lambda c: (self.eta[c], str(c)))
+            self._recompute(berth_id)
+        for call_id in self.calls:
+            if call_id not in self.position and self.berth_ids:
+                self._insert_best(call_id)
+
+    def _insert_best(self, call_id: Any):
+        best = (float('inf'), self.berth_ids[0], 0)
+        for berth_id in self.berth_ids:
+            for index in self._candidate_positions(berth_id, call_id):
+                delta = self._insertion_delta(berth_id, index, call_id)
+                if delta < best[0]:
+                    best = (delta, berth_id, index)
+        _, berth_id, index = best
+        self.sequences[berth_id].insert(index, call_id)
+        self._recompute(berth_id)
+
+    def update_eta(self, call_id: Any, new_eta: datetime, time_budget: float = 0.3, window_hours: float = 72.0,
+                   handling_hours: Optional[float] = None) -> BerthSchedule:
+        """
+        Bir geminin ETA'sı (ve isteğe bağlı operasyon süresi) değiştiğinde artımlı yeniden optimizasyon:
+        gemi mevcut yerinden çıkarılıp en iyi konuma eklenir, ardından sadece yeni ETA çevresinde yerel arama yapılır.
+        """
+        start_time = time.perf_counter()
+        call = self.calls[call_id]
+        call.eta = new_eta
+        self.eta[call_id] = self._hours(new_eta)
+        if handling_hours is not None:
+            call.handling_hours = handling_hours
+            self.hours[call_id] = max(float(handling_hours), 0.0)
+        berth_id = self.position.pop(call_id, None)
+        if berth_id is not None:
+            self.sequences[berth_id].remove(call_id)
+            self._recompute(berth_id)
+        if self.berth_ids:
+            self._insert_best(call_id)
+        window = (self.eta[call_id] - window_hours, self.eta[call_id] + window_hours)
+        iterations = self._local_search(start_time + time_budget, window)
+        return self._result(iterations, start_time)
+
+    def add_call(self, call: BerthCall, time_budget: float = 0.3) -> BerthSchedule:
+        """Yeni uğramayı mevcut plana artımlı olarak ekle"""
+        self.calls[call.call_id] = call
+        self.hours[call.call_id] = max(float(call.handling_hours or 0), 0.0)
+        return self.update_eta(call.call_id, call.eta, time_budget)
+
+    def remove_call(self, call_id: Any) -> BerthSchedule:
+        """Uğramayı plandan çıkar; sonraki gemiler öne kayar"""
+        start_time = time.perf_counter()
+        berth_id = self.position.pop(call_id, None)
+        if berth_id is not None:
+            self.sequences[berth_id].remove(call_id)
+            self._recompute(berth_id)
+        self.calls.pop(call_id, None)
+        self.eta.pop(call_id, None)
+        self.hours.pop(call_id, None)
+        return self._result(0, start_time)
+
+if __name__ == "__main__":
+    # Benchmark: bir sezonluk gemi uğraması
+    print("🧪 Benchmarking Berth Scheduler...")
+
+    rng = random.Random(11)
+    season_start = datetime(2025, 1, 1)
+    for n_calls, n_berths, days in [(200, 3, 30), (1500, 8, 120), (4000, 14, 180)]:
+        calls = [BerthCall(i, f"GEMI-{i % 300:03d}", season_start + timedelta(hours=rng.uniform(0, days * 24)),
+                           rng.uniform(6, 20)) for i in range(n_calls)]
+        scheduler = BerthScheduler([f"R{i + 1}" for i in range(n_berths)], calls)
+        t0 = time.perf_counter(); scheduler._construct(); greedy_wait = sum(scheduler._berth_wait(b) for b in scheduler.berth_ids)
+        construct_ms = (time.perf_counter() - t0) * 1000
+        scheduler = BerthScheduler([f"R{i + 1}" for i in range(n_berths)], calls)
+        schedule = scheduler.solve(time_budget=3.0)
+        print(f"✅ {n_calls} uğrama, {n_berths} rıhtım: greedy bekleme {greedy_wait:.0f} saat ({construct_ms:.0f} ms), "
+              f"yerel arama sonrası {schedule.total_wait_hours:.0f} saat ({schedule.elapsed * 1000:.0f} ms, {schedule.iterations} deneme)")
+        moved = calls[n_calls // 2]
+        update = scheduler.update_eta(moved.call_id, moved.eta + timedelta(hours=20))
+        print(f"   ETA değişikliği sonrası yeniden plan: {update.elapsed * 1000:.0f} ms, toplam bekleme {update.total_wait_hours:.0f} saat")
+
+    print("\n🎉 Berth scheduler benchmark completed!")
@@ -45,13 +45,22 @@ DEFAULT_CONFIG = {
         "port": get_env_var("DB_PORT", "5432")
     },
     "theme": get_env_var("APP_THEME", "dark"), # YENİ: Tema ayarı eklendi (dark/light)
+    "telemetry": {
+        "source": "simulator",  # simulator / udp / file
+        "host": "127.0.0.1",
+        "port": 47800,
+        "file": "",
+        "simulator_hz": 5,
+        "ui_hz": 10
+    },
     "colors": {
         "filled": "#e74c3c",
         "pending": "#f1c40f",
         "placeable": "#2ecc71",
         "incompatible": "#e67e22",
         "empty": "#bdc3c7",
-        "reefer": "#3498db" 
+        "reefer": "#3498db",
+        "overstow": "#8e44ad"
     }
 }
 
@@ -0,0 +1,17 @@
+# conftest.py - Testler için ortak ayarlar (kök dizin sys.path'e eklenir; Qt testleri ekransız çalışır)
+
+import os
+import sys
+
+import pytest
+
+# Testler modülleri kök dizinden içe aktarır (ui/common altındaki testler dahil, hangi dizinden çalıştırılırsa çalıştırılsın)
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path: sys.path.insert(0, ROOT_DIR)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+@pytest.fixture(scope='session')
+def qt_app():
+    """Kuyruklu sinyallerin teslimi için tek QCoreApplication"""
+    from PyQt6.QtCore import QCoreApplication
+    return QCoreApplication.instance() or QCoreApplication([])
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# container_index.py - Konteyner ID'lerinin bellekte tutulan sıralı indeksi (önek tamamlama) ve Bloom süzgeci
+
+import bisect
+import select
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+NOTIFY_CHANNEL = 'konteyner_id'  # tetikleyiciler '+ID1,ID2' / '-ID1,ID2' yükleri gönderir
+BLOOM_BITS_PER_ID = 10           # ~%1 yanlış pozitif (7 hash ile)
+BLOOM_HASHES = 7
+MERGE_THRESHOLD = 4096           # bu kadar ekleme/silme birikince ana dizi yeniden kurulur
+SNAPSHOT_CHUNK = 100000
+RECONNECT_DELAY_SEC = 5.0
+
+_FNV_OFFSET = np.uint64(0xcbf29ce484222325)
+_FNV_PRIME = np.uint64(0x100000001b3)
+
+def _hash_pair(ids: np.ndarray):
+    """
+    Sabit genişlikli bayt dizisi (dtype 'S') için vektörel FNV-1a ve ondan türetilen ikinci hash.
+    Dolgu sıfırları atlanır; böylece aynı ID hangi genişlikte saklanırsa saklansın aynı hash'i alır.
+    """
+    columns = ids.view(np.uint8).reshape(len(ids), ids.dtype.itemsize).astype(np.uint64)
+    h1 = np.full(len(ids), _FNV_OFFSET, dtype=np.uint64)
+    for col in columns.T:
+        h1 = np.where(col != 0, (h1 ^ col) * _FNV_PRIME, h1)
+    h2 = h1 ^ (h1 >> np.uint64(31))                  # splitmix64 karıştırma
+    h2 = h2 * np.uint64(0xbf58476d1ce4e5b9)
+    h2 = (h2 ^ (h2 >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+    return h1, (h2 ^ (h2 >> np.uint64(31))) | np.uint64(1)
+
+class BloomFilter:
+    """Bit dizisi np.packbits düzeninde (bayt başına 8 bit, büyük uçtan) tutulur"""
+
+    def __init__(self, capacity: int):
+        self.bit_count = max(1024, int(capacity * BLOOM_BITS_PER_ID))
+        self.bits = np.zeros((self.bit_count + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, ids: np.ndarray) -> np.ndarray:
+        h1, h2 = _hash_pair(ids)
+        steps = np.arange(BLOOM_HASHES, dtype=np.uint64)
+        return ((h1[:, None] + steps * h2[:, None]) % np.uint64(self.bit_count)).astype(np.int64)
+
+    def add_many(self, ids: np.ndarray):
+        if not len(ids): return
+        pos = self._positions(ids).ravel()
+        if len(ids) > 1000:   # toplu kurulum: bool dizide işaretleyip paketlemek .at'ten çok daha hızlı
+            flags = np.unpackbits(self.bits, count=self.bit_count).astype(bool)
+            flags[pos] = True
+            self.bits = np.packbits(flags)
+        else:
+            np.bitwise_or.at(self.bits, pos >> 3, (128 >> (pos & 7)).astype(np.uint8))
+
+    def might_contain(self, cid: bytes) -> bool:
+        pos = self._positions(np.array([cid]))[0]
+        return bool(np.all(self.bits[pos >> 3] & (128 >> (pos & 7))))
+
+class ContainerIdIndex:
+    """
+    Tüm konteyner ID'lerinin sıralı bayt dizisi + son değişiklikler için küçük sıralı ek liste ve silinenler kümesi.
+    Bloom süzgeci "kesinlikle yok" cevabını veritabanına gitmeden verir; silmeler süzgeçten çıkarılamadığı
+    için en kötü durumda gereksiz bir veritabanı sorgusuna yol açar. Tüm metodlar thread-safe'dir.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = False
+        self._ids = np.empty(0, dtype='S1')
+        self._added: List[bytes] = []
+        self._removed = set()
+        self._bloom = BloomFilter(0)
+
+    @staticmethod
+    def _key(cid) -> bytes:
+        return str(cid).strip().upper().encode('utf-8')
+
+    def load(self, ids: Iterable[str]):
+        """Tam anlık görüntüden yeniden kur (önceki içerik atılır)"""
+        keys = dict.fromkeys(str(c).strip().upper().encode('utf-8') for c in ids)   # sırayı koruyarak tekilleştir
+        keys.pop(b'', None)
+        keys = sorted(keys)   # veritabanından sıralı gelir, timsort neredeyse doğrusal
+        array = np.array(keys or [b''], dtype=bytes)[:len(keys)]
+        bloom = BloomFilter(len(array) * 2)   # büyüme payı: süzgeç kapasitenin iki katına kadar ~%1'de kalır
+        bloom.add_many(array)
+        with self.lock:
+            self._ids, self._added, self._removed, self._bloom = array, [], set(), bloom
+            self.ready = True
+
+    def _contains_locked(self, key: bytes) -> bool:
+        if key in self._removed: return False
+        i = bisect.bisect_left(self._added, key)
+        if i < len(self._added) and self._added[i] == key: return True
+        j = int(np.searchsorted(self._ids, key))
+        return j < len(self._ids) and self._ids[j] == key
+
+    def add(self, cid):
+        key = self._key(cid)
+        if not key: return
+        with self.lock:
+            self._removed.discard(key)
+            if not self._contains_locked(key):
+                bisect.insort(self._added, key)
+                self._bloom.add_many(np.array([key]))
+                self._maybe_merge()
+
+    def discard(self, cid):
+        key = self._key(cid)
+        with self.lock:
+            i = bisect.bisect_left(self._added, key)
+            if i < len(self._added) and self._added[i] == key:
+                del self._added[i]
+            elif self._contains_locked(key):
+                self._removed.add(key)
+                self._maybe_merge()
+
+    def apply_event(self, payload: str):
+        """Tetikleyici bildirimi: '+' eklenen, '-' silinen ID'ler (virgülle ayrılmış)"""
+        if not payload: return
+        op, ids = payload[0], [c for c in payload[1:].split(',') if c]
+        for cid in ids:
+            if op == '+': self.add(cid)
+            elif op == '-': self.discard(cid)
+
+    def _maybe_merge(self):
+        if len(self._added) + len(self._removed) < MERGE_THRESHOLD: return
+        ids = self._ids
+        if self._removed:
+            ids = ids[~np.isin(ids, np.array(list(self._removed), dtype=bytes))]
+        if self._added:
+            added = np.array(self._added, dtype=bytes)
+            width = max(ids.dtype.itemsize, added.dtype.itemsize)
+            ids = np.sort(np.concatenate([ids.astype(f'S{width}'), added.astype(f'S{width}')]))
+        if self._removed or len(ids) * BLOOM_BITS_PER_ID > self._bloom.bit_count:
+            self._bloom = BloomFilter(len(ids) * 2)
+            self._bloom.add_many(ids)
+        self._ids, self._added, self._removed = ids, [], set()
+
+    def might_contain(self, cid) -> bool:
+        """False: kesinlikle yok. True: olabilir (indeks hazır değilse de True)."""
+        with self.lock:
+            return not self.ready or self._bloom.might_contain(self._key(cid))
+
+    def contains(self, cid) -> Optional[bool]:
+        """Yerel indekse göre tam üyelik; indeks hazır değilse None"""
+        with self.lock:
+            return self._contains_locked(self._key(cid)) if self.ready else None
+
+    def complete(self, prefix: str, limit: int = 20) -> List[str]:
+        """Önekle başlayan ilk `limit` ID (sıralı)"""
+        key = self._key(prefix)
+        if not key: return []
+        with self.lock:
+            if not self.ready: return []
+            lo = int(np.searchsorted(self._ids, key))
+            hi = int(np.searchsorted(self._ids, key + b'\xff'))
+            base = [c for c in self._ids[lo:min(hi, lo + limit + len(self._removed))].tolist() if c not in self._removed]
+            a = bisect.bisect_left(self._added, key)
+            extra = []
+            while a < len(self._added) and self._added[a].startswith(key) and len(extra) < limit:
+                extra.append(self._added[a]); a += 1
+        return [c.decode('utf-8') for c in sorted(base + extra)[:limit]]
+
+    def __len__(self):
+        with self.lock:
+            return len(self._ids) + len(self._added) - len(self._removed)
+
+_shared_index = ContainerIdIndex()
+
+def shared_index() -> ContainerIdIndex:
+    """Süreç genelinde tek indeks (arayüz ve iş kuyruğu thread'leri aynı indeksi kullanır)"""
+    return _shared_index
+
+class ContainerIndexListener:
+    """
+    Kendi bağlantısıyla LISTEN yapıp indeksi güncel tutan arka plan thread'i. Önce dinlemeye başlar,
+    sonra anlık görüntüyü yükler (arada gelen bildirimler sonradan uygulanır, işlemler idempotent).
+    Bağlantı koparsa indeks 'hazır değil' işaretlenir (çağıranlar veritabanına döner) ve yeniden bağlanılır.
+    channels: aynı bağlantı üzerinden dinlenecek diğer kanallar {kanal: işleyici(yük)}; bildirim kaçırılmış
+    olabileceğinden her (yeniden) bağlanmada işleyiciler yük None ile bir kez çağrılır.
+    """
+
+    def __init__(self, db_factory: Callable, index: Optional[ContainerIdIndex] = None,
+                 channels: Optional[Dict[str, Callable]] = None):
+        self.db_factory = db_factory
+        self.index = index or shared_index()
+        self.channels = dict(channels or {})
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None: return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            db = None
+            try:
+                db = self.db_factory()
+                if not getattr(db, 'conn', None) or not db.ensure_container_id_events():
+                    raise RuntimeError("veritabanı bağlantısı veya tetikleyiciler hazır değil")
+                self._listen(db)
+            except Exception as e:
+                print(f"⚠️  Konteyner ID indeksi güncellenemiyor: {e}")
+            finally:
+                with self.index.lock: self.index.ready = False
+                if db is not None: db.close_connection()
+            self._stop_event.wait(RECONNECT_DELAY_SEC)
+
+    def _listen(self, db):
+        conn = db.conn
+        with conn.cursor() as cursor:
+            for channel in [NOTIFY_CHANNEL, *self.channels]:
+                cursor.execute(f"LISTEN {channel}")
+        conn.commit()
+        for handler in self.channels.values(): handler(None)
+        started = time.perf_counter()
+        ids = []
+        for chunk in db.iter_container_ids(SNAPSHOT_CHUNK):
+            ids.extend(chunk)
+        self.index.load(ids)
+        print(f"✅ Konteyner ID indeksi yüklendi: {len(self.index):,} ID ({(time.perf_counter() - started) * 1000:.0f} ms)")
+        conn.autocommit = True
+        while not self._stop_event.is_set():
+            if select.select([conn], [], [], 1.0)[0]:
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    if notify.channel == NOTIFY_CHANNEL: self.index.apply_event(notify.payload)
+                    elif notify.channel in self.channels: self.channels[notify.channel](notify.payload)
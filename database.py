@@ -1,11 +1,17 @@
 # database.py (Eksik Rapor Fonksiyonları Eklenmiş Tam Hali)
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values, Json
 from collections import defaultdict
 import config_manager
+import json
+import threading
 import time
 from datetime import datetime
+import container_index
+import lifecycle_states
+from ship_occupancy import ShipOccupancyGrid
+from utils import PORT_KEY_SQL, port_key
 
 # Offline mode kontrolü
 try:
@@ -183,6 +189,14 @@ class DatabaseConnection:
             
             return result
                 
+        except psycopg2.extensions.QueryCanceledError:
+            # İptal edilen sorgu (connection.cancel / statement_timeout) yeniden denenmez, çağırana iletilir
+            try:
+                self.conn.rollback()
+            except psycopg2.Error:
+                pass
+            raise
+                
         except psycopg2.OperationalError as e:
             print(f"❌ Connection error (attempt {_retry_count + 1}): {e}")
             
@@ -231,107 +245,156 @@ class DatabaseConnection:
             return False
 
     # Container Lifecycle Methods
+    def ensure_lifecycle_state_machine(self):
+        """
+        Durum makinesi verisi: container_lifecycle_transitions (izinli geçişler), durumlar üzerinde
+        is_terminal / rollover_state_id sütunları ve iki tablodaki değişiklikleri NOTIFY ile yayan tetikleyiciler.
+        İlk kurulumda geçiş tablosu mevcut davranışla (her durumdan her duruma) doldurulur; DELIVERED (9 ve 11)
+        cycle'ı tamamlayıp ORDERED (1) durumuna dönen terminal durumlar olarak işaretlenir.
+        """
+        if getattr(self, '_lifecycle_state_machine_ready', False): return True
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    cursor.execute("SELECT to_regclass('public.container_lifecycle_transitions') IS NOT NULL")
+                    if not cursor.fetchone()[0]:
+                        cursor.execute("""
+                            ALTER TABLE public.container_lifecycle_states
+                                ADD COLUMN IF NOT EXISTS is_terminal BOOLEAN NOT NULL DEFAULT false,
+                                ADD COLUMN IF NOT EXISTS rollover_state_id INTEGER REFERENCES public.container_lifecycle_states(id);
+                            UPDATE public.container_lifecycle_states SET is_terminal = true,
+                                   rollover_state_id = (SELECT id FROM public.container_lifecycle_states WHERE id = 1)
+                            WHERE id IN (9, 11);
+                            CREATE TABLE public.container_lifecycle_transitions (
+                                from_state_id INTEGER NOT NULL REFERENCES public.container_lifecycle_states(id) ON DELETE CASCADE,
+                                to_state_id INTEGER NOT NULL REFERENCES public.container_lifecycle_states(id) ON DELETE CASCADE,
+                                PRIMARY KEY (from_state_id, to_state_id)
+                            );
+                            INSERT INTO public.container_lifecycle_transitions (from_state_id, to_state_id)
+                            SELECT a.id, b.id FROM public.container_lifecycle_states a CROSS JOIN public.container_lifecycle_states b
+                            WHERE a.id <> b.id;
+                        """)
+                    cursor.execute("SELECT COUNT(*) FROM pg_trigger WHERE tgname LIKE 'trg_lifecycle_bildir_%'")
+                    if cursor.fetchone()[0] != 2:
+                        cursor.execute(f"""
+                            CREATE OR REPLACE FUNCTION public.lifecycle_durum_bildir() RETURNS trigger AS $$
+                            BEGIN
+                                PERFORM pg_notify('{lifecycle_states.NOTIFY_CHANNEL}', TG_TABLE_NAME);
+                                RETURN NULL;
+                            END $$ LANGUAGE plpgsql;
+                            DROP TRIGGER IF EXISTS trg_lifecycle_bildir_durum ON public.container_lifecycle_states;
+                            DROP TRIGGER IF EXISTS trg_lifecycle_bildir_gecis ON public.container_lifecycle_transitions;
+                            CREATE TRIGGER trg_lifecycle_bildir_durum AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.container_lifecycle_states
+                                FOR EACH STATEMENT EXECUTE FUNCTION public.lifecycle_durum_bildir();
+                            CREATE TRIGGER trg_lifecycle_bildir_gecis AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.container_lifecycle_transitions
+                                FOR EACH STATEMENT EXECUTE FUNCTION public.lifecycle_durum_bildir();
+                        """)
+            self._lifecycle_state_machine_ready = True
+            return True
+        except psycopg2.Error as e:
+            print(f"⚠️  Lifecycle durum makinesi tabloları hazırlanamadı: {e}"); self.conn.rollback()
+            return False
+
+    def get_lifecycle_state_machine(self):
+        """Durumlar ve izinli geçişler; süreç genelinde önbellekli, değişiklik bildiriminde yeniden okunur"""
+        return lifecycle_states.shared_state_cache().get(self._load_lifecycle_state_machine)
+
+    def _load_lifecycle_state_machine(self):
+        ready = self.ensure_lifecycle_state_machine()
+        states = self.execute_query("SELECT * FROM public.container_lifecycle_states ORDER BY id", fetchall=True) or []
+        transitions = None
+        if ready:
+            transitions = self.execute_query("SELECT from_state_id, to_state_id FROM public.container_lifecycle_transitions", fetchall=True)
+        return lifecycle_states.LifecycleStateMachine(states, transitions)
+
     def get_lifecycle_states(self):
-        """Konteyner lifecycle state'lerini getir"""
+        """Konteyner lifecycle state'lerini getir (aktif olanlar, önbellekten)"""
         try:
-            return self.execute_query(
-                "SELECT * FROM container_lifecycle_states WHERE is_active = true ORDER BY id", 
-                fetchall=True
-            )
-        except:
+            return self.get_lifecycle_state_machine().state_rows()
+        except Exception:
             # Eğer tablo yoksa boş liste döndür
             return []
     
     def change_container_lifecycle_state(self, container_id, new_state_id, reason=None, changed_by="USER"):
         """Konteyner lifecycle state'ini değiştir"""
+        result = self.change_containers_lifecycle_state([container_id], new_state_id, reason, changed_by)
+        for rejected in result['rejected']:
+            print(f"❌ Container {container_id}: {rejected['reason']}")
+        return result['success'] and bool(result['changed'])
+
+    def change_containers_lifecycle_state(self, container_ids, new_state_id, reason=None, changed_by="USER"):
+        """
+        Konteynerleri tek transaction'da yeni lifecycle durumuna geçir. Hedef durum ve her konteynerin
+        mevcut durumundan geçiş durum makinesine göre doğrulanır; geçersiz olanlar yazılmadan reddedilir.
+        Terminal duruma geçişte cycle sayacı artar ve konteyner rollover durumuna döner (ek SYSTEM geçmiş kaydıyla).
+        Dönüş: {'success', 'changed': [id], 'rejected': [{'container_id', 'reason'}], 'error'}
+        """
+        result = {'success': False, 'changed': [], 'rejected': [], 'error': None}
+        container_ids = list(dict.fromkeys(container_ids or []))
+        machine = self.get_lifecycle_state_machine()
+        target_error = machine.check(None, new_state_id)
+        if target_error:
+            result['rejected'] = [{'container_id': c_id, 'reason': target_error} for c_id in container_ids]
+            result['error'] = target_error
+            return result
+        if not container_ids: result['success'] = True; return result
+        final_state_id, completes_cycle = machine.resolve(new_state_id)
         try:
-            # Önce geçerli state'i ve cycle count'ı al
-            current_state_query = "SELECT current_lifecycle_state, lifecycle_cycle_count FROM public.konteynerler WHERE id = %s"
-            current_state_result = self.execute_query(current_state_query, (container_id,), fetchone=True)
-            
-            if not current_state_result:
-                print(f"Container {container_id} bulunamadı")
-                return False
-            
-            current_state = current_state_result.get('current_lifecycle_state')
-            current_cycle_count = current_state_result.get('lifecycle_cycle_count', 0)
-            
-            # Lifecycle history'ye ekle
-            history_query = """
-                INSERT INTO public.container_lifecycle_history 
-                (container_id, from_state_id, to_state_id, change_timestamp, change_reason, changed_by)
-                VALUES (%s, %s, %s, NOW(), %s, %s)
-            """
-            
-            history_result = self.execute_query(history_query, (container_id, current_state, new_state_id, reason, changed_by))
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    cursor.execute("SELECT id, current_lifecycle_state, lifecycle_cycle_count FROM public.konteynerler WHERE id = ANY(%s) ORDER BY id FOR UPDATE",
+                                   (container_ids,))
+                    current = {c_id: (state_id, cycles or 0) for c_id, state_id, cycles in cursor.fetchall()}
+                    rejected = machine.check_many({c_id: s for c_id, (s, _) in current.items()}, new_state_id)
+                    history, updates = [], []
+                    for c_id in container_ids:
+                        if c_id not in current: reason_text = "Konteyner bulunamadı"
+                        else: reason_text = rejected.get(c_id)
+                        if reason_text:
+                            result['rejected'].append({'container_id': c_id, 'reason': reason_text})
+                            continue
+                        state_id, cycles = current[c_id]
+                        history.append((c_id, state_id, new_state_id, reason, changed_by))
+                        if completes_cycle:
+                            cycles += 1
+                            if final_state_id != new_state_id:
+                                history.append((c_id, new_state_id, final_state_id, f"Cycle {cycles} tamamlandı - Yeni cycle başlıyor", "SYSTEM"))
+                        updates.append((c_id, final_state_id, cycles))
+                    if updates:
+                        execute_values(cursor, """INSERT INTO public.container_lifecycle_history
+                                                  (container_id, from_state_id, to_state_id, change_timestamp, change_reason, changed_by) VALUES %s""",
+                                       history, template="(%s, %s, %s, NOW(), %s, %s)", page_size=1000)
+                        execute_values(cursor, "UPDATE public.konteynerler k SET current_lifecycle_state = v.durum, lifecycle_cycle_count = v.sayac FROM (VALUES %s) AS v(id, durum, sayac) WHERE k.id = v.id",
+                                       updates, page_size=1000)
+        except psycopg2.Error as e:
+            print(f"❌ Lifecycle state change error: {e}"); self.conn.rollback()
+            result['error'] = str(e)
+            return result
+
+        result['changed'] = [u[0] for u in updates]
+        result['success'] = True
+        if result['rejected'] and not updates:
+            result['error'] = result['rejected'][0]['reason']
+        if updates:
+            cycle_text = f", cycle tamamlandı (→ {machine.name(final_state_id)})" if completes_cycle else ""
+            print(f"✅ {len(updates)} konteyner {machine.name(new_state_id)} durumuna geçti{cycle_text}; {len(result['rejected'])} reddedildi")
+            self.invalidate_lifecycle_stats()
             
-            if history_result:
-                # Eğer DELIVERED (9 veya 11) state'ine geçiş yapılıyorsa cycle count'ı artır
-                new_cycle_count = current_cycle_count
-                final_state_id = new_state_id
-                
-                if new_state_id == 9 or new_state_id == 11:  # DELIVERED state (hem 9 hem 11)
-                    new_cycle_count = current_cycle_count + 1
-                    final_state_id = 1  # Cycle tamamlandı, yeni cycle için ORDERED state'e geç
-                    
-                    print(f"🔄 Container {container_id}: Cycle {new_cycle_count} tamamlandı (State {new_state_id}→1), yeni cycle başlıyor")
-                    
-                    # Cycle tamamlandığında additional history kaydı
-                    additional_history_query = """
-                        INSERT INTO public.container_lifecycle_history 
-                        (container_id, from_state_id, to_state_id, change_timestamp, change_reason, changed_by)
-                        VALUES (%s, %s, %s, NOW(), %s, %s)
-                    """
-                    
-                    self.execute_query(additional_history_query, (container_id, new_state_id, 1, f"Cycle {new_cycle_count} tamamlandı - Yeni cycle başlıyor", "SYSTEM"))
+            # Cache'i temizle - UI'da güncel veri görünsün
+            if ADVANCED_FEATURES_ENABLED and hasattr(self, 'cache') and self.cache is not None:
+                # Tüm container cache'lerini temizle
+                cache_keys_to_remove = [key for key in self.cache.keys() if key.startswith('all_containers_detailed_')]
+                for key in cache_keys_to_remove:
+                    del self.cache[key]
                 
-                # Konteyner'in current state'ini ve cycle count'ını güncelle
-                update_query = """
-                    UPDATE public.konteynerler 
-                    SET current_lifecycle_state = %s, lifecycle_cycle_count = %s 
-                    WHERE id = %s
-                """
-                update_result = self.execute_query(update_query, (final_state_id, new_cycle_count, container_id))
-                
-                if update_result:
-                    print(f"✅ Container {container_id} state changed to {final_state_id}, cycle count: {new_cycle_count}")
-                    
-                    # Cache'i temizle - UI'da güncel veri görünsün
-                    if ADVANCED_FEATURES_ENABLED and hasattr(self, 'cache') and self.cache is not None:
-                        # Tüm container cache'lerini temizle
-                        cache_keys_to_remove = []
-                        for key in self.cache.keys():
-                            if key.startswith('all_containers_detailed_'):
-                                cache_keys_to_remove.append(key)
-                        
-                        for key in cache_keys_to_remove:
-                            del self.cache[key]
-                        
-                        print(f"🧹 Cache temizlendi: {len(cache_keys_to_remove)} cache key'i silindi")
-                    
-                    return True
-                else:
-                    print(f"❌ Failed to update container {container_id} state")
-                    return False
-            else:
-                print(f"❌ Failed to create history record for container {container_id}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ Lifecycle state change error: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
+                print(f"🧹 Cache temizlendi: {len(cache_keys_to_remove)} cache key'i silindi")
+        return result
     
     def _get_state_name(self, state_id):
         """State ID'den state adını al"""
         try:
-            result = self.execute_query(
-                "SELECT state_name FROM container_lifecycle_states WHERE id = %s", 
-                (state_id,), fetchone=True
-            )
-            return result['state_name'] if result else 'UNKNOWN'
-        except:
+            return self.get_lifecycle_state_machine().name(state_id)
+        except Exception:
             return 'UNKNOWN'
     
     def get_container_lifecycle_history(self, container_id):
@@ -352,6 +415,328 @@ class DatabaseConnection:
             # Eğer tablolar yoksa boş liste döndür
             return []
 
+    _LIFECYCLE_SUMMARY_UPSERT = """
+        INSERT INTO public.container_lifecycle_ozet AS o (container_id, gecis_sayisi, tamamlanan_cycle, ilk_degisim, son_degisim, son_durum_id)
+        SELECT h.container_id, COUNT(*), COUNT(*) FILTER (WHERE s.is_terminal), MIN(h.change_timestamp), MAX(h.change_timestamp),
+               (array_agg(h.to_state_id ORDER BY h.change_timestamp DESC, h.id DESC))[1]
+        FROM {source} h LEFT JOIN public.container_lifecycle_states s ON s.id = h.to_state_id
+        {where}
+        GROUP BY h.container_id
+        ON CONFLICT (container_id) DO UPDATE SET
+            gecis_sayisi = o.gecis_sayisi + EXCLUDED.gecis_sayisi,
+            tamamlanan_cycle = o.tamamlanan_cycle + EXCLUDED.tamamlanan_cycle,
+            ilk_degisim = LEAST(o.ilk_degisim, EXCLUDED.ilk_degisim),
+            son_durum_id = CASE WHEN EXCLUDED.son_degisim >= o.son_degisim THEN EXCLUDED.son_durum_id ELSE o.son_durum_id END,
+            son_degisim = GREATEST(o.son_degisim, EXCLUDED.son_degisim);
+    """
+
+    def ensure_lifecycle_timeline(self):
+        """
+        Timeline için (container_id, change_timestamp, id) indeksi ve konteyner başına özet satırı
+        (container_lifecycle_ozet: geçiş sayısı, tamamlanan cycle, ilk/son değişim, güncel durum).
+        Özet, geçmişe eklenen satırlarla deyim seviyesi tetikleyicide artımlı güncellenir; silinen geçmişi olan
+        konteynerlerin özeti yeniden hesaplanır. Tablo ilk kurulurken (ya da tetikleyiciler eksikse) mevcut geçmişten doldurulur.
+        """
+        if getattr(self, '_lifecycle_timeline_ready', False): return True
+        if not self.ensure_lifecycle_state_machine(): return False   # is_terminal sütunu gerekli
+        installed_query = """SELECT to_regclass('public.container_lifecycle_ozet') IS NOT NULL AND
+                                     (SELECT COUNT(*) FROM pg_trigger WHERE tgrelid = 'public.container_lifecycle_history'::regclass
+                                      AND tgname LIKE 'trg_lifecycle_ozet_%') = 2"""
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    cursor.execute(installed_query)
+                    installed = cursor.fetchone()[0]
+                    if not installed:
+                        # Kurulum ve doldurma sırasında geçmiş yazmaları beklesin: tetikleyiciler kurulmadan eklenen ya da
+                        # hem tetikleyici hem doldurma tarafından sayılan satır kalmaz. Kilit alınınca durum yeniden kontrol edilir.
+                        cursor.execute("LOCK TABLE public.container_lifecycle_history IN SHARE ROW EXCLUSIVE MODE")
+                        cursor.execute(installed_query)
+                        installed = cursor.fetchone()[0]
+                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lifecycle_history_konteyner_zaman ON public.container_lifecycle_history (container_id, change_timestamp, id)")
+                    self._lifecycle_history_index_ready = True
+                    if not installed:
+                        cursor.execute("""
+                            CREATE TABLE IF NOT EXISTS public.container_lifecycle_ozet (
+                                container_id VARCHAR(50) PRIMARY KEY,
+                                gecis_sayisi BIGINT NOT NULL DEFAULT 0,
+                                tamamlanan_cycle INTEGER NOT NULL DEFAULT 0,
+                                ilk_degisim TIMESTAMP,
+                                son_degisim TIMESTAMP,
+                                son_durum_id INTEGER
+                            );
+                        """)
+                        recompute = self._LIFECYCLE_SUMMARY_UPSERT.format(
+                            source="public.container_lifecycle_history", where="WHERE h.container_id IN (SELECT container_id FROM eski_satirlar)")
+                        cursor.execute(f"""
+                            CREATE OR REPLACE FUNCTION public.lifecycle_ozet_guncelle() RETURNS trigger AS $$
+                            BEGIN
+                                IF TG_OP = 'INSERT' THEN
+                                    {self._LIFECYCLE_SUMMARY_UPSERT.format(source="yeni_satirlar", where="")}
+                                ELSE
+                                    DELETE FROM public.container_lifecycle_ozet WHERE container_id IN (SELECT container_id FROM eski_satirlar);
+                                    {recompute}
+                                END IF;
+                                RETURN NULL;
+                            END $$ LANGUAGE plpgsql;
+                            DROP TRIGGER IF EXISTS trg_lifecycle_ozet_ekle ON public.container_lifecycle_history;
+                            DROP TRIGGER IF EXISTS trg_lifecycle_ozet_sil ON public.container_lifecycle_history;
+                            CREATE TRIGGER trg_lifecycle_ozet_ekle AFTER INSERT ON public.container_lifecycle_history
+                                REFERENCING NEW TABLE AS yeni_satirlar FOR EACH STATEMENT EXECUTE FUNCTION public.lifecycle_ozet_guncelle();
+                            CREATE TRIGGER trg_lifecycle_ozet_sil AFTER DELETE ON public.container_lifecycle_history
+                                REFERENCING OLD TABLE AS eski_satirlar FOR EACH STATEMENT EXECUTE FUNCTION public.lifecycle_ozet_guncelle();
+                        """)
+                        # Tetikleyiciler kurulduktan sonra (tablo kilitliyken) özet baştan doldurulur
+                        cursor.execute("TRUNCATE public.container_lifecycle_ozet")
+                        cursor.execute(self._LIFECYCLE_SUMMARY_UPSERT.format(source="public.container_lifecycle_history", where=""))
+            self._lifecycle_timeline_ready = True
+            return True
+        except psycopg2.Error as e:
+            print(f"⚠️  Lifecycle timeline özet tablosu hazırlanamadı: {e}"); self.conn.rollback()
+            return False
+
+    def get_container_lifecycle_timeline(self, container_id, before=None, limit=50):
+        """
+        Konteyner geçmişinin en yeniden eskiye bir sayfası. before: önceki sayfanın son satırının
+        (change_timestamp, id) değeri; verilirse sadece ondan eski kayıtlar gelir (keyset sayfalama).
+        """
+        self.ensure_lifecycle_timeline()
+        condition, params = "", [container_id]
+        if before is not None:
+            condition = "AND (clh.change_timestamp, clh.id) < (%s, %s)"
+            params += list(before)
+        query = f"""
+            SELECT clh.*, from_state.state_name AS from_state_name, to_state.state_name AS to_state_name,
+                   to_state.color_code AS color_code
+            FROM public.container_lifecycle_history clh
+            LEFT JOIN public.container_lifecycle_states from_state ON clh.from_state_id = from_state.id
+            LEFT JOIN public.container_lifecycle_states to_state ON clh.to_state_id = to_state.id
+            WHERE clh.container_id = %s {condition}
+            ORDER BY clh.change_timestamp DESC, clh.id DESC
+            LIMIT %s
+        """
+        return self.execute_query(query, (*params, limit), fetchall=True) or []
+
+    def get_container_lifecycle_summary(self, container_id):
+        """Konteynerin özet satırı (geçiş ve cycle sayısı, güncel durum ve o durumda geçen süre) ya da None"""
+        if not self.ensure_lifecycle_timeline(): return None
+        row = self.execute_query("""
+            SELECT o.*, NOW() - o.son_degisim AS durumda_gecen
+            FROM public.container_lifecycle_ozet o WHERE o.container_id = %s
+        """, (container_id,), fetchone=True)
+        if not row: return None
+        summary = dict(row)
+        state = self.get_lifecycle_state_machine().state(summary['son_durum_id'])
+        summary['son_durum_adi'] = state.name if state else None
+        summary['son_durum_renk'] = state.color if state else None
+        return summary
+
+    def iter_lifecycle_transitions(self, after_id=0, chunk_size=100000):
+        """
+        id'si after_id'den büyük lifecycle geçişlerini konteyner ve zamana göre sıralı, parça parça döndürür.
+        Her parça: [(id, container_id, to_state_id, epoch_saniye, sonraki_geçiş_epoch | None), ...]
+        Sonraki geçiş LEAD(change_timestamp) ile sadece okunan aralık içinde hesaplanır.
+        """
+        if not getattr(self, '_lifecycle_history_index_ready', False):
+            self._lifecycle_history_index_ready = bool(self.execute_query(
+                "CREATE INDEX IF NOT EXISTS idx_lifecycle_history_konteyner_zaman ON public.container_lifecycle_history (container_id, change_timestamp, id)"))
+        query = """SELECT h.id, h.container_id, h.to_state_id, EXTRACT(EPOCH FROM h.change_timestamp)::float8,
+                          EXTRACT(EPOCH FROM LEAD(h.change_timestamp) OVER (PARTITION BY h.container_id ORDER BY h.change_timestamp, h.id))::float8
+                   FROM public.container_lifecycle_history h
+                   WHERE h.id > %s
+                   ORDER BY h.container_id, h.change_timestamp, h.id"""
+        try:
+            with self.conn:
+                with self.conn.cursor(name=f"lifecycle_gecis_{id(self)}_{time.monotonic_ns()}") as cursor:
+                    cursor.itersize = chunk_size
+                    cursor.execute(query, (after_id,))
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows: break
+                        yield rows
+        except psycopg2.extensions.QueryCanceledError:
+            self.conn.rollback(); raise
+        except psycopg2.Error as e:
+            print(f"Lifecycle geçmişi okuma hatası: {e}"); self.conn.rollback()
+
+    def get_containers_after(self, after_id=None, limit=500):
+        """
+        Konteyner listesinin bir sonraki parçası (id'ye göre keyset sayfalama, PK indeksini kullanır).
+        Tablo modelleri parça parça yükleme ve yenilemede bunu çağırır; güncel veri gerektiği için cache'lenmez.
+        """
+        query = """
+            SELECT k.*, cls.state_name as lifecycle_state_name, cls.color_code as lifecycle_color
+            FROM public.konteynerler k
+            LEFT JOIN container_lifecycle_states cls ON k.current_lifecycle_state = cls.id
+            WHERE %s IS NULL OR k.id > %s
+            ORDER BY k.id ASC
+            LIMIT %s
+        """
+        return self.execute_query(query, (after_id, after_id, limit), fetchall=True) or []
+
+    def ensure_container_search_indexes(self):
+        """
+        Konteyner araması için indeksler:
+        - idx_konteyner_id_onek: id üzerinde text_pattern_ops B-tree (collation'dan bağımsız 'ABC%' önek araması)
+        - idx_konteyner_id_trgm_gist / idx_konteyner_limanlar_trgm: id ve "çıkış varış" liman ifadesi üzerinde pg_trgm GiST.
+          Hem '%abc%' ILIKE süzgecini hem benzerliğe göre KNN sıralamasını (<->, <->>) karşılar.
+        pg_trgm kurulamazsa (yetki yok vb.) sadece önek indeksi kullanılır, alt dize araması indekssiz çalışır.
+        """
+        if getattr(self, '_container_search_ready', None) is not None: return self._container_search_ready
+        self._container_search_trgm = False
+        if not self.execute_query("CREATE INDEX IF NOT EXISTS idx_konteyner_id_onek ON public.konteynerler (id text_pattern_ops)"):
+            self._container_search_ready = False
+            return False
+        self._container_search_trgm = bool(self.execute_query("""
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+            DROP INDEX IF EXISTS public.idx_konteyner_id_trgm, public.idx_konteyner_cikis_trgm, public.idx_konteyner_varis_trgm;
+            CREATE INDEX IF NOT EXISTS idx_konteyner_id_trgm_gist ON public.konteynerler USING gist (id gist_trgm_ops);
+            CREATE INDEX IF NOT EXISTS idx_konteyner_limanlar_trgm ON public.konteynerler
+                USING gist ((COALESCE(cikis_limani, '') || ' ' || COALESCE(varis_limani, '')) gist_trgm_ops);
+        """))
+        if not self._container_search_trgm:
+            print("⚠️  pg_trgm kullanılamıyor, konteyner araması sadece ID önekinde indeksli olacak")
+        self._container_search_ready = True
+        return True
+
+    # NOTIFY yükü 8000 bayt ile sınırlı: ID'ler kümülatif bayt uzunluğuna göre ~7000 baytlık gruplara bölünür
+    _ID_NOTIFY_BYTES = 7000
+    _ID_NOTIFY = ("PERFORM pg_notify('" + container_index.NOTIFY_CHANNEL + "', '{op}' || string_agg(id, ',' ORDER BY id)) "
+                  "FROM (SELECT id, (SUM(octet_length(id) + 1) OVER (ORDER BY id ROWS UNBOUNDED PRECEDING) - 1) / " + str(_ID_NOTIFY_BYTES) + " AS grup "
+                  "FROM ({source}) s) g GROUP BY grup;")
+
+    def ensure_container_id_events(self):
+        """
+        konteynerler üzerinde eklenen/silinen ID'leri NOTIFY ile yayan tetikleyiciler (container_index.ContainerIndexListener dinler).
+        Ekleme/silme deyim seviyesindedir, yükler bayt sınırına göre bölünür. Güncelleme tetikleyicisi sadece id sütunu
+        değiştiğinde satır seviyesinde çalışır (geçiş tabloları sütun listeli tetikleyicide kullanılamaz); durum/konum
+        güncellemeleri bildirim üretmez. Eski tanımlar (500'lük gruplar, her UPDATE'te çalışan tetikleyici) yeniden kurulur.
+        """
+        if getattr(self, '_container_id_events_ready', False): return True
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    cursor.execute("""
+                        SELECT COUNT(*) = 3 AND bool_or(pg_get_triggerdef(t.oid) LIKE '%UPDATE OF id%') AND bool_or(p.prosrc LIKE '%octet_length%')
+                        FROM pg_trigger t JOIN pg_proc p ON p.oid = t.tgfoid
+                        WHERE t.tgrelid = 'public.konteynerler'::regclass AND t.tgname LIKE 'trg_konteyner_id_%'
+                    """)
+                    if not cursor.fetchone()[0]:
+                        cursor.execute(f"""
+                            CREATE OR REPLACE FUNCTION public.konteyner_id_bildir() RETURNS trigger AS $$
+                            BEGIN
+                                IF TG_OP = 'INSERT' THEN
+                                    {self._ID_NOTIFY.format(op='+', source="SELECT id FROM yeni_satirlar")}
+                                ELSE
+                                    {self._ID_NOTIFY.format(op='-', source="SELECT id FROM eski_satirlar")}
+                                END IF;
+                                RETURN NULL;
+                            END $$ LANGUAGE plpgsql;
+                            CREATE OR REPLACE FUNCTION public.konteyner_id_degisti() RETURNS trigger AS $$
+                            BEGIN
+                                PERFORM pg_notify('{container_index.NOTIFY_CHANNEL}', '-' || OLD.id);
+                                PERFORM pg_notify('{container_index.NOTIFY_CHANNEL}', '+' || NEW.id);
+                                RETURN NULL;
+                            END $$ LANGUAGE plpgsql;
+                            DROP TRIGGER IF EXISTS trg_konteyner_id_ekle ON public.konteynerler;
+                            DROP TRIGGER IF EXISTS trg_konteyner_id_guncelle ON public.konteynerler;
+                            DROP TRIGGER IF EXISTS trg_konteyner_id_sil ON public.konteynerler;
+                            CREATE TRIGGER trg_konteyner_id_ekle AFTER INSERT ON public.konteynerler
+                                REFERENCING NEW TABLE AS yeni_satirlar FOR EACH STATEMENT EXECUTE FUNCTION public.konteyner_id_bildir();
+                            CREATE TRIGGER trg_konteyner_id_guncelle AFTER UPDATE OF id ON public.konteynerler
+                                FOR EACH ROW WHEN (OLD.id IS DISTINCT FROM NEW.id) EXECUTE FUNCTION public.konteyner_id_degisti();
+                            CREATE TRIGGER trg_konteyner_id_sil AFTER DELETE ON public.konteynerler
+                                REFERENCING OLD TABLE AS eski_satirlar FOR EACH STATEMENT EXECUTE FUNCTION public.konteyner_id_bildir();
+                        """)
+            self._container_id_events_ready = True
+            return True
+        except psycopg2.Error as e:
+            print(f"⚠️  Konteyner ID bildirim tetikleyicileri kurulamadı: {e}"); self.conn.rollback()
+            return False
+
+    def iter_container_ids(self, chunk_size=100000):
+        """Tüm konteyner ID'leri, sunucu taraflı imleçle parça parça (id sırasıyla)"""
+        try:
+            with self.conn:
+                with self.conn.cursor(name=f"konteyner_idleri_{id(self)}_{time.monotonic_ns()}") as cursor:
+                    cursor.itersize = chunk_size
+                    cursor.execute("SELECT id FROM public.konteynerler ORDER BY id")
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows: break
+                        yield [r[0] for r in rows]
+        except psycopg2.Error as e:
+            print(f"Konteyner ID okuma hatası: {e}"); self.conn.rollback()
+            raise
+
+    def container_exists(self, c_id):
+        """
+        Konteyner var mı? Bellekteki ID indeksinin Bloom süzgeci "kesinlikle yok" derse veritabanına gidilmez;
+        "olabilir" durumunda (ya da indeks hazır değilse) tek satırlık sorgu ile kesinleştirilir.
+        """
+        if not container_index.shared_index().might_contain(c_id):
+            return False
+        return bool(self.execute_query("SELECT 1 AS var FROM public.konteynerler WHERE id = %s", (c_id,), fetchone=True))
+
+    def complete_container_ids(self, prefix, limit=20):
+        """Önekle başlayan konteyner ID'leri: bellekteki indeksten, hazır değilse id önek indeksinden"""
+        index = container_index.shared_index()
+        if index.ready:
+            return index.complete(prefix, limit)
+        prefix = (prefix or "").strip().upper()
+        if not prefix: return []
+        pattern = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        rows = self.execute_query("SELECT id FROM public.konteynerler WHERE id LIKE %s ORDER BY id LIMIT %s", (pattern, limit), fetchall=True)
+        return [r['id'] for r in rows or []]
+
+    def search_containers(self, text, limit=50, after=None, status=None):
+        """
+        İndeksli, sıralı ve sayfalı konteyner araması. Gruplar: tam ID eşleşmesi, ID öneki, ID içinde geçen,
+        liman adında geçen. Her grup kendi LIMIT'li alt sorgusuyla okunup UNION ALL ile birleştirilir; önek grubu
+        id sırasıyla (B-tree aralık taraması), alt dize grupları GiST KNN ile trigram uzaklığı ve id sırasıyla okunur
+        (ID için similarity, limanlar için word_similarity): eşleşmelerin hepsi skorlanıp sıralanmaz, LIMIT kadarı okunur.
+        after: önceki sayfanın son satırının (arama_grubu, arama_skoru, id) değeri (keyset sayfalama).
+        3 karakterden kısa aramalar sadece ID önekine bakar (trigram indeksi kısa metinlerde işe yaramaz).
+        """
+        text = (text or "").strip()
+        if not text: return []
+        self.ensure_container_search_indexes()
+        pattern = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        prefix, contains = pattern.upper() + '%', '%' + pattern + '%'
+        ports = "(COALESCE(k.cikis_limani, '') || ' ' || COALESCE(k.varis_limani, ''))"   # idx_konteyner_limanlar_trgm ifadesi
+        trgm = getattr(self, '_container_search_trgm', False)
+        # Uzaklık (KNN sıralama anahtarı) ve skor = 1 - uzaklık; float8'e önce çevrilir ki farklı uzaklıklar aynı skora düşmesin
+        id_distance, port_distance = ("k.id <-> %(text)s", f"{ports} <->> %(text)s") if trgm else (None, None)
+        groups = [(0, "k.id = upper(%(text)s)", None),
+                  (1, "k.id LIKE %(prefix)s AND k.id <> upper(%(text)s)", None)]
+        if len(text) >= 3:
+            groups += [(2, "k.id ILIKE %(contains)s AND k.id NOT LIKE %(prefix)s", id_distance),
+                       (3, f"{ports} ILIKE %(contains)s AND (k.cikis_limani ILIKE %(contains)s OR k.varis_limani ILIKE %(contains)s) "
+                           "AND k.id NOT ILIKE %(contains)s", port_distance)]
+        after_group = after[0] if after else -1
+        parts = []
+        for group, condition, distance in groups:
+            group_score = f"(1 - ({distance})::float8)" if distance else None
+            if group < after_group: continue
+            if group == after_group:
+                condition += (f" AND ({group_score} < %(after_score)s OR ({group_score} = %(after_score)s AND k.id > %(after_id)s))"
+                              if group_score else " AND k.id > %(after_id)s")
+            parts.append(f"""(SELECT k.id, {group} AS arama_grubu, {group_score or '0::float8'} AS arama_skoru FROM public.konteynerler k
+                              WHERE {condition} AND (%(status)s IS NULL OR k.durum = %(status)s)
+                              ORDER BY {distance + ', ' if distance else ''}k.id LIMIT %(limit)s)""")
+        if not parts: return []
+        query = f"""
+            SELECT k.*, cls.state_name as lifecycle_state_name, cls.color_code as lifecycle_color, a.arama_grubu, a.arama_skoru
+            FROM ({' UNION ALL '.join(parts)}) a
+            JOIN public.konteynerler k ON k.id = a.id
+            LEFT JOIN container_lifecycle_states cls ON k.current_lifecycle_state = cls.id
+            ORDER BY a.arama_grubu, a.arama_skoru DESC, k.id
+            LIMIT %(limit)s
+        """
+        params = {'text': text, 'prefix': prefix, 'contains': contains, 'status': status, 'limit': limit,
+                  'after_score': float(after[1]) if after else None, 'after_id': after[2] if after else None}
+        return self.execute_query(query, params, fetchall=True) or []
+
     # Cached methods
     def get_all_containers_detailed(self, limit=None, offset=None):
         """Cache'li konteyner listesi - sayfalama desteği ile"""
@@ -387,6 +772,59 @@ class DatabaseConnection:
         
         return result
     
+    LIFECYCLE_STATS_TTL_SEC = 10
+    # Anlık görüntü süreç genelinde paylaşılır: iş kuyruğu ya da arka plan görevleri kendi bağlantılarıyla yazıp okusa da
+    # invalidate_lifecycle_stats() sürümü artırır ve hiçbir bağlantı eski görüntüyü döndürmez
+    _lifecycle_stats_lock = threading.Lock()
+    _lifecycle_stats_version = 0
+    _lifecycle_stats_snapshot = None   # (zaman, sürüm, istatistikler)
+
+    def get_lifecycle_dashboard_stats(self, max_age_sec=None):
+        """
+        Lifecycle paneli istatistikleri tek sorguda: toplam konteyner, toplam cycle, aktif durum sayısı,
+        durum dağılımı (çoktan aza) ve en çok kullanılan durum. Veritabanından sadece durum sayısı kadar
+        veri gelir; sonuç kısa süreli, süreç genelinde bir anlık görüntü olarak saklanır (durum değişikliğinde temizlenir).
+        """
+        max_age_sec = self.LIFECYCLE_STATS_TTL_SEC if max_age_sec is None else max_age_sec
+        cls = DatabaseConnection
+        with cls._lifecycle_stats_lock:
+            snapshot, version = cls._lifecycle_stats_snapshot, cls._lifecycle_stats_version
+        if snapshot and snapshot[1] == version and time.monotonic() - snapshot[0] < max_age_sec:
+            return snapshot[2]
+        query = """
+            WITH dagilim AS (
+                SELECT current_lifecycle_state AS state_id, COUNT(*) AS adet, COALESCE(SUM(lifecycle_cycle_count), 0) AS cycles
+                FROM public.konteynerler GROUP BY current_lifecycle_state
+            )
+            SELECT COALESCE(SUM(d.adet), 0)::bigint AS total_containers,
+                   COALESCE(SUM(d.cycles), 0)::bigint AS total_cycles,
+                   COALESCE(json_agg(json_build_object('state_id', d.state_id, 'state_name', COALESCE(s.state_name, 'TANIMSIZ'),
+                                                       'color', s.color_code, 'count', d.adet) ORDER BY d.adet DESC)
+                            FILTER (WHERE d.adet > 0), '[]') AS distribution
+            FROM dagilim d LEFT JOIN public.container_lifecycle_states s ON s.id = d.state_id
+        """
+        row = self.execute_query(query, fetchone=True)
+        if not row:
+            return None
+        distribution = row['distribution'] or []
+        stats = {
+            'total_containers': int(row['total_containers']),
+            'total_cycles': int(row['total_cycles']),
+            'active_lifecycles': len(self.get_lifecycle_state_machine().active_states()),
+            'most_used_state': distribution[0]['state_name'] if distribution else None,
+            'distribution': distribution,
+        }
+        with cls._lifecycle_stats_lock:
+            # okuma sırasında gelen bir değişiklik bu görüntüyü eskitmiş olabilir; o durumda saklanmaz
+            if version == cls._lifecycle_stats_version: cls._lifecycle_stats_snapshot = (time.monotonic(), version, stats)
+        return stats
+
+    def invalidate_lifecycle_stats(self):
+        cls = DatabaseConnection
+        with cls._lifecycle_stats_lock:
+            cls._lifecycle_stats_version += 1
+            cls._lifecycle_stats_snapshot = None
+
     def get_containers_count(self):
         """Toplam konteyner sayısını al"""
         query = "SELECT COUNT(*) as total FROM public.konteynerler"
@@ -406,18 +844,13 @@ class DatabaseConnection:
                 print(f"❌ {error_msg}")
                 return error_msg
             
-            print(f"🔧 DEBUG: Connection status: {self.conn}")
-            
-            # Check if container already exists
-            print(f"🔧 DEBUG: Checking if container {c_id} already exists...")
-            existing = self.get_container_details_by_id(c_id)
-            if existing:
+            # Check if container already exists (Bloom süzgeci yeni ID'lerde veritabanı sorgusunu atlar;
+            # yarış durumunda birincil anahtar IntegrityError ile yakalanır)
+            if self.container_exists(c_id):
                 error_msg = f"Konteyner ID {c_id} zaten mevcut"
                 print(f"⚠️  {error_msg}")
                 return error_msg
             
-            print(f"🔧 DEBUG: Container {c_id} is unique, proceeding with insert...")
-            
             # Insert new container
             result = self.execute_query(
                 "INSERT INTO public.konteynerler (id, tip, cikis_limani, varis_limani, durum, current_lifecycle_state) VALUES (%s, %s, %s, %s, %s, %s)", 
@@ -428,6 +861,8 @@ class DatabaseConnection:
             
             if result:
                 print(f"✅ Konteyner {c_id} başarıyla eklendi: {c_id}")
+                self.invalidate_lifecycle_stats()
+                container_index.shared_index().add(c_id)
                 
                 # CRITICAL: Clear all caches immediately after successful insert
                 try:
@@ -537,13 +972,15 @@ class DatabaseConnection:
         return result
 
     def delete_container_by_id(self, c_id):
-        return self.execute_query("DELETE FROM public.konteynerler WHERE id=%s", (c_id,))
+        result = self.execute_query("DELETE FROM public.konteynerler WHERE id=%s", (c_id,))
+        if result:
+            container_index.shared_index().discard(c_id)
+            self.invalidate_lifecycle_stats()
+        return result
 
     def get_container_details_by_id(self, c_id):
         """Konteyner detaylarını ID ile getir"""
         try:
-            print(f"🔧 DEBUG: Getting container details for ID: {c_id}")
-            
             if not self.conn:
                 print("⚠️  Database connection is None, attempting to connect...")
                 self.connect()
@@ -552,13 +989,17 @@ class DatabaseConnection:
                 print("❌ Could not establish database connection")
                 return None
                 
-            result = self.execute_query("SELECT * FROM public.konteynerler WHERE id = %s", (c_id,), fetchone=True)
-            print(f"🔧 DEBUG: Query result for {c_id}: {result}")
-            return result
+            return self.execute_query("SELECT * FROM public.konteynerler WHERE id = %s", (c_id,), fetchone=True)
             
         except Exception as e:
             print(f"❌ Error in get_container_details_by_id: {e}")
             return None
+
+    def get_containers_by_ids(self, container_ids):
+        """Birden çok konteynerin kayıtlarını tek sorguda getir (bulunamayanlar listede yer almaz)"""
+        container_ids = list(dict.fromkeys(c for c in container_ids or [] if c))
+        if not container_ids: return []
+        return self.execute_query("SELECT * FROM public.konteynerler WHERE id = ANY(%s)", (container_ids,), fetchall=True) or []
         
     def get_all_loadable_containers(self):
         return self.execute_query("SELECT * FROM public.konteynerler WHERE durum = 'SAHA' OR durum = 'ATANMAMIS'", fetchall=True)
@@ -597,7 +1038,231 @@ class DatabaseConnection:
                     cursor.execute("UPDATE public.gemi_yuklemeler SET gemi_bay=%s, gemi_satir=%s, gemi_sutun=%s WHERE konteyner_id=%s", (bay_id, new_row, new_tier, container_id))
             return True
         except psycopg2.Error as e: print(f"Gemi konumu güncelleme hatası: {e}"); self.conn.rollback(); return False
+
+    def apply_ship_placements(self, ship_id, placements=(), relocations=()):
+        """
+        Planlanan yerleştirme ve taşımaları tek transaction'da uygula.
+        placements / relocations: [(container_id, bay_id, row, tier), ...]
+        Çakışan kalemler (dolu slot, altı boş slot, durumu değişmiş konteyner, alttaki konteynerle boyut/reefer
+        uyumsuzluğu; ShipOccupancyGrid.placeable_mask ile aynı kurallar) atlanır ve geri kalanlar yine de kaydedilir.
+        Uyumsuzluk başka operatörün o arada yaptığı yerleştirmeden doğabileceği için kalem bazında raporlanır.
+        Gemi boyutları dışında slot istemci hatasıdır: böyle bir kalem varsa hiçbir şey kaydedilmez.
+        Dönüş: {'success', 'applied', 'conflicts', 'error'}
+        """
+        result = {'success': False, 'applied': [], 'conflicts': []}
+        placements, relocations = list(placements or []), list(relocations or [])
+        if not placements and not relocations: result['success'] = True; return result
+        all_ids = [p[0] for p in placements + relocations]
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    # Aynı gemiye eşzamanlı plan onaylarını sırala (başka operatörün işlemiyle yarışmayı önler)
+                    cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"gemi_plan:{ship_id}",))
+                    cursor.execute("SELECT toplam_bay_sayisi, toplam_sira_sayisi, toplam_kat_sayisi FROM public.gemiler WHERE gemi_id = %s", (ship_id,))
+                    ship = cursor.fetchone()
+                    if not ship:
+                        result['error'] = f"Gemi bulunamadı: {ship_id}"; return result
+                    grid = ShipOccupancyGrid.from_ship({'toplam_bay_sayisi': ship[0], 'toplam_sira_sayisi': ship[1], 'toplam_kat_sayisi': ship[2]})
+                    cursor.execute("""SELECT gy.konteyner_id, gy.gemi_bay, gy.gemi_satir, gy.gemi_sutun, k.tip FROM public.gemi_yuklemeler gy
+                                      LEFT JOIN public.konteynerler k ON k.id = gy.konteyner_id WHERE gy.gemi_id = %s""", (ship_id,))
+                    occupied = {}
+                    for c_id, bay, row, tier, tip in cursor.fetchall():
+                        occupied[(bay, row, tier)] = c_id
+                        grid.place(c_id, tip, bay, row, tier)
+                    cursor.execute("SELECT id, durum, gemi_id, tip FROM public.konteynerler WHERE id = ANY(%s) ORDER BY id FOR UPDATE", (all_ids,))
+                    states, types = {}, {}
+                    for c_id, durum, gemi_id, tip in cursor.fetchall():
+                        states[c_id], types[c_id] = (durum, gemi_id), tip
+
+                    slot_of = {c_id: slot for slot, c_id in occupied.items()}
+                    for c_id, _, _, _ in relocations:
+                        if c_id in slot_of and states.get(c_id, (None, None))[1] == ship_id:
+                            occupied.pop(slot_of[c_id], None); grid.remove(*slot_of[c_id])
+
+                    accepted_placements, accepted_relocations, violations = [], [], []
+                    items = [(p, False) for p in placements] + [(r, True) for r in relocations]
+                    for (c_id, bay, row, tier), is_relocation in sorted(items, key=lambda i: i[0][3]):
+                        if not grid.contains_slot(bay, row, tier):
+                            violations.append({'container_id': c_id, 'bay': bay, 'row': row, 'tier': tier, 'reason': "Slot gemi boyutları dışında"})
+                            continue
+                        durum, gemi_id = states.get(c_id, (None, None))
+                        if durum is None: reason = "Konteyner bulunamadı"
+                        elif is_relocation and gemi_id != ship_id: reason = "Konteyner artık bu gemide değil"
+                        elif is_relocation and c_id in slot_of and (slot_of[c_id][0], slot_of[c_id][1], slot_of[c_id][2] + 1) in occupied: reason = "Konteynerin üstünde başka konteyner var"
+                        elif not is_relocation and durum not in ('SAHA', 'ATANMAMIS'): reason = f"Konteyner artık yüklenebilir değil (durum: {durum})"
+                        elif (bay, row, tier) in occupied: reason = f"Slot dolu ({occupied[(bay, row, tier)]})"
+                        elif tier > 0 and (bay, row, tier - 1) not in occupied: reason = "Altı boş (yerçekimi kuralı)"
+                        elif not grid.placeable_mask(types.get(c_id), bay)[row, tier]: reason = "Alttaki konteynerle boyut/reefer tipi uyumsuz"
+                        else: reason = None
+                        if reason:
+                            result['conflicts'].append({'container_id': c_id, 'bay': bay, 'row': row, 'tier': tier, 'reason': reason})
+                            if is_relocation and c_id in slot_of and slot_of[c_id] not in occupied:
+                                occupied[slot_of[c_id]] = c_id; grid.place(c_id, types.get(c_id), *slot_of[c_id])
+                            continue
+                        occupied[(bay, row, tier)] = c_id
+                        grid.place(c_id, types.get(c_id), bay, row, tier)
+                        (accepted_relocations if is_relocation else accepted_placements).append((c_id, bay, row, tier))
+
+                    if violations:
+                        # Gemi dışı slot istemci tarafında yakalanmış olmalıydı: plan bütünüyle reddedilir
+                        result['conflicts'] = violations + result['conflicts']
+                        result['error'] = f"{len(violations)} yerleştirme gemi boyutları dışında, plan kaydedilmedi"
+                        return result
+
+                    accepted = accepted_placements + accepted_relocations
+                    if accepted:
+                        execute_values(cursor, "UPDATE public.konteynerler k SET durum = 'GEMI', saha_konum = NULL, gemi_id = v.gemi_id, gemi_konum = v.konum FROM (VALUES %s) AS v(id, gemi_id, konum) WHERE k.id = v.id",
+                                       [(c_id, ship_id, f"{bay}-R{row}-T{tier}") for c_id, bay, row, tier in accepted], page_size=1000)
+                    if accepted_placements:
+                        cursor.execute("DELETE FROM public.gemi_yuklemeler WHERE konteyner_id = ANY(%s)", ([p[0] for p in accepted_placements],))
+                        execute_values(cursor, "INSERT INTO public.gemi_yuklemeler (konteyner_id, gemi_id, gemi_satir, gemi_sutun, gemi_bay, yukleme_tarihi) VALUES %s",
+                                       [(c_id, ship_id, row, tier, bay) for c_id, bay, row, tier in accepted_placements], template="(%s, %s, %s, %s, %s, NOW())", page_size=1000)
+                    if accepted_relocations:
+                        execute_values(cursor, "UPDATE public.gemi_yuklemeler gy SET gemi_bay = v.bay, gemi_satir = v.satir, gemi_sutun = v.sutun FROM (VALUES %s) AS v(id, bay, satir, sutun) WHERE gy.konteyner_id = v.id",
+                                       accepted_relocations, page_size=1000)
+            result['applied'] = [a[0] for a in accepted]
+            result['success'] = True
+            if accepted and ADVANCED_FEATURES_ENABLED and hasattr(self, 'cache') and self.cache is not None: self.cache.clear()
+            return result
+        except psycopg2.Error as e:
+            print(f"Toplu gemi planı kaydetme hatası: {e}"); self.conn.rollback()
+            result['error'] = str(e)
+            return result
         
+    def move_containers(self, moves):
+        """
+        Konteyner taşımalarını tek transaction'da uygula: saha/gemi konumu, gemi_yuklemeler,
+        araç durumu ve tasima_loglari birlikte yazılır.
+        moves: [{'container_id', 'destination': ('YARD', konum) | ('SHIP', gemi_id, bay, sıra, kat), 'vehicle_id' (isteğe bağlı)}, ...]
+        Çakışan kalemler atlanır, diğerleri kaydedilir. Gemi hedefleri apply_ship_placements ile aynı ShipOccupancyGrid
+        kurallarıyla (yerçekimi, alttaki konteynerle boyut/reefer uyumu) doğrulanır; gemi boyutları dışında bir hedef
+        varsa hiçbir şey kaydedilmez. Dönüş: {'success', 'moved': [yeni konteyner kayıtları], 'conflicts', 'error'}
+        """
+        result = {'success': False, 'moved': [], 'conflicts': []}
+        moves = list(moves or [])
+        if not moves: result['success'] = True; return result
+        container_ids = [m['container_id'] for m in moves]
+        yard_targets = sorted({m['destination'][1] for m in moves if m['destination'][0] == 'YARD'})
+        lock_ships = {m['destination'][1] for m in moves if m['destination'][0] == 'SHIP'}
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    # Hedef ve kaynak gemiler ile saha konumları için kilitler (apply_ship_placements ile aynı sıra: önce advisory, sonra satır kilidi).
+                    # Kaynak gemiden alınan konteynerin üstündeki slot da kontrol edileceği için kaynak gemilerin planı da kilitlenir.
+                    while True:
+                        cursor.execute("SELECT DISTINCT gemi_id FROM public.gemi_yuklemeler WHERE konteyner_id = ANY(%s)", (container_ids,))
+                        ship_ids = sorted(lock_ships | {r[0] for r in cursor.fetchall()})
+                        for key in [f"gemi_plan:{s}" for s in ship_ids] + [f"saha:{loc}" for loc in yard_targets]:
+                            cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (key,))
+                        cursor.execute("SELECT id, durum, gemi_id, tip FROM public.konteynerler WHERE id = ANY(%s) ORDER BY id FOR UPDATE", (container_ids,))
+                        locked = cursor.fetchall()
+                        # Kilit beklenirken başka bir gemiye taşınmış konteyner varsa o geminin kilidi satır kilitlerinden sonra
+                        # alınmaz (sıra bozulur, kilitlenme riski): işlem geri alınır ve tam kilit kümesiyle baştan denenir
+                        cursor.execute("SELECT DISTINCT gemi_id FROM public.gemi_yuklemeler WHERE konteyner_id = ANY(%s)", (container_ids,))
+                        late_ships = {r[0] for r in cursor.fetchall()} - set(ship_ids)
+                        if not late_ships: break
+                        self.conn.rollback()
+                        lock_ships |= set(ship_ids) | late_ships
+                    states, types = {}, {}
+                    for c_id, durum, gemi_id, tip in locked:
+                        states[c_id], types[c_id] = (durum, gemi_id), tip
+                    vehicle_ids = [m['vehicle_id'] for m in moves if m.get('vehicle_id')]
+                    cursor.execute("SELECT id, durum FROM public.araclar WHERE id = ANY(%s) ORDER BY id FOR UPDATE", (vehicle_ids,))
+                    vehicle_states = dict(cursor.fetchall())
+                    cursor.execute("SELECT gemi_id, toplam_bay_sayisi, toplam_sira_sayisi, toplam_kat_sayisi FROM public.gemiler WHERE gemi_id = ANY(%s)", (ship_ids,))
+                    grids = {g: ShipOccupancyGrid.from_ship({'toplam_bay_sayisi': bays, 'toplam_sira_sayisi': rows, 'toplam_kat_sayisi': tiers})
+                             for g, bays, rows, tiers in cursor.fetchall()}
+                    cursor.execute("""SELECT gy.konteyner_id, gy.gemi_id, gy.gemi_bay, gy.gemi_satir, gy.gemi_sutun, k.tip FROM public.gemi_yuklemeler gy
+                                      LEFT JOIN public.konteynerler k ON k.id = gy.konteyner_id WHERE gy.gemi_id = ANY(%s)""", (ship_ids,))
+                    ship_slots = {}
+                    for c_id, g, bay, row, tier, tip in cursor.fetchall():
+                        ship_slots[(g, bay, row, tier)] = c_id
+                        if g in grids: grids[g].place(c_id, tip, bay, row, tier)
+                    cursor.execute("SELECT id, saha_konum FROM public.konteynerler WHERE durum = 'SAHA' AND saha_konum = ANY(%s)", (yard_targets,))
+                    yard_slots = {loc: c_id for c_id, loc in cursor.fetchall()}
+                    ship_slot_of = {c_id: slot for slot, c_id in ship_slots.items()}
+
+                    # Gemi dışı hedef istemci hatasıdır (apply_ship_placements gibi): taşımalar bütünüyle reddedilir
+                    violations = []
+                    for m in moves:
+                        dest = m['destination']
+                        if dest[0] != 'SHIP': continue
+                        if dest[1] not in grids: reason = "Gemi bulunamadı"
+                        elif not grids[dest[1]].contains_slot(*dest[2:]): reason = "Slot gemi boyutları dışında"
+                        else: continue
+                        violations.append({'container_id': m['container_id'], 'destination': dest, 'vehicle_id': m.get('vehicle_id'), 'reason': reason})
+                    if violations:
+                        result['conflicts'] = violations
+                        result['error'] = f"{len(violations)} taşıma hedefi gemi boyutları dışında, taşımalar kaydedilmedi"
+                        return result
+
+                    accepted, used_vehicles = [], set()
+                    for m in moves:
+                        c_id, dest, v_id = m['container_id'], m['destination'], m.get('vehicle_id')
+                        source = ship_slot_of.get(c_id)
+                        # Tip kontrolü konteynerin kendi eski slotu boşalmış gibi yapılır; çakışmada geri konur
+                        if source and source[0] in grids: grids[source[0]].remove(*source[1:])
+                        if c_id not in states: reason = "Konteyner bulunamadı"
+                        elif v_id and vehicle_states.get(v_id) != 'BOŞTA': reason = f"Araç uygun değil ({vehicle_states.get(v_id, 'bulunamadı')})"
+                        elif v_id and v_id in used_vehicles: reason = "Araç aynı işlemde başka taşımaya atandı"
+                        elif source and (source[0], source[1], source[2], source[3] + 1) in ship_slots: reason = "Konteynerin üstünde başka konteyner var"
+                        elif dest[0] == 'YARD' and yard_slots.get(dest[1]) not in (None, c_id): reason = f"Saha konumu dolu ({yard_slots[dest[1]]})"
+                        elif dest[0] == 'SHIP' and ship_slots.get(tuple(dest[1:])) not in (None, c_id): reason = f"Slot dolu ({ship_slots[tuple(dest[1:])]})"
+                        elif dest[0] == 'SHIP' and dest[4] > 0 and (dest[1], dest[2], dest[3], dest[4] - 1) not in ship_slots: reason = "Altı boş (yerçekimi kuralı)"
+                        elif dest[0] == 'SHIP' and not grids[dest[1]].placeable_mask(types.get(c_id), dest[2])[dest[3], dest[4]]: reason = "Alttaki konteynerle boyut/reefer tipi uyumsuz"
+                        else: reason = None
+                        if reason:
+                            result['conflicts'].append({'container_id': c_id, 'destination': dest, 'vehicle_id': v_id, 'reason': reason})
+                            if source and source[0] in grids: grids[source[0]].place(c_id, types.get(c_id), *source[1:])
+                            continue
+                        # Kaynağı boşalt, hedefi doldur (aynı işlemdeki sonraki taşımalar güncel durumu görür)
+                        if source: ship_slots.pop(source, None); ship_slot_of.pop(c_id, None)
+                        for loc in [loc for loc, occupant in yard_slots.items() if occupant == c_id]: yard_slots.pop(loc)
+                        if dest[0] == 'YARD': yard_slots[dest[1]] = c_id
+                        else:
+                            ship_slots[tuple(dest[1:])] = c_id; ship_slot_of[c_id] = tuple(dest[1:])
+                            grids[dest[1]].place(c_id, types.get(c_id), *dest[2:])
+                        if v_id: used_vehicles.add(v_id)
+                        accepted.append(m)
+
+                    yard_moves = [(m['container_id'], m['destination'][1]) for m in accepted if m['destination'][0] == 'YARD']
+                    ship_moves = [(m['container_id'],) + tuple(m['destination'][1:]) for m in accepted if m['destination'][0] == 'SHIP']
+                    if yard_moves:
+                        execute_values(cursor, "UPDATE public.konteynerler k SET durum = 'SAHA', saha_konum = v.konum, gemi_id = NULL, gemi_konum = NULL FROM (VALUES %s) AS v(id, konum) WHERE k.id = v.id",
+                                       yard_moves, page_size=1000)
+                    if ship_moves:
+                        execute_values(cursor, "UPDATE public.konteynerler k SET durum = 'GEMI', saha_konum = NULL, gemi_id = v.gemi_id, gemi_konum = v.konum FROM (VALUES %s) AS v(id, gemi_id, konum) WHERE k.id = v.id",
+                                       [(c_id, g, f"{bay}-R{row}-T{tier}") for c_id, g, bay, row, tier in ship_moves], page_size=1000)
+                    if accepted:
+                        cursor.execute("DELETE FROM public.gemi_yuklemeler WHERE konteyner_id = ANY(%s)", ([m['container_id'] for m in accepted],))
+                    if ship_moves:
+                        execute_values(cursor, "INSERT INTO public.gemi_yuklemeler (konteyner_id, gemi_id, gemi_satir, gemi_sutun, gemi_bay, yukleme_tarihi) VALUES %s",
+                                       [(c_id, g, row, tier, bay) for c_id, g, bay, row, tier in ship_moves], template="(%s, %s, %s, %s, %s, NOW())", page_size=1000)
+                    vehicle_moves = [(m['container_id'], m['vehicle_id']) for m in accepted if m.get('vehicle_id')]
+                    if vehicle_moves:
+                        cursor.execute("UPDATE public.araclar SET durum = 'MEŞGUL' WHERE id = ANY(%s)", ([v for _, v in vehicle_moves],))
+                        execute_values(cursor, "INSERT INTO public.tasima_loglari (konteyner_id, arac_id, islem_tipi, islem_tarihi) VALUES %s",
+                                       vehicle_moves, template="(%s, %s, 'ATAMA YAPILDI', NOW())", page_size=1000)
+                if accepted:
+                    with self.conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                        cursor.execute("SELECT * FROM public.konteynerler WHERE id = ANY(%s)", ([m['container_id'] for m in accepted],))
+                        result['moved'] = cursor.fetchall()
+            result['success'] = True
+            if accepted and ADVANCED_FEATURES_ENABLED and hasattr(self, 'cache') and self.cache is not None: self.cache.clear()
+            return result
+        except psycopg2.Error as e:
+            print(f"Konteyner taşıma hatası: {e}"); self.conn.rollback()
+            result['error'] = str(e)
+            return result
+
+    def move_container(self, container_id, destination, vehicle_id=None):
+        """Tek konteyner taşıması (move_containers). Dönüş: {'success', 'container', 'error'}"""
+        result = self.move_containers([{'container_id': container_id, 'destination': tuple(destination), 'vehicle_id': vehicle_id}])
+        if result['moved']:
+            return {'success': True, 'container': result['moved'][0], 'error': None}
+        error = result['conflicts'][0]['reason'] if result['conflicts'] else result.get('error', "Bilinmeyen hata")
+        return {'success': False, 'container': None, 'error': error}
+
     def get_all_ship_slots(self, ship_id):
         query = "SELECT k.*, gy.gemi_satir, gy.gemi_sutun as gemi_tier, gy.gemi_bay FROM public.gemi_yuklemeler gy JOIN public.konteynerler k ON gy.konteyner_id = k.id WHERE gy.gemi_id = %s"
         records = self.execute_query(query, (ship_id,), fetchall=True)
@@ -606,6 +1271,39 @@ class DatabaseConnection:
             for r in records: slots[r['gemi_bay']][(r['gemi_satir'], r['gemi_tier'])] = r
         return slots
 
+    def get_ship_bay_slots(self, ship_id, bay_id):
+        """Tek bir bay'in dolu slotlarını getir: {(sıra, kat): konteyner}"""
+        query = "SELECT k.*, gy.gemi_satir, gy.gemi_sutun as gemi_tier, gy.gemi_bay FROM public.gemi_yuklemeler gy JOIN public.konteynerler k ON gy.konteyner_id = k.id WHERE gy.gemi_id = %s AND gy.gemi_bay = %s"
+        records = self.execute_query(query, (ship_id, bay_id), fetchall=True)
+        return {(r['gemi_satir'], r['gemi_tier']): r for r in records} if records else {}
+
+    def get_ship_bay_summary(self, ship_id, port_rotation=None):
+        """
+        Bay başına doluluk, reefer ve overstow sayıları (genel görünüm ısı haritası için).
+        Overstow, port_rotation sırasına göre kolondaki alt konteynerlerin en erken limanıyla karşılaştırılarak hesaplanır.
+        Liman adları yazım farkı gözetilmeden (utils.port_key ile aynı kural) eşleştirilir.
+        """
+        rotation = [port_key(p) for p in port_rotation or []]
+        rank_sql = f"COALESCE(array_position(%s::text[], {PORT_KEY_SQL.format(column='k.varis_limani')}), %s)"
+        query = f"""
+            SELECT gemi_bay, COUNT(*) AS dolu_slot,
+                   COUNT(*) FILTER (WHERE is_reefer) AS reefer_slot,
+                   COUNT(*) FILTER (WHERE port_rank > min_below) AS overstow
+            FROM (
+                SELECT gy.gemi_bay, k.tip ILIKE '%%REEFER%%' AS is_reefer,
+                       {rank_sql} AS port_rank,
+                       MIN({rank_sql}) OVER (
+                           PARTITION BY gy.gemi_bay, gy.gemi_satir ORDER BY gy.gemi_sutun
+                           ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS min_below
+                FROM public.gemi_yuklemeler gy JOIN public.konteynerler k ON gy.konteyner_id = k.id
+                WHERE gy.gemi_id = %s
+            ) s
+            GROUP BY gemi_bay
+        """
+        unknown_rank = len(rotation) + 1
+        records = self.execute_query(query, (rotation, unknown_rank, rotation, unknown_rank, ship_id), fetchall=True)
+        return {r['gemi_bay']: r for r in records} if records else {}
+
     def add_ship(self, gemi_id, gemi_adi, toplam_bay, toplam_sira, toplam_kat):
         query = "INSERT INTO public.gemiler (gemi_id, gemi_adi, toplam_bay_sayisi, toplam_sira_sayisi, toplam_kat_sayisi) VALUES (%s, %s, %s, %s, %s)"
         return self.execute_query(query, (gemi_id, gemi_adi, toplam_bay, toplam_sira, toplam_kat))
@@ -656,6 +1354,140 @@ class DatabaseConnection:
             timestamp = datetime.now().strftime("%H%M%S")
             return f"GEMI-{timestamp}"
 
+    # Rıhtım Planlama
+    def ensure_berth_tables(self):
+        """Rıhtım ve gemi yanaşma tablolarını yoksa oluştur (ilk kurulumda 4 rıhtım eklenir)"""
+        if getattr(self, '_berth_tables_ready', False): return True
+        query = """
+            CREATE TABLE IF NOT EXISTS public.rihtimlar (
+                rihtim_id VARCHAR(20) PRIMARY KEY,
+                rihtim_adi VARCHAR(100)
+            );
+            CREATE TABLE IF NOT EXISTS public.gemi_yanasmalari (
+                id SERIAL PRIMARY KEY,
+                gemi_id VARCHAR(50) NOT NULL REFERENCES public.gemiler(gemi_id) ON DELETE CASCADE,
+                eta TIMESTAMP NOT NULL,
+                islem_suresi_saat NUMERIC(6, 2) NOT NULL DEFAULT 12,
+                rihtim_id VARCHAR(20) REFERENCES public.rihtimlar(rihtim_id) ON DELETE SET NULL,
+                planlanan_baslangic TIMESTAMP,
+                planlanan_bitis TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS idx_gemi_yanasmalari_eta ON public.gemi_yanasmalari (eta);
+            INSERT INTO public.rihtimlar (rihtim_id, rihtim_adi)
+            SELECT 'R' || i, 'Rıhtım ' || i FROM generate_series(1, 4) AS i
+            WHERE NOT EXISTS (SELECT 1 FROM public.rihtimlar);
+        """
+        self._berth_tables_ready = bool(self.execute_query(query))
+        return self._berth_tables_ready
+
+    def get_berths(self):
+        if not self.ensure_berth_tables(): return []
+        return self.execute_query("SELECT * FROM public.rihtimlar ORDER BY rihtim_id ASC", fetchall=True) or []
+
+    def get_berth_calls(self, start=None, end=None):
+        """Gemi yanaşma kayıtları (ETA aralığı verilirse sadece o aralıktakiler)"""
+        if not self.ensure_berth_tables(): return []
+        query = """
+            SELECT gy.*, g.gemi_adi FROM public.gemi_yanasmalari gy
+            JOIN public.gemiler g ON gy.gemi_id = g.gemi_id
+            WHERE (%s::timestamp IS NULL OR gy.eta >= %s) AND (%s::timestamp IS NULL OR gy.eta < %s)
+            ORDER BY gy.eta ASC
+        """
+        return self.execute_query(query, (start, start, end, end), fetchall=True) or []
+
+    def add_berth_call(self, gemi_id, eta, islem_suresi_saat):
+        if not self.ensure_berth_tables(): return None
+        row = self.execute_query("INSERT INTO public.gemi_yanasmalari (gemi_id, eta, islem_suresi_saat) VALUES (%s, %s, %s) RETURNING id",
+                                 (gemi_id, eta, islem_suresi_saat), fetchone=True)
+        if row: self.conn.commit()
+        return row['id'] if row else None
+
+    def update_berth_call(self, call_id, eta, islem_suresi_saat):
+        return self.execute_query("UPDATE public.gemi_yanasmalari SET eta=%s, islem_suresi_saat=%s WHERE id=%s", (eta, islem_suresi_saat, call_id))
+
+    def delete_berth_call(self, call_id):
+        return self.execute_query("DELETE FROM public.gemi_yanasmalari WHERE id=%s", (call_id,))
+
+    def save_berth_schedule(self, assignments):
+        """Planı tek transaction'da kaydet. assignments: [(call_id, rihtim_id, baslangic, bitis), ...]"""
+        assignments = list(assignments or [])
+        if not assignments: return True
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    execute_values(cursor, "UPDATE public.gemi_yanasmalari gy SET rihtim_id = v.rihtim_id, planlanan_baslangic = v.baslangic, planlanan_bitis = v.bitis FROM (VALUES %s) AS v(id, rihtim_id, baslangic, bitis) WHERE gy.id = v.id",
+                                   assignments, template="(%s, %s, %s::timestamp, %s::timestamp)", page_size=1000)
+            return True
+        except psycopg2.Error as e: print(f"Rıhtım planı kaydetme hatası: {e}"); self.conn.rollback(); return False
+
+    # Taşıma Planları
+    def ensure_transport_plan_tables(self):
+        """tasima_planlari tablosunu yoksa oluştur"""
+        if getattr(self, '_transport_plan_tables_ready', False): return True
+        query = """
+            CREATE TABLE IF NOT EXISTS public.tasima_planlari (
+                id VARCHAR(40) PRIMARY KEY,
+                optimizasyon_kriteri VARCHAR(20) NOT NULL,
+                durum VARCHAR(20) NOT NULL DEFAULT 'planned',
+                kargo_sayisi INTEGER NOT NULL,
+                toplam_maliyet NUMERIC(12, 2),
+                toplam_sure_saat NUMERIC(10, 3),
+                toplam_mesafe_km NUMERIC(10, 3),
+                toplam_co2_kg NUMERIC(10, 3),
+                rotalar JSONB NOT NULL,
+                olusturma_tarihi TIMESTAMP NOT NULL DEFAULT NOW()
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasima_planlari_durum_tarih ON public.tasima_planlari (durum, olusturma_tarihi DESC);
+        """
+        self._transport_plan_tables_ready = bool(self.execute_query(query))
+        return self._transport_plan_tables_ready
+
+    def save_transport_plan(self, plan):
+        if not self.ensure_transport_plan_tables(): return False
+        query = """
+            INSERT INTO public.tasima_planlari (id, optimizasyon_kriteri, durum, kargo_sayisi, toplam_maliyet, toplam_sure_saat, toplam_mesafe_km, toplam_co2_kg, rotalar)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        return self.execute_query(query, (plan['id'], plan['optimization_criteria'], plan['status'], plan['cargo_items_count'], plan['total_cost'],
+                                          plan['total_time_hours'], plan['total_distance_km'], plan['environmental_impact']['total_co2_kg'], Json(plan['routes'])))
+
+    def get_transport_plans(self, status_filter=None, limit=500):
+        """Plan özetleri (rota JSON'u okunmaz), en yeni önce"""
+        if not self.ensure_transport_plan_tables(): return []
+        query = """
+            SELECT id, optimizasyon_kriteri AS optimization_criteria, durum AS status, kargo_sayisi AS cargo_items_count,
+                   toplam_maliyet::float AS total_cost, toplam_sure_saat::float AS total_time_hours,
+                   toplam_mesafe_km::float AS total_distance_km, toplam_co2_kg::float AS total_co2_kg, olusturma_tarihi AS created_at
+            FROM public.tasima_planlari WHERE (%s::text IS NULL OR durum = %s)
+            ORDER BY olusturma_tarihi DESC LIMIT %s
+        """
+        return self.execute_query(query, (status_filter, status_filter, limit), fetchall=True) or []
+
+    def get_transport_plan(self, plan_id):
+        if not self.ensure_transport_plan_tables(): return None
+        record = self.execute_query("SELECT * FROM public.tasima_planlari WHERE id = %s", (plan_id,), fetchone=True)
+        if not record: return None
+        return {'id': record['id'], 'optimization_criteria': record['optimizasyon_kriteri'], 'status': record['durum'],
+                'cargo_items_count': record['kargo_sayisi'], 'total_cost': float(record['toplam_maliyet'] or 0),
+                'total_time_hours': float(record['toplam_sure_saat'] or 0), 'total_distance_km': float(record['toplam_mesafe_km'] or 0),
+                'environmental_impact': {'total_co2_kg': float(record['toplam_co2_kg'] or 0)}, 'routes': record['rotalar'],
+                'created_at': record['olusturma_tarihi']}
+
+    def update_transport_plan_status(self, plan_id, status):
+        """Plan durumunu güncelle; plan onaylanınca rotaları tek transaction'da iş emri olarak kuyruğa eklenir"""
+        if status != 'approved' or not self.ensure_move_order_tables():
+            return self.execute_query("UPDATE public.tasima_planlari SET durum = %s WHERE id = %s", (status, plan_id))
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    cursor.execute("UPDATE public.tasima_planlari SET durum = 'approved' WHERE id = %s AND durum <> 'approved' RETURNING id", (plan_id,))
+                    if cursor.fetchone():
+                        cursor.execute("""INSERT INTO public.tasima_is_emirleri (konteyner_id, baslangic_dugum, hedef_dugum, plan_id, oncelik)
+                                          SELECT NULLIF(r->>'container_id', ''), r->>'origin_id', r->>'destination_id', p.id, COALESCE((r->>'priority')::int, 3)
+                                          FROM public.tasima_planlari p, jsonb_array_elements(p.rotalar) r WHERE p.id = %s""", (plan_id,))
+            return True
+        except psycopg2.Error as e: print(f"Plan onaylama hatası: {e}"); self.conn.rollback(); return False
+
     def get_vehicles(self):
         return self.execute_query("SELECT * FROM public.araclar ORDER BY id ASC", fetchall=True)
 
@@ -671,6 +1503,412 @@ class DatabaseConnection:
             return True
         except psycopg2.Error as e: print(f"Araç atama hatası: {e}"); self.conn.rollback(); return False
             
+    # Araç Telemetrisi
+    def ensure_telemetry_tables(self):
+        """arac_telemetri (geçmiş) ve arac_son_durum (son konum) tablolarını yoksa oluştur"""
+        if getattr(self, '_telemetry_tables_ready', False): return True
+        query = """
+            CREATE TABLE IF NOT EXISTS public.arac_telemetri (
+                id BIGSERIAL PRIMARY KEY,
+                arac_id VARCHAR(50) NOT NULL,
+                zaman TIMESTAMP NOT NULL,
+                x REAL, y REAL, hiz REAL, yon REAL,
+                durum VARCHAR(20)
+            );
+            CREATE INDEX IF NOT EXISTS idx_arac_telemetri_arac_zaman ON public.arac_telemetri (arac_id, zaman DESC);
+            CREATE TABLE IF NOT EXISTS public.arac_son_durum (
+                arac_id VARCHAR(50) PRIMARY KEY,
+                zaman TIMESTAMP NOT NULL,
+                x REAL, y REAL, hiz REAL, yon REAL,
+                durum VARCHAR(20)
+            );
+        """
+        self._telemetry_tables_ready = bool(self.execute_query(query))
+        return self._telemetry_tables_ready
+
+    def save_telemetry_batch(self, samples):
+        """Telemetri örneklerini (TelemetrySample) geçmişe ekle ve son durumu güncelle (tek transaction)"""
+        rows = [(s.vehicle_id, datetime.fromtimestamp(s.ts), s.x, s.y, s.speed, s.heading, s.status) for s in samples]
+        if not rows: return True
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    execute_values(cursor, "INSERT INTO public.arac_telemetri (arac_id, zaman, x, y, hiz, yon, durum) VALUES %s", rows, page_size=1000)
+                    execute_values(cursor, """
+                        INSERT INTO public.arac_son_durum (arac_id, zaman, x, y, hiz, yon, durum) VALUES %s
+                        ON CONFLICT (arac_id) DO UPDATE SET zaman = EXCLUDED.zaman, x = EXCLUDED.x, y = EXCLUDED.y,
+                            hiz = EXCLUDED.hiz, yon = EXCLUDED.yon, durum = EXCLUDED.durum
+                        WHERE arac_son_durum.zaman <= EXCLUDED.zaman
+                    """, rows, page_size=1000)
+            return True
+        except psycopg2.Error as e: print(f"Telemetri kayıt hatası: {e}"); self.conn.rollback(); return False
+
+    def get_vehicle_positions(self):
+        """Araçların son kaydedilen konum/telemetri durumu"""
+        if not self.ensure_telemetry_tables(): return []
+        return self.execute_query("SELECT arac_id, zaman, x, y, hiz, yon, durum FROM public.arac_son_durum ORDER BY arac_id", fetchall=True) or []
+
+    # Araç Dağıtımı (İş Emirleri)
+    def ensure_move_order_tables(self):
+        """tasima_is_emirleri tablosunu yoksa oluştur"""
+        if getattr(self, '_move_order_tables_ready', False): return True
+        query = """
+            CREATE TABLE IF NOT EXISTS public.tasima_is_emirleri (
+                id SERIAL PRIMARY KEY,
+                konteyner_id VARCHAR(50),
+                baslangic_dugum VARCHAR(50) NOT NULL,
+                hedef_dugum VARCHAR(50) NOT NULL,
+                plan_id VARCHAR(40),
+                oncelik INTEGER NOT NULL DEFAULT 3,
+                durum VARCHAR(20) NOT NULL DEFAULT 'BEKLIYOR',
+                arac_id VARCHAR(50),
+                olusturma_tarihi TIMESTAMP NOT NULL DEFAULT NOW(),
+                atama_tarihi TIMESTAMP,
+                tamamlanma_tarihi TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS idx_is_emirleri_bekleyen ON public.tasima_is_emirleri (oncelik DESC, olusturma_tarihi) WHERE durum = 'BEKLIYOR';
+            CREATE INDEX IF NOT EXISTS idx_is_emirleri_arac ON public.tasima_is_emirleri (arac_id, atama_tarihi DESC);
+            CREATE INDEX IF NOT EXISTS idx_tasima_loglari_arac ON public.tasima_loglari (arac_id, islem_tarihi DESC);
+        """
+        self._move_order_tables_ready = bool(self.execute_query(query))
+        return self._move_order_tables_ready
+
+    def create_move_orders(self, orders):
+        """Toplu iş emri ekle. orders: [(konteyner_id, baslangic_dugum, hedef_dugum, plan_id, oncelik), ...]"""
+        orders = list(orders or [])
+        if not orders: return True
+        if not self.ensure_move_order_tables(): return False
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    execute_values(cursor, "INSERT INTO public.tasima_is_emirleri (konteyner_id, baslangic_dugum, hedef_dugum, plan_id, oncelik) VALUES %s", orders, page_size=1000)
+            return True
+        except psycopg2.Error as e: print(f"İş emri ekleme hatası: {e}"); self.conn.rollback(); return False
+
+    def get_pending_move_orders(self, limit=10000):
+        if not self.ensure_move_order_tables(): return []
+        query = "SELECT * FROM public.tasima_is_emirleri WHERE durum = 'BEKLIYOR' ORDER BY oncelik DESC, olusturma_tarihi ASC LIMIT %s"
+        return self.execute_query(query, (limit,), fetchall=True) or []
+
+    def get_idle_vehicles_with_location(self):
+        """BOŞTA araçlar ve son iş emrinin hedef düğümü (konum)"""
+        if not self.ensure_move_order_tables(): return []
+        query = """
+            SELECT a.*, son.hedef_dugum AS konum FROM public.araclar a
+            LEFT JOIN LATERAL (
+                SELECT e.hedef_dugum FROM public.tasima_is_emirleri e
+                WHERE e.arac_id = a.id AND e.atama_tarihi IS NOT NULL
+                ORDER BY e.atama_tarihi DESC LIMIT 1
+            ) son ON TRUE
+            WHERE a.durum = 'BOŞTA' ORDER BY a.id
+        """
+        return self.execute_query(query, fetchall=True) or []
+
+    def commit_dispatch(self, assignments):
+        """
+        Dağıtım sonucunu tek transaction'da kaydet: iş emirleri ATANDI, araçlar MEŞGUL,
+        tasima_loglari'na toplu kayıt. Başka bir işlemin kilitlediği ya da o arada atanmış
+        iş emri/araç içeren çiftler atlanır (SKIP LOCKED). Dönüş: kaydedilen (iş_emri_id, araç_id) listesi.
+        """
+        assignments = list(assignments or [])
+        if not assignments: return []
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    cursor.execute("SELECT id FROM public.tasima_is_emirleri WHERE id = ANY(%s) AND durum = 'BEKLIYOR' FOR UPDATE SKIP LOCKED", ([a[0] for a in assignments],))
+                    free_orders = {r[0] for r in cursor.fetchall()}
+                    cursor.execute("SELECT id FROM public.araclar WHERE id = ANY(%s) AND durum = 'BOŞTA' FOR UPDATE SKIP LOCKED", ([a[1] for a in assignments],))
+                    free_vehicles = {r[0] for r in cursor.fetchall()}
+                    accepted = [(o, v) for o, v in assignments if o in free_orders and v in free_vehicles]
+                    if accepted:
+                        execute_values(cursor, "UPDATE public.tasima_is_emirleri e SET durum = 'ATANDI', arac_id = v.arac_id, atama_tarihi = NOW() FROM (VALUES %s) AS v(id, arac_id) WHERE e.id = v.id",
+                                       accepted, page_size=1000)
+                        cursor.execute("UPDATE public.araclar SET durum = 'MEŞGUL' WHERE id = ANY(%s)", ([v for _, v in accepted],))
+                        cursor.execute("""INSERT INTO public.tasima_loglari (konteyner_id, arac_id, islem_tipi, islem_tarihi)
+                                          SELECT konteyner_id, arac_id, 'ATAMA YAPILDI', NOW() FROM public.tasima_is_emirleri WHERE id = ANY(%s)""",
+                                       ([o for o, _ in accepted],))
+            return accepted
+        except psycopg2.Error as e: print(f"Toplu araç atama hatası: {e}"); self.conn.rollback(); return []
+
+    def complete_vehicle_task(self, vehicle_id):
+        """
+        Aracı BOŞTA yap ve atanmış iş emrini tamamla (tek transaction). İş emri olmadan yapılan taşımalarda
+        (move_containers, assign_vehicle_to_transport) bitiş, aracın kapanmamış son ATAMA YAPILDI kaydı için loglanır.
+        """
+        orders_ready = self.ensure_move_order_tables()
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    cursor.execute("UPDATE public.araclar SET durum = 'BOŞTA' WHERE id = %s", (vehicle_id,))
+                    closed = []
+                    if orders_ready:
+                        cursor.execute("UPDATE public.tasima_is_emirleri SET durum = 'TAMAMLANDI', tamamlanma_tarihi = NOW() WHERE arac_id = %s AND durum = 'ATANDI' RETURNING konteyner_id", (vehicle_id,))
+                        closed = cursor.fetchall()
+                    # Kullanım analizi için görev bitişi kapatılan iş emirleri ya da açık kalan elle atama için loglanır
+                    if closed:
+                        execute_values(cursor, "INSERT INTO public.tasima_loglari (konteyner_id, arac_id, islem_tipi, islem_tarihi) VALUES %s",
+                                       [(c_id, vehicle_id) for c_id, in closed], template="(%s, %s, 'GOREV TAMAMLANDI', NOW())")
+                    else:
+                        cursor.execute("""INSERT INTO public.tasima_loglari (konteyner_id, arac_id, islem_tipi, islem_tarihi)
+                                          SELECT son.konteyner_id, son.arac_id, 'GOREV TAMAMLANDI', NOW()
+                                          FROM (SELECT konteyner_id, arac_id, islem_tipi FROM public.tasima_loglari
+                                                WHERE arac_id = %s AND islem_tipi IN ('ATAMA YAPILDI', 'GOREV TAMAMLANDI')
+                                                ORDER BY islem_tarihi DESC, id DESC LIMIT 1) son
+                                          WHERE son.islem_tipi = 'ATAMA YAPILDI'""", (vehicle_id,))
+            return True
+        except psycopg2.Error as e: print(f"Görev tamamlama hatası: {e}"); self.conn.rollback(); return False
+
+    # İş Kuyruğu (arka plan yazma işlemleri)
+    def ensure_job_queue_tables(self):
+        """is_kuyrugu tablosunu yoksa oluştur"""
+        if getattr(self, '_job_queue_tables_ready', False): return True
+        query = """
+            CREATE TABLE IF NOT EXISTS public.is_kuyrugu (
+                id BIGSERIAL PRIMARY KEY,
+                is_tipi VARCHAR(40) NOT NULL,
+                parametreler JSONB NOT NULL DEFAULT '{}'::jsonb,
+                sira_anahtari VARCHAR(100),
+                durum VARCHAR(20) NOT NULL DEFAULT 'BEKLIYOR',
+                sonuc JSONB,
+                hata TEXT,
+                deneme_sayisi INTEGER NOT NULL DEFAULT 0,
+                isleyen VARCHAR(100),
+                olusturma_tarihi TIMESTAMP NOT NULL DEFAULT NOW(),
+                baslama_tarihi TIMESTAMP,
+                bitis_tarihi TIMESTAMP
+            );
+            ALTER TABLE public.is_kuyrugu ADD COLUMN IF NOT EXISTS istemci_id VARCHAR(100);
+            DROP INDEX IF EXISTS public.idx_is_kuyrugu_acik;
+            CREATE INDEX IF NOT EXISTS idx_is_kuyrugu_istemci_acik ON public.is_kuyrugu (istemci_id, id) WHERE durum IN ('BEKLIYOR', 'CALISIYOR');
+            CREATE INDEX IF NOT EXISTS idx_is_kuyrugu_anahtar ON public.is_kuyrugu (sira_anahtari, id) WHERE durum IN ('BEKLIYOR', 'CALISIYOR');
+        """
+        self._job_queue_tables_ready = bool(self.execute_query(query))
+        return self._job_queue_tables_ready
+
+    def enqueue_job(self, job_type, payload, key=None, client_id=None):
+        """
+        Kuyruğa iş ekle, iş id'sini döndür. Aynı sira_anahtari'na sahip işler (istemciden bağımsız) eklenme
+        sırasıyla işlenir; iş sadece client_id'si aynı olan işleyicilerce alınır.
+        """
+        if not self.ensure_job_queue_tables(): return None
+        row = self.execute_query("INSERT INTO public.is_kuyrugu (is_tipi, parametreler, sira_anahtari, istemci_id) VALUES (%s, %s, %s, %s) RETURNING id",
+                                 (job_type, Json(payload, dumps=lambda o: json.dumps(o, default=str)), key, client_id), fetchone=True)
+        if not row: return None
+        self.conn.commit()
+        return row['id']
+
+    def claim_next_job(self, worker_name, client_id=None):
+        """
+        Bu istemcinin sıradaki işini al (FOR UPDATE SKIP LOCKED): başka işleyicinin kilitlediği işler atlanır,
+        aynı anahtarda (başka istemcininki de olsa) daha eski açık iş varsa o iş bitene kadar beklenir.
+        """
+        query = """
+            WITH next_job AS (
+                SELECT j.id FROM public.is_kuyrugu j
+                WHERE j.durum = 'BEKLIYOR' AND j.istemci_id IS NOT DISTINCT FROM %s
+                  AND NOT EXISTS (SELECT 1 FROM public.is_kuyrugu o
+                                  WHERE o.sira_anahtari = j.sira_anahtari AND o.id < j.id AND o.durum IN ('BEKLIYOR', 'CALISIYOR'))
+                ORDER BY j.id LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE public.is_kuyrugu q SET durum = 'CALISIYOR', isleyen = %s, baslama_tarihi = NOW(), deneme_sayisi = q.deneme_sayisi + 1
+            FROM next_job WHERE q.id = next_job.id
+            RETURNING q.id, q.is_tipi, q.parametreler, q.sira_anahtari, q.deneme_sayisi
+        """
+        try:
+            with self.conn:
+                with self.conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    cursor.execute(query, (client_id, worker_name))
+                    return cursor.fetchone()
+        except psycopg2.Error as e: print(f"İş kuyruğu okuma hatası: {e}"); self.conn.rollback(); return None
+
+    def finish_job(self, job_id, result=None, error=None, retry=False):
+        """İşi TAMAMLANDI/HATA olarak kapat; retry=True ise tekrar denenmek üzere BEKLIYOR'a döndür"""
+        status = 'BEKLIYOR' if retry else ('HATA' if error else 'TAMAMLANDI')
+        query = "UPDATE public.is_kuyrugu SET durum = %s, sonuc = %s, hata = %s, bitis_tarihi = CASE WHEN %s THEN NULL ELSE NOW() END WHERE id = %s"
+        return self.execute_query(query, (status, Json(result, dumps=lambda o: json.dumps(o, default=str)) if result is not None else None, error, retry, job_id))
+
+    def register_job_client(self, client_id):
+        """İstemcinin çalıştığını oturum seviyesi advisory kilitle işaretle (bağlantı kapanınca kilit kendiliğinden bırakılır)"""
+        return self.execute_query("SELECT pg_advisory_lock(hashtext(%s))", (f"is_istemci:{client_id}",))
+
+    def adopt_orphaned_jobs(self, owner, client_id):
+        """
+        Aynı makine/kullanıcının kapanmış süreçlerinden kalan açık işleri bu istemciye devret. Süreç kilidi
+        (register_job_client) alınabilen istemci kapanmış sayılır; iş durumuna dokunulmaz, yarıda kalan işler
+        requeue_stale_jobs ile kuyruğa döner. Dönüş: devralınan iş sayısı.
+        """
+        if not self.ensure_job_queue_tables(): return 0
+        query = """
+            WITH adaylar AS (
+                SELECT DISTINCT istemci_id FROM public.is_kuyrugu
+                WHERE durum IN ('BEKLIYOR', 'CALISIYOR') AND istemci_id <> %(client)s
+                  AND (istemci_id = %(owner)s OR left(istemci_id, length(%(owner)s) + 1) = %(owner)s || '/')
+            ), kapanmis AS (
+                SELECT istemci_id FROM adaylar WHERE pg_try_advisory_lock(hashtext('is_istemci:' || istemci_id))
+            ), devir AS (
+                UPDATE public.is_kuyrugu q SET istemci_id = %(client)s
+                FROM kapanmis WHERE q.istemci_id = kapanmis.istemci_id AND q.durum IN ('BEKLIYOR', 'CALISIYOR')
+                RETURNING q.id
+            )
+            SELECT (SELECT COUNT(*) FROM devir), ARRAY(SELECT istemci_id FROM kapanmis)
+        """
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    cursor.execute(query, {'owner': owner, 'client': client_id})
+                    adopted, dead_clients = cursor.fetchone()
+                    # Canlılık denetimi için alınan kilitler bırakılır
+                    for dead in dead_clients:
+                        cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", (f"is_istemci:{dead}",))
+            return adopted
+        except psycopg2.Error as e: print(f"İş devralma hatası: {e}"); self.conn.rollback(); return 0
+
+    def requeue_stale_jobs(self, timeout_minutes=10):
+        """Yarıda kalan (işleyicisi kapanmış) işleri tekrar kuyruğa al"""
+        if not self.ensure_job_queue_tables(): return False
+        return self.execute_query("UPDATE public.is_kuyrugu SET durum = 'BEKLIYOR', isleyen = NULL WHERE durum = 'CALISIYOR' AND baslama_tarihi < NOW() - make_interval(mins => %s)", (timeout_minutes,))
+
+    def get_job_queue_counts(self):
+        """Durum bazında iş sayıları"""
+        rows = self.execute_query("SELECT durum, COUNT(*) AS adet FROM public.is_kuyrugu WHERE olusturma_tarihi > NOW() - INTERVAL '1 day' GROUP BY durum", fetchall=True)
+        return {r['durum']: r['adet'] for r in rows or []}
+
+    # Rapor Özet (Rollup) Tabloları
+    _ROLLUP_SOURCES = {
+        'ekle': "SELECT y.*, 1 AS d FROM yeni_satirlar y",
+        'sil': "SELECT e.*, -1 AS d FROM eski_satirlar e",
+        'guncelle': "SELECT e.*, -1 AS d FROM eski_satirlar e UNION ALL SELECT y.*, 1 AS d FROM yeni_satirlar y",
+    }
+    # Özet satırları her tetikleyicide aynı sırayla kilitlenir (tablo tablo ayrı deyimler, her biri anahtar sırasıyla):
+    # eşzamanlı konteyner yazmaları aynı satırlarda birbirini bekleyebilir ama kilitlenme (deadlock) oluşmaz
+    _ROLLUP_DIRECTIONS = """yonlu AS (
+            SELECT giris_tarihi, cikis_limani AS liman, 'C' AS yon, d FROM degisim WHERE cikis_limani IS NOT NULL
+            UNION ALL
+            SELECT giris_tarihi, varis_limani, 'V', d FROM degisim WHERE varis_limani IS NOT NULL
+        )"""
+    _ROLLUP_FUNCTION_BODY = """
+        WITH degisim AS ({source})
+        INSERT INTO public.rapor_tip_konum (tip, durum, gemi_id, adet)
+        SELECT COALESCE(tip, ''), COALESCE(durum, ''), COALESCE(gemi_id::text, ''), SUM(d) FROM degisim GROUP BY 1, 2, 3 HAVING SUM(d) <> 0 ORDER BY 1, 2, 3
+        ON CONFLICT (tip, durum, gemi_id) DO UPDATE SET adet = rapor_tip_konum.adet + EXCLUDED.adet;
+
+        WITH degisim AS ({source}), {directions}
+        INSERT INTO public.rapor_gunluk_trafik (gun, liman, yon, adet)
+        SELECT giris_tarihi::date, liman, yon, SUM(d) FROM yonlu WHERE giris_tarihi IS NOT NULL GROUP BY 1, 2, 3 HAVING SUM(d) <> 0 ORDER BY 1, 2, 3
+        ON CONFLICT (gun, liman, yon) DO UPDATE SET adet = rapor_gunluk_trafik.adet + EXCLUDED.adet;
+
+        WITH degisim AS ({source}), {directions}
+        INSERT INTO public.rapor_liman_toplam (liman, yon, adet)
+        SELECT liman, yon, SUM(d) FROM yonlu GROUP BY 1, 2 HAVING SUM(d) <> 0 ORDER BY 1, 2
+        ON CONFLICT (liman, yon) DO UPDATE SET adet = rapor_liman_toplam.adet + EXCLUDED.adet;
+    """
+
+    def ensure_report_rollups(self, rebuild=False):
+        """
+        Rapor özet tablolarını ve konteynerler üzerindeki deyim seviyesi (transition table) tetikleyicilerini kur.
+        - rapor_gunluk_trafik: gün × liman × yön (C: çıkış, V: varış)
+        - rapor_tip_konum: tip × durum × gemi
+        - rapor_liman_toplam: liman × yön (tüm zamanlar)
+        Tetikleyiciler ilk kez kuruluyorsa (veya rebuild=True) tablolar mevcut veriden yeniden doldurulur.
+        """
+        if getattr(self, '_report_rollups_ready', False) and not rebuild: return True
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    cursor.execute("""
+                        CREATE TABLE IF NOT EXISTS public.rapor_gunluk_trafik (
+                            gun DATE NOT NULL, liman VARCHAR(100) NOT NULL, yon CHAR(1) NOT NULL, adet INTEGER NOT NULL DEFAULT 0,
+                            PRIMARY KEY (gun, liman, yon));
+                        CREATE TABLE IF NOT EXISTS public.rapor_tip_konum (
+                            tip VARCHAR(50) NOT NULL, durum VARCHAR(20) NOT NULL, gemi_id VARCHAR(50) NOT NULL, adet INTEGER NOT NULL DEFAULT 0,
+                            PRIMARY KEY (tip, durum, gemi_id));
+                        CREATE TABLE IF NOT EXISTS public.rapor_liman_toplam (
+                            liman VARCHAR(100) NOT NULL, yon CHAR(1) NOT NULL, adet INTEGER NOT NULL DEFAULT 0,
+                            PRIMARY KEY (liman, yon));
+                    """)
+                    # Fonksiyonlar her kurulumda güncellenir (tetikleyiciler zaten varsa eski gövdeler yenisiyle değişir)
+                    for op, source in self._ROLLUP_SOURCES.items():
+                        cursor.execute(f"""
+                            CREATE OR REPLACE FUNCTION public.rapor_ozet_{op}() RETURNS trigger AS $$
+                            BEGIN
+                                {self._ROLLUP_FUNCTION_BODY.format(source=source, directions=self._ROLLUP_DIRECTIONS)}
+                                RETURN NULL;
+                            END $$ LANGUAGE plpgsql;""")
+                    cursor.execute("SELECT COUNT(*) FROM pg_trigger WHERE tgrelid = 'public.konteynerler'::regclass AND tgname LIKE 'trg_rapor_ozet_%'")
+                    installed = cursor.fetchone()[0] == 3
+                    if not installed or rebuild:
+                        # Kurulum ve yeniden doldurma sırasında konteyner yazmaları beklesin (sayımlar tutarlı kalır)
+                        cursor.execute("LOCK TABLE public.konteynerler IN SHARE ROW EXCLUSIVE MODE")
+                        cursor.execute("""
+                            DROP TRIGGER IF EXISTS trg_rapor_ozet_ekle ON public.konteynerler;
+                            DROP TRIGGER IF EXISTS trg_rapor_ozet_guncelle ON public.konteynerler;
+                            DROP TRIGGER IF EXISTS trg_rapor_ozet_sil ON public.konteynerler;
+                            CREATE TRIGGER trg_rapor_ozet_ekle AFTER INSERT ON public.konteynerler
+                                REFERENCING NEW TABLE AS yeni_satirlar FOR EACH STATEMENT EXECUTE FUNCTION public.rapor_ozet_ekle();
+                            CREATE TRIGGER trg_rapor_ozet_guncelle AFTER UPDATE ON public.konteynerler
+                                REFERENCING OLD TABLE AS eski_satirlar NEW TABLE AS yeni_satirlar FOR EACH STATEMENT EXECUTE FUNCTION public.rapor_ozet_guncelle();
+                            CREATE TRIGGER trg_rapor_ozet_sil AFTER DELETE ON public.konteynerler
+                                REFERENCING OLD TABLE AS eski_satirlar FOR EACH STATEMENT EXECUTE FUNCTION public.rapor_ozet_sil();
+                        """)
+                        self._fill_report_rollups(cursor)
+            self._report_rollups_ready = True
+            return True
+        except psycopg2.Error as e:
+            print(f"⚠️  Rapor özet tabloları kurulamadı, raporlar doğrudan konteynerler tablosundan hesaplanacak: {e}"); self.conn.rollback()
+            return False
+
+    def _fill_report_rollups(self, cursor):
+        cursor.execute("""
+            TRUNCATE public.rapor_gunluk_trafik, public.rapor_tip_konum, public.rapor_liman_toplam;
+            INSERT INTO public.rapor_tip_konum (tip, durum, gemi_id, adet)
+            SELECT COALESCE(tip, ''), COALESCE(durum, ''), COALESCE(gemi_id::text, ''), COUNT(*) FROM public.konteynerler GROUP BY 1, 2, 3;
+            WITH yonlu AS (
+                SELECT giris_tarihi, cikis_limani AS liman, 'C' AS yon FROM public.konteynerler WHERE cikis_limani IS NOT NULL
+                UNION ALL
+                SELECT giris_tarihi, varis_limani, 'V' FROM public.konteynerler WHERE varis_limani IS NOT NULL
+            ), gunluk AS (
+                INSERT INTO public.rapor_gunluk_trafik (gun, liman, yon, adet)
+                SELECT giris_tarihi::date, liman, yon, COUNT(*) FROM yonlu WHERE giris_tarihi IS NOT NULL GROUP BY 1, 2, 3
+            )
+            INSERT INTO public.rapor_liman_toplam (liman, yon, adet) SELECT liman, yon, COUNT(*) FROM yonlu GROUP BY 1, 2;
+        """)
+
+    def rebuild_report_rollups(self):
+        """Özet tabloları konteynerler tablosundan yeniden hesapla (periyodik tutarlılık kontrolü / bakım için)"""
+        return self.ensure_report_rollups(rebuild=True)
+
+    def ensure_report_change_events(self, tables, channel):
+        """
+        Rapor tablolarına yazan her deyimden sonra tablo adını NOTIFY ile yayan deyim seviyesi tetikleyiciler
+        (rapor önbelleğinin veri sürümü; bildirim commit sonrası iletildiğinden sürüm veriden önce değişmez).
+        """
+        if getattr(self, '_report_change_events_ready', False): return True
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    cursor.execute("SELECT t FROM unnest(%s::text[]) t WHERE to_regclass('public.' || t) IS NOT NULL", (list(tables),))
+                    existing = [r[0] for r in cursor.fetchall()]
+                    cursor.execute("SELECT COUNT(*) FROM pg_trigger WHERE tgname = 'trg_rapor_verisi' AND tgrelid = ANY(%s::regclass[])",
+                                   ([f"public.{t}" for t in existing],))
+                    if cursor.fetchone()[0] != len(existing):
+                        cursor.execute(f"""
+                            CREATE OR REPLACE FUNCTION public.rapor_verisi_bildir() RETURNS trigger AS $$
+                            BEGIN
+                                PERFORM pg_notify('{channel}', TG_TABLE_NAME);
+                                RETURN NULL;
+                            END $$ LANGUAGE plpgsql;""")
+                        for table in existing:
+                            cursor.execute(f"""
+                                DROP TRIGGER IF EXISTS trg_rapor_verisi ON public.{table};
+                                CREATE TRIGGER trg_rapor_verisi AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.{table}
+                                    FOR EACH STATEMENT EXECUTE FUNCTION public.rapor_verisi_bildir();""")
+            self._report_change_events_ready = True
+            return True
+        except psycopg2.Error as e:
+            print(f"⚠️  Rapor veri bildirimleri kurulamadı, rapor önbelleği kullanılmayacak: {e}"); self.conn.rollback()
+            return False
+
     def get_report_data(self):
         query = "SELECT COUNT(*) as dolu_slot FROM public.konteynerler WHERE durum = 'SAHA'"; result = self.execute_query(query, fetchone=True)
         return {'occupancy_rate': (result['dolu_slot'] / 700) * 100 if result else 0}
@@ -686,6 +1924,13 @@ class DatabaseConnection:
         return results
 
     def get_container_type_distribution_data(self, location_type=None, ship_id=None):
+        if self.ensure_report_rollups():
+            query, params = "SELECT NULLIF(tip, '') AS tip, SUM(adet)::int AS count FROM public.rapor_tip_konum", []
+            if location_type in ('SAHA', 'GEMI', 'ATANMAMIS'):
+                query += " WHERE durum = %s"; params.append(location_type)
+                if location_type == 'GEMI' and ship_id: query += " AND gemi_id = %s"; params.append(str(ship_id))
+            query += " GROUP BY 1 HAVING SUM(adet) > 0"
+            return self.execute_query(query, tuple(params), fetchall=True)
         params, query, where_clauses = (), "SELECT tip, COUNT(*) as count FROM public.konteynerler ", []
         if location_type == 'SAHA': where_clauses.append("durum = 'SAHA'")
         elif location_type == 'GEMI':
@@ -697,6 +1942,12 @@ class DatabaseConnection:
     
     ### DÜZELTME: Eksik olan raporlama fonksiyonu eklendi ###
     def get_port_traffic_data(self, start_date, end_date, traffic_type):
+        if self.ensure_report_rollups():
+            # Günlük özet tablosundan: maliyet tarih aralığındaki gün × liman sayısıyla sınırlı
+            directions = {'Çıkış': ['C'], 'Varış': ['V']}.get(traffic_type, ['C', 'V'])
+            query = """SELECT liman, SUM(adet)::int AS count FROM public.rapor_gunluk_trafik
+                       WHERE gun BETWEEN %s AND %s AND yon = ANY(%s) GROUP BY liman HAVING SUM(adet) > 0"""
+            return self.execute_query(query, (start_date, end_date, directions), fetchall=True)
         params = (start_date, end_date)
         if traffic_type == 'Çıkış':
             query = "SELECT cikis_limani as liman, COUNT(*) as count FROM public.konteynerler WHERE giris_tarihi BETWEEN %s AND %s AND cikis_limani IS NOT NULL GROUP BY liman"
@@ -708,12 +1959,42 @@ class DatabaseConnection:
         return self.execute_query(query, params, fetchall=True)
 
     def get_destination_port_distribution(self):
+        if self.ensure_report_rollups():
+            return self.execute_query("SELECT liman AS varis_limani, adet AS count FROM public.rapor_liman_toplam WHERE yon = 'V' AND adet > 0 ORDER BY adet DESC", fetchall=True)
         query = "SELECT varis_limani, COUNT(*) as count FROM public.konteynerler WHERE varis_limani IS NOT NULL GROUP BY varis_limani ORDER BY count DESC"
         return self.execute_query(query, fetchall=True)
 
+    def iter_transport_log_events(self, start_date, end_date, vehicle_type=None, chunk_size=50000):
+        """
+        tasima_loglari satırlarını sunucu taraflı (named) cursor ile parça parça döndürür.
+        Her parça: [(arac_id, arac_tipi, epoch_saniye, islem_tipi), ...]
+        """
+        if not getattr(self, '_transport_log_index_ready', False):
+            self._transport_log_index_ready = bool(self.execute_query("CREATE INDEX IF NOT EXISTS idx_tasima_loglari_tarih ON public.tasima_loglari (islem_tarihi)"))
+        query = """SELECT t.arac_id, a.tip, EXTRACT(EPOCH FROM t.islem_tarihi)::float8, t.islem_tipi
+                   FROM public.tasima_loglari t JOIN public.araclar a ON t.arac_id = a.id
+                   WHERE t.islem_tarihi >= %s AND t.islem_tarihi < %s"""
+        params = [start_date, end_date]
+        if vehicle_type and vehicle_type != 'Tümü':
+            query += " AND a.tip = %s"; params.append(vehicle_type)
+        try:
+            with self.conn:
+                with self.conn.cursor(name=f"tasima_log_{id(self)}_{time.monotonic_ns()}") as cursor:
+                    cursor.itersize = chunk_size
+                    cursor.execute(query, params)
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows: break
+                        yield rows
+        except psycopg2.extensions.QueryCanceledError:
+            self.conn.rollback(); raise
+        except psycopg2.Error as e:
+            print(f"Taşıma logu okuma hatası: {e}"); self.conn.rollback()
+
     def get_vehicle_usage_data(self, start_date, end_date, vehicle_type):
         # Önce taşıma loglarını deneyelim
-        query = "SELECT t.arac_id, a.tip as arac_tipi, COUNT(t.id) as islem_sayisi FROM public.tasima_loglari t JOIN public.araclar a ON t.arac_id = a.id WHERE t.islem_tarihi BETWEEN %s AND %s"
+        # Her görev hem atama hem tamamlanma olarak loglanır; işlem sayısı sadece atamalardan hesaplanır
+        query = "SELECT t.arac_id, a.tip as arac_tipi, COUNT(t.id) as islem_sayisi FROM public.tasima_loglari t JOIN public.araclar a ON t.arac_id = a.id WHERE t.islem_tipi = 'ATAMA YAPILDI' AND t.islem_tarihi BETWEEN %s AND %s"
         params = [start_date, end_date]
         if vehicle_type and vehicle_type != 'Tümü': 
             query += " AND a.tip = %s"
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# job_queue.py - Konteyner hareketleri ve döngü değişiklikleri için kalıcı arka plan iş kuyruğu
+
+import getpass
+import itertools
+import socket
+import threading
+import traceback
+import uuid
+from typing import Callable, Dict, Optional
+
+import psycopg2
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal
+
+from database import DatabaseConnection, OFFLINE_MODE
+
+MOVE_CONTAINERS = 'MOVE_CONTAINERS'
+SHIP_PLACEMENTS = 'SHIP_PLACEMENTS'
+ADD_CONTAINER = 'ADD_CONTAINER'
+LIFECYCLE_CHANGE = 'LIFECYCLE_CHANGE'
+# Durum değişiklikleri (tekli ve toplu) tek sırada işlenir: seçimleri kesişen toplu işler eklenme sırasıyla uygulanır
+LIFECYCLE_QUEUE_KEY = 'lifecycle'
+
+DEFAULT_WORKER_COUNT = 2
+POLL_INTERVAL_SEC = 0.5      # kuyruk boşken bekleme (yeni iş eklenince hemen uyanılır)
+MAX_ATTEMPTS = 3             # bağlantı hatalarında tekrar deneme sayısı
+STALE_JOB_MINUTES = 10
+PROCESS_INSTANCE_ID = uuid.uuid4().hex[:12]   # aynı makine/kullanıcıda açık birden fazla uygulamayı ayırır
+
+def client_owner():
+    """İstemci kimliğinin süreçten bağımsız kısmı: makine + işletim sistemi kullanıcısı"""
+    try: user = getpass.getuser()
+    except Exception: user = 'bilinmeyen'
+    return f"{socket.gethostname()}/{user}"[:75]
+
+def default_client_id():
+    """
+    Kuyruktaki işlerin sahibi olan istemci: makine/kullanıcı + süreç kimliği. İş sadece gönderen süreçte
+    işlenir (sonuç callback'leri orada vardır); aynı kullanıcının iki açık uygulaması birbirinin işini almaz.
+    Kapanmış süreçlerin açık işleri JobQueue.start() sırasında aynı makine/kullanıcının yeni sürecine devredilir.
+    """
+    return f"{client_owner()}/{PROCESS_INSTANCE_ID}"   # işleyici adı "<istemci>#n" isleyen sütununa sığar
+
+def _run_move_containers(db, payload):
+    moves = [{'container_id': m['container_id'], 'destination': tuple(m['destination']), 'vehicle_id': m.get('vehicle_id')}
+             for m in payload['moves']]
+    return db.move_containers(moves)
+
+def _run_ship_placements(db, payload):
+    return db.apply_ship_placements(payload['ship_id'], [tuple(p) for p in payload.get('placements', [])],
+                                    [tuple(r) for r in payload.get('relocations', [])])
+
+def _run_add_container(db, payload):
+    result = db.add_new_container(payload['id'], payload['tip'], payload['cikis_limani'], payload['varis_limani'], payload.get('durum', 'ATANMAMIS'))
+    return {'success': result is True, 'error': None if result is True else str(result or "Bilinmeyen veritabanı hatası")}
+
+def _run_lifecycle_change(db, payload):
+    # 'container_ids' verilirse toplu geçiş: geçersiz olanlar reddedilir, diğerleri tek transaction'da yazılır
+    container_ids = payload.get('container_ids') or [payload['container_id']]
+    result = db.change_containers_lifecycle_state(container_ids, payload['state_id'], payload.get('reason'), payload.get('changed_by', 'USER'))
+    if result.get('success') and not result.get('changed') and result.get('rejected'):
+        result['success'] = False
+    if not result.get('success') and not result.get('error'):
+        result['error'] = "Durum değişikliği başarısız oldu"
+    return result
+
+JOB_HANDLERS: Dict[str, Callable] = {
+    MOVE_CONTAINERS: _run_move_containers,
+    SHIP_PLACEMENTS: _run_ship_placements,
+    ADD_CONTAINER: _run_add_container,
+    LIFECYCLE_CHANGE: _run_lifecycle_change,
+}
+
+def run_job(db, job_type, payload):
+    """İşi verilen bağlantı üzerinde çalıştır; sonuç her zaman 'success' anahtarlı sözlüktür"""
+    handler = JOB_HANDLERS.get(job_type)
+    if handler is None:
+        return {'success': False, 'error': f"Bilinmeyen iş tipi: {job_type}"}
+    return handler(db, payload) or {'success': False, 'error': "İş sonuç döndürmedi"}
+
+class JobWorker(QThread):
+    """Kuyruktan iş alıp kendi veritabanı bağlantısı üzerinde çalıştıran işleyici"""
+
+    job_finished = pyqtSignal(int, str, object)   # iş id, iş tipi, sonuç sözlüğü
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, name, wake_event, client_id):
+        super().__init__()
+        self.name = name
+        self.wake_event = wake_event
+        self.client_id = client_id
+        self._stop = False
+        self.db = None
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        self.db = DatabaseConnection()
+        if not self.db.conn:
+            self.error_occurred.emit(f"{self.name}: veritabanı bağlantısı kurulamadı")
+            return
+        try:
+            while not self._stop:
+                if self.db.conn is None or self.db.conn.closed:
+                    self.db.connect()
+                    self.wake_event.wait(POLL_INTERVAL_SEC)
+                    continue
+                job = self.db.claim_next_job(self.name, self.client_id)
+                if not job:
+                    self.wake_event.wait(POLL_INTERVAL_SEC)
+                    self.wake_event.clear()
+                    continue
+                self._process(job)
+        finally:
+            self.db.close_connection()
+
+    def _connection_lost(self):
+        return self.db.conn is None or bool(self.db.conn.closed)
+
+    def _process(self, job):
+        try:
+            result = run_job(self.db, job['is_tipi'], job['parametreler'])
+        except Exception as e:
+            if not isinstance(e, psycopg2.OperationalError) and not self._connection_lost():
+                traceback.print_exc()
+            result = {'success': False, 'error': str(e)}
+        # İşleyicilerin veritabanı metotları psycopg2 hatalarını yakalayıp başarısız sonuç döndürdüğü için
+        # bağlantı kopması istisnadan değil bağlantının durumundan anlaşılır
+        if self._connection_lost():
+            # Bağlantı koptu: yeniden bağlan, deneme hakkı varsa iş kuyruğa geri döner
+            error = result.get('error') or "Veritabanı bağlantısı koptu"
+            self.db.connect()
+            retry = job['deneme_sayisi'] < MAX_ATTEMPTS
+            self.db.finish_job(job['id'], error=error, retry=retry)
+            if not retry:
+                self.job_finished.emit(job['id'], job['is_tipi'], {'success': False, 'error': error})
+            return
+        self.db.finish_job(job['id'], result=result, error=None if result.get('success') else result.get('error') or "İş başarısız")
+        self.job_finished.emit(job['id'], job['is_tipi'], result)
+
+class JobQueue(QObject):
+    """
+    Yazma işlemlerini GUI thread'inden alan kuyruk.
+    submit() işi is_kuyrugu tablosuna yazar ve hemen döner; işleyici havuzu işleri
+    SELECT ... FOR UPDATE SKIP LOCKED ile paralel alır. Sonuçlar sinyal ve (varsa)
+    submit'e verilen callback ile GUI thread'inde bildirilir. Offline modda işler
+    aynı bağlantı üzerinde olay döngüsünün bir sonraki turunda çalıştırılır.
+    """
+
+    job_completed = pyqtSignal(int, str, object)   # iş id, iş tipi, sonuç
+    job_failed = pyqtSignal(int, str, str)         # iş id, iş tipi, hata
+    pending_changed = pyqtSignal(int)
+
+    def __init__(self, db_connection, worker_count=DEFAULT_WORKER_COUNT, client_id=None, parent=None):
+        super().__init__(parent)
+        self.db = db_connection
+        self.client_id = client_id or default_client_id()
+        self.worker_count = max(int(worker_count), 1)
+        self.workers = []
+        self.callbacks: Dict[int, Callable] = {}
+        self.wake_event = threading.Event()
+        self.offline = OFFLINE_MODE or not getattr(self.db, 'conn', None)
+        self._local_ids = itertools.count(1)
+
+    @property
+    def pending_count(self):
+        return len(self.callbacks)
+
+    def start(self):
+        if self.offline or self.workers: return
+        self.db.register_job_client(self.client_id)
+        self.db.adopt_orphaned_jobs(client_owner(), self.client_id)
+        self.db.requeue_stale_jobs(STALE_JOB_MINUTES)
+        for i in range(self.worker_count):
+            worker = JobWorker(f"{self.client_id}#{i + 1}", self.wake_event, self.client_id)
+            worker.job_finished.connect(self._on_job_finished)
+            worker.error_occurred.connect(lambda msg: print(f"⚠️  İş kuyruğu: {msg}"))
+            worker.start()
+            self.workers.append(worker)
+        print(f"✅ İş kuyruğu başlatıldı ({self.worker_count} işleyici)")
+
+    def stop(self, timeout_ms=5000):
+        for worker in self.workers:
+            worker.stop()
+        self.wake_event.set()
+        for worker in self.workers:
+            worker.wait(timeout_ms)
+        self.workers.clear()
+
+    def submit(self, job_type, payload, key=None, callback: Optional[Callable] = None):
+        """
+        İşi kuyruğa ekle. key: aynı anahtarlı işler sırayla işlenir (ör. konteyner id).
+        callback(sonuç) GUI thread'inde çağrılır. Dönüş: iş id (kuyruğa yazılamazsa None).
+        """
+        if self.offline:
+            job_id = -next(self._local_ids)
+            QTimer.singleShot(0, lambda: self._on_job_finished(job_id, job_type, run_job(self.db, job_type, payload)))
+        else:
+            job_id = self.db.enqueue_job(job_type, payload, key, self.client_id)
+            if job_id is None:
+                return None
+            self.wake_event.set()
+        self.callbacks[job_id] = callback
+        self.pending_changed.emit(self.pending_count)
+        return job_id
+
+    def _on_job_finished(self, job_id, job_type, result):
+        callback = self.callbacks.pop(job_id, None)
+        if callback:
+            try:
+                callback(result)
+            except Exception:
+                traceback.print_exc()
+        if result.get('success'):
+            self.job_completed.emit(job_id, job_type, result)
+        else:
+            self.job_failed.emit(job_id, job_type, result.get('error') or "İş başarısız")
+        self.pending_changed.emit(self.pending_count)
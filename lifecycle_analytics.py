@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# lifecycle_analytics.py - container_lifecycle_history üzerinden durumda kalma (dwell) süresi analizi
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Dağılım histogramı kova sınırları (saat)
+DWELL_BIN_EDGES_HOURS = np.array([0, 1, 4, 12, 24, 48, 72, 168, 336, 720, np.inf])
+TREND_BUCKETS = {'Gün': 86400, 'Hafta': 7 * 86400, 'Ay': 30 * 86400}
+PERCENTILES = (0.5, 0.9, 0.95)
+# id'ler INSERT anında alınır, commit sırası farklı olabilir: son okunan id'den küçük id'li bir satır sonradan görünür
+# hale gelebilir. update() son bu kadar id'yi yeniden okur, daha önce işlenmiş id'ler atlanır.
+LATE_COMMIT_OVERLAP_IDS = 20000
+
+@dataclass
+class StateDwell:
+    """Tek durum için bekleme süresi özeti (saat)"""
+    state_id: int
+    state_name: str
+    visits: int                  # tamamlanmış (çıkılmış) ziyaret sayısı
+    mean_hours: float
+    p50_hours: float
+    p90_hours: float
+    p95_hours: float
+    max_hours: float
+    current_count: int           # şu an bu durumda olan konteyner
+    current_mean_hours: float    # şu anki bekleyenlerin ortalama süresi
+    histogram: np.ndarray = field(default_factory=lambda: np.zeros(len(DWELL_BIN_EDGES_HOURS) - 1, dtype=np.int64))
+
+@dataclass
+class DwellSummary:
+    """Durum bazında bekleme süresi dağılımı ve zaman içindeki medyan eğilimi"""
+    states: List[StateDwell] = field(default_factory=list)
+    trend_starts: np.ndarray = field(default_factory=lambda: np.array([]))            # epoch saniye
+    trend_p50: np.ndarray = field(default_factory=lambda: np.zeros((0, 0)))           # durum × kova medyan (saat, NaN: veri yok)
+    trend_bucket_sec: int = 7 * 86400
+    since: Optional[datetime] = None
+    segment_count: int = 0
+    history_rows: int = 0
+    elapsed: float = 0.0
+
+def group_percentiles(groups: np.ndarray, values: np.ndarray, quantiles: Sequence[float], values_sorted: bool = False):
+    """
+    Gruplu yüzdelikler tek sıralamayla: (grup, değer) sırasına dizilip her grubun dilimi içinde
+    doğrusal enterpolasyon yapılır (np.percentile varsayılanıyla aynı). Değerler zaten sıralıysa
+    sadece grup etiketleri kararlı sıralanır (65536'dan az grupta radix sort).
+    Dönüş: (gruplar, adetler, yüzdelik matrisi [grup × quantile], en büyük değerler)
+    """
+    if len(values) == 0:
+        return np.zeros(0, dtype=groups.dtype), np.zeros(0, dtype=np.int64), np.zeros((0, len(quantiles))), np.zeros(0)
+    if values_sorted:
+        order = np.argsort(groups.astype(np.uint16) if groups.max() < 65536 else groups, kind='stable')
+    else:
+        order = np.lexsort((values, groups))
+    g, v = groups[order], values[order]
+    starts = np.concatenate(([0], np.nonzero(g[1:] != g[:-1])[0] + 1))
+    counts = np.diff(np.concatenate((starts, [len(g)])))
+    result = np.empty((len(starts), len(quantiles)))
+    for j, q in enumerate(quantiles):
+        pos = starts + q * (counts - 1)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, starts + counts - 1)
+        result[:, j] = v[lo] + (v[hi] - v[lo]) * (pos - lo)
+    return g[starts], counts, result, v[starts + counts - 1]
+
+class DwellEngine:
+    """
+    Geçmiş satırlarını bir kez okuyup kapalı bekleme dilimlerini (konteyner, durum, başlangıç, süre)
+    süreye göre sıralı NumPy dizilerinde tutar. update() son okunan id'ye yakın bir pencereden itibaren okur ve daha önce
+    işlenmiş id'leri atlar (geç commit edilen satırlar kaybolmaz): yeni satırlar kendi aralarında LEAD ile, her konteynerin
+    önceki açık dilimi ise ilk yeni satırla kapatılır. Aynı konteynerin geçişleri satır kilidiyle sıralandığından
+    konteyner içinde id sırası zaman sırasıyla uyumludur.
+    """
+
+    def __init__(self, overlap_ids: int = LATE_COMMIT_OVERLAP_IDS):
+        self.lock = threading.Lock()
+        self.overlap_ids = overlap_ids
+        self.last_id = 0
+        self.recent_ids = np.zeros(0, dtype=np.int64)        # (last_id - overlap_ids, last_id] aralığında işlenmiş id'ler (sıralı)
+        self.history_rows = 0
+        self.container_codes: Dict[str, int] = {}
+        self.open_state = np.full(0, -1, dtype=np.int64)     # konteyner kodu → şu anki durum (-1: yok)
+        self.open_start = np.zeros(0)                         # konteyner kodu → duruma giriş zamanı
+        self._segments: List[Tuple[np.ndarray, ...]] = []     # birleştirilmemiş (kod, durum, başlangıç, süre) parçaları
+        self.seg_code = np.zeros(0, dtype=np.int64)
+        self.seg_state = np.zeros(0, dtype=np.int64)
+        self.seg_start = np.zeros(0)
+        self.seg_hours = np.zeros(0)
+
+    def _codes_for(self, container_ids: np.ndarray) -> np.ndarray:
+        unique, inverse = np.unique(container_ids, return_inverse=True)
+        codes = np.array([self.container_codes.setdefault(c, len(self.container_codes)) for c in unique], dtype=np.int64)
+        if len(self.container_codes) > len(self.open_state):
+            grow = len(self.container_codes) * 2 - len(self.open_state)
+            self.open_state = np.concatenate((self.open_state, np.full(grow, -1, dtype=np.int64)))
+            self.open_start = np.concatenate((self.open_start, np.zeros(grow)))
+        return codes[inverse]
+
+    def ingest(self, chunks: Iterable[List[Tuple]]) -> int:
+        """(id, container_id, to_state_id, epoch, sonraki_epoch) parçalarını (konteyner, zaman sıralı) işle"""
+        added, previous_code, seen = 0, -1, [self.recent_ids]
+        with self.lock:
+            for chunk in chunks:
+                if not chunk: continue
+                if len(self.recent_ids):   # yeniden okunan pencerede daha önce işlenmiş satırlar atlanır
+                    keep = ~np.isin(np.fromiter((r[0] for r in chunk), dtype=np.int64, count=len(chunk)), self.recent_ids)
+                    if not keep.all(): chunk = [r for r, k in zip(chunk, keep) if k]
+                    if not chunk: continue
+                ids, containers, states, times, next_times = zip(*chunk)
+                codes = self._codes_for(np.asarray(containers, dtype=object).astype(str))
+                states = np.asarray(states, dtype=np.int64)
+                times = np.asarray(times, dtype=np.float64)
+                next_times = np.asarray(next_times, dtype=np.float64)   # None → NaN (okunan aralıkta son geçiş)
+
+                # Konteynerin bu güncellemedeki ilk satırı önceki açık dilimi kapatır
+                first = np.ones(len(codes), dtype=bool)
+                first[1:] = codes[1:] != codes[:-1]
+                first[0] = codes[0] != previous_code
+                closing = codes[first]
+                closing = closing[self.open_state[closing] >= 0]
+                if len(closing):
+                    closing_end = times[first][self.open_state[codes[first]] >= 0]
+                    self._segments.append((closing, self.open_state[closing].copy(), self.open_start[closing].copy(),
+                                           (closing_end - self.open_start[closing]) / 3600.0))
+                    self.open_state[closing] = -1
+
+                closed = ~np.isnan(next_times)
+                self._segments.append((codes[closed], states[closed], times[closed], (next_times[closed] - times[closed]) / 3600.0))
+                last = ~closed
+                self.open_state[codes[last]] = states[last]
+                self.open_start[codes[last]] = times[last]
+
+                previous_code = codes[-1]
+                self.last_id = max(self.last_id, int(max(ids)))
+                self.history_rows += len(codes)
+                added += len(codes)
+                seen.append(np.asarray(ids, dtype=np.int64))
+            if len(seen) > 1:
+                ids = np.concatenate(seen)
+                self.recent_ids = np.unique(ids[ids > self.last_id - self.overlap_ids])
+        return added
+
+    def update(self, db) -> int:
+        """Veritabanından yeni (ve son okumadan sonra commit edilmiş) geçmiş satırlarını oku"""
+        return self.ingest(db.iter_lifecycle_transitions(max(self.last_id - self.overlap_ids, 0)))
+
+    def _consolidate(self):
+        """Yeni dilimleri süreye göre sıralı dizilere yerleştir (yüzdelikler için tam sıralama gerekmez)"""
+        if not self._segments: return
+        code, state, start, hours = (np.concatenate(part) for part in zip(*self._segments))
+        self._segments.clear()
+        order = np.argsort(hours, kind='stable')
+        positions = np.searchsorted(self.seg_hours, hours[order], side='right')
+        self.seg_code = np.insert(self.seg_code, positions, code[order])
+        self.seg_state = np.insert(self.seg_state, positions, state[order])
+        self.seg_start = np.insert(self.seg_start, positions, start[order])
+        self.seg_hours = np.insert(self.seg_hours, positions, hours[order])
+
+    def summary(self, state_names: Optional[Dict[int, str]] = None, since: Optional[datetime] = None,
+                bucket_sec: int = TREND_BUCKETS['Hafta'], now: Optional[float] = None) -> DwellSummary:
+        """Durum bazında yüzdelikler, histogram, şu anki bekleyenler ve medyan eğilimi"""
+        t0 = time.perf_counter()
+        state_names = state_names or {}
+        now = time.time() if now is None else now
+        with self.lock:
+            self._consolidate()
+            mask = self.seg_start >= since.timestamp() if since else slice(None)
+            seg_state, seg_start, seg_hours = self.seg_state[mask], self.seg_start[mask], self.seg_hours[mask]
+            open_mask = self.open_state >= 0
+            open_state, open_hours = self.open_state[open_mask], (now - self.open_start[open_mask]) / 3600.0
+            history_rows = self.history_rows
+
+        summary = DwellSummary(trend_bucket_sec=bucket_sec, since=since, segment_count=len(seg_hours), history_rows=history_rows)
+        state_ids = np.union1d(np.unique(seg_state), np.unique(open_state))
+        if len(state_ids) == 0:
+            summary.elapsed = time.perf_counter() - t0
+            return summary
+        seg_idx = np.searchsorted(state_ids, seg_state)
+        n_states = len(state_ids)
+
+        groups, counts, pct, maxima = group_percentiles(seg_idx, seg_hours, PERCENTILES, values_sorted=True)
+        visits = np.zeros(n_states, dtype=np.int64); visits[groups] = counts
+        pct_full = np.full((n_states, len(PERCENTILES)), np.nan); pct_full[groups] = pct
+        max_full = np.full(n_states, np.nan); max_full[groups] = maxima
+        sums = np.bincount(seg_idx, weights=seg_hours, minlength=n_states)
+
+        open_idx = np.searchsorted(state_ids, open_state)
+        current = np.bincount(open_idx, minlength=n_states)
+        current_sum = np.bincount(open_idx, weights=open_hours, minlength=n_states)
+
+        n_bins = len(DWELL_BIN_EDGES_HOURS) - 1
+        bins = np.clip(np.searchsorted(DWELL_BIN_EDGES_HOURS, seg_hours, side='right') - 1, 0, n_bins - 1)
+        histogram = np.bincount(seg_idx * n_bins + bins, minlength=n_states * n_bins).reshape(n_states, n_bins)
+
+        for i, state_id in enumerate(state_ids):
+            summary.states.append(StateDwell(
+                int(state_id), state_names.get(int(state_id), str(state_id)), int(visits[i]),
+                float(sums[i] / visits[i]) if visits[i] else float('nan'),
+                *(float(x) for x in pct_full[i]), float(max_full[i]),
+                int(current[i]), float(current_sum[i] / current[i]) if current[i] else float('nan'),
+                histogram[i]))
+
+        if len(seg_start):
+            origin = (np.floor(seg_start.min() / bucket_sec)) * bucket_sec
+            bucket = ((seg_start - origin) // bucket_sec).astype(np.int64)
+            n_buckets = int(bucket.max()) + 1
+            groups, _, pct, _ = group_percentiles(seg_idx * n_buckets + bucket, seg_hours, (0.5,), values_sorted=True)
+            trend = np.full(n_states * n_buckets, np.nan); trend[groups] = pct[:, 0]
+            summary.trend_starts = origin + np.arange(n_buckets) * bucket_sec
+            summary.trend_p50 = trend.reshape(n_states, n_buckets)
+        summary.elapsed = time.perf_counter() - t0
+        return summary
+
+    def container_dwell(self, container_id: str, now: Optional[float] = None) -> Dict[int, Tuple[int, float]]:
+        """Tek konteyner için durum → (ziyaret sayısı, toplam saat); şu anki durum dahil"""
+        now = time.time() if now is None else now
+        with self.lock:
+            self._consolidate()
+            code = self.container_codes.get(str(container_id))
+            if code is None: return {}
+            mask = self.seg_code == code
+            result = {}
+            for state, hours in zip(self.seg_state[mask], self.seg_hours[mask]):
+                visits, total = result.get(int(state), (0, 0.0))
+                result[int(state)] = (visits + 1, total + float(hours))
+            if self.open_state[code] >= 0:
+                state = int(self.open_state[code])
+                visits, total = result.get(state, (0, 0.0))
+                result[state] = (visits + 1, total + (now - self.open_start[code]) / 3600.0)
+            return result
+
+if __name__ == "__main__":
+    # Benchmark: milyonlarca geçmiş satırı, ardından küçük artımlı güncelleme
+    print("🧪 Benchmarking Lifecycle Dwell Analytics...")
+
+    rng = np.random.default_rng(11)
+    n_containers, per_container = 100000, 20
+    base = datetime(2024, 1, 1).timestamp()
+    gaps = rng.gamma(2.0, 12 * 3600, (n_containers, per_container))
+    times = base + rng.uniform(0, 700 * 86400, (n_containers, 1)) + np.cumsum(gaps, axis=1)
+    states = rng.integers(1, 12, (n_containers, per_container))
+    next_times = np.concatenate((times[:, 1:], np.full((n_containers, 1), np.nan)), axis=1)
+    container_ids = np.repeat([f"KONT{i:07d}" for i in range(n_containers)], per_container)
+    rows = list(zip(range(1, n_containers * per_container + 1), container_ids.tolist(), states.ravel().tolist(),
+                    times.ravel().tolist(), [None if np.isnan(x) else x for x in next_times.ravel().tolist()]))
+    chunks = [rows[i:i + 100000] for i in range(0, len(rows), 100000)]
+
+    engine = DwellEngine()
+    t0 = time.perf_counter(); engine.ingest(chunks); ingest_s = time.perf_counter() - t0
+    now = float(times.max()) + 3600
+    first = engine.summary(now=now)
+    summary = engine.summary(now=now)
+    print(f"✅ {len(rows):,} geçmiş satırı: okuma {ingest_s:.2f} s, ilk özet (sıralama dahil) {first.elapsed * 1000:.0f} ms, "
+          f"sonraki özet {summary.elapsed * 1000:.0f} ms ({summary.segment_count:,} dilim, {summary.trend_p50.shape[1]} haftalık kova)")
+
+    # Doğrulama: np.percentile ile karşılaştır
+    for state in summary.states[:3]:
+        check = engine.seg_hours[engine.seg_state == state.state_id]
+        assert abs(np.percentile(check, 90) - state.p90_hours) < 1e-9 and abs(np.median(check) - state.p50_hours) < 1e-9
+
+    # Artımlı: 1000 konteynere birer yeni geçiş
+    new_rows = [(len(rows) + i + 1, f"KONT{i:07d}", 1, now + i, None) for i in range(1000)]
+    t0 = time.perf_counter(); engine.ingest([new_rows]); summary = engine.summary(now=now + 2000)
+    print(f"✅ Artımlı güncelleme (1.000 yeni satır) + özet: {(time.perf_counter() - t0) * 1000:.0f} ms, {summary.segment_count:,} dilim")
+
+    print("\n🎉 Lifecycle dwell analytics benchmark completed!")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# lifecycle_states.py - Konteyner yaşam döngüsü durum makinesi (durumlar, izinli geçişler, cycle sonu davranışı)
+
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+NOTIFY_CHANNEL = 'lifecycle_durumlari'   # durum/geçiş tabloları değişince tetikleyiciler bildirir
+
+class LifecycleState(NamedTuple):
+    id: int
+    name: str
+    description: str
+    color: Optional[str]
+    is_active: bool
+    is_terminal: bool            # bu duruma geçiş bir cycle'ı tamamlar
+    rollover_to: Optional[int]   # cycle tamamlanınca konteynerin geçtiği durum (yoksa terminal durumda kalır)
+
+class LifecycleStateMachine:
+    """
+    Durumlar ve izinli geçişlerin değişmez anlık görüntüsü; thread'ler arasında kilitsiz paylaşılır.
+    transitions None ise (geçiş tablosu yok) aktif her duruma geçişe izin verilir.
+    Durumu olmayan konteyner (ilk atama) her aktif duruma geçebilir.
+    """
+
+    def __init__(self, state_rows: Iterable[dict], transitions: Optional[Iterable[dict]] = None):
+        self.rows = [dict(r) for r in state_rows]
+        self.states: Dict[int, LifecycleState] = {}
+        for r in self.rows:
+            name = r.get('state_name') or r.get('state_description') or str(r['id'])
+            self.states[r['id']] = LifecycleState(r['id'], name, r.get('state_description') or name, r.get('color_code'),
+                                                  bool(r.get('is_active', True)), bool(r.get('is_terminal')), r.get('rollover_state_id'))
+        self.restricted = transitions is not None
+        self._targets: Dict[int, frozenset] = {}
+        if self.restricted:
+            targets: Dict[int, set] = {}
+            for t in transitions:
+                targets.setdefault(t['from_state_id'], set()).add(t['to_state_id'])
+            self._targets = {k: frozenset(v) for k, v in targets.items()}
+        self.by_name = {s.name: s.id for s in self.states.values()}
+        self.by_name.update({s.description: s.id for s in self.states.values() if s.description not in self.by_name})
+
+    def __bool__(self):
+        return bool(self.states)
+
+    def state(self, state_id) -> Optional[LifecycleState]:
+        return self.states.get(state_id)
+
+    def name(self, state_id, default='UNKNOWN') -> str:
+        state = self.states.get(state_id)
+        return state.name if state else default
+
+    def active_states(self) -> List[LifecycleState]:
+        return [s for s in self.states.values() if s.is_active]
+
+    def state_rows(self) -> List[dict]:
+        """get_lifecycle_states() ile aynı biçim: aktif durum satırları, id sırasıyla"""
+        return sorted((r for r in self.rows if r.get('is_active', True)), key=lambda r: r['id'])
+
+    def targets(self, from_state_id) -> List[int]:
+        """Verilen durumdan geçilebilecek aktif durumlar"""
+        return [s.id for s in self.active_states() if self.check(from_state_id, s.id) is None]
+
+    def check(self, from_state_id, to_state_id) -> Optional[str]:
+        """Geçiş geçersizse sebebi, geçerliyse None"""
+        target = self.states.get(to_state_id)
+        if target is None: return f"Tanımsız durum: {to_state_id}"
+        if not target.is_active: return f"'{target.name}' durumu aktif değil"
+        if from_state_id is None: return None
+        if from_state_id == to_state_id: return f"Konteyner zaten '{target.name}' durumunda"
+        if self.restricted and to_state_id not in self._targets.get(from_state_id, ()):
+            return f"'{self.name(from_state_id, str(from_state_id))}' → '{target.name}' geçişine izin verilmiyor"
+        return None
+
+    def check_many(self, current_states: Dict[str, Optional[int]], to_state_id) -> Dict[str, str]:
+        """Toplu geçiş: {konteyner_id: mevcut durum} -> {konteyner_id: red sebebi} (sadece geçersizler)"""
+        rejected = {}
+        for c_id, from_state_id in current_states.items():
+            reason = self.check(from_state_id, to_state_id)
+            if reason: rejected[c_id] = reason
+        return rejected
+
+    def resolve(self, to_state_id) -> Tuple[int, bool]:
+        """Geçişten sonra kaydedilecek durum ve cycle'ın tamamlanıp tamamlanmadığı"""
+        target = self.states.get(to_state_id)
+        if target is None or not target.is_terminal: return to_state_id, False
+        return (target.rollover_to if target.rollover_to is not None else to_state_id), True
+
+class LifecycleStateCache:
+    """
+    Süreç genelinde tek durum makinesi. İlk ihtiyaçta yüklenir, NOTIFY ile gelen değişiklik bildiriminde
+    (ya da dinleyici yeniden bağlandığında) atılır ve sonraki çağrıda yeniden okunur.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._machine: Optional[LifecycleStateMachine] = None
+        self._generation = 0
+
+    def get(self, loader: Callable[[], LifecycleStateMachine]) -> LifecycleStateMachine:
+        with self.lock:
+            machine, generation = self._machine, self._generation
+        if machine is not None: return machine
+        machine = loader()
+        with self.lock:
+            # yükleme sırasında gelen bir bildirim bu görüntüyü eskitmiş olabilir; o durumda saklanmaz
+            if machine and generation == self._generation: self._machine = machine
+        return machine
+
+    def invalidate(self, payload=None):
+        with self.lock:
+            self._machine = None
+            self._generation += 1
+
+_shared_cache = LifecycleStateCache()
+
+def shared_state_cache() -> LifecycleStateCache:
+    return _shared_cache
@@ -6,6 +6,8 @@ import random
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 
+from lifecycle_states import LifecycleStateMachine
+
 class MockDatabase:
     """Gerçek veritabanı olmadan tüm özelliklerin çalışması için mock database"""
     
@@ -80,6 +82,7 @@ class MockDatabase:
                 prev_state = random.choice(self.lifecycle_states) if i > 0 else None
                 
                 history.append({
+                    'id': len(history) + 1,
                     'container_id': container['id'],
                     'change_timestamp': base_time + timedelta(days=i*2),
                     'from_state_name': prev_state['state_description'] if prev_state else None,
@@ -123,6 +126,37 @@ class MockDatabase:
         """Tüm container'ları detaylı olarak getir"""
         return self.containers
     
+    def get_containers_after(self, after_id=None, limit=500):
+        """id'ye göre sıralı konteyner parçası - offline mode"""
+        containers = sorted(self.containers, key=lambda c: c['id'])
+        return [c for c in containers if after_id is None or c['id'] > after_id][:limit]
+    
+    def container_exists(self, c_id):
+        """Konteyner var mı - offline mode"""
+        return any(c['id'] == c_id for c in self.containers)
+    
+    def complete_container_ids(self, prefix, limit=20):
+        """Önekle başlayan konteyner ID'leri - offline mode"""
+        prefix = (prefix or "").strip().upper()
+        return sorted(c['id'] for c in self.containers if prefix and c['id'].startswith(prefix))[:limit]
+    
+    def search_containers(self, text, limit=50, after=None, status=None):
+        """Sıralı konteyner araması - offline mode"""
+        text = (text or "").strip().upper()
+        if not text: return []
+        def group(c):
+            cid = c['id'].upper()
+            if cid == text: return 0
+            if cid.startswith(text): return 1
+            if len(text) < 3: return None
+            if text in cid: return 2
+            if text in (c.get('cikis_limani') or '').upper() or text in (c.get('varis_limani') or '').upper(): return 3
+            return None
+        matches = [(group(c), c['id'], c) for c in self.containers if status is None or c.get('durum') == status]
+        matches = sorted((m for m in matches if m[0] is not None), key=lambda m: m[:2])
+        if after: matches = [m for m in matches if m[:2] > (after[0], after[2])]
+        return [dict(c, arama_grubu=g, arama_skoru=0.0) for g, _, c in matches[:limit]]
+    
     def get_lifecycle_states(self):
         """Lifecycle state'lerini getir"""
         return self.lifecycle_states
@@ -131,6 +165,29 @@ class MockDatabase:
         """Container lifecycle geçmişini getir"""
         return [h for h in self.lifecycle_history if h['container_id'] == container_id]
     
+    def get_container_lifecycle_timeline(self, container_id, before=None, limit=50):
+        """Container geçmişinin (change_timestamp, id) sırasıyla en yeniden eskiye bir sayfası"""
+        history = sorted((h for h in self.lifecycle_history if h['container_id'] == container_id),
+                         key=lambda h: (h['change_timestamp'], h['id']), reverse=True)
+        if before is not None:
+            history = [h for h in history if (h['change_timestamp'], h['id']) < tuple(before)]
+        return history[:limit]
+    
+    def get_container_lifecycle_summary(self, container_id):
+        """Container özet satırı - offline mode (geçmişten hesaplanır)"""
+        history = self.get_container_lifecycle_timeline(container_id, limit=len(self.lifecycle_history))
+        if not history: return None
+        return {
+            'container_id': container_id,
+            'gecis_sayisi': len(history),
+            'tamamlanan_cycle': sum(1 for h in history if h['to_state_name'] == 'DELIVERED'),
+            'ilk_degisim': history[-1]['change_timestamp'],
+            'son_degisim': history[0]['change_timestamp'],
+            'durumda_gecen': datetime.now() - history[0]['change_timestamp'],
+            'son_durum_adi': history[0]['to_state_name'],
+            'son_durum_renk': history[0].get('color_code'),
+        }
+    
     def change_container_lifecycle_state(self, container_id, new_state_id, reason=None, changed_by="USER"):
         """Container state değiştir"""
         # Container'ı bul ve state'ini güncelle
@@ -147,6 +204,7 @@ class MockDatabase:
                     
                     # History'ye ekle
                     self.lifecycle_history.append({
+                        'id': len(self.lifecycle_history) + 1,
                         'container_id': container_id,
                         'change_timestamp': datetime.now(),
                         'from_state_name': old_state,
@@ -159,9 +217,49 @@ class MockDatabase:
                     return True
         return False
     
+    def get_lifecycle_state_machine(self):
+        """Durum makinesi - offline mode (geçiş tablosu yok, aktif her duruma geçilebilir)"""
+        return LifecycleStateMachine(self.lifecycle_states)
+    
+    def change_containers_lifecycle_state(self, container_ids, new_state_id, reason=None, changed_by="USER"):
+        """Toplu durum değişikliği - offline mode (geçersiz geçişler reddedilir)"""
+        machine = self.get_lifecycle_state_machine()
+        containers = {c['id']: c for c in self.containers}
+        result = {'success': True, 'changed': [], 'rejected': [], 'error': None}
+        for container_id in dict.fromkeys(container_ids or []):
+            container = containers.get(container_id)
+            if container is None:
+                error = "Konteyner bulunamadı"
+            else:
+                error = machine.check(machine.by_name.get(container.get('lifecycle_state_name')), new_state_id)
+            if error or not self.change_container_lifecycle_state(container_id, new_state_id, reason, changed_by):
+                result['rejected'].append({'container_id': container_id, 'reason': error or "Durum değiştirilemedi"})
+            else:
+                result['changed'].append(container_id)
+        if result['rejected'] and not result['changed']:
+            result['error'] = result['rejected'][0]['reason']
+        return result
+    
     def get_containers_count(self):
         """Toplam konteyner sayısını al - offline mode"""
         return len(self.containers)
+
+    def get_lifecycle_dashboard_stats(self, max_age_sec=None):
+        """Lifecycle panel istatistikleri - offline mode"""
+        counts = {}
+        for container in self.containers:
+            name = container.get('lifecycle_state_name') or 'TANIMSIZ'
+            counts[name] = counts.get(name, 0) + 1
+        colors = {s['state_description']: s['color_code'] for s in self.lifecycle_states}
+        distribution = [{'state_id': None, 'state_name': name, 'color': colors.get(name), 'count': count}
+                        for name, count in sorted(counts.items(), key=lambda item: -item[1])]
+        return {
+            'total_containers': len(self.containers),
+            'total_cycles': sum(c.get('lifecycle_cycle_count', 0) or 0 for c in self.containers),
+            'active_lifecycles': len(self.lifecycle_states),
+            'most_used_state': distribution[0]['state_name'] if distribution else None,
+            'distribution': distribution,
+        }
     
 class MockCursor:
     """Mock database cursor"""
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# report_batch.py - Ekransız (Agg) toplu rapor üretimi: rapor türleri × filtreler → PDF/PNG/CSV
+
+import argparse
+import csv
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from matplotlib.image import imsave
+
+from report_renderer import REPORT_FILTER_KEYS, REPORT_TYPES, export_report_pdf, fetch_report_data, render_report, report_table
+
+FORMATS = ('pdf', 'png', 'csv')
+DEFAULT_FETCH_CONNECTIONS = 4
+PAGE_WIDTH_PX, PAGE_HEIGHT_PX, PNG_DPI = 1200, 750, 100
+
+_TR_ASCII = str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosuCGIOSU")
+
+def slugify(text: str) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(text).translate(_TR_ASCII)).strip('_').lower()
+
+@dataclass
+class BatchJob:
+    """Tek rapor: tür + filtreler + istenen çıktı biçimleri"""
+    report_type: str
+    filters: Dict = field(default_factory=dict)
+    formats: Tuple[str, ...] = FORMATS
+    name: Optional[str] = None
+
+    def data_key(self) -> Tuple:
+        keys = REPORT_FILTER_KEYS.get(self.report_type, tuple(sorted(self.filters)))
+        return (self.report_type,) + tuple(self.filters.get(k) for k in keys)
+
+    def file_stem(self, index: int) -> str:
+        if self.name:
+            return slugify(self.name)
+        parts = [self.filters.get(k) for k in REPORT_FILTER_KEYS.get(self.report_type, ()) if self.filters.get(k) not in (None, 'Tümü')]
+        return f"{index:02d}_" + slugify('_'.join([self.report_type] + [str(p) for p in parts]))
+
+@dataclass
+class BatchResult:
+    """Toplu çalıştırmanın özeti"""
+    files: List[str] = field(default_factory=list)
+    errors: List[Tuple[str, str]] = field(default_factory=list)   # (iş, hata)
+    jobs: int = 0
+    unique_fetches: int = 0
+    fetch_time: float = 0.0
+    render_time: float = 0.0
+    elapsed: float = 0.0
+
+def expand_jobs(report_types: Sequence[str], filter_sets: Sequence[Dict], formats: Sequence[str] = FORMATS) -> List[BatchJob]:
+    """Rapor türleri × filtre kombinasyonları"""
+    return [BatchJob(report_type, dict(filters), tuple(formats)) for report_type in report_types for filters in filter_sets]
+
+def nightly_pack(today: Optional[date] = None, formats: Sequence[str] = FORMATS) -> List[BatchJob]:
+    """Gece çalıştırılan yönetim raporu paketi (dün, son 7 gün, son 30 gün, yılbaşından bugüne)"""
+    today = today or date.today()
+    yesterday = today - timedelta(days=1)
+    periods = {
+        'dun': (yesterday, yesterday),
+        'son_7_gun': (today - timedelta(days=7), yesterday),
+        'son_30_gun': (today - timedelta(days=30), yesterday),
+        'yil_basindan': (date(today.year, 1, 1), yesterday),
+    }
+    formats = tuple(formats)
+    jobs = [BatchJob("Saha Doluluk Oranı", {}, formats, "saha_doluluk"),
+            BatchJob("Gemi Bazında Doluluk Oranı", {'filter1_data': None}, formats, "gemi_doluluk"),
+            BatchJob("Varış Limanlarına Göre Dağılım", {}, formats, "varis_limanlari")]
+    for location in ('Tümü', 'SAHA', 'GEMI', 'ATANMAMIS'):
+        jobs.append(BatchJob("Konteyner Tipi Dağılımı", {'filter1_text': location}, formats, f"konteyner_tipi_{location}"))
+    for period, (start, end) in periods.items():
+        dates = {'start_date': start.isoformat(), 'end_date': end.isoformat()}
+        for traffic in ('Çıkış', 'Varış', 'Toplam'):
+            jobs.append(BatchJob("Liman Trafik Hacmi", {**dates, 'filter1_text': traffic}, formats, f"liman_trafik_{traffic}_{period}"))
+        jobs.append(BatchJob("Araç Kullanım Verileri", {**dates, 'filter1_text': 'Tümü'}, formats, f"arac_kullanim_{period}"))
+        if period != 'yil_basindan':
+            jobs.append(BatchJob("Araç Verimlilik Analizi", {**dates, 'filter1_text': 'Tümü'}, formats, f"arac_verimlilik_{period}"))
+    return jobs
+
+def _plain(data):
+    """RealDictRow vb. satırları süreçler arası aktarım için düz sözlüğe çevir"""
+    if isinstance(data, list):
+        return [dict(row) if isinstance(row, dict) else row for row in data]
+    if isinstance(data, dict):
+        return dict(data)
+    return data
+
+def fetch_batch_data(jobs: Sequence[BatchJob], db=None, db_factory: Optional[Callable] = None,
+                     connections: int = DEFAULT_FETCH_CONNECTIONS) -> Dict[Tuple, object]:
+    """
+    İşlerin ihtiyaç duyduğu veriyi tek geçişte oku: aynı veri anahtarı bir kez sorgulanır.
+    db_factory verilirse sorgular en fazla `connections` bağlantılı bir havuzda paralel çalışır,
+    aksi halde verilen db bağlantısı üzerinde sırayla.
+    """
+    unique = {}
+    for job in jobs:
+        unique.setdefault(job.data_key(), job)
+
+    def fetch(db_conn, job):
+        try:
+            return _plain(fetch_report_data(db_conn, job.report_type, job.filters))
+        except Exception as e:
+            return e
+
+    if db_factory is None or connections <= 1 or len(unique) <= 1:
+        return {key: fetch(db, job) for key, job in unique.items()}
+
+    local, opened, lock = threading.local(), [], threading.Lock()
+    def fetch_pooled(job):
+        if not hasattr(local, 'db'):
+            local.db = db_factory()
+            with lock: opened.append(local.db)
+        return fetch(local.db, job)
+    try:
+        with ThreadPoolExecutor(max_workers=min(connections, len(unique))) as pool:
+            return dict(zip(unique.keys(), pool.map(fetch_pooled, unique.values())))
+    finally:
+        for conn in opened:
+            conn.close_connection()
+
+def render_job_files(job: BatchJob, data, out_dir: str, stem: str) -> List[str]:
+    """Tek işi istenen biçimlerde dosyaya yaz (işleyici süreçte çalışır)"""
+    paths = []
+    if 'png' in job.formats:
+        # Agg ile çizilmiş piksel tamponu doğrudan yazılır (savefig tekrar çizerdi)
+        figure = render_report(job.report_type, data, job.filters, PAGE_WIDTH_PX, PAGE_HEIGHT_PX, PNG_DPI)
+        path = os.path.join(out_dir, f"{stem}.png")
+        imsave(path, np.asarray(figure.canvas.buffer_rgba()))
+        paths.append(path)
+    if 'pdf' in job.formats:
+        path = os.path.join(out_dir, f"{stem}.pdf")
+        export_report_pdf(path, [(job.report_type, data, job.filters)])
+        paths.append(path)
+    if 'csv' in job.formats:
+        headers, rows = report_table(job.report_type, data)
+        path = os.path.join(out_dir, f"{stem}.csv")
+        with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f, delimiter=';')
+            if headers: writer.writerow(headers)
+            writer.writerows(rows)
+        paths.append(path)
+    return paths
+
+def run_batch(jobs: Sequence[BatchJob], out_dir: str, db=None, db_factory: Optional[Callable] = None,
+              workers: Optional[int] = None, connections: int = DEFAULT_FETCH_CONNECTIONS,
+              combined_pdf: Optional[str] = None) -> BatchResult:
+    """
+    Veriyi bir kez oku, sonra çizimleri süreç havuzunda paralel üret.
+    workers: çizim süreci sayısı (None: CPU sayısı, 1: aynı süreçte).
+    combined_pdf: verilirse tüm raporlar ayrıca tek bir çok sayfalı PDF'e yazılır.
+    """
+    t0 = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    result = BatchResult(jobs=len(jobs))
+    data = fetch_batch_data(jobs, db, db_factory, connections)
+    result.unique_fetches = len(data)
+    result.fetch_time = time.perf_counter() - t0
+
+    tasks = []
+    for index, job in enumerate(jobs, 1):
+        job_data = data.get(job.data_key())
+        if isinstance(job_data, Exception):
+            result.errors.append((job.file_stem(index), f"Veri okunamadı: {job_data}"))
+            continue
+        tasks.append((job, job_data, job.file_stem(index)))
+
+    render_start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(tasks) <= 1:
+        outcomes = []
+        for job, job_data, stem in tasks:
+            try: outcomes.append(render_job_files(job, job_data, out_dir, stem))
+            except Exception as e: outcomes.append(e)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = [pool.submit(render_job_files, job, job_data, out_dir, stem) for job, job_data, stem in tasks]
+            outcomes = []
+            for future in futures:
+                try: outcomes.append(future.result())
+                except Exception as e: outcomes.append(e)
+    for (job, _, stem), outcome in zip(tasks, outcomes):
+        if isinstance(outcome, Exception): result.errors.append((stem, str(outcome)))
+        else: result.files.extend(outcome)
+    if combined_pdf and tasks:
+        try:
+            export_report_pdf(combined_pdf, [(job.report_type, job_data, job.filters) for job, job_data, _ in tasks])
+            result.files.append(combined_pdf)
+        except Exception as e:
+            result.errors.append((os.path.basename(combined_pdf), str(e)))
+    result.render_time = time.perf_counter() - render_start
+    result.elapsed = time.perf_counter() - t0
+    return result
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Liman Yönetim Sistemi - toplu rapor üretimi (ekransız)")
+    parser.add_argument('--pack', choices=['nightly'], help="Hazır rapor paketi")
+    parser.add_argument('--report', action='append', default=[], help="Rapor türü (birden fazla verilebilir, 'all' tümü)")
+    parser.add_argument('--start', help="Başlangıç tarihi (YYYY-MM-DD, varsayılan: 30 gün önce)")
+    parser.add_argument('--end', help="Bitiş tarihi (YYYY-MM-DD, varsayılan: bugün)")
+    parser.add_argument('--filter', action='append', default=[], help="Birinci filtre değeri (trafik tipi, konum tipi, araç tipi); her değer ayrı rapor üretir")
+    parser.add_argument('--formats', default=','.join(FORMATS), help="Virgülle ayrılmış: pdf,png,csv")
+    parser.add_argument('--out', default=os.path.join('raporlar', date.today().isoformat()), help="Çıktı klasörü")
+    parser.add_argument('--combined-pdf', help="Tüm raporları ayrıca bu tek PDF dosyasına yaz")
+    parser.add_argument('--workers', type=int, default=None, help="Çizim süreci sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument('--connections', type=int, default=DEFAULT_FETCH_CONNECTIONS, help="Veri okuma bağlantı sayısı")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = _parse_args(argv)
+    formats = tuple(f.strip().lower() for f in args.formats.split(',') if f.strip())
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        print(f"❌ Desteklenmeyen biçim: {', '.join(unknown)}"); return 2
+
+    if args.pack == 'nightly':
+        jobs = nightly_pack(formats=formats)
+    else:
+        report_types = REPORT_TYPES if 'all' in args.report else args.report
+        invalid = [r for r in report_types if r not in REPORT_TYPES]
+        if not report_types or invalid:
+            print(f"❌ Geçerli rapor türleri: {', '.join(REPORT_TYPES)}"); return 2
+        end = args.end or date.today().isoformat()
+        start = args.start or (date.fromisoformat(end) - timedelta(days=30)).isoformat()
+        filter_sets = [{'start_date': start, 'end_date': end, 'filter1_text': value} for value in (args.filter or ['Tümü'])]
+        jobs = expand_jobs(report_types, filter_sets, formats)
+
+    from database import DatabaseConnection
+    db = DatabaseConnection()
+    if not db.conn:
+        print("❌ Veritabanı bağlantısı kurulamadı"); return 1
+    try:
+        result = run_batch(jobs, args.out, db=db, db_factory=DatabaseConnection, workers=args.workers,
+                           connections=args.connections, combined_pdf=args.combined_pdf)
+    finally:
+        db.close_connection()
+
+    print(f"✅ {result.jobs} rapor, {len(result.files)} dosya → {args.out} "
+          f"(veri: {result.unique_fetches} sorgu {result.fetch_time:.2f} sn, çizim {result.render_time:.2f} sn, toplam {result.elapsed:.2f} sn)")
+    for stem, error in result.errors:
+        print(f"❌ {stem}: {error}")
+    return 1 if result.errors else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# report_renderer.py - Rapor verisinin alınması ve grafiklerin ekrandan bağımsız (Agg) çizimi
+
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+import matplotlib.dates as mdates
+
+from vehicle_analytics import analyze_vehicle_utilization
+
+REPORT_TYPES = [
+    "Saha Doluluk Oranı", "Gemi Bazında Doluluk Oranı", "Konteyner Tipi Dağılımı",
+    "Liman Trafik Hacmi", "Varış Limanlarına Göre Dağılım", "Araç Kullanım Verileri",
+    "Araç Verimlilik Analizi",
+]
+
+# Rapor tablolarına yazan her deyimden sonra tetikleyicinin tablo adıyla gönderdiği bildirim (commit sonrası iletilir)
+REPORT_NOTIFY_CHANNEL = 'rapor_verisi'
+
+# Rapor türünün okuduğu tablolar (veri sürümü ve önbellek geçersizleştirme için)
+REPORT_TABLES = {
+    "Saha Doluluk Oranı": ('konteynerler',),
+    "Gemi Bazında Doluluk Oranı": ('gemiler', 'gemi_yuklemeler'),
+    "Konteyner Tipi Dağılımı": ('konteynerler',),
+    "Liman Trafik Hacmi": ('konteynerler',),
+    "Varış Limanlarına Göre Dağılım": ('konteynerler',),
+    "Araç Kullanım Verileri": ('tasima_loglari', 'araclar'),
+    "Araç Verimlilik Analizi": ('tasima_loglari', 'araclar'),
+}
+
+# Rapor türünün veri sorgusunu etkileyen filtreler
+REPORT_FILTER_KEYS = {
+    "Saha Doluluk Oranı": (),
+    "Gemi Bazında Doluluk Oranı": ('filter1_data',),
+    "Konteyner Tipi Dağılımı": ('filter1_text', 'filter2_data'),
+    "Liman Trafik Hacmi": ('start_date', 'end_date', 'filter1_text'),
+    "Varış Limanlarına Göre Dağılım": (),
+    "Araç Kullanım Verileri": ('start_date', 'end_date', 'filter1_text'),
+    "Araç Verimlilik Analizi": ('start_date', 'end_date', 'filter1_text'),
+}
+
+NO_DATA_TEXT = "Bu Rapor İçin Veri Bulunamadı"
+PDF_TITLE = "Liman Yönetim Sistemi Raporu"
+PDF_PAGE_SIZE = (11.69, 8.27)    # A4 yatay (inç)
+PDF_TABLE_ROWS = 28              # tablo sayfası başına satır
+
+class RenderedReport(NamedTuple):
+    """Çizilmiş rapor: dışa aktarma için veri ve filtrelerle birlikte"""
+    report_type: str
+    filters: Dict
+    data: object
+    figure: Figure
+BACKGROUND, AXES_BACKGROUND = '#2c3e50', '#34495e'
+
+def fetch_report_data(db, report_type: str, filters: Dict):
+    """
+    Rapor türüne göre veriyi oku. filters: start_date, end_date (ISO), filter1_data, filter1_text, filter2_data
+    """
+    start_date, end_date = filters.get('start_date'), filters.get('end_date')
+    filter1_data, filter1_text, filter2_data = filters.get('filter1_data'), filters.get('filter1_text'), filters.get('filter2_data')
+    if report_type == "Saha Doluluk Oranı":
+        return db.get_report_data()
+    if report_type == "Gemi Bazında Doluluk Oranı":
+        return db.get_ship_occupancy_data(ship_id=filter1_data)
+    if report_type == "Konteyner Tipi Dağılımı":
+        return db.get_container_type_distribution_data(location_type=filter1_text, ship_id=filter2_data)
+    if report_type == "Liman Trafik Hacmi":
+        return db.get_port_traffic_data(start_date=start_date, end_date=end_date, traffic_type=filter1_text)
+    if report_type == "Varış Limanlarına Göre Dağılım":
+        return db.get_destination_port_distribution()
+    if report_type == "Araç Kullanım Verileri":
+        return db.get_vehicle_usage_data(start_date=start_date, end_date=end_date, vehicle_type=filter1_text)
+    if report_type == "Araç Verimlilik Analizi":
+        end_exclusive = (date.fromisoformat(end_date) + timedelta(days=1)).isoformat()
+        report = analyze_vehicle_utilization(db, start_date, end_exclusive, vehicle_type=filter1_text)
+        return report if report.event_count else None
+    return None
+
+# Tablo/CSV çıktısı için rapor türüne göre (başlık, satır anahtarı) sütunları
+REPORT_COLUMNS = {
+    "Gemi Bazında Doluluk Oranı": [("Gemi ID", 'gemi_id'), ("Gemi Adı", 'gemi_adi'), ("Kapasite", 'kapasite'), ("Dolu Slot", 'dolu_slot'), ("Doluluk (%)", 'doluluk_orani')],
+    "Konteyner Tipi Dağılımı": [("Tip", 'tip'), ("Konteyner Sayısı", 'count')],
+    "Liman Trafik Hacmi": [("Liman", 'liman'), ("Konteyner Sayısı", 'count')],
+    "Varış Limanlarına Göre Dağılım": [("Varış Limanı", 'varis_limani'), ("Konteyner Sayısı", 'count')],
+}
+
+def report_table(report_type: str, data) -> Tuple[List[str], List[List]]:
+    """Rapor verisini (başlıklar, satırlar) tablosuna çevir (CSV ve PDF tabloları için)"""
+    if not data:
+        return [], []
+    if report_type == "Saha Doluluk Oranı":
+        return ["Doluluk Oranı (%)"], [[round(float(data.get('occupancy_rate') or 0), 2)]]
+    if report_type == "Araç Verimlilik Analizi":
+        headers = ["Araç", "Tip", "Meşgul (sa)", "Kullanım (%)", "Hareket", "Hareket/sa", "Boşta Kalma", "En Uzun Boşta (sa)"]
+        rows = [[v.vehicle_id, v.vehicle_type, round(v.busy_hours, 2), round(v.utilization * 100, 1), v.moves,
+                 round(v.moves_per_hour, 2), v.idle_gaps, round(v.longest_idle_hours, 2)]
+                for v in sorted(data.vehicles, key=lambda v: v.utilization, reverse=True)]
+        return headers, rows
+    columns = REPORT_COLUMNS.get(report_type) or [(key, key) for key in data[0].keys()]
+    rows = []
+    for d in data:
+        row = []
+        for _, key in columns:
+            value = d.get(key)
+            row.append(round(float(value), 2) if isinstance(value, float) else value)
+        rows.append(row)
+    return [title for title, _ in columns], rows
+
+def configure_plot_style(figure, ax):
+    ax.set_facecolor(AXES_BACKGROUND); figure.set_facecolor(BACKGROUND)
+    ax.tick_params(axis='x', colors='white'); ax.tick_params(axis='y', colors='white')
+    for spine in ax.spines.values(): spine.set_edgecolor('white')
+    ax.yaxis.label.set_color('white'); ax.xaxis.label.set_color('white'); ax.title.set_color('white')
+
+def plot_pie_chart(ax, value, title):
+    value = value or 0
+    dolu = min(value, 100); bos = 100 - dolu
+    ax.pie([dolu, bos], labels=['Dolu', 'Boş'], autopct='%1.1f%%', startangle=90, colors=['#e74c3c', '#2ecc71'], textprops={'color': "w"})
+    ax.set_title(title); ax.axis('equal')
+
+def plot_bar_chart(figure, ax, labels, values, title, ylabel):
+    ax.bar(labels, values, color='#3498db')
+    ax.set_title(title); ax.set_ylabel(ylabel); ax.tick_params(axis='x', rotation=45)
+    figure.tight_layout()
+
+def plot_vehicle_utilization(figure, report, vehicle_type):
+    """Üstte filo kullanım zaman çizelgesi, altta araç bazında kullanım oranı"""
+    figure.clear()
+    timeline_ax = figure.add_subplot(211); vehicle_ax = figure.add_subplot(212)
+    for ax in (timeline_ax, vehicle_ax): configure_plot_style(figure, ax)
+
+    times = [datetime.fromtimestamp(t) for t in report.bucket_starts]
+    timeline_ax.fill_between(times, report.fleet_busy, step='post', color='#3498db', alpha=0.6, label="Ortalama meşgul araç")
+    moves_ax = timeline_ax.twinx()
+    moves_ax.plot(times, report.fleet_moves / report.bucket_hours, color='#f1c40f', linewidth=1, label="Hareket/saat")
+    moves_ax.tick_params(axis='y', colors='#f1c40f')
+    if report.peak_time:
+        timeline_ax.axvline(report.peak_time, color='#e74c3c', linestyle='--', linewidth=1)
+    timeline_ax.set_title(f"Araç Verimliliği ({vehicle_type}) — filo kullanımı %{report.fleet_utilization * 100:.1f}\n"
+                          f"{report.moves_per_hour:.1f} hareket/saat, en yüksek eşzamanlılık {report.peak_concurrency}"
+                          f"{report.peak_time.strftime(' (%d.%m %H:%M)') if report.peak_time else ''}")
+    timeline_ax.set_ylabel("Meşgul araç")
+    locator = mdates.AutoDateLocator(); timeline_ax.xaxis.set_major_locator(locator)
+    timeline_ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+    vehicles = sorted(report.vehicles, key=lambda v: v.utilization, reverse=True)[:40]
+    labels = [v.vehicle_id for v in vehicles]
+    vehicle_ax.bar(labels, [v.utilization * 100 for v in vehicles], color='#2ecc71')
+    for i, v in enumerate(vehicles):
+        if v.idle_gaps: vehicle_ax.text(i, v.utilization * 100, f"{v.longest_idle_hours:.0f} sa", ha='center', va='bottom', color='white', fontsize=7)
+    vehicle_ax.set_ylabel("Kullanım (%)"); vehicle_ax.tick_params(axis='x', rotation=60, labelsize=8)
+    vehicle_ax.set_title("Araç bazında kullanım (çubuk üstü: en uzun boşta kalma, saat)")
+    figure.tight_layout()
+
+def draw_report(figure, report_type: str, data, filters: Dict):
+    """Veriyi verilen Figure üzerine çiz (Figure herhangi bir canvas'a bağlı olabilir)"""
+    figure.clear()
+    ax = figure.add_subplot(111)
+    configure_plot_style(figure, ax)
+    filter1_text = filters.get('filter1_text')
+
+    if report_type == "Saha Doluluk Oranı" and data:
+        plot_pie_chart(ax, data.get('occupancy_rate', 0), "Saha Doluluk Oranı")
+    elif report_type == "Gemi Bazında Doluluk Oranı" and data:
+        if len(data) == 1: plot_pie_chart(ax, data[0]['doluluk_orani'], f"{data[0]['gemi_adi']} Doluluk Oranı")
+        else: plot_bar_chart(figure, ax, [d['gemi_adi'] for d in data], [d['doluluk_orani'] for d in data], "Gemi Doluluk Oranları", "Doluluk Oranı (%)")
+    elif report_type == "Konteyner Tipi Dağılımı" and data:
+        plot_bar_chart(figure, ax, [d['tip'] for d in data], [d['count'] for d in data], "Konteyner Tipi Dağılımı", "Konteyner Sayısı")
+    elif report_type == "Liman Trafik Hacmi" and data:
+        plot_bar_chart(figure, ax, [d.get('liman', 'Bilinmiyor') for d in data], [d['count'] for d in data], "Liman Trafik Hacmi", "Konteyner Sayısı")
+    elif report_type == "Varış Limanlarına Göre Dağılım" and data:
+        plot_bar_chart(figure, ax, [d['varis_limani'] for d in data], [d['count'] for d in data], "Varış Limanlarına Göre Konteyner Dağılımı", "Konteyner Sayısı")
+    elif report_type == "Araç Kullanım Verileri" and data:
+        # Eğer işlem sayısı sıfırsa (taşıma logu yoksa), araç durumunu göster
+        if all(d.get('islem_sayisi', 0) == 0 for d in data):
+            durum_counts = {}
+            for d in data:
+                durum = d.get('durum', 'BİLİNMİYOR')
+                durum_counts[durum] = durum_counts.get(durum, 0) + 1
+            plot_bar_chart(figure, ax, list(durum_counts.keys()), list(durum_counts.values()), f"Araç Durumu Dağılımı ({filter1_text})", "Araç Sayısı")
+        else:
+            labels = [f"{d.get('arac_tipi', 'Bilinmiyor')}-{d.get('arac_id', 'N/A')}" for d in data]
+            plot_bar_chart(figure, ax, labels, [d['islem_sayisi'] for d in data], f"Araç Kullanım İstatistikleri ({filter1_text})", "İşlem Sayısı")
+    elif report_type == "Araç Verimlilik Analizi" and data:
+        plot_vehicle_utilization(figure, data, filter1_text)
+    else:
+        ax.text(0.5, 0.5, NO_DATA_TEXT, ha='center', va='center', transform=ax.transAxes, color='white', fontsize=14)
+
+def render_report(report_type: str, data, filters: Dict, width_px: int = 1000, height_px: int = 600, dpi: int = 100) -> Figure:
+    """GUI'den bağımsız bir Figure oluşturup Agg ile çizer (herhangi bir thread'de çağrılabilir)"""
+    figure = Figure(figsize=(max(width_px, 100) / dpi, max(height_px, 100) / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    draw_report(figure, report_type, data, filters)
+    canvas.draw()
+    return figure
+
+def figure_rgba(figure: Figure) -> Tuple[bytes, int, int]:
+    """Agg ile çizilmiş Figure'ün RGBA piksel verisi"""
+    buffer = figure.canvas.buffer_rgba()
+    height, width = buffer.shape[0], buffer.shape[1]
+    return bytes(buffer), width, height
+
+def describe_filters(report_type: str, filters: Dict) -> str:
+    """Rapor başlığında gösterilecek filtre özeti"""
+    keys = REPORT_FILTER_KEYS.get(report_type, ())
+    parts = []
+    if 'start_date' in keys:
+        parts.append(f"{filters.get('start_date')} – {filters.get('end_date')}")
+    if 'filter1_text' in keys and filters.get('filter1_text'):
+        parts.append(str(filters['filter1_text']))
+    if 'filter1_data' in keys or 'filter2_data' in keys:
+        ship = filters.get('filter1_data') or filters.get('filter2_data')
+        if ship: parts.append(f"Gemi: {ship}")
+    return ", ".join(parts) or "Tüm veriler"
+
+def _format_cell(value) -> str:
+    if value is None: return "-"
+    if isinstance(value, float): return f"{value:,.2f}".rstrip('0').rstrip('.')
+    return str(value)
+
+def _draw_pdf_header(figure, title, subtitle, color):
+    figure.text(0.5, 0.97, title, ha='center', va='top', fontsize=16, fontweight='bold', color=color)
+    figure.text(0.5, 0.925, subtitle, ha='center', va='top', fontsize=10, color=color)
+
+def _draw_table_page(figure, headers, rows):
+    ax = figure.add_axes((0.04, 0.04, 0.92, 0.84)); ax.axis('off')
+    table = ax.table(cellText=[[_format_cell(v) for v in row] for row in rows], colLabels=headers, loc='upper center', cellLoc='center')
+    table.auto_set_font_size(False); table.set_fontsize(9); table.scale(1, 1.35)
+    for (row, _), cell in table.get_celld().items():
+        cell.set_edgecolor('#bdc3c7')
+        if row == 0:
+            cell.set_facecolor(AXES_BACKGROUND); cell.get_text().set_color('white'); cell.get_text().set_fontweight('bold')
+        elif row % 2 == 0:
+            cell.set_facecolor('#ecf0f1')
+
+def export_report_pdf(path, sections: Sequence[Tuple[str, object, Dict]], title: str = PDF_TITLE,
+                      generated_at: Optional[datetime] = None) -> int:
+    """
+    Raporları vektörel, çok sayfalı PDF olarak yaz: her bölüm için bir grafik sayfası ve
+    PDF_TABLE_ROWS satırlık veri tablosu sayfaları. sections: (rapor türü, veri, filtreler).
+    Dönüş: sayfa sayısı.
+    """
+    generated_at = generated_at or datetime.now()
+    pages = 0
+    with PdfPages(path, metadata={'Title': title, 'Creator': PDF_TITLE}) as pdf:
+        for report_type, data, filters in sections:
+            subtitle = f"{report_type} — {describe_filters(report_type, filters)} — Oluşturma: {generated_at:%Y-%m-%d %H:%M}"
+            figure = Figure(figsize=PDF_PAGE_SIZE)
+            draw_report(figure, report_type, data, filters)
+            figure.tight_layout(rect=(0.02, 0.02, 0.98, 0.89))
+            _draw_pdf_header(figure, title, subtitle, 'white')
+            pdf.savefig(figure, facecolor=figure.get_facecolor()); pages += 1
+
+            headers, rows = report_table(report_type, data)
+            chunks = range(0, len(rows), PDF_TABLE_ROWS)
+            for page_no, first in enumerate(chunks, 1):
+                page = Figure(figsize=PDF_PAGE_SIZE, facecolor='white')
+                _draw_pdf_header(page, report_type, f"Veri tablosu — {describe_filters(report_type, filters)} — sayfa {page_no}/{len(chunks)}", BACKGROUND)
+                _draw_table_page(page, headers, rows[first:first + PDF_TABLE_ROWS])
+                pdf.savefig(page); pages += 1
+    return pages
+
+def report_source_tables() -> List[str]:
+    """Raporların okuduğu tüm tablolar"""
+    return sorted({table for tables in REPORT_TABLES.values() for table in tables})
+
+class ReportDataVersions:
+    """
+    Tablo başına veri sürümü: REPORT_NOTIFY_CHANNEL bildirimi geldikçe ilgili tablonun sayacı artar. Dinleyici
+    (yeniden) bağlandığında bump(None) ile tüm sürümler geçersizleşir. Dinleyici hiç bağlanmadıysa (offline, tetikleyici
+    kurulamadı) sürüm bilinmez: get() None döndürür ve o sonuç önbelleğe alınmaz.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+        self.epoch = 0
+        self.live = False
+
+    def bump(self, table: Optional[str] = None):
+        with self.lock:
+            if table is None:
+                self.epoch += 1
+                self.live = True
+            else:
+                self.counters[table] = self.counters.get(table, 0) + 1
+
+    def get(self, tables: Sequence[str]) -> Optional[Tuple]:
+        with self.lock:
+            if not self.live: return None
+            return (self.epoch,) + tuple(self.counters.get(t, 0) for t in tables)
+
+class ReportCache:
+    """(rapor türü, filtreler, veri sürümü) anahtarlı, thread-safe LRU veri önbelleği"""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(report_type: str, filters: Dict, version) -> Tuple:
+        return (report_type, tuple(sorted((k, v) for k, v in filters.items())), version)
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, report_type: Optional[str] = None):
+        """Tüm önbelleği veya sadece bir rapor türünü temizle"""
+        with self.lock:
+            if report_type is None:
+                self.entries.clear()
+            else:
+                for key in [k for k in self.entries if k[0] == report_type]:
+                    del self.entries[key]
+
+if __name__ == "__main__":
+    # Benchmark: vektörel PDF (matplotlib PDF backend) ve eski 300 dpi raster + reportlab yolu
+    import io, os, random, tempfile, time
+    print("🧪 Benchmarking PDF Export...")
+
+    random.seed(3)
+    filters = {'start_date': '2025-01-01', 'end_date': '2025-01-31', 'filter1_text': 'Toplam'}
+    ports = [f"Liman {i:02d}" for i in range(40)]
+    sections = [
+        ("Saha Doluluk Oranı", {'occupancy_rate': 67.4}, {}),
+        ("Liman Trafik Hacmi", [{'liman': p, 'count': random.randint(10, 900)} for p in ports], filters),
+        ("Konteyner Tipi Dağılımı", [{'tip': t, 'count': random.randint(50, 400)} for t in ('20DC', '40DC', '40HC', '45HC', 'REEF', 'OT', 'FR')], {'filter1_text': 'Tümü'}),
+    ]
+
+    def export_raster(path, report_type, data, filters):
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.utils import ImageReader
+        from reportlab.pdfgen import canvas as pdf_canvas
+        figure = render_report(report_type, data, filters)
+        img_data = io.BytesIO()
+        figure.savefig(img_data, format='png', dpi=300, facecolor=figure.get_facecolor(), bbox_inches='tight')
+        img_data.seek(0)
+        c = pdf_canvas.Canvas(path, pagesize=letter); width, height = letter
+        c.drawImage(ImageReader(img_data), (width - 500) / 2, height - 550, width=500, height=350, preserveAspectRatio=True)
+        c.save()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export_report_pdf(os.path.join(tmp, 'isinma.pdf'), sections[:1])   # font önbelleği ısınması
+        for report_type, data, section_filters in sections:
+            raster_path, vector_path = os.path.join(tmp, 'raster.pdf'), os.path.join(tmp, 'vector.pdf')
+            t0 = time.perf_counter(); export_raster(raster_path, report_type, data, section_filters); raster_ms = (time.perf_counter() - t0) * 1000
+            t0 = time.perf_counter(); pages = export_report_pdf(vector_path, [(report_type, data, section_filters)]); vector_ms = (time.perf_counter() - t0) * 1000
+            print(f"✅ {report_type}: raster {raster_ms:.0f} ms / {os.path.getsize(raster_path) / 1024:.0f} KB (1 sayfa, sadece grafik) — "
+                  f"vektörel {vector_ms:.0f} ms / {os.path.getsize(vector_path) / 1024:.0f} KB ({pages} sayfa, grafik + tablo)")
+        path = os.path.join(tmp, 'paket.pdf')
+        t0 = time.perf_counter(); pages = export_report_pdf(path, sections); elapsed = (time.perf_counter() - t0) * 1000
+        print(f"✅ Tüm bölümler tek dosyada: {pages} sayfa, {elapsed:.0f} ms, {os.path.getsize(path) / 1024:.0f} KB")
+
+    print("\n🎉 PDF export benchmark completed!")
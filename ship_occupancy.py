@@ -0,0 +1,184 @@
+# ship_occupancy.py - Gemi slot doluluk matrisi ve vektörel yerleştirme maskeleri
+
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from utils import parse_container_type
+
+class ShipOccupancyGrid:
+    """
+    Bir geminin tüm slotlarını bay × sıra × kat NumPy dizilerinde tutar.
+    Doluluk, boyut, reefer ve varış limanı kodu slot bazında saklanır; "X konteyneri
+    nereye konabilir" maskesi tek bir vektörel geçişte hesaplanır.
+    Planlanan (beklemedeki) yerleştirmeler place/remove/move ile artımlı işlenir.
+    """
+
+    def __init__(self, bay_ids: List[str], rows: int, tiers: int):
+        self.bay_ids = list(bay_ids)
+        self.bay_index = {bay_id: i for i, bay_id in enumerate(self.bay_ids)}
+        self.rows, self.tiers = max(int(rows or 0), 0), max(int(tiers or 0), 0)
+        shape = (len(self.bay_ids), self.rows, self.tiers)
+        self.occupied = np.zeros(shape, dtype=bool)
+        self.size = np.zeros(shape, dtype=np.int16)
+        self.reefer = np.zeros(shape, dtype=bool)
+        self.port_code = np.full(shape, -1, dtype=np.int16)  # port_names listesindeki index, -1 = bilinmiyor
+        self.port_names = []
+        self.port_index = {}
+        self.slot_container = {}  # (bay_idx, row, tier) -> container_id
+        self.container_slot = {}  # container_id -> (bay_idx, row, tier)
+
+    @classmethod
+    def from_ship(cls, ship_details: Dict, filled_slots: Optional[Dict] = None) -> 'ShipOccupancyGrid':
+        """gemiler kaydı ve get_all_ship_slots çıktısından matrisi oluştur"""
+        ship_details = ship_details or {}
+        bay_ids = [f"B{i:02d}" for i in range(1, (ship_details.get('toplam_bay_sayisi') or 0) + 1)]
+        grid = cls(bay_ids, ship_details.get('toplam_sira_sayisi'), ship_details.get('toplam_kat_sayisi'))
+        for bay_id, bay_slots in (filled_slots or {}).items():
+            for (row, tier), container in bay_slots.items():
+                grid.place(container.get('id'), container.get('tip'), bay_id, row, tier, container.get('varis_limani'))
+        return grid
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.occupied.shape
+
+    def _index(self, bay_id: str, row: int, tier: int) -> Optional[Tuple[int, int, int]]:
+        b = self.bay_index.get(bay_id)
+        if b is None or not (0 <= row < self.rows) or not (0 <= tier < self.tiers):
+            return None
+        return b, row, tier
+
+    def place(self, container_id: str, container_type: str, bay_id: str, row: int, tier: int,
+              discharge_port: Optional[str] = None) -> bool:
+        """Slotu dolu işaretle (commit edilmiş ya da planlanan yerleştirme)"""
+        idx = self._index(bay_id, row, tier)
+        if idx is None:
+            return False
+        c_size, c_is_reefer = parse_container_type(container_type)
+        if container_id is not None:
+            old_idx = self.container_slot.pop(container_id, None)
+            if old_idx is not None and old_idx != idx:
+                self._clear(old_idx)
+        displaced_id = self.slot_container.get(idx)
+        if displaced_id is not None and displaced_id != container_id:
+            self.container_slot.pop(displaced_id, None)
+        self.occupied[idx] = True
+        self.size[idx] = c_size
+        self.reefer[idx] = bool(c_is_reefer)
+        self.port_code[idx] = self._port_code(discharge_port)
+        if container_id is not None:
+            self.slot_container[idx] = container_id
+            self.container_slot[container_id] = idx
+        else:
+            self.slot_container.pop(idx, None)
+        return True
+
+    def remove(self, bay_id: str, row: int, tier: int) -> Optional[str]:
+        """Slotu boşalt, içindeki konteyner ID'sini döndür"""
+        idx = self._index(bay_id, row, tier)
+        if idx is None:
+            return None
+        container_id = self.slot_container.get(idx)
+        if container_id is not None:
+            self.container_slot.pop(container_id, None)
+        self._clear(idx)
+        return container_id
+
+    def move(self, container_id: str, container_type: str, bay_id: str, row: int, tier: int,
+             discharge_port: Optional[str] = None) -> bool:
+        """Konteyneri mevcut slotundan yeni slota taşı"""
+        return self.place(container_id, container_type, bay_id, row, tier, discharge_port)
+
+    def _clear(self, idx: Tuple[int, int, int]):
+        self.occupied[idx] = False
+        self.size[idx] = 0
+        self.reefer[idx] = False
+        self.port_code[idx] = -1
+        self.slot_container.pop(idx, None)
+
+    def _port_code(self, port: Optional[str]) -> int:
+        if not port:
+            return -1
+        code = self.port_index.get(port)
+        if code is None:
+            code = self.port_index[port] = len(self.port_names)
+            self.port_names.append(port)
+        return code
+
+    def load_bay(self, bay_id: str, bay_slots: Dict):
+        """Bay'i temizleyip verilen slotlarla (get_ship_bay_slots çıktısı) yeniden doldur"""
+        b = self.bay_index.get(bay_id)
+        if b is None:
+            return
+        for idx in [idx for idx in self.slot_container if idx[0] == b]:
+            self.container_slot.pop(self.slot_container.pop(idx), None)
+        self.occupied[b] = False
+        self.size[b] = 0
+        self.reefer[b] = False
+        self.port_code[b] = -1
+        for (row, tier), container in (bay_slots or {}).items():
+            self.place(container.get('id'), container.get('tip'), bay_id, row, tier, container.get('varis_limani'))
+
+    def contains_slot(self, bay_id: str, row: int, tier: int) -> bool:
+        """Slot gemi boyutları içinde mi"""
+        return self._index(bay_id, row, tier) is not None
+
+    def container_at(self, bay_id: str, row: int, tier: int) -> Optional[str]:
+        idx = self._index(bay_id, row, tier)
+        return self.slot_container.get(idx) if idx is not None else None
+
+    def lowest_free_tiers(self, bay_id: Optional[str] = None) -> np.ndarray:
+        """
+        Her kolon için yerçekimi kuralına göre yerleştirilebilecek en alt katı döndürür.
+        bay_id verilirse (sıra,) şeklinde, verilmezse (bay, sıra) şeklinde dizi döner.
+        Kolon tamamen doluysa değer kat sayısına eşittir.
+        """
+        occupied = self._bay_view(self.occupied, bay_id)
+        if self.tiers == 0:
+            return np.zeros(occupied.shape[:-1], dtype=np.int32)
+        first_free = np.argmin(occupied, axis=-1)
+        return np.where(occupied.all(axis=-1), self.tiers, first_free).astype(np.int32)
+
+    def placeable_mask(self, container_type: str, bay_id: Optional[str] = None) -> np.ndarray:
+        """
+        Verilen tipteki bir konteynerin konulabileceği slotların maskesi.
+        Kurallar: slot boş olmalı, kolondaki ilk boş kat olmalı (yerçekimi) ve
+        alttaki konteynerle boyut ve reefer tipi aynı olmalı.
+        """
+        c_size, c_is_reefer = parse_container_type(container_type)
+        occupied = self._bay_view(self.occupied, bay_id)
+        size = self._bay_view(self.size, bay_id)
+        reefer = self._bay_view(self.reefer, bay_id)
+        if self.tiers == 0 or (bay_id is not None and bay_id not in self.bay_index):
+            return np.zeros(occupied.shape, dtype=bool)   # tanımsız bay'in boş görünümü yerleştirilebilir sayılmaz
+
+        tier_idx = np.arange(self.tiers)
+        gravity_ok = tier_idx == self.lowest_free_tiers(bay_id)[..., None]
+
+        below_size = np.zeros_like(size)
+        below_size[..., 1:] = size[..., :-1]
+        below_reefer = np.zeros_like(reefer)
+        below_reefer[..., 1:] = reefer[..., :-1]
+        support_ok = (below_size == c_size) & (below_reefer == bool(c_is_reefer))
+        support_ok[..., 0] = True
+
+        return gravity_ok & ~occupied & support_ok
+
+    def placeable_slots(self, container_type: str, bay_id: Optional[str] = None) -> List[Tuple]:
+        """placeable_mask'teki uygun slotları (bay_id, sıra, kat) listesi olarak döndür"""
+        mask = self.placeable_mask(container_type, bay_id)
+        if bay_id is not None:
+            return [(bay_id, int(r), int(t)) for r, t in np.argwhere(mask)]
+        return [(self.bay_ids[b], int(r), int(t)) for b, r, t in np.argwhere(mask)]
+
+    def bay_fill_counts(self) -> np.ndarray:
+        """Bay başına dolu slot sayısı"""
+        return self.occupied.sum(axis=(1, 2))
+
+    def _bay_view(self, array: np.ndarray, bay_id: Optional[str]) -> np.ndarray:
+        if bay_id is None:
+            return array
+        b = self.bay_index.get(bay_id)
+        if b is None:
+            return np.zeros((self.rows, self.tiers), dtype=array.dtype)
+        return array[b]
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# stowage_planner.py - Seçili gemi için otomatik istif (stowage) planlama motoru
+
+import time
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from utils import parse_container_type, port_key
+from ship_occupancy import ShipOccupancyGrid
+from overstow_analysis import discharge_ranks
+
+@dataclass
+class StowagePlacement:
+    """Plandaki tek bir yerleştirme"""
+    container_id: str
+    bay_id: str
+    row: int
+    tier: int
+    discharge_port: Optional[str] = None
+    overstow: bool = False
+
+@dataclass
+class StowagePlan:
+    """Planlama sonucu"""
+    ship_id: Optional[str]
+    placements: List[StowagePlacement] = field(default_factory=list)
+    unplaced: List[str] = field(default_factory=list)
+    port_rotation: List[str] = field(default_factory=list)
+    overstows: int = 0
+    elapsed: float = 0.0
+    timed_out: bool = False
+
+def default_port_rotation(containers: List[Dict]) -> List[str]:
+    """Rota verilmemişse varış limanlarını alfabetik sırayla kullan (yazımı farklı aynı liman bir kez)"""
+    ports = {}
+    for c in containers:
+        if c.get('varis_limani'): ports.setdefault(port_key(c['varis_limani']), c['varis_limani'])
+    return sorted(ports.values(), key=port_key)
+
+def port_rank(port: Optional[str], port_rotation: List[str]) -> int:
+    """
+    Limanın rotadaki sırası (0 = ilk uğranan liman). Rotada olmayan limanlar
+    en son boşaltılacak kabul edilir ve istifin en altına yerleşir.
+    """
+    key = port_key(port)
+    if key is not None:
+        for i, name in enumerate(port_rotation):
+            if port_key(name) == key:
+                return i
+    return len(port_rotation)
+
+class StowagePlanner:
+    """
+    Greedy istif planlayıcı. Konteynerler en geç boşaltılacak limandan başlayarak
+    yerleştirilir; böylece aynı plan içinde yeni bir overstow oluşmaz. Her konteyner
+    için tüm kolonlar vektörel olarak puanlanır:
+      1. Aynı tipte, üstü daha geç (veya aynı) limana giden kolonlar (en yakın rota farkı)
+      2. Boş kolonlar
+      3. Mecburen overstow oluşturacak kolonlar (en küçük rota farkı)
+    Kurallar ShipOccupancyGrid ile aynıdır: yerçekimi, aynı boyut ve aynı reefer tipi.
+    """
+
+    def __init__(self, ship_details: Dict, filled_slots: Optional[Dict] = None, port_rotation: Optional[List[str]] = None):
+        self.ship_details = ship_details or {}
+        self.ship_id = self.ship_details.get('gemi_id')
+        self.grid = ShipOccupancyGrid.from_ship(self.ship_details, filled_slots)
+        self.port_rotation = list(port_rotation or [])
+
+    def _initial_columns(self):
+        """Kolon bazlı başlangıç durumunu (yükseklik, tip, en üst rota sırası) çıkar"""
+        n_bays, rows, tiers = self.grid.shape
+        heights = self.grid.lowest_free_tiers().reshape(-1).astype(np.int32)
+        col_size = np.zeros(n_bays * rows, dtype=np.int16)
+        col_reefer = np.zeros(n_bays * rows, dtype=bool)
+        col_top_rank = np.full(n_bays * rows, len(self.port_rotation), dtype=np.int32)
+
+        filled = heights > 0
+        if tiers and filled.any():
+            b_idx, r_idx = np.divmod(np.nonzero(filled)[0], rows)
+            top_tiers = heights[filled] - 1
+            col_size[filled] = self.grid.size[b_idx, r_idx, top_tiers]
+            col_reefer[filled] = self.grid.reefer[b_idx, r_idx, top_tiers]
+            col_top_rank[filled] = discharge_ranks(self.grid, self.port_rotation)[b_idx, r_idx, top_tiers]
+        return heights, col_size, col_reefer, col_top_rank
+
+    def plan(self, containers: List[Dict], time_budget: Optional[float] = 5.0) -> StowagePlan:
+        """
+        Aday konteynerler için tam yükleme planı üret.
+        time_budget (saniye) aşılırsa o ana kadarki plan timed_out=True ile döner.
+        """
+        start_time = time.perf_counter()
+        if not self.port_rotation:
+            self.port_rotation = default_port_rotation(containers)
+        result = StowagePlan(ship_id=self.ship_id, port_rotation=list(self.port_rotation))
+
+        n_bays, rows, tiers = self.grid.shape
+        n_cols = n_bays * rows
+        candidates = [c for c in containers if c.get('id') and c['id'] not in self.grid.container_slot]
+        if not n_cols or not tiers:
+            result.unplaced = [c['id'] for c in candidates]
+            result.elapsed = time.perf_counter() - start_time
+            return result
+
+        heights, col_size, col_reefer, col_top_rank = self._initial_columns()
+        col_order = np.arange(n_cols, dtype=np.float64) / n_cols
+        penalty_empty = float(tiers * (len(self.port_rotation) + 2))
+        penalty_overstow = penalty_empty * 2
+
+        # En geç boşaltılacak liman önce; aynı liman içinde tip gruplarını bir arada tut
+        keyed = []
+        for c in candidates:
+            c_size, c_is_reefer = parse_container_type(c.get('tip'))
+            keyed.append((-port_rank(c.get('varis_limani'), self.port_rotation), c_size, bool(c_is_reefer), c))
+        keyed.sort(key=lambda k: (k[0], k[1], k[2], k[3]['id']))
+
+        for i, (neg_rank, c_size, c_is_reefer, container) in enumerate(keyed):
+            if time_budget is not None and i % 64 == 0 and time.perf_counter() - start_time > time_budget:
+                result.timed_out = True
+                result.unplaced.extend(k[3]['id'] for k in keyed[i:])
+                break
+            c_rank = -neg_rank
+            has_room = heights < tiers
+            empty = heights == 0
+            same_type = ~empty & (col_size == c_size) & (col_reefer == c_is_reefer)
+            no_overstow = same_type & (col_top_rank >= c_rank)
+
+            score = np.full(n_cols, np.inf)
+            score[no_overstow] = (col_top_rank[no_overstow] - c_rank) * tiers + (tiers - heights[no_overstow])
+            score[empty] = penalty_empty + col_order[empty]
+            overstow = same_type & ~no_overstow
+            score[overstow] = penalty_overstow + (c_rank - col_top_rank[overstow])
+            score[~has_room] = np.inf
+
+            col = int(np.argmin(score))
+            if not np.isfinite(score[col]):
+                result.unplaced.append(container['id'])
+                continue
+
+            b, r = divmod(col, rows)
+            t = int(heights[col])
+            is_overstow = bool(overstow[col])
+            bay_id = self.grid.bay_ids[b]
+            self.grid.place(container['id'], container.get('tip'), bay_id, r, t, container.get('varis_limani'))
+            heights[col] = t + 1
+            col_size[col], col_reefer[col], col_top_rank[col] = c_size, c_is_reefer, c_rank
+            result.overstows += int(is_overstow)
+            result.placements.append(StowagePlacement(
+                container_id=container['id'], bay_id=bay_id, row=r, tier=t,
+                discharge_port=container.get('varis_limani'), overstow=is_overstow
+            ))
+
+        result.elapsed = time.perf_counter() - start_time
+        return result
+
+def plan_ship_stowage(db_connection, ship_id: str, containers: Optional[List[Dict]] = None,
+                      port_rotation: Optional[List[str]] = None, time_budget: Optional[float] = 5.0) -> StowagePlan:
+    """Veritabanındaki gemi ve yüklenebilir konteynerlerle plan üret (kaydetmez)"""
+    ship_details = db_connection.execute_query("SELECT * FROM public.gemiler WHERE gemi_id=%s", (ship_id,), fetchone=True)
+    if not ship_details:
+        return StowagePlan(ship_id=ship_id)
+    filled_slots = db_connection.get_all_ship_slots(ship_id)
+    if containers is None:
+        containers = db_connection.get_all_loadable_containers() or []
+    planner = StowagePlanner(ship_details, filled_slots, port_rotation)
+    return planner.plan(containers, time_budget)
+
+def stowage_plan_payload(plan: StowagePlan) -> Dict:
+    """Planı iş kuyruğundaki SHIP_PLACEMENTS işinin yüküne çevir"""
+    return {'ship_id': plan.ship_id, 'placements': [(p.container_id, p.bay_id, p.row, p.tier) for p in plan.placements], 'relocations': []}
+
+def save_stowage_plan(db_connection, plan: StowagePlan) -> Dict:
+    """
+    Planı gemi_yuklemeler tablosuna tek transaction'da yaz.
+    Dönüş apply_ship_placements ile aynıdır: {'success', 'applied', 'conflicts'}
+    """
+    return db_connection.apply_ship_placements(plan.ship_id, placements=stowage_plan_payload(plan)['placements'])
+
+if __name__ == "__main__":
+    # Benchmark: büyük bir gemi için sentetik planlama
+    import random
+    print("🧪 Benchmarking Stowage Planner...")
+
+    random.seed(42)
+    ports = ['HAMBURG', 'ROTTERDAM', 'ANTWERP', 'VALENCIA', 'PIREUS', 'ISTANBUL', 'IZMIR', 'MERSIN']
+    types = ['20 DRY', '40 DRY', '40 HC', '20 REEFER', '40 REEFER']
+    for bays, rows, tiers, n_boxes in [(12, 10, 8, 800), (24, 20, 16, 5000), (40, 24, 20, 15000)]:
+        ship = {'gemi_id': 'BENCH', 'toplam_bay_sayisi': bays, 'toplam_sira_sayisi': rows, 'toplam_kat_sayisi': tiers}
+        boxes = [{'id': f'BNCH{i:07d}', 'tip': random.choice(types), 'varis_limani': random.choice(ports)} for i in range(n_boxes)]
+        planner = StowagePlanner(ship, port_rotation=ports)
+        plan = planner.plan(boxes, time_budget=30.0)
+        print(f"✅ {bays}x{rows}x{tiers} ({bays * rows * tiers} slot), {n_boxes} konteyner: "
+              f"{len(plan.placements)} yerleşti, {len(plan.unplaced)} kaldı, "
+              f"{plan.overstows} overstow, {plan.elapsed * 1000:.1f} ms")
+
+    print("\n🎉 Stowage planner benchmark completed!")
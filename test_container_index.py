@@ -0,0 +1,65 @@
+# test_container_index.py - ContainerIdIndex (Bloom süzgeci, önek tamamlama, bildirimler) davranış testleri
+
+import numpy as np
+
+import container_index
+from container_index import BloomFilter, ContainerIdIndex
+
+def _loaded(ids):
+    index = ContainerIdIndex()
+    index.load(ids)
+    return index
+
+def test_bloom_has_no_false_negatives_and_few_false_positives():
+    ids = np.array([f"MSCU{i:07d}".encode() for i in range(20000)])
+    bloom = BloomFilter(len(ids))
+    bloom.add_many(ids)
+    assert all(bloom.might_contain(c) for c in ids[::97])
+    false_positives = sum(bloom.might_contain(f"XXXX{i:07d}".encode()) for i in range(5000))
+    assert false_positives / 5000 < 0.03
+
+def test_bulk_and_incremental_bloom_paths_agree():
+    ids = np.array([f"ID{i}".encode() for i in range(1500)])
+    bulk, single = BloomFilter(3000), BloomFilter(3000)
+    bulk.add_many(ids)
+    for c in ids: single.add_many(np.array([c]))
+    assert np.array_equal(bulk.bits, single.bits)
+
+def test_unready_index_answers_maybe():
+    index = ContainerIdIndex()
+    assert index.might_contain('ANY') and index.contains('ANY') is None and index.complete('A') == []
+
+def test_load_normalizes_and_deduplicates():
+    index = _loaded([' abc1 ', 'ABC1', 'abc2', ''])
+    assert len(index) == 2
+    assert index.contains('abc1') and index.contains('ABC2') and index.contains('ABC3') is False
+    assert not index.might_contain('ZZZ999') or index.contains('ZZZ999') is False
+
+def test_prefix_completion_merges_added_and_skips_removed():
+    index = _loaded(['ABC1', 'ABC2', 'ABC3', 'ABD1'])
+    index.apply_event('+ABC0,ABC9')
+    index.apply_event('-ABC2')
+    assert index.complete('abc') == ['ABC0', 'ABC1', 'ABC3', 'ABC9']
+    assert index.complete('abc', limit=2) == ['ABC0', 'ABC1']
+    assert index.complete('AB', limit=10)[-1] == 'ABD1'
+    assert index.complete('') == []
+
+def test_events_keep_membership_in_sync():
+    index = _loaded(['A1'])
+    index.apply_event('+B1,B2')
+    index.apply_event('-A1')
+    index.apply_event('-B2')
+    assert index.contains('B1') and index.contains('A1') is False and index.contains('B2') is False
+    index.apply_event('+A1')
+    assert index.contains('A1') and len(index) == 2
+
+def test_merge_rebuilds_arrays_and_keeps_contents(monkeypatch):
+    monkeypatch.setattr(container_index, 'MERGE_THRESHOLD', 8)
+    index = _loaded([f"OLD{i}" for i in range(10)])
+    for i in range(6): index.add(f"NEWLONGER{i}")
+    for i in range(3): index.discard(f"OLD{i}")
+    # 8. değişiklikte eşik aşıldı ve ana dizi yeniden kuruldu; sonraki silme yine ek kümede bekler
+    assert index._added == [] and index._removed == {b'OLD2'} and b'NEWLONGER0' in index._ids
+    assert len(index) == 13
+    assert index.contains('NEWLONGER5') and index.contains('OLD1') is False and index.contains('OLD9')
+    assert index.might_contain('NEWLONGER0')
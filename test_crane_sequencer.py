@@ -0,0 +1,42 @@
+# test_crane_sequencer.py - CraneSequencer ve ship_move_lists davranış testleri
+
+from crane_sequencer import DISCHARGE, LOAD, CraneSequencer, ship_move_lists
+
+def test_discharges_top_down_then_loads_bottom_up_in_each_bay():
+    loads = [('L1', 'B01', 0, 1), ('L0', 'B01', 0, 0)]
+    discharges = [('D0', 'B01', 1, 0), ('D1', 'B01', 1, 1)]
+    plan = CraneSequencer(1).sequence(loads, discharges)
+    moves = [(m.container_id, m.move_type) for m in plan.schedules[0].moves]
+    assert moves == [('D1', DISCHARGE), ('D0', DISCHARGE), ('L0', LOAD), ('L1', LOAD)]
+
+def test_cranes_get_contiguous_non_overlapping_bay_ranges():
+    loads = [(f"C{b}{i}", f"B{b:02d}", 0, i) for b in range(1, 9) for i in range(3)]
+    plan = CraneSequencer(3).sequence(loads)
+    assert plan.move_count == len(loads) and len(plan.schedules) <= 3
+    seen = []
+    for schedule in plan.schedules:
+        positions = [int(b[1:]) for b in schedule.bays]
+        assert positions == list(range(positions[0], positions[-1] + 1))
+        seen.extend(positions)
+    assert seen == sorted(seen) == list(range(1, 9))
+    assert plan.makespan == max(s.finish_time for s in plan.schedules)
+
+def test_more_cranes_never_increase_makespan():
+    loads = [(f"C{b}{i}", f"B{b:02d}", 0, i) for b in range(1, 13) for i in range(b % 4 + 1)]
+    makespans = [CraneSequencer(n).sequence(loads).makespan for n in (1, 2, 4)]
+    assert makespans[0] >= makespans[1] >= makespans[2]
+
+def test_empty_input_gives_empty_plan():
+    plan = CraneSequencer(2).sequence([], [])
+    assert plan.schedules == [] and plan.makespan == 0.0
+
+def test_move_lists_count_only_staged_boxes_as_loads():
+    filled = {'B01': {(0, 0): {'id': 'HAM1', 'varis_limani': 'HAMBURG'}, (0, 1): {'id': 'ROT1', 'varis_limani': 'ROTTERDAM'}}}
+    loads, discharges = ship_move_lists(filled, [('NEW', 'B01', 1, 0)], 'HAMBURG')
+    assert loads == [('NEW', 'B01', 1, 0)]
+    assert discharges == [('HAM1', 'B01', 0, 0)]
+    assert ship_move_lists(filled, [], None) == ([], [])
+
+def test_discharge_port_matches_mixed_case_names():
+    filled = {'B01': {(0, 0): {'id': 'IST1', 'varis_limani': 'İstanbul'}}}
+    assert ship_move_lists(filled, [], 'ISTANBUL') == ([], [('IST1', 'B01', 0, 0)])
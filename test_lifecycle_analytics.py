@@ -0,0 +1,75 @@
+# test_lifecycle_analytics.py - DwellEngine artımlı okuma ve bekleme süresi davranış testleri
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from lifecycle_analytics import DwellEngine
+
+HOUR = 3600.0
+
+class FakeHistory:
+    """iter_lifecycle_transitions'ı bellekteki commit edilmiş satırlarla taklit eder (LEAD okunan aralıkta hesaplanır)"""
+
+    def __init__(self):
+        self.rows = []   # (id, container_id, to_state_id, epoch)
+
+    def commit(self, *rows):
+        self.rows.extend(rows)
+
+    def iter_lifecycle_transitions(self, after_id=0, chunk_size=100000):
+        rows = sorted((r for r in self.rows if r[0] > after_id), key=lambda r: (r[1], r[3], r[0]))
+        out = []
+        for i, r in enumerate(rows):
+            following = rows[i + 1] if i + 1 < len(rows) and rows[i + 1][1] == r[1] else None
+            out.append(r + (following[3] if following else None,))
+        for i in range(0, len(out), chunk_size):
+            yield out[i:i + chunk_size]
+
+def _segments(engine):
+    with engine.lock:
+        engine._consolidate()
+        return sorted(zip(engine.seg_code.tolist(), engine.seg_state.tolist(), engine.seg_hours.tolist()))
+
+def test_closed_and_open_dwell_segments():
+    db, engine = FakeHistory(), DwellEngine()
+    db.commit((1, 'C1', 10, 0.0), (2, 'C1', 20, 2 * HOUR), (3, 'C2', 10, 0.0))
+    assert engine.update(db) == 3
+    assert engine.container_dwell('C1', now=5 * HOUR) == {10: (1, 2.0), 20: (1, 3.0)}
+    summary = engine.summary({10: 'GELDI', 20: 'SAHADA'}, now=5 * HOUR)
+    by_state = {s.state_name: s for s in summary.states}
+    assert by_state['GELDI'].visits == 1 and by_state['GELDI'].current_count == 1
+    assert by_state['SAHADA'].visits == 0 and by_state['SAHADA'].current_count == 1
+
+def test_incremental_update_closes_open_segment_without_duplicates():
+    db, engine = FakeHistory(), DwellEngine()
+    db.commit((1, 'C1', 10, 0.0), (2, 'C1', 20, HOUR))
+    engine.update(db)
+    db.commit((3, 'C1', 30, 4 * HOUR))
+    assert engine.update(db) == 1    # pencere yeniden okunur ama işlenmiş id'ler atlanır
+    assert engine.update(db) == 0
+    assert _segments(engine) == [(0, 10, 1.0), (0, 20, 3.0)]
+    assert engine.history_rows == 3
+
+def test_late_commit_below_last_id_is_not_lost():
+    db, engine = FakeHistory(), DwellEngine()
+    db.commit((1, 'C1', 10, 0.0), (3, 'C2', 10, 0.0))
+    engine.update(db)
+    assert engine.last_id == 3
+    db.commit((2, 'C1', 20, 2 * HOUR))   # id'si daha önce alınmış, commit'i geç kalmış satır
+    assert engine.update(db) == 1
+    assert engine.container_dwell('C1', now=3 * HOUR) == {10: (1, 2.0), 20: (1, 1.0)}
+
+def test_rows_older_than_overlap_window_are_forgotten():
+    db, engine = FakeHistory(), DwellEngine(overlap_ids=2)
+    db.commit(*[(i, f"C{i}", 10, 0.0) for i in range(1, 6)])
+    engine.update(db)
+    assert np.array_equal(engine.recent_ids, [4, 5])
+
+def test_summary_since_filters_by_segment_start():
+    db, engine = FakeHistory(), DwellEngine()
+    db.commit((1, 'C1', 10, 0.0), (2, 'C1', 20, HOUR), (3, 'C1', 10, 10 * HOUR), (4, 'C1', 20, 12 * HOUR))
+    engine.update(db)
+    summary = engine.summary(since=datetime.fromtimestamp(5 * HOUR, tz=timezone.utc), now=20 * HOUR)
+    visits = {s.state_id: s.visits for s in summary.states}
+    assert visits[10] == 1 and summary.segment_count == 1
@@ -0,0 +1,60 @@
+# test_lifecycle_states.py - Durum makinesi ve süreç önbelleği davranış testleri
+
+from lifecycle_states import LifecycleStateCache, LifecycleStateMachine
+
+STATES = [
+    {'id': 1, 'state_name': 'GELDI', 'is_active': True},
+    {'id': 2, 'state_name': 'SAHADA', 'is_active': True},
+    {'id': 3, 'state_name': 'CIKTI', 'is_active': True, 'is_terminal': True, 'rollover_state_id': 1},
+    {'id': 4, 'state_name': 'ESKI', 'is_active': False},
+    {'id': 5, 'state_name': 'HURDA', 'is_active': True, 'is_terminal': True},
+]
+TRANSITIONS = [{'from_state_id': 1, 'to_state_id': 2}, {'from_state_id': 2, 'to_state_id': 3}]
+
+def test_restricted_transitions():
+    machine = LifecycleStateMachine(STATES, TRANSITIONS)
+    assert machine.check(1, 2) is None
+    assert "izin verilmiyor" in machine.check(1, 3)
+    assert "zaten" in machine.check(2, 2)
+    assert "aktif değil" in machine.check(1, 4)
+    assert "Tanımsız" in machine.check(1, 99)
+    assert machine.check(None, 3) is None   # ilk atama her aktif duruma yapılabilir
+    assert machine.targets(2) == [3]
+
+def test_unrestricted_when_no_transition_table():
+    machine = LifecycleStateMachine(STATES)
+    assert machine.check(1, 3) is None and machine.check(3, 1) is None
+    assert machine.targets(1) == [2, 3, 5]
+
+def test_terminal_state_rolls_over_and_completes_cycle():
+    machine = LifecycleStateMachine(STATES)
+    assert machine.resolve(3) == (1, True)
+    assert machine.resolve(5) == (5, True)
+    assert machine.resolve(2) == (2, False)
+
+def test_check_many_returns_only_rejections():
+    machine = LifecycleStateMachine(STATES, TRANSITIONS)
+    assert set(machine.check_many({'A': 2, 'B': 1, 'C': None}, 3)) == {'B'}
+
+def test_state_rows_and_name_lookup():
+    machine = LifecycleStateMachine(STATES)
+    assert [r['id'] for r in machine.state_rows()] == [1, 2, 3, 5]
+    assert machine.by_name['SAHADA'] == 2 and machine.name(99) == 'UNKNOWN'
+
+def test_cache_reloads_after_invalidate():
+    cache, loads = LifecycleStateCache(), []
+    def loader():
+        loads.append(1)
+        return LifecycleStateMachine(STATES)
+    first = cache.get(loader)
+    assert cache.get(loader) is first and len(loads) == 1
+    cache.invalidate()
+    assert cache.get(loader) is not first and len(loads) == 2
+
+def test_cache_drops_snapshot_invalidated_while_loading():
+    cache = LifecycleStateCache()
+    def stale_loader():
+        cache.invalidate()   # yükleme sürerken bildirim geldi
+        return LifecycleStateMachine(STATES)
+    assert cache.get(stale_loader)
+    assert cache._machine is None
@@ -0,0 +1,70 @@
+# test_report_batch.py - Toplu raporlarda veri okumanın tekilleştirilmesi
+
+import threading
+
+from report_batch import BatchJob, expand_jobs, fetch_batch_data, nightly_pack, run_batch
+
+class CountingDb:
+    """Rapor sorgularını sayan sahte bağlantı"""
+
+    def __init__(self, calls=None, lock=None):
+        self.calls = [] if calls is None else calls
+        self.lock = lock or threading.Lock()
+        self.closed = False
+
+    def _record(self, *key):
+        with self.lock: self.calls.append(key)
+
+    def get_container_type_distribution_data(self, location_type=None, ship_id=None):
+        self._record('tip', location_type, ship_id)
+        return [{'tip': '20 DRY', 'count': 3}]
+
+    def get_destination_port_distribution(self):
+        self._record('liman')
+        return [{'varis_limani': 'HAMBURG', 'count': 2}]
+
+    def get_ship_occupancy_data(self, ship_id=None):
+        raise RuntimeError("bağlantı koptu")
+
+    def close_connection(self):
+        self.closed = True
+
+def test_data_key_ignores_filters_the_report_does_not_use():
+    a = BatchJob("Konteyner Tipi Dağılımı", {'filter1_text': 'SAHA', 'start_date': '2024-01-01'})
+    b = BatchJob("Konteyner Tipi Dağılımı", {'filter1_text': 'SAHA', 'start_date': '2025-01-01'}, ('csv',))
+    assert a.data_key() == b.data_key()
+    assert a.data_key() != BatchJob("Konteyner Tipi Dağılımı", {'filter1_text': 'GEMI'}).data_key()
+
+def test_each_data_key_is_fetched_once():
+    jobs = expand_jobs(["Konteyner Tipi Dağılımı", "Varış Limanlarına Göre Dağılım"],
+                       [{'filter1_text': 'SAHA'}, {'filter1_text': 'SAHA'}, {'filter1_text': 'GEMI'}])
+    db = CountingDb()
+    data = fetch_batch_data(jobs, db)
+    assert len(jobs) == 6 and len(data) == 3
+    assert sorted(db.calls) == [('liman',), ('tip', 'GEMI', None), ('tip', 'SAHA', None)]
+
+def test_pooled_fetch_dedupes_and_closes_connections():
+    jobs = expand_jobs(["Konteyner Tipi Dağılımı"], [{'filter1_text': t} for t in ('SAHA', 'GEMI', 'ATANMAMIS', 'SAHA')])
+    calls, lock, opened = [], threading.Lock(), []
+    def factory():
+        db = CountingDb(calls, lock)
+        opened.append(db)
+        return db
+    data = fetch_batch_data(jobs, db_factory=factory, connections=2)
+    assert len(data) == 3 and len(calls) == 3
+    assert 1 <= len(opened) <= 2 and all(db.closed for db in opened)
+
+def test_fetch_errors_are_reported_per_job(tmp_path):
+    jobs = [BatchJob("Gemi Bazında Doluluk Oranı", {}, ('csv',), "gemi"),
+            BatchJob("Varış Limanlarına Göre Dağılım", {}, ('csv',), "liman"),
+            BatchJob("Varış Limanlarına Göre Dağılım", {}, ('csv',), "liman_kopya")]
+    db = CountingDb()
+    result = run_batch(jobs, str(tmp_path), db=db, workers=1)
+    assert result.unique_fetches == 2 and db.calls == [('liman',)]
+    assert [stem for stem, _ in result.errors] == ['gemi']
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['liman.csv', 'liman_kopya.csv']
+
+def test_nightly_pack_has_unique_file_names():
+    jobs = nightly_pack()
+    stems = [job.file_stem(i) for i, job in enumerate(jobs, 1)]
+    assert len(stems) == len(set(stems))
@@ -0,0 +1,61 @@
+# test_ship_occupancy.py - ShipOccupancyGrid yerleştirme maskeleri ve artımlı güncelleme davranış testleri
+
+import numpy as np
+
+from ship_occupancy import ShipOccupancyGrid
+
+def _grid(bays=2, rows=2, tiers=3, filled=None):
+    ship = {'gemi_id': 'G1', 'toplam_bay_sayisi': bays, 'toplam_sira_sayisi': rows, 'toplam_kat_sayisi': tiers}
+    return ShipOccupancyGrid.from_ship(ship, filled)
+
+def test_from_ship_places_filled_slots():
+    grid = _grid(filled={'B01': {(0, 0): {'id': 'A', 'tip': '20 DRY', 'varis_limani': 'Hamburg'}}})
+    assert grid.shape == (2, 2, 3)
+    assert grid.container_at('B01', 0, 0) == 'A' and grid.container_slot['A'] == (0, 0, 0)
+    assert grid.port_names == ['Hamburg'] and grid.bay_fill_counts().tolist() == [1, 0]
+
+def test_place_rejects_out_of_bounds_slots():
+    grid = _grid()
+    assert not grid.place('X', '20 DRY', 'B09', 0, 0)
+    assert not grid.place('X', '20 DRY', 'B01', 2, 0)
+    assert not grid.place('X', '20 DRY', 'B01', 0, 3)
+    assert not grid.occupied.any()
+
+def test_lowest_free_tiers_follow_gravity():
+    grid = _grid(bays=1, rows=3, tiers=2)
+    grid.place('A', '20 DRY', 'B01', 0, 0)
+    grid.place('B', '20 DRY', 'B01', 1, 0); grid.place('C', '20 DRY', 'B01', 1, 1)
+    assert grid.lowest_free_tiers('B01').tolist() == [1, 2, 0]
+    assert grid.lowest_free_tiers().shape == (1, 3)
+
+def test_placeable_mask_requires_matching_support():
+    grid = _grid(bays=1, rows=3, tiers=3)
+    grid.place('A', '20 DRY', 'B01', 0, 0)
+    grid.place('R', '40 REEFER', 'B01', 1, 0)
+    assert grid.placeable_slots('20 DRY', 'B01') == [('B01', 0, 1), ('B01', 2, 0)]
+    assert grid.placeable_slots('40 REEFER', 'B01') == [('B01', 1, 1), ('B01', 2, 0)]
+    assert grid.placeable_slots('40 DRY') == [('B01', 2, 0)]
+    assert not grid.placeable_mask('20 DRY', 'B99').any()
+
+def test_remove_and_move_update_both_lookups():
+    grid = _grid()
+    grid.place('A', '20 DRY', 'B01', 0, 0, 'Hamburg')
+    assert grid.move('A', '20 DRY', 'B02', 1, 0, 'Hamburg')
+    assert grid.container_at('B01', 0, 0) is None and not grid.occupied[0, 0, 0]
+    assert grid.container_slot['A'] == (1, 1, 0) and grid.port_code[1, 1, 0] == 0
+    assert grid.remove('B02', 1, 0) == 'A'
+    assert 'A' not in grid.container_slot and not grid.occupied.any() and grid.size.sum() == 0
+
+def test_placing_over_a_slot_displaces_previous_container():
+    grid = _grid()
+    grid.place('A', '20 DRY', 'B01', 0, 0)
+    grid.place('B', '20 DRY', 'B01', 0, 0)
+    assert grid.container_at('B01', 0, 0) == 'B' and 'A' not in grid.container_slot
+
+def test_load_bay_replaces_only_that_bay():
+    grid = _grid()
+    grid.place('A', '20 DRY', 'B01', 0, 0); grid.place('B', '20 DRY', 'B02', 0, 0)
+    grid.load_bay('B01', {(1, 0): {'id': 'C', 'tip': '40 DRY'}})
+    assert 'A' not in grid.container_slot and grid.container_at('B01', 1, 0) == 'C'
+    assert grid.container_at('B02', 0, 0) == 'B'
+    assert np.array_equal(grid.bay_fill_counts(), [1, 1])
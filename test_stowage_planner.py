@@ -0,0 +1,57 @@
+# test_stowage_planner.py - StowagePlanner davranış testleri
+
+from overstow_analysis import analyze_overstows
+from ship_occupancy import ShipOccupancyGrid
+from stowage_planner import StowagePlanner, default_port_rotation, port_rank, stowage_plan_payload
+
+def _ship(bays, rows, tiers):
+    return {'gemi_id': 'G1', 'toplam_bay_sayisi': bays, 'toplam_sira_sayisi': rows, 'toplam_kat_sayisi': tiers}
+
+def _box(c_id, port, tip='20 DRY'):
+    return {'id': c_id, 'tip': tip, 'varis_limani': port}
+
+def test_later_ports_are_stowed_below_earlier_ports():
+    plan = StowagePlanner(_ship(1, 1, 3), port_rotation=['A', 'B', 'C']).plan([_box('X1', 'A'), _box('X2', 'B'), _box('X3', 'C')])
+    tiers = {p.container_id: p.tier for p in plan.placements}
+    assert tiers == {'X3': 0, 'X2': 1, 'X1': 2}
+    assert plan.overstows == 0 and not plan.unplaced
+
+def test_placements_respect_bounds_gravity_and_unique_slots():
+    boxes = [_box(f"C{i}", port) for i, port in enumerate(['A', 'B', 'C'] * 10)]
+    plan = StowagePlanner(_ship(2, 3, 4), port_rotation=['A', 'B', 'C']).plan(boxes)
+    slots = {(p.bay_id, p.row, p.tier) for p in plan.placements}
+    assert len(slots) == len(plan.placements) == 24
+    assert len(plan.unplaced) == 6
+    for bay_id, row, tier in slots:
+        assert bay_id in ('B01', 'B02') and 0 <= row < 3 and 0 <= tier < 4
+        assert tier == 0 or (bay_id, row, tier - 1) in slots
+
+def test_size_and_reefer_are_not_mixed_in_a_column():
+    filled = {'B01': {(0, 0): _box('OLD20', 'A'), (1, 0): _box('OLDRF', 'A', '40 REEFER')}}
+    plan = StowagePlanner(_ship(1, 3, 2), filled, ['A']).plan([_box('NEW40', 'A', '40 DRY')])
+    assert [(p.row, p.tier) for p in plan.placements] == [(2, 0)]
+
+def test_containers_already_on_board_are_not_planned_again():
+    filled = {'B01': {(0, 0): _box('ONBOARD', 'A')}}
+    plan = StowagePlanner(_ship(1, 1, 2), filled, ['A']).plan([_box('ONBOARD', 'A'), _box('NEW', 'A')])
+    assert [(p.container_id, p.tier) for p in plan.placements] == [('NEW', 1)]
+
+def test_exhausted_time_budget_returns_partial_plan():
+    plan = StowagePlanner(_ship(1, 1, 3)).plan([_box('X1', 'A')], time_budget=0)
+    assert plan.timed_out and plan.unplaced == ['X1'] and not plan.placements
+
+def test_default_rotation_and_job_payload():
+    assert default_port_rotation([_box('1', 'B'), _box('2', 'A'), {'id': '3'}]) == ['A', 'B']
+    plan = StowagePlanner(_ship(1, 1, 1), port_rotation=['A']).plan([_box('X1', 'A')])
+    assert stowage_plan_payload(plan) == {'ship_id': 'G1', 'placements': [('X1', 'B01', 0, 0)], 'relocations': []}
+
+def test_typed_rotation_matches_mixed_case_port_names():
+    rotation = ['HAMBURG', 'ISTANBUL', 'VALENCIA']   # operatörün yazdığı rota; veride "Hamburg", "İstanbul"
+    assert port_rank('Hamburg', rotation) == 0 and port_rank('İstanbul', rotation) == 1 and port_rank('Mersin', rotation) == 3
+    plan = StowagePlanner(_ship(1, 1, 3), port_rotation=rotation).plan([_box('X1', 'Hamburg'), _box('X2', 'İstanbul'), _box('X3', 'valencia')])
+    assert {p.container_id: p.tier for p in plan.placements} == {'X3': 0, 'X2': 1, 'X1': 2}
+
+def test_overstow_analysis_ignores_port_name_case():
+    grid = ShipOccupancyGrid.from_ship(_ship(1, 1, 2), {'B01': {(0, 0): _box('A', 'Hamburg'), (0, 1): _box('B', 'İstanbul')}})
+    assert analyze_overstows(grid, ['HAMBURG', 'ISTANBUL']).overstow_mask.sum() == 1
+    assert default_port_rotation([_box('1', 'Hamburg'), _box('2', 'HAMBURG'), _box('3', 'İzmir')]) == ['Hamburg', 'İzmir']
@@ -0,0 +1,227 @@
+# ui/berth_planning_tab.py - Rıhtım tahsis planı (Gantt görünümü)
+from datetime import datetime, timedelta
+from PyQt6.QtWidgets import (
+    QWidget, QHBoxLayout, QVBoxLayout, QSplitter, QLabel, QGraphicsView, QGraphicsScene,
+    QGraphicsSimpleTextItem, QPushButton, QMessageBox, QFormLayout, QComboBox,
+    QDateTimeEdit, QDoubleSpinBox, QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt6.QtGui import QFont, QBrush, QColor, QPen
+from PyQt6.QtCore import Qt, QDateTime
+
+import qtawesome as qta
+from berth_scheduler import BerthCall, BerthScheduler
+from ui.common.widgets import InteractiveRectItem
+
+class BerthPlanningTab(QWidget):
+    HOUR_WIDTH, ROW_HEIGHT, LABEL_WIDTH, AXIS_HEIGHT = 6, 44, 90, 30
+
+    def __init__(self, db_connection, main_window, parent=None):
+        super().__init__(parent)
+        self.db = db_connection; self.main_window = main_window
+        self.berths, self.calls_by_id = [], {}
+        self.scheduler, self.schedule = None, None
+        self.selected_call_id = None
+        self.init_ui()
+        self.refresh_all()
+
+    def init_ui(self):
+        main_layout = QHBoxLayout(self)
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+
+        left_panel = QWidget(); left_layout = QVBoxLayout(left_panel)
+        title_label = QLabel("Rıhtım Planı"); title_label.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+        left_layout.addWidget(title_label)
+
+        self.calls_table = QTableWidget(); self.calls_table.setColumnCount(6)
+        self.calls_table.setHorizontalHeaderLabels(["Gemi", "ETA", "Süre (saat)", "Rıhtım", "Yanaşma", "Bekleme (saat)"])
+        self.calls_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.calls_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.calls_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.calls_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.calls_table.itemSelectionChanged.connect(self.on_call_selected)
+        left_layout.addWidget(self.calls_table)
+
+        form_layout = QFormLayout()
+        self.ship_combo = QComboBox()
+        self.eta_edit = QDateTimeEdit(QDateTime.currentDateTime()); self.eta_edit.setCalendarPopup(True); self.eta_edit.setDisplayFormat("dd.MM.yyyy HH:mm")
+        self.duration_spin = QDoubleSpinBox(); self.duration_spin.setRange(1, 240); self.duration_spin.setValue(12); self.duration_spin.setSuffix(" saat")
+        form_layout.addRow("Gemi:", self.ship_combo); form_layout.addRow("ETA:", self.eta_edit); form_layout.addRow("Operasyon Süresi:", self.duration_spin)
+        left_layout.addLayout(form_layout)
+
+        button_layout = QHBoxLayout()
+        self.add_call_button = QPushButton(qta.icon('fa5s.plus-circle', color='lightgreen'), " Uğrama Ekle"); self.add_call_button.clicked.connect(self.add_call)
+        self.update_call_button = QPushButton(qta.icon('fa5s.clock', color='lightblue'), " ETA Güncelle"); self.update_call_button.clicked.connect(self.update_call)
+        self.delete_call_button = QPushButton(qta.icon('fa5s.trash-alt', color='red'), " Sil"); self.delete_call_button.clicked.connect(self.delete_call)
+        for btn in [self.add_call_button, self.update_call_button, self.delete_call_button]: button_layout.addWidget(btn)
+        left_layout.addLayout(button_layout)
+        self.optimize_button = QPushButton(qta.icon('fa5s.magic', color='orange'), " Planı Optimize Et"); self.optimize_button.clicked.connect(self.optimize_schedule)
+        left_layout.addWidget(self.optimize_button)
+        self.summary_label = QLabel(""); self.summary_label.setWordWrap(True)
+        left_layout.addWidget(self.summary_label)
+        self.update_call_button.setEnabled(False); self.delete_call_button.setEnabled(False)
+
+        self.scene = QGraphicsScene(); self.view = QGraphicsView(self.scene)
+        self.view.setRenderHint(self.view.renderHints().Antialiasing)
+        splitter.addWidget(left_panel); splitter.addWidget(self.view); splitter.setSizes([450, 900])
+        main_layout.addWidget(splitter)
+
+    def refresh_all(self):
+        """Rıhtımları, gemileri ve kayıtlı planı yükle (yeniden optimizasyon yapmaz)"""
+        self.berths = self.db.get_berths() if hasattr(self.db, 'get_berths') else []
+        ships = self.db.get_all_ships() or []
+        current_ship = self.ship_combo.currentData()
+        self.ship_combo.blockSignals(True); self.ship_combo.clear()
+        for ship in ships: self.ship_combo.addItem(f"{ship['gemi_id']} - {ship.get('gemi_adi', '')}", ship['gemi_id'])
+        if current_ship: self.ship_combo.setCurrentIndex(max(self.ship_combo.findData(current_ship), 0))
+        self.ship_combo.blockSignals(False)
+
+        records = self.db.get_berth_calls() if hasattr(self.db, 'get_berth_calls') else []
+        calls = [BerthCall(call_id=r['id'], ship_id=r['gemi_id'], eta=r['eta'], handling_hours=float(r['islem_suresi_saat']),
+                           ship_name=r.get('gemi_adi') or r['gemi_id']) for r in records]
+        self.calls_by_id = {c.call_id: c for c in calls}
+        self.scheduler = BerthScheduler([b['rihtim_id'] for b in self.berths], calls)
+        self.scheduler.load_assignments({r['id']: r['rihtim_id'] for r in records if r.get('rihtim_id')})
+        self.schedule = self.scheduler.current_schedule()
+        self.update_display()
+
+    def _save_and_show(self, schedule, message=""):
+        self.schedule = schedule
+        if not self.db.save_berth_schedule([(c.call_id, c.berth_id, c.start, c.end) for c in schedule.calls]):
+            QMessageBox.critical(self, "Hata", "Rıhtım planı kaydedilirken bir hata oluştu.")
+        self.update_display(message)
+
+    def optimize_schedule(self):
+        if not self.scheduler or not self.berths:
+            QMessageBox.warning(self, "Uyarı", "Planlanacak rıhtım bulunamadı."); return
+        self.scheduler = BerthScheduler([b['rihtim_id'] for b in self.berths], list(self.calls_by_id.values()))
+        schedule = self.scheduler.solve(time_budget=2.0)
+        self._save_and_show(schedule, f"Plan {schedule.elapsed:.2f} sn'de optimize edildi ({schedule.iterations} deneme).")
+
+    def _form_values(self):
+        return self.eta_edit.dateTime().toPyDateTime().replace(second=0, microsecond=0), self.duration_spin.value()
+
+    def add_call(self):
+        ship_id = self.ship_combo.currentData()
+        if not ship_id: QMessageBox.warning(self, "Eksik Bilgi", "Önce bir gemi seçin."); return
+        eta, duration = self._form_values()
+        call_id = self.db.add_berth_call(ship_id, eta, duration)
+        if not call_id: QMessageBox.critical(self, "Hata", "Uğrama eklenirken bir hata oluştu."); return
+        call = BerthCall(call_id=call_id, ship_id=ship_id, eta=eta, handling_hours=duration,
+                         ship_name=self.ship_combo.currentText().split(' - ', 1)[-1] or ship_id)
+        self.calls_by_id[call_id] = call
+        if self.berths:
+            schedule = self.scheduler.add_call(call)
+            self._save_and_show(schedule, f"Uğrama plana {schedule.elapsed * 1000:.0f} ms'de eklendi.")
+
+    def update_call(self):
+        if self.selected_call_id not in self.calls_by_id: return
+        eta, duration = self._form_values()
+        if not self.db.update_berth_call(self.selected_call_id, eta, duration):
+            QMessageBox.critical(self, "Hata", "Uğrama güncellenirken bir hata oluştu."); return
+        if self.berths:
+            # Artımlı yeniden optimizasyon: sadece ilgili gemi ve yeni ETA çevresi yeniden planlanır
+            schedule = self.scheduler.update_eta(self.selected_call_id, eta, handling_hours=duration)
+            self._save_and_show(schedule, f"ETA değişikliği {schedule.elapsed * 1000:.0f} ms'de plana işlendi.")
+        else:
+            call = self.calls_by_id[self.selected_call_id]; call.eta, call.handling_hours = eta, duration
+            self.update_display()
+
+    def delete_call(self):
+        if self.selected_call_id not in self.calls_by_id: return
+        reply = QMessageBox.question(self, "Onay", "Seçili uğramayı silmek istediğinizden emin misiniz?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes: return
+        if not self.db.delete_berth_call(self.selected_call_id):
+            QMessageBox.critical(self, "Hata", "Uğrama silinirken bir hata oluştu."); return
+        self.calls_by_id.pop(self.selected_call_id, None)
+        schedule = self.scheduler.remove_call(self.selected_call_id)
+        self.selected_call_id = None
+        self._save_and_show(schedule)
+
+    def on_call_selected(self):
+        selected_rows = self.calls_table.selectionModel().selectedRows()
+        if not selected_rows:
+            self.selected_call_id = None; self.update_call_button.setEnabled(False); self.delete_call_button.setEnabled(False); return
+        call = self.calls_by_id.get(self.calls_table.item(selected_rows[0].row(), 0).data(Qt.ItemDataRole.UserRole))
+        if not call: return
+        self.selected_call_id = call.call_id
+        self.ship_combo.setCurrentIndex(max(self.ship_combo.findData(call.ship_id), 0))
+        self.eta_edit.setDateTime(call.eta); self.duration_spin.setValue(call.handling_hours)
+        self.update_call_button.setEnabled(True); self.delete_call_button.setEnabled(True)
+        self.draw_gantt()
+
+    def handle_item_click(self, data):
+        if data and data.get('type') == 'berth_call':
+            for row in range(self.calls_table.rowCount()):
+                if self.calls_table.item(row, 0).data(Qt.ItemDataRole.UserRole) == data['id']:
+                    self.calls_table.selectRow(row); break
+
+    def update_display(self, message=""):
+        calls = sorted(self.calls_by_id.values(), key=lambda c: c.eta)
+        self.calls_table.blockSignals(True); self.calls_table.setRowCount(len(calls))
+        for row, call in enumerate(calls):
+            name_item = QTableWidgetItem(call.ship_name); name_item.setData(Qt.ItemDataRole.UserRole, call.call_id)
+            self.calls_table.setItem(row, 0, name_item)
+            self.calls_table.setItem(row, 1, QTableWidgetItem(call.eta.strftime("%d.%m.%Y %H:%M")))
+            self.calls_table.setItem(row, 2, QTableWidgetItem(f"{call.handling_hours:.1f}"))
+            self.calls_table.setItem(row, 3, QTableWidgetItem(call.berth_id or "-"))
+            self.calls_table.setItem(row, 4, QTableWidgetItem(call.start.strftime("%d.%m.%Y %H:%M") if call.start else "-"))
+            self.calls_table.setItem(row, 5, QTableWidgetItem(f"{call.waiting_hours:.1f}"))
+        self.calls_table.blockSignals(False)
+
+        summary = f"Rıhtım: {len(self.berths)} | Uğrama: {len(calls)}"
+        if self.schedule:
+            summary += f" | Toplam bekleme: {self.schedule.total_wait_hours:.1f} saat | En uzun bekleme: {self.schedule.max_wait_hours:.1f} saat"
+        self.summary_label.setText(summary + (f"\n{message}" if message else ""))
+        self.draw_gantt()
+
+    def _ship_color(self, ship_id):
+        return QColor.fromHsv(sum(map(ord, str(ship_id))) * 37 % 360, 140, 200)
+
+    def draw_gantt(self):
+        self.scene.clear()
+        planned = [c for c in self.calls_by_id.values() if c.start and c.berth_id]
+        if not self.berths or not planned:
+            self.scene.addText("Planlanmış uğrama yok. Uğrama ekleyip planı optimize edin.").setDefaultTextColor(Qt.GlobalColor.white)
+            return
+        origin = min(min(c.eta for c in planned), min(c.start for c in planned)).replace(hour=0, minute=0, second=0, microsecond=0)
+        horizon_end = max(c.end for c in planned)
+        x_of = lambda moment: self.LABEL_WIDTH + (moment - origin).total_seconds() / 3600 * self.HOUR_WIDTH
+        row_of = {b['rihtim_id']: i for i, b in enumerate(self.berths)}
+        total_height = self.AXIS_HEIGHT + len(self.berths) * self.ROW_HEIGHT
+
+        # Zaman ekseni (gün çizgileri)
+        grid_pen = QPen(QColor(80, 80, 80), 1, Qt.PenStyle.DotLine)
+        day = origin
+        while day <= horizon_end:
+            x = x_of(day)
+            self.scene.addLine(x, self.AXIS_HEIGHT - 5, x, total_height, grid_pen)
+            label = QGraphicsSimpleTextItem(day.strftime("%d.%m")); label.setBrush(QBrush(Qt.GlobalColor.lightGray)); label.setPos(x + 2, 5)
+            self.scene.addItem(label)
+            day += timedelta(days=1)
+        now_x = x_of(datetime.now())
+        if self.LABEL_WIDTH <= now_x <= x_of(horizon_end):
+            self.scene.addLine(now_x, self.AXIS_HEIGHT - 5, now_x, total_height, QPen(QColor("#e74c3c"), 2))
+
+        for berth in self.berths:
+            y = self.AXIS_HEIGHT + row_of[berth['rihtim_id']] * self.ROW_HEIGHT
+            label = QGraphicsSimpleTextItem(berth.get('rihtim_adi') or berth['rihtim_id']); label.setBrush(QBrush(Qt.GlobalColor.white)); label.setPos(5, y + 14)
+            self.scene.addItem(label)
+            self.scene.addLine(self.LABEL_WIDTH, y + self.ROW_HEIGHT, x_of(horizon_end), y + self.ROW_HEIGHT, QPen(QColor(60, 60, 60)))
+
+        for call in planned:
+            if call.berth_id not in row_of: continue
+            y = self.AXIS_HEIGHT + row_of[call.berth_id] * self.ROW_HEIGHT + 6
+            if call.waiting_hours > 0:
+                # Bekleme: ETA'dan yanaşmaya kadar kesikli çizgi
+                self.scene.addLine(x_of(call.eta), y + 16, x_of(call.start), y + 16, QPen(QColor("#e67e22"), 2, Qt.PenStyle.DashLine))
+            width = max(x_of(call.end) - x_of(call.start), 2)
+            rect = InteractiveRectItem(x_of(call.start), y, width, self.ROW_HEIGHT - 12)
+            rect.setBrush(QBrush(self._ship_color(call.ship_id)))
+            rect.setPen(QPen(Qt.GlobalColor.yellow, 3) if call.call_id == self.selected_call_id else QPen(Qt.GlobalColor.black, 1))
+            rect.setData(0, {'type': 'berth_call', 'id': call.call_id})
+            rect.setToolTip(f"{call.ship_name} ({call.ship_id})\nETA: {call.eta:%d.%m.%Y %H:%M}\nYanaşma: {call.start:%d.%m.%Y %H:%M}\n"
+                            f"Ayrılış: {call.end:%d.%m.%Y %H:%M}\nBekleme: {call.waiting_hours:.1f} saat")
+            rect.clicked.connect(self.handle_item_click); self.scene.addItem(rect)
+            if width > 40:
+                text = QGraphicsSimpleTextItem(call.ship_name); text.setFont(QFont("Arial", 8)); text.setBrush(QBrush(Qt.GlobalColor.black))
+                text.setPos(x_of(call.start) + 3, y + 10); self.scene.addItem(text)
@@ -0,0 +1,175 @@
+# ui/common/background_tasks.py
+"""
+Görünüm başına "en son istek geçerli" arka plan görevleri.
+Her görünüm (ör. 'dashboard') kendi bağlantısıyla çalışan uzun ömürlü bir thread'e sahiptir; bekleyen istek
+yenisiyle değiştirilir (birleştirme), süren sorgu connection.cancel() ile iptal edilir ve her sorgu
+statement_timeout ile sınırlanır. Thread asla terminate() edilmez: görev, checkpoint() çağrılarında ya da
+iptal edilen sorgudan dönen QueryCanceledError ile kendiliğinden biter, bağlantı rollback ile temiz bırakılır.
+Eski isteklerin sonuçları ve ilerleme mesajları GUI'ye ulaşmadan atılır.
+"""
+
+import threading
+import traceback
+
+import psycopg2
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from database import DatabaseConnection, OFFLINE_MODE
+
+DEFAULT_STATEMENT_TIMEOUT_MS = 30000
+
+
+class TaskCancelled(Exception):
+    """Görevin yerine daha yenisi geldi (ya da görünüm kapatılıyor)"""
+
+
+class TaskContext:
+    """Göreve verilen bağlantı ve iptal noktası"""
+
+    def __init__(self, worker, generation):
+        self.db = worker.db
+        self._worker = worker
+        self._generation = generation
+
+    def checkpoint(self, message=None):
+        """Yeni istek geldiyse TaskCancelled fırlatır; message verilirse ilerleme olarak bildirilir"""
+        if self._worker.is_superseded(): raise TaskCancelled()
+        if message: self._worker.progress.emit(self._generation, message)
+
+
+class _ViewWorker(QThread):
+    """Bir görünümün görevlerini sırayla çalıştıran thread (en son istek işlenir)"""
+
+    finished_task = pyqtSignal(int, object)   # nesil, sonuç
+    failed = pyqtSignal(int, str)
+    progress = pyqtSignal(int, str)
+
+    def __init__(self, shared_db, statement_timeout_ms):
+        super().__init__()
+        self.shared_db = shared_db   # offline modda arayüzün sahte veritabanı paylaşılır
+        self.statement_timeout_ms = statement_timeout_ms
+        self.condition = threading.Condition()
+        self.pending = None
+        self._running = False
+        self._stop = False
+        self.db = None
+
+    def request(self, generation, task):
+        with self.condition:
+            self.pending = (generation, task)
+            self._cancel_running()
+            self.condition.notify()
+
+    def cancel(self):
+        with self.condition:
+            self.pending = None
+            self._cancel_running()
+
+    def stop(self):
+        with self.condition:
+            self._stop = True
+            self.pending = None
+            self._cancel_running()
+            self.condition.notify()
+        self.wait(5000)
+
+    def is_superseded(self):
+        with self.condition:
+            return self.pending is not None or self._stop
+
+    def _cancel_running(self):
+        cancel = getattr(getattr(self.db, 'conn', None), 'cancel', None)
+        if self._running and cancel is not None:
+            try: cancel()
+            except psycopg2.Error: pass
+
+    def _connect(self):
+        if OFFLINE_MODE and self.shared_db is not None:
+            return self.shared_db
+        db = DatabaseConnection()
+        if db.conn and self.statement_timeout_ms:
+            db.execute_query("SET statement_timeout = %s", (int(self.statement_timeout_ms),))
+        return db
+
+    def run(self):
+        self.db = self._connect()
+        try:
+            while True:
+                with self.condition:
+                    while self.pending is None and not self._stop: self.condition.wait()
+                    if self._stop: break
+                    (generation, task), self.pending = self.pending, None
+                    self._running = True
+                try:
+                    self._process(generation, task)
+                finally:
+                    with self.condition: self._running = False
+        finally:
+            if self.db is not self.shared_db: self.db.close_connection()
+
+    def _process(self, generation, task):
+        try:
+            result = task(TaskContext(self, generation))
+            if not self.is_superseded(): self.finished_task.emit(generation, result)
+        except TaskCancelled:
+            pass   # yerine daha yeni bir istek geldi
+        except psycopg2.extensions.QueryCanceledError:
+            # Yeni istek yoksa iptal statement_timeout'tan gelmiştir
+            if not self.is_superseded(): self.failed.emit(generation, f"Sorgu zaman aşımına uğradı ({self.statement_timeout_ms / 1000:g} sn)")
+        except Exception as e:
+            traceback.print_exc()
+            if not self.is_superseded(): self.failed.emit(generation, str(e))
+        finally:
+            # Okuma işlemleri de transaction açar; bağlantı bir sonraki görev için boşta bırakılır
+            rollback = getattr(getattr(self.db, 'conn', None), 'rollback', None)
+            if rollback is not None and self.db is not self.shared_db:
+                try: rollback()
+                except psycopg2.Error: pass
+
+
+class BackgroundTaskRunner(QObject):
+    """
+    submit(görünüm, görev) ile görev başlatılır; görev(ctx) ctx.db üzerinde çalışır ve sonucu döndürür.
+    Aynı görünüme yeni görev gelince öncekinin sonucu hiçbir zaman yayınlanmaz.
+    """
+
+    task_finished = pyqtSignal(str, object)   # görünüm, sonuç
+    task_failed = pyqtSignal(str, str)
+    task_progress = pyqtSignal(str, str)
+
+    def __init__(self, db_connection=None, statement_timeout_ms=DEFAULT_STATEMENT_TIMEOUT_MS, parent=None):
+        super().__init__(parent)
+        self.db = db_connection
+        self.statement_timeout_ms = statement_timeout_ms
+        self.workers = {}
+        self.generations = {}
+
+    def submit(self, view, task):
+        generation = self.generations.get(view, 0) + 1
+        self.generations[view] = generation
+        self._worker(view).request(generation, task)
+        return generation
+
+    def cancel(self, view):
+        self.generations[view] = self.generations.get(view, 0) + 1
+        if view in self.workers: self.workers[view].cancel()
+
+    def shutdown(self):
+        for worker in self.workers.values():
+            worker.stop()
+        self.workers.clear()
+
+    def _worker(self, view):
+        worker = self.workers.get(view)
+        if worker is None:
+            worker = _ViewWorker(self.db, self.statement_timeout_ms)
+            worker.finished_task.connect(lambda generation, result: self._deliver(view, generation, self.task_finished, result))
+            worker.failed.connect(lambda generation, error: self._deliver(view, generation, self.task_failed, error))
+            worker.progress.connect(lambda generation, message: self._deliver(view, generation, self.task_progress, message))
+            worker.start()
+            self.workers[view] = worker
+        return worker
+
+    def _deliver(self, view, generation, signal, value):
+        if generation == self.generations.get(view):   # eski isteklerden gelenler atılır
+            signal.emit(view, value)
@@ -0,0 +1,238 @@
+# ui/common/container_models.py
+"""
+Konteyner listeleri için sanal tablo modelleri.
+Satırlar veritabanından id sırasıyla parça parça (canFetchMore/fetchMore) yüklenir; hücreler sadece
+görünür oldukça çizilir. Yenilemede mevcut satırlarla fark alınır, sadece değişen satırlar bildirilir.
+Metin araması sunucu tarafında yapılır (ui/common/container_search.py).
+"""
+
+from typing import Callable, NamedTuple, Optional
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PyQt6.QtGui import QColor
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class ContainerColumn(NamedTuple):
+    title: str
+    value: Callable                        # satır sözlüğü -> gösterilecek metin
+    sort_key: Optional[Callable] = None    # verilmezse gösterilen metne göre sıralanır
+    background: Optional[Callable] = None  # satır sözlüğü -> renk kodu
+    alignment: Optional[Qt.AlignmentFlag] = None
+
+
+def container_location(c):
+    durum = c.get('durum')
+    if durum == 'SAHA': return c.get('saha_konum') or 'Konum Hatası!'
+    if durum == 'GEMI': return c.get('gemi_konum') or f"GEMI: {c.get('gemi_id', '?')}"
+    if durum == 'ATANMAMIS': return 'Atanmamış'
+    return ""
+
+
+MANAGEMENT_COLUMNS = [
+    ContainerColumn("ID", lambda c: c.get('id') or ''),
+    ContainerColumn("Tip", lambda c: c.get('tip') or ''),
+    ContainerColumn("Durum", lambda c: c.get('durum') or 'Bilinmiyor'),
+    ContainerColumn("Konum", container_location),
+    ContainerColumn("Çıkış Limanı", lambda c: c.get('cikis_limani') or ''),
+    ContainerColumn("Varış Limanı", lambda c: c.get('varis_limani') or ''),
+]
+
+LIFECYCLE_COLUMNS = [
+    ContainerColumn("ID", lambda c: str(c.get('id'))),
+    ContainerColumn("Tip", lambda c: str(c.get('tip'))),
+    ContainerColumn("Durum", lambda c: str(c.get('durum'))),
+    ContainerColumn("Lifecycle", lambda c: c.get('lifecycle_state_name') or 'N/A', background=lambda c: c.get('lifecycle_color')),
+    ContainerColumn("Cycle Count", lambda c: str(c.get('lifecycle_cycle_count') or 0),
+                    sort_key=lambda c: c.get('lifecycle_cycle_count') or 0, alignment=Qt.AlignmentFlag.AlignCenter),
+]
+
+
+class ContainerTableModel(QAbstractTableModel):
+    """
+    fetch_chunk(after_id, limit) ile id sırasına göre doldurulan salt okunur konteyner modeli.
+    Sıralama burada (anahtar fonksiyonu ile tek seferde) yapılır, proxy sadece süzer.
+    """
+
+    def __init__(self, fetch_chunk, columns, chunk_size=DEFAULT_CHUNK_SIZE, parent=None):
+        super().__init__(parent)
+        self.fetch_chunk = fetch_chunk
+        self.columns = columns
+        self.chunk_size = chunk_size
+        self._rows = []
+        self._row_of = None
+        self._last_id = None      # veritabanı sırasına göre son yüklenen id (keyset için)
+        self._sort = None         # (sütun, sıra) ya da None (id sırası)
+        self._exhausted = False
+        self._colors = {}
+
+    # --- Qt arayüzü ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.columns[section].title
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        row, column = self._rows[index.row()], self.columns[index.column()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return column.value(row)
+        if role == Qt.ItemDataRole.BackgroundRole and column.background:
+            return self._color(column.background(row))
+        if role == Qt.ItemDataRole.TextAlignmentRole and column.alignment is not None:
+            return column.alignment
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted: return
+        chunk = list(self.fetch_chunk(self._last_id, self.chunk_size) or [])
+        self._exhausted = len(chunk) < self.chunk_size
+        if not chunk: return
+        self._last_id = chunk[-1]['id']
+        self._append(chunk)
+
+    def _append(self, chunk):
+        if self._sort is None:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(chunk) - 1)
+            self._rows.extend(chunk)
+            self._row_of = None
+            self.endInsertRows()
+        else:
+            # Sıralı görünümde yeni parça yerine oturtulur
+            self.apply_rows(self._rows + chunk)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Yüklü satırları sırala; seçili satırlar (kalıcı indeksler) yerinde kalır"""
+        self._sort = (column, order) if column >= 0 else None
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        ids = [self._rows[index.row()]['id'] for index in persistent]
+        self._rows.sort(key=self._order_key, reverse=self._descending())
+        self._row_of = None
+        self.changePersistentIndexList(persistent, [self.index(self.row_of(cid), index.column()) for cid, index in zip(ids, persistent)])
+        self.layoutChanged.emit()
+
+    # --- Yardımcılar ---
+    def loaded_count(self):
+        return len(self._rows)
+
+    def is_exhausted(self):
+        return self._exhausted
+
+    def row_data(self, row):
+        return self._rows[row]
+
+    def row_of(self, container_id):
+        """Yüklü satırlar arasında id'nin satır numarası (yoksa None)"""
+        if self._row_of is None:
+            self._row_of = {c['id']: i for i, c in enumerate(self._rows)}
+        return self._row_of.get(container_id)
+
+    def _natural_key(self, c):
+        """Sıralama seçilmemişken satır sırası (veritabanı sırası)"""
+        return c['id']
+
+    def _order_key(self, c):
+        if self._sort is None: return self._natural_key(c)
+        column = self.columns[self._sort[0]]
+        return ((column.sort_key or column.value)(c), c['id'])
+
+    def _descending(self):
+        return self._sort is not None and self._sort[1] == Qt.SortOrder.DescendingOrder
+
+    def _color(self, code):
+        if not code: return None
+        if code not in self._colors:
+            color = QColor(code)
+            self._colors[code] = color if color.isValid() else None
+        return self._colors[code]
+
+    def refresh(self):
+        """Şu ana kadar yüklenen aralığı yeniden oku ve farkları uygula"""
+        limit = max(len(self._rows), self.chunk_size)
+        self.apply_rows(list(self.fetch_chunk(None, limit) or []), requested=limit)
+
+    def apply_rows(self, new_rows, requested=None):
+        """
+        Veritabanı sırasıyla gelen yeni satır listesini mevcut listeyle karşılaştırır: silinen bloklar
+        için removeRows, eklenenler için insertRows, değişen satırlar için dataChanged yayınlanır.
+        Böylece seçim ve kaydırma konumu korunur, proxy sadece etkilenen satırları yeniden süzer.
+        """
+        if requested is not None:
+            self._exhausted = len(new_rows) < requested
+            self._last_id = new_rows[-1]['id'] if new_rows else None
+        new_rows = sorted(new_rows, key=self._order_key, reverse=self._descending())
+        rows = self._rows
+        new_order = {c['id']: self._order_key(c) for c in new_rows}
+
+        # Silinenler ve sıralamadaki yeri değişenler (sondan başa, ardışık bloklar halinde)
+        def gone(c):
+            key = new_order.get(c['id'])
+            return key is None or key != self._order_key(c)
+        i = len(rows)
+        while i > 0:
+            if not gone(rows[i - 1]):
+                i -= 1; continue
+            end = i
+            while i > 0 and gone(rows[i - 1]): i -= 1
+            self.beginRemoveRows(QModelIndex(), i, end - 1)
+            del rows[i:end]
+            self.endRemoveRows()
+
+        # Eklenenler ve değişenler (kalan satırlar yeni listenin alt dizisidir)
+        i = j = 0
+        changed_first = changed_last = None
+        while j < len(new_rows):
+            if i < len(rows) and rows[i]['id'] == new_rows[j]['id']:
+                if rows[i] != new_rows[j]:
+                    rows[i] = new_rows[j]
+                    if changed_first is None: changed_first = i
+                    changed_last = i
+                i += 1; j += 1
+                continue
+            k = j
+            while k < len(new_rows) and (i >= len(rows) or new_rows[k]['id'] != rows[i]['id']): k += 1
+            self.beginInsertRows(QModelIndex(), i, i + k - j - 1)
+            rows[i:i] = new_rows[j:k]
+            self.endInsertRows()
+            i += k - j; j = k
+        self._row_of = None
+        if changed_first is not None:
+            self.dataChanged.emit(self.index(changed_first, 0), self.index(changed_last, len(self.columns) - 1))
+
+
+class ContainerFilterProxy(QSortFilterProxyModel):
+    """İsteğe bağlı durum süzgeci; sıralama kaynak modelde yapılır"""
+
+    def __init__(self, status_column=None, parent=None):
+        super().__init__(parent)
+        self.status_column = status_column
+        self._status = None
+
+    def set_status(self, status):
+        status = status or None
+        if status != self._status:
+            self._status = status
+            self.invalidateFilter()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._status is None or self.status_column is None: return True
+        model = self.sourceModel()
+        return model.columns[self.status_column].value(model.row_data(source_row)) == self._status
+
+    def row_data(self, proxy_row):
+        return self.sourceModel().row_data(self.mapToSource(self.index(proxy_row, 0)).row())
@@ -0,0 +1,235 @@
+# ui/common/container_search.py
+"""
+Sunucu tarafı konteyner araması: yazarken gecikmeli (debounce) istek, arka planda kendi bağlantısıyla
+çalışan thread ve sıralı/sayfalı sonuçları gösteren sanal model. Sadece en son arama geçerlidir; yeni
+istek gelince süren sorgu connection.cancel() ile iptal edilir ve eski sonuçlar atılır.
+"""
+
+import threading
+import time
+import traceback
+
+import psycopg2
+from PyQt6.QtCore import Qt, QObject, QThread, QTimer, QModelIndex, QStringListModel, pyqtSignal
+from PyQt6.QtWidgets import QCompleter
+
+from database import DatabaseConnection, OFFLINE_MODE
+from ui.common.container_models import ContainerTableModel
+
+SEARCH_DEBOUNCE_MS = 250
+SEARCH_PAGE_SIZE = 100
+COMPLETION_LIMIT = 20
+
+
+class ContainerSearchWorker(QThread):
+    """search_containers sorgularını sırayla çalıştıran uzun ömürlü thread (en son istek işlenir)"""
+
+    results_ready = pyqtSignal(int, object, int, object, float)   # nesil, önceki sayfanın son anahtarı, limit, satırlar, süre (ms)
+    search_failed = pyqtSignal(int, str)
+
+    def __init__(self, shared_db=None):
+        super().__init__()
+        self.shared_db = shared_db   # offline modda arayüzün sahte veritabanı paylaşılır
+        self.condition = threading.Condition()
+        self.pending = None
+        self._searching = False
+        self._stop = False
+        self.db = None
+
+    def request(self, generation, text, status, after, limit):
+        with self.condition:
+            self.pending = (generation, text, status, after, limit)
+            self._cancel_running()
+            self.condition.notify()
+
+    def cancel(self):
+        with self.condition:
+            self.pending = None
+            self._cancel_running()
+
+    def stop(self):
+        with self.condition:
+            self._stop = True
+            self._cancel_running()
+            self.condition.notify()
+        self.wait(5000)
+
+    def _cancel_running(self):
+        cancel = getattr(getattr(self.db, 'conn', None), 'cancel', None)
+        if self._searching and cancel is not None:
+            try: cancel()
+            except psycopg2.Error: pass
+
+    def run(self):
+        self.db = self.shared_db if OFFLINE_MODE and self.shared_db is not None else DatabaseConnection()
+        try:
+            while True:
+                with self.condition:
+                    while self.pending is None and not self._stop: self.condition.wait()
+                    if self._stop: break
+                    request, self.pending = self.pending, None
+                    self._searching = True
+                try:
+                    self._process(*request)
+                finally:
+                    with self.condition: self._searching = False
+        finally:
+            if self.db is not self.shared_db: self.db.close_connection()
+
+    def _process(self, generation, text, status, after, limit):
+        try:
+            started = time.perf_counter()
+            rows = self.db.search_containers(text, limit=limit, after=after, status=status)
+            if rows is False: rows = []
+            self.results_ready.emit(generation, after, limit, list(rows), (time.perf_counter() - started) * 1000)
+        except psycopg2.extensions.QueryCanceledError:
+            pass   # yerine daha yeni bir arama geldi
+        except Exception as e:
+            traceback.print_exc()
+            self.search_failed.emit(generation, str(e))
+
+
+class ContainerSearchModel(ContainerTableModel):
+    """Arama sonuçları; sıra sunucudaki sıralamadır, sonraki sayfalar kaydırdıkça arka planda istenir"""
+
+    page_requested = pyqtSignal(object, int)   # önceki sayfanın son anahtarı (None: ilk sayfa), limit
+
+    def __init__(self, columns, chunk_size=SEARCH_PAGE_SIZE, parent=None):
+        super().__init__(None, columns, chunk_size=chunk_size, parent=parent)
+        self._rank = {}
+        self._cursor = None       # sunucudan okunan son satırın (arama_grubu, arama_skoru, id) değeri
+        self._loading = False
+        self._exhausted = True
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return super().canFetchMore(parent) and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent): return
+        self._loading = True
+        self.page_requested.emit(self._cursor, self.chunk_size)
+
+    def refresh(self):
+        self.page_requested.emit(None, max(len(self._rows), self.chunk_size))
+
+    def set_results(self, rows, requested):
+        """İlk sayfa (ya da yenileme): sunucu sırasıyla mevcut sonuçlarla fark alınarak uygulanır"""
+        self._rank = {c['id']: i for i, c in enumerate(rows)}
+        self._cursor = self._key_of(rows[-1]) if rows else None
+        self._loading = False
+        self.apply_rows(rows, requested=requested)
+
+    def append_results(self, rows, requested):
+        self._loading = False
+        self._exhausted = len(rows) < requested
+        if rows: self._cursor = self._key_of(rows[-1])
+        rows = [c for c in rows if c['id'] not in self._rank]   # sayfalar arasında kayan satırlar tekrar gelmesin
+        for c in rows: self._rank[c['id']] = len(self._rank)
+        if rows: self._append(rows)
+
+    def loading_failed(self):
+        self._loading = False
+
+    @staticmethod
+    def _key_of(c):
+        return (c.get('arama_grubu', 0), c.get('arama_skoru') or 0.0, c['id'])
+
+    def _natural_key(self, c):
+        return self._rank.get(c['id'], len(self._rank))
+
+
+class ContainerSearch(QObject):
+    """
+    Arama kutusu ile sunucu araması arasındaki bağlantı. set_query() her tuş vuruşunda çağrılabilir;
+    istek ancak yazma durunca gönderilir. Arama boşalınca active_changed(False) ile tarama listesine dönülür.
+    """
+
+    active_changed = pyqtSignal(bool)
+    results_ready = pyqtSignal(str, int, float)   # arama metni, yüklü sonuç sayısı, süre (ms)
+    search_failed = pyqtSignal(str)
+
+    def __init__(self, db_connection, columns, debounce_ms=SEARCH_DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.db = db_connection
+        self.model = ContainerSearchModel(columns, parent=self)
+        self.model.page_requested.connect(self._request_page)
+        self.worker = None
+        self.generation = 0
+        self.text = ""
+        self.status = None
+        self.active = False
+        self.timer = QTimer(self); self.timer.setSingleShot(True); self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self._submit)
+
+    def set_query(self, text, status=None, immediate=False):
+        text = (text or "").strip()
+        if (text, status) == (self.text, self.status) and not immediate: return
+        self.text, self.status = text, status
+        if immediate: self.timer.stop(); self._submit()
+        else: self.timer.start()
+
+    def refresh(self):
+        """Veri değiştiğinde açık aramayı aynı aralıkla tekrarla"""
+        if self.active: self.model.refresh()
+
+    def shutdown(self):
+        self.timer.stop()
+        if self.worker is not None:
+            self.worker.stop()
+
+    def _submit(self):
+        self.generation += 1
+        if not self.text:
+            if self.worker is not None: self.worker.cancel()
+            if self.active:
+                self.active = False
+                self.active_changed.emit(False)
+            return
+        self._request_page(None, self.model.chunk_size)
+
+    def _request_page(self, after, limit):
+        if not self.text: return
+        if self.worker is None:
+            self.worker = ContainerSearchWorker(self.db)
+            self.worker.results_ready.connect(self._on_results)
+            self.worker.search_failed.connect(self._on_failed)
+            self.worker.start()
+        self.worker.request(self.generation, self.text, self.status, after, limit)
+
+    def _on_results(self, generation, after, limit, rows, elapsed_ms):
+        if generation != self.generation: return   # eski aramanın sonucu
+        if after is None:
+            self.model.set_results(rows, limit)
+            if not self.active:
+                self.active = True
+                self.active_changed.emit(True)
+        else:
+            self.model.append_results(rows, limit)
+        self.results_ready.emit(self.text, self.model.loaded_count(), elapsed_ms)
+
+    def _on_failed(self, generation, error):
+        if generation != self.generation: return
+        self.model.loading_failed()
+        self.search_failed.emit(error)
+
+
+class ContainerIdCompleter(QCompleter):
+    """Yazılan öneke göre konteyner ID önerileri (bellekteki ID indeksinden, her tuşta yeniden doldurulur)"""
+
+    def __init__(self, db_connection, line_edit, limit=COMPLETION_LIMIT):
+        super().__init__(line_edit)
+        self.db = db_connection
+        self.limit = limit
+        self.ids = QStringListModel(self)
+        self.setModel(self.ids)
+        self.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
+        line_edit.setCompleter(self)
+        line_edit.textEdited.connect(self._update)
+
+    def _update(self, text):
+        ids = self.db.complete_container_ids(text, self.limit) if len(text.strip()) >= 2 else []
+        self.ids.setStringList(ids)
+        if ids:
+            self.setCompletionPrefix(text.strip())
+            self.complete()
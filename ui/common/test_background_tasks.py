@@ -0,0 +1,87 @@
+# ui/common/test_background_tasks.py - BackgroundTaskRunner "en son istek geçerli" davranış testleri
+
+import threading
+import time
+
+import pytest
+from PyQt6.QtCore import QCoreApplication
+
+import ui.common.background_tasks as background_tasks
+from ui.common.background_tasks import BackgroundTaskRunner, TaskCancelled
+
+@pytest.fixture
+def runner(qt_app, monkeypatch):
+    # Offline modda worker arayüzün (sahte) bağlantısını paylaşır; veritabanı gerekmez
+    monkeypatch.setattr(background_tasks, 'OFFLINE_MODE', True)
+    runner = BackgroundTaskRunner(db_connection=object())
+    events = []
+    runner.task_finished.connect(lambda view, result: events.append(('finished', view, result)))
+    runner.task_failed.connect(lambda view, error: events.append(('failed', view, error)))
+    runner.task_progress.connect(lambda view, message: events.append(('progress', view, message)))
+    runner.events = events
+    yield runner
+    runner.shutdown()
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "zaman aşımı"
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+
+def _blocking_task(started, release, outcome):
+    def task(ctx):
+        started.set()
+        release.wait(5)
+        try:
+            ctx.checkpoint("eski ilerleme")
+        except TaskCancelled:
+            outcome.append('cancelled'); raise
+        outcome.append('completed')
+        return 'eski'
+    return task
+
+def test_result_is_delivered(runner):
+    runner.submit('panel', lambda ctx: ctx.db is runner.db and 'tamam')
+    _wait_for(lambda: runner.events)
+    assert runner.events == [('finished', 'panel', 'tamam')]
+
+def test_newer_request_supersedes_running_task(runner):
+    started, release, outcome = threading.Event(), threading.Event(), []
+    runner.submit('panel', _blocking_task(started, release, outcome))
+    assert started.wait(5)
+    runner.submit('panel', lambda ctx: 'yeni')
+    release.set()
+    _wait_for(lambda: any(e[0] == 'finished' for e in runner.events))
+    QCoreApplication.processEvents()
+    assert outcome == ['cancelled']
+    assert runner.events == [('finished', 'panel', 'yeni')]
+
+def test_cancel_drops_pending_and_running_results(runner):
+    started, release, outcome = threading.Event(), threading.Event(), []
+    runner.submit('panel', _blocking_task(started, release, outcome))
+    assert started.wait(5)
+    runner.cancel('panel')
+    release.set()
+    _wait_for(lambda: outcome)
+    time.sleep(0.05); QCoreApplication.processEvents()
+    assert runner.events == []
+
+def test_failures_and_progress_are_reported(runner):
+    def failing(ctx):
+        ctx.checkpoint("adım 1")
+        raise ValueError("bozuk veri")
+    runner.submit('panel', failing)
+    _wait_for(lambda: any(e[0] == 'failed' for e in runner.events))
+    assert runner.events == [('progress', 'panel', "adım 1"), ('failed', 'panel', "bozuk veri")]
+
+def test_views_run_independently(runner):
+    started, release, outcome = threading.Event(), threading.Event(), []
+    runner.submit('yavas', _blocking_task(started, release, outcome))
+    assert started.wait(5)
+    runner.submit('hizli', lambda ctx: 'hızlı')
+    _wait_for(lambda: runner.events)
+    assert runner.events == [('finished', 'hizli', 'hızlı')]
+    release.set()
+    _wait_for(lambda: len(runner.events) == 3)
+    assert runner.events[1:] == [('progress', 'yavas', "eski ilerleme"), ('finished', 'yavas', 'eski')]
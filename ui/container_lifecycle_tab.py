@@ -10,93 +10,58 @@ from PyQt6.QtGui import *
 import sys
 from datetime import datetime, timedelta
 
+from ui.lifecycle_dwell_panel import LifecycleDwellPanel
+from ui.lifecycle_timeline import LifecycleTimeline
+from ui.common.container_models import ContainerTableModel, ContainerFilterProxy, LIFECYCLE_COLUMNS
+from ui.common.container_search import ContainerSearch, ContainerIdCompleter
+from ui.common.background_tasks import BackgroundTaskRunner
 
-class DataLoadingWorker(QThread):
-    """Arka planda veri yükleme worker'ı"""
-    data_loaded = pyqtSignal(dict)  # Yüklenen veriyi gönder
-    error_occurred = pyqtSignal(str)  # Hata mesajını gönder
-    progress_update = pyqtSignal(str)  # İlerleme mesajını gönder
+
+DASHBOARD_VIEW = 'dashboard'
+
+class DataLoadingTask:
+    """
+    Panel verisini arka planda yükleyen görev (BackgroundTaskRunner'da kendi bağlantısıyla çalışır).
+    Adımlar arasındaki checkpoint'lerde yerine yeni istek geldiyse kendiliğinden bırakır.
+    """
     
-    def __init__(self, db_connection, page=1, page_size=100):
-        super().__init__()
-        self.db_connection = db_connection
-        self.page = page
-        self.page_size = page_size
+    def __init__(self, page_size=100):
+        self.page_size = page_size  # listede şu an yüklü olan satır sayısı kadar (en az bir parça) yeniden okunur
+        self.db_connection = None
         
-    def run(self):
+    def __call__(self, ctx):
         """Arka planda veri yükleme"""
-        try:
-            data = {}
-            
-            self.progress_update.emit("🔄 Konteyner sayısı hesaplanıyor...")
-            data['total_containers'] = self.db_connection.get_containers_count()
-            
-            self.progress_update.emit(f"🔄 Konteyner listesi yükleniyor (Sayfa {self.page})...")
-            offset = (self.page - 1) * self.page_size
-            data['containers'] = self.db_connection.get_all_containers_detailed(
-                limit=self.page_size, offset=offset
-            )
-            
-            self.progress_update.emit("🔄 Lifecycle durumları yükleniyor...")
-            data['lifecycle_states'] = self.db_connection.get_lifecycle_states()
-            
-            self.progress_update.emit("🔄 İstatistikler hesaplanıyor...")
-            data['statistics'] = self.load_statistics_data()
-            
-            self.progress_update.emit("🔄 Son aktiviteler yükleniyor...")
-            data['recent_activities'] = self.load_recent_activities_data()
-            
-            self.progress_update.emit("🔄 Durum dağılımı hesaplanıyor...")
-            data['state_distribution'] = self.load_state_distribution_data()
-            
-            self.progress_update.emit("✅ Veri yükleme tamamlandı!")
-            self.data_loaded.emit(data)
-            
-        except Exception as e:
-            self.error_occurred.emit(str(e))
-    
-    def load_statistics_data(self):
-        """İstatistik verilerini yükle"""
-        try:
-            stats = {}
-            
-            # Toplam konteyner sayısı
-            containers = self.db_connection.get_all_containers_detailed()
-            stats['total_containers'] = len(containers) if containers else 0
-            
-            # Aktif lifecycle sayısı
-            lifecycle_states = self.db_connection.get_lifecycle_states()
-            stats['active_lifecycles'] = len(lifecycle_states) if lifecycle_states else 0
-            
-            # Toplam cycle count
-            try:
-                total_cycles_result = self.db_connection.execute_query(
-                    "SELECT SUM(lifecycle_cycle_count) as total_cycles FROM public.konteynerler", 
-                    fetchone=True
-                )
-                stats['total_cycles'] = total_cycles_result['total_cycles'] if total_cycles_result and total_cycles_result['total_cycles'] else 0
-            except:
-                stats['total_cycles'] = 0
-            
-            # En çok kullanılan durum
-            try:
-                most_used_result = self.db_connection.execute_query("""
-                    SELECT cls.state_name, COUNT(*) as count
-                    FROM public.konteynerler k
-                    LEFT JOIN container_lifecycle_states cls ON k.current_lifecycle_state = cls.id
-                    GROUP BY cls.state_name
-                    ORDER BY count DESC 
-                    LIMIT 1
-                """, fetchone=True)
-                
-                stats['most_used_state'] = most_used_result['state_name'] if most_used_result else 'SAHA'
-            except:
-                stats['most_used_state'] = 'SAHA'
-            
-            return stats
-        except Exception as e:
-            print(f"İstatistik yükleme hatası: {e}")
-            return {}
+        self.db_connection = ctx.db
+        data = {}
+        
+        ctx.checkpoint("🔄 İstatistikler hesaplanıyor...")
+        dashboard = self.db_connection.get_lifecycle_dashboard_stats() or {}
+        data['total_containers'] = dashboard.get('total_containers', 0)
+        data['statistics'] = self.load_statistics_data(dashboard)
+        data['state_distribution'] = self.load_state_distribution_data(dashboard)
+        
+        ctx.checkpoint("🔄 Konteyner listesi yükleniyor...")
+        data['containers'] = self.db_connection.get_containers_after(None, self.page_size)
+        data['containers_requested'] = self.page_size
+        
+        ctx.checkpoint("🔄 Lifecycle durumları yükleniyor...")
+        data['state_machine'] = self.db_connection.get_lifecycle_state_machine()   # süreç önbelleğinden
+        
+        ctx.checkpoint("🔄 Son aktiviteler yükleniyor...")
+        data['recent_activities'] = self.load_recent_activities_data()
+        
+        ctx.checkpoint("✅ Veri yükleme tamamlandı!")
+        return data
+    
+    @staticmethod
+    def load_statistics_data(dashboard):
+        """Panel istatistiklerini tek sorguluk özetten çıkar"""
+        return {
+            'total_containers': dashboard.get('total_containers', 0),
+            'active_lifecycles': dashboard.get('active_lifecycles', 0),
+            'total_cycles': dashboard.get('total_cycles', 0),
+            'most_used_state': dashboard.get('most_used_state') or 'SAHA',
+        }
     
     def load_recent_activities_data(self):
         """Son aktiviteleri yükle"""
@@ -138,45 +103,24 @@ class DataLoadingWorker(QThread):
             print(f"Son aktiviteler yükleme hatası: {e}")
             return []
     
-    def load_state_distribution_data(self):
-        """Durum dağılımını yükle"""
-        try:
-            # Gerçek durum dağılımını çek - doğru kolon adı: current_lifecycle_state
-            distribution = self.db_connection.execute_query("""
-                SELECT k.current_lifecycle_state, 
-                       cls.state_name,
-                       COUNT(*) as count
-                FROM public.konteynerler k
-                LEFT JOIN container_lifecycle_states cls ON k.current_lifecycle_state = cls.id
-                GROUP BY k.current_lifecycle_state, cls.state_name
-                ORDER BY count DESC
-                LIMIT 5
-            """, fetchall=True)
-            
-            # Dictionary formatında döndür
-            state_dist = {}
-            if distribution:
-                colors = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6']  # Renkler
-                for i, dist in enumerate(distribution):
-                    state_name = dist.get('state_name', 'N/A')
-                    count = dist.get('count', 0)
-                    color = colors[i % len(colors)]  # Renk döngüsü
-                    state_dist[state_name] = {'count': count, 'color': color}
-            
-            return state_dist
-        except Exception as e:
-            print(f"Durum dağılımı yükleme hatası: {e}")
-            return {}
+    @staticmethod
+    def load_state_distribution_data(dashboard):
+        """En kalabalık 5 durumun dağılımı (tek sorguluk özetten)"""
+        colors = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6']
+        return {d['state_name']: {'count': d['count'], 'color': colors[i % len(colors)]}
+                for i, d in enumerate(dashboard.get('distribution', [])[:5])}
 
 class ContainerLifecycleTab(QWidget):
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, job_queue=None):
         super().__init__()
         self.db_connection = db_connection
-        self.data_worker = None
-        
-        # Pagination vars
-        self.current_page = 1
-        self.total_pages = 1
+        self.job_queue = job_queue  # verilirse durum değişiklikleri arka planda işlenir
+        self.tasks = BackgroundTaskRunner(db_connection, parent=self)
+        self.tasks.task_finished.connect(lambda view, data: self.on_data_loaded(data) if view == DASHBOARD_VIEW else None)
+        self.tasks.task_failed.connect(lambda view, error: self.on_loading_error(error) if view == DASHBOARD_VIEW else None)
+        self.tasks.task_progress.connect(lambda view, message: self.on_progress_update(message) if view == DASHBOARD_VIEW else None)
+        self.total_containers = 0
+        self.state_machine = None
         
         self.init_ui()
         
@@ -228,8 +172,11 @@ class ContainerLifecycleTab(QWidget):
         
         layout.addWidget(self.main_content_widget)
         
-        # Alt panel - İstatistikler
-        self.bottom_panel = self.create_bottom_panel()
+        # Alt panel - İstatistikler ve bekleme süresi analizi
+        self.dwell_panel = LifecycleDwellPanel()
+        self.bottom_panel = QTabWidget()
+        self.bottom_panel.addTab(self.create_bottom_panel(), "📈 Genel")
+        self.bottom_panel.addTab(self.dwell_panel, "⏱️ Bekleme Süreleri")
         self.bottom_panel.setVisible(False)
         layout.addWidget(self.bottom_panel)
         
@@ -246,8 +193,9 @@ class ContainerLifecycleTab(QWidget):
         # Arama kutusu
         search_frame = QHBoxLayout()
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Konteyner ID ile ara...")
+        self.search_input.setPlaceholderText("Konteyner ID veya liman ile ara...")
         self.search_input.textChanged.connect(self.filter_containers)
+        self.search_completer = ContainerIdCompleter(self.db_connection, self.search_input)
         
         search_btn = QPushButton("🔍")
         search_btn.setMaximumWidth(35)
@@ -274,39 +222,44 @@ class ContainerLifecycleTab(QWidget):
         list_group = QGroupBox("📋 Konteyner Listesi")
         list_layout = QVBoxLayout()
         
-        # Sayfalama kontrolleri
+        # Yükleme kontrolleri (liste kaydırdıkça parça parça yüklenir)
         pagination_frame = QHBoxLayout()
         self.page_size_combo = QComboBox()
         self.page_size_combo.addItems(["50", "100", "200", "500"])
         self.page_size_combo.setCurrentText("100")
         self.page_size_combo.currentTextChanged.connect(self.on_page_size_changed)
         
-        self.prev_page_btn = QPushButton("◀ Önceki")
-        self.prev_page_btn.clicked.connect(self.prev_page)
-        self.prev_page_btn.setEnabled(False)
-        
-        self.page_label = QLabel("Sayfa 1")
+        self.page_label = QLabel("")
         self.page_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
-        self.next_page_btn = QPushButton("Sonraki ▶")
-        self.next_page_btn.clicked.connect(self.next_page)
-        
-        pagination_frame.addWidget(QLabel("Sayfa boyutu:"))
+        pagination_frame.addWidget(QLabel("Parça boyutu:"))
         pagination_frame.addWidget(self.page_size_combo)
         pagination_frame.addStretch()
-        pagination_frame.addWidget(self.prev_page_btn)
         pagination_frame.addWidget(self.page_label)
-        pagination_frame.addWidget(self.next_page_btn)
         
         list_layout.addLayout(pagination_frame)
         
-        self.container_list = QTableWidget()
+        self.container_model = ContainerTableModel(
+            lambda after_id, limit: self.db_connection.get_containers_after(after_id, limit),
+            LIFECYCLE_COLUMNS, chunk_size=100, parent=self)
+        self.container_model.rowsInserted.connect(self.update_loaded_label)
+        self.search = ContainerSearch(self.db_connection, LIFECYCLE_COLUMNS, parent=self)
+        self.search.active_changed.connect(self.on_search_active_changed)
+        self.search.results_ready.connect(self.on_search_results)
+        self.search.search_failed.connect(lambda error: self.page_label.setText(f"❌ Arama hatası: {error}"))
+        self._select_first_result = False
+        self.container_proxy = ContainerFilterProxy(status_column=2, parent=self)
+        self.container_proxy.setSourceModel(self.container_model)
+        
+        self.container_list = QTableView()
+        self.container_list.setModel(self.container_proxy)
+        self.container_list.setSortingEnabled(True)
+        self.container_list.sortByColumn(-1, Qt.SortOrder.AscendingOrder)
         self.container_list.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.container_list.itemSelectionChanged.connect(self.on_container_selected)
-        
-        # Tablo başlıkları
-        self.container_list.setColumnCount(5)
-        self.container_list.setHorizontalHeaderLabels(["ID", "Tip", "Durum", "Lifecycle", "Cycle Count"])
+        self.container_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.container_list.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.container_list.verticalHeader().setDefaultSectionSize(24)
+        self.container_list.selectionModel().selectionChanged.connect(self.on_container_selected)
         
         # Kolon genişlikleri
         header = self.container_list.horizontalHeader()
@@ -320,10 +273,6 @@ class ContainerLifecycleTab(QWidget):
         list_group.setLayout(list_layout)
         layout.addWidget(list_group)
         
-        # Pagination vars
-        self.current_page = 1
-        self.total_pages = 1
-        
         return layout
     
     def create_center_panel(self):
@@ -345,16 +294,9 @@ class ContainerLifecycleTab(QWidget):
         self.selected_container_label.setStyleSheet("font-weight: bold; color: #2c3e50; margin: 5px;")
         timeline_layout.addWidget(self.selected_container_label)
         
-        # Timeline scroll area
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setMinimumHeight(300)
-        
-        self.timeline_widget = QWidget()
-        self.timeline_layout = QVBoxLayout(self.timeline_widget)
-        
-        scroll_area.setWidget(self.timeline_widget)
-        timeline_layout.addWidget(scroll_area)
+        # Timeline: özet başlığı ve kaydırdıkça yüklenen geçmiş
+        self.timeline = LifecycleTimeline(self.db_connection)
+        timeline_layout.addWidget(self.timeline)
         
         # Yeni state ekleme
         add_state_frame = QHBoxLayout()
@@ -517,25 +459,13 @@ class ContainerLifecycleTab(QWidget):
         return stats_group
     
     def load_data_async(self):
-        """Asenkron veri yükleme başlat"""
-        if self.data_worker is not None:
-            self.data_worker.terminate()
-            self.data_worker.wait()
-        
-        # Sayfalama parametreleri - güvenli erişim
-        try:
-            page_size = int(self.page_size_combo.currentText())
-        except:
-            page_size = 100  # Default değer
-        
-        self.data_worker = DataLoadingWorker(
-            self.db_connection, 
-            page=self.current_page, 
-            page_size=page_size
-        )
-        self.data_worker.data_loaded.connect(self.on_data_loaded)
-        self.data_worker.error_occurred.connect(self.on_loading_error)
-        self.data_worker.progress_update.connect(self.on_progress_update)
+        """
+        Asenkron veri yükleme başlat. Süren yükleme varsa sorgusu iptal edilir ve sonucu atılır;
+        art arda gelen istekler tek yüklemede birleşir (en son istek geçerli).
+        """
+        # Listede yüklü olan aralık (en az bir parça) yeniden okunup farkları uygulanır
+        page_size = max(self.container_model.chunk_size, self.container_model.loaded_count())
+        self.tasks.submit(DASHBOARD_VIEW, DataLoadingTask(page_size=page_size))
         
         # Loading UI'yi göster - güvenli erişim
         try:
@@ -544,8 +474,6 @@ class ContainerLifecycleTab(QWidget):
         except:
             pass
         
-        self.data_worker.start()
-        
     def on_progress_update(self, message):
         """İlerleme mesajını güncelle"""
         self.loading_label.setText(message)
@@ -559,16 +487,17 @@ class ContainerLifecycleTab(QWidget):
             self.main_content_widget.setVisible(True)
             self.bottom_panel.setVisible(True)
             
-            # Sayfalama kontrollerini güncelle
             total_containers = data.get('total_containers', 0)
-            self.update_pagination_controls(total_containers)
+            self.total_containers = total_containers
             
             # Verileri UI'ye yükle
-            self.populate_containers(data.get('containers', []))
-            self.populate_lifecycle_states(data.get('lifecycle_states', []))
+            self.populate_containers(data.get('containers', []), data.get('containers_requested'))
+            self.search.refresh()
+            self.populate_lifecycle_states(data.get('state_machine') or self.state_machine)
             self.populate_statistics(data.get('statistics', {}))
             self.populate_recent_activities(data.get('recent_activities', []))
             self.populate_state_distribution(data.get('state_distribution', {}))
+            self.dwell_panel.refresh()
             
             # Alt panelin görünürlüğünü kontrol et
             print(f"🔧 DEBUG: Alt panel görünürlük kontrolü")
@@ -578,7 +507,7 @@ class ContainerLifecycleTab(QWidget):
                 print(f"   activity_list var mı: {hasattr(self, 'activity_list')}")
                 print(f"   state_distribution_layout var mı: {hasattr(self, 'state_distribution_layout')}")
             
-            print(f"✅ Container Lifecycle Tab veri yükleme tamamlandı! (Sayfa {self.current_page}, Toplam: {total_containers})")
+            print(f"✅ Container Lifecycle Tab veri yükleme tamamlandı! (Toplam: {total_containers})")
             
         except Exception as e:
             self.on_loading_error(f"Veri işleme hatası: {e}")
@@ -597,67 +526,52 @@ class ContainerLifecycleTab(QWidget):
     def load_data(self):
         """Eski senkron veri yükleme (yedek)"""
         self.load_data_async()
-    
-    def populate_containers(self, containers):
-        """Konteyner listesini doldur"""
+
+    def shutdown(self):
+        """Arka plan thread'lerini durdur"""
+        self.tasks.shutdown()
+        self.search.shutdown()
+        self.dwell_panel.shutdown()
+    
+    def populate_containers(self, containers, requested=None):
+        """Konteyner modelini yeni satırlarla karşılaştırarak güncelle (sadece farklar yansır)"""
         try:
-            print(f"🔧 DEBUG: populate_containers called with {len(containers) if containers else 0} containers")
-            
-            if not containers:
-                print("❌ Konteyner listesi boş!")
-                # Boş durum mesajı göster
-                self.container_list.setRowCount(1)
-                empty_item = QTableWidgetItem("Henüz konteyner bulunmuyor")
-                empty_item.setFlags(empty_item.flags() & ~Qt.ItemFlag.ItemIsSelectable)
-                self.container_list.setItem(0, 0, empty_item)
-                self.container_list.setSpan(0, 0, 1, 5)  # Tüm sütunları kapsasın
-                return
-            
-            self.container_list.setRowCount(len(containers))
-            
-            for row, container in enumerate(containers):
-                # ID
-                self.container_list.setItem(row, 0, QTableWidgetItem(str(container['id'])))
-                
-                # Tip
-                self.container_list.setItem(row, 1, QTableWidgetItem(str(container['tip'])))
-                
-                # Durum
-                self.container_list.setItem(row, 2, QTableWidgetItem(str(container['durum'])))
-                
-                # Lifecycle state
-                lifecycle_state = container.get('lifecycle_state_name', 'N/A')
-                lifecycle_item = QTableWidgetItem(lifecycle_state)
-                
-                # Renk kodlaması
-                if container.get('lifecycle_color'):
-                    try:
-                        lifecycle_item.setBackground(QColor(container['lifecycle_color']))
-                    except:
-                        pass
-                
-                self.container_list.setItem(row, 3, lifecycle_item)
-                
-                # Cycle Count
-                cycle_count = container.get('lifecycle_cycle_count', 0)
-                cycle_item = QTableWidgetItem(str(cycle_count))
-                cycle_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.container_list.setItem(row, 4, cycle_item)
-            
-            print(f"✅ {len(containers)} konteyner listesi dolduruldu")
-                
+            self.container_model.apply_rows(list(containers or []), requested=requested)
+            self.update_loaded_label()
         except Exception as e:
             print(f"❌ Konteyner listesi doldurma hatası: {e}")
             import traceback
             traceback.print_exc()
     
-    def populate_lifecycle_states(self, states):
-        """Lifecycle state'lerini doldur"""
+    def update_loaded_label(self, *_):
+        """Yüklü / toplam konteyner sayısını göster"""
+        if self.search.active: return
+        loaded = self.container_model.loaded_count()
+        if not loaded:
+            self.page_label.setText("Henüz konteyner bulunmuyor")
+        else:
+            self.page_label.setText(f"{loaded:,} / {max(self.total_containers, loaded):,} yüklendi")
+    
+    def selected_container_id(self):
+        containers = self.selected_containers()
+        return containers[0]['id'] if containers else None
+    
+    def selected_containers(self):
+        rows = sorted(index.row() for index in self.container_list.selectionModel().selectedRows())
+        return [self.container_proxy.row_data(row) for row in rows]
+    
+    def current_state_id(self, container):
+        """Satırdaki mevcut lifecycle durumu (id yoksa durum adından)"""
+        if 'current_lifecycle_state' in container:
+            return container['current_lifecycle_state']
+        return self.state_machine.by_name.get(container.get('lifecycle_state_name'))
+    
+    def populate_lifecycle_states(self, machine):
+        """Lifecycle state'lerini doldur (durum makinesinin önbellekteki görüntüsünden)"""
         try:
-            # Combo box'ı doldur
-            self.new_state_combo.clear()
-            for state in states:
-                self.new_state_combo.addItem(state['state_description'], state['id'])
+            self.state_machine = machine
+            states = machine.state_rows()
+            self.populate_state_combo()
             
             # Tablo'yu doldur
             self.states_list.setRowCount(len(states))
@@ -819,24 +733,51 @@ class ContainerLifecycleTab(QWidget):
             traceback.print_exc()
     
     def load_lifecycle_states(self):
-        """Lifecycle state'lerini combo box'a yükle - eksik metod"""
+        """Lifecycle state'lerini combo box'a yükle"""
         try:
-            states = self.db_connection.get_lifecycle_states()
-            self.new_state_combo.clear()
-            
-            for state in states:
-                self.new_state_combo.addItem(state['state_description'], state['id'])
-                
+            self.state_machine = self.db_connection.get_lifecycle_state_machine()
+            self.populate_state_combo()
         except Exception as e:
             print(f"Lifecycle states yükleme hatası: {e}")
     
+    def populate_state_combo(self):
+        """Aktif durumları combo box'a yükle ve seçime göre izinli olanları işaretle"""
+        current = self.new_state_combo.currentData()
+        self.new_state_combo.clear()
+        for state in self.state_machine.active_states():
+            self.new_state_combo.addItem(state.description, state.id)
+        index = self.new_state_combo.findData(current)
+        if index >= 0: self.new_state_combo.setCurrentIndex(index)
+        self.update_state_choices()
+    
+    def update_state_choices(self):
+        """Seçili konteynerlerden en az birinin geçebileceği durumlar seçilebilir, diğerleri pasif gösterilir"""
+        if self.state_machine is None: return
+        containers = self.selected_containers() if hasattr(self, 'container_list') else []
+        current_states = {self.current_state_id(c) for c in containers}
+        model = self.new_state_combo.model()
+        for i in range(self.new_state_combo.count()):
+            state_id = self.new_state_combo.itemData(i)
+            reasons = [self.state_machine.check(s, state_id) for s in current_states]
+            enabled = not containers or any(r is None for r in reasons)
+            model.item(i).setEnabled(enabled)
+            model.item(i).setToolTip("" if enabled else next(r for r in reasons if r))
+        if self.new_state_combo.currentIndex() >= 0 and not model.item(self.new_state_combo.currentIndex()).isEnabled():
+            first = next((i for i in range(self.new_state_combo.count()) if model.item(i).isEnabled()), -1)
+            self.new_state_combo.setCurrentIndex(first)
+    
     # ...existing code...
     
     def on_container_selected(self):
         """Konteyner seçildiğinde"""
-        current_row = self.container_list.currentRow()
-        if current_row >= 0:
-            container_id = self.container_list.item(current_row, 0).text()
+        containers = self.selected_containers()
+        self.update_state_choices()
+        if len(containers) > 1:
+            self.selected_container_label.setText(f"📦 {len(containers)} konteyner seçili (toplu durum değişikliği)")
+            self.add_state_btn.setEnabled(True)
+            self.clear_timeline()
+        elif containers:
+            container_id = containers[0]['id']
             self.selected_container_label.setText(f"📦 Seçili Konteyner: {container_id}")
             self.add_state_btn.setEnabled(True)
             self.load_container_timeline(container_id)
@@ -846,265 +787,115 @@ class ContainerLifecycleTab(QWidget):
             self.clear_timeline()
     
     def load_container_timeline(self, container_id):
-        """Konteyner timeline'ını yükle"""
-        try:
-            # Timeline'ı temizle
-            self.clear_timeline()
-            
-            # History'yi al
-            history = self.db_connection.get_container_lifecycle_history(container_id)
-            
-            if not history:
-                no_history_label = QLabel("🔍 Bu konteyner için lifecycle geçmişi bulunamadı.")
-                no_history_label.setStyleSheet("color: #7f8c8d; font-style: italic; padding: 20px;")
-                self.timeline_layout.addWidget(no_history_label)
-                return
-            
-            # Timeline item'larını oluştur
-            for i, item in enumerate(history):
-                timeline_item = self.create_timeline_item(item, i == 0)
-                self.timeline_layout.addWidget(timeline_item)
-                
-            self.timeline_layout.addStretch()
-            
-        except Exception as e:
-            QMessageBox.warning(self, "Hata", f"Timeline yüklenirken hata: {e}")
-    
-    def create_timeline_item(self, history_item, is_current=False):
-        """Timeline item widget'ı oluştur"""
-        frame = QFrame()
-        frame.setFrameStyle(QFrame.Shape.Box)
-        frame.setStyleSheet(f"""
-            QFrame {{
-                border: 2px solid {'#3498db' if is_current else '#bdc3c7'};
-                border-radius: 8px;
-                margin: 5px;
-                padding: 10px;
-                background-color: {'#ecf0f1' if is_current else '#ffffff'};
-            }}
-        """)
-        
-        layout = QVBoxLayout(frame)
-        
-        # Başlık
-        title_layout = QHBoxLayout()
-        
-        # State badge
-        state_badge = QLabel(history_item['to_state_name'])
-        state_badge.setStyleSheet(f"""
-            background-color: {history_item.get('color_code', '#95a5a6')};
-            color: white;
-            padding: 3px 8px;
-            border-radius: 4px;
-            font-weight: bold;
-        """)
-        title_layout.addWidget(state_badge)
-        
-        if is_current:
-            current_badge = QLabel("📍 GÜNCEL")
-            current_badge.setStyleSheet("color: #e74c3c; font-weight: bold;")
-            title_layout.addWidget(current_badge)
-        
-        title_layout.addStretch()
-        
-        # Zaman
-        time_label = QLabel(history_item['change_timestamp'].strftime("%d/%m/%Y %H:%M"))
-        time_label.setStyleSheet("color: #7f8c8d; font-size: 12px;")
-        title_layout.addWidget(time_label)
-        
-        layout.addLayout(title_layout)
-        
-        # Detaylar
-        if history_item.get('from_state_name'):
-            change_label = QLabel(f"➡️ {history_item['from_state_name']} → {history_item['to_state_name']}")
-        else:
-            change_label = QLabel(f"🆕 İlk durum: {history_item['to_state_name']}")
-        
-        change_label.setStyleSheet("margin: 5px 0px;")
-        layout.addWidget(change_label)
-        
-        # Sebep
-        if history_item.get('change_reason'):
-            reason_label = QLabel(f"💬 Sebep: {history_item['change_reason']}")
-            reason_label.setStyleSheet("font-style: italic; color: #34495e;")
-            layout.addWidget(reason_label)
-        
-        # Değiştiren kişi
-        if history_item.get('changed_by'):
-            user_label = QLabel(f"👤 Değiştiren: {history_item['changed_by']}")
-            user_label.setStyleSheet("font-size: 11px; color: #7f8c8d;")
-            layout.addWidget(user_label)
-        
-        return frame
+        """Konteyner timeline'ını yükle (özet + en yeni sayfa, eskiler kaydırdıkça)"""
+        self.timeline.set_container(container_id)
     
     def clear_timeline(self):
         """Timeline'ı temizle"""
-        while self.timeline_layout.count():
-            child = self.timeline_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        self.timeline.clear()
     
     def change_container_state(self):
-        """Konteyner durumunu değiştir"""
-        current_row = self.container_list.currentRow()
-        if current_row < 0:
+        """Seçili konteyner(ler)in durumunu değiştir; geçişler önce yerel durum makinesiyle doğrulanır"""
+        containers = self.selected_containers()
+        if not containers:
             QMessageBox.warning(self, "Uyarı", "Lütfen önce bir konteyner seçin.")
             return
-        
-        container_id = self.container_list.item(current_row, 0).text()
         new_state_id = self.new_state_combo.currentData()
+        if new_state_id is None:
+            QMessageBox.warning(self, "Uyarı", "Lütfen yeni bir durum seçin.")
+            return
         reason = self.reason_input.text().strip()
         
-        print(f"🔧 DEBUG: Container ID: {container_id}")  # Debug
-        print(f"🔧 DEBUG: New state ID: {new_state_id}")  # Debug
-        print(f"🔧 DEBUG: Reason: {reason}")  # Debug
-        
-        # Combo box debug
-        print(f"🔧 DEBUG: Combo box item count: {self.new_state_combo.count()}")
-        for i in range(self.new_state_combo.count()):
-            print(f"   {i}: {self.new_state_combo.itemText(i)} -> {self.new_state_combo.itemData(i)}")
-        
-        if not new_state_id:
-            # Eğer data None ise, index kullan
-            current_index = self.new_state_combo.currentIndex()
-            if current_index >= 0:
-                # States listesinden ID al
-                try:
-                    states = self.db_connection.get_lifecycle_states()
-                    if states and current_index < len(states):
-                        new_state_id = states[current_index]['id']
-                        print(f"🔧 DEBUG: Using index-based state ID: {new_state_id}")
-                    else:
-                        QMessageBox.warning(self, "Uyarı", "Durum listesi yüklenemedi.")
-                        return
-                except Exception as e:
-                    QMessageBox.warning(self, "Uyarı", f"Durum listesi hatası: {e}")
-                    return
-            else:
-                QMessageBox.warning(self, "Uyarı", "Lütfen yeni bir durum seçin.")
-                return
+        # Geçersiz geçişler veritabanına gönderilmeden ayıklanır
+        rejected = self.state_machine.check_many({c['id']: self.current_state_id(c) for c in containers}, new_state_id)
+        allowed = [c['id'] for c in containers if c['id'] not in rejected]
+        rejected_text = "\n".join(f"• {c_id}: {text}" for c_id, text in list(rejected.items())[:5])
+        if len(rejected) > 5: rejected_text += f"\n• ... {len(rejected) - 5} konteyner daha"
+        if not allowed:
+            QMessageBox.warning(self, "Geçersiz Geçiş", f"Seçili konteynerler bu duruma geçirilemez:\n\n{rejected_text}")
+            return
         
         # Onay al
-        state_name = self.new_state_combo.currentText()
-        reply = QMessageBox.question(
-            self, 
-            "Durum Değişikliği Onayı", 
-            f"Konteyner {container_id} durumunu '{state_name}' olarak değiştirmek istediğinizden emin misiniz?",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-        )
-        
-        if reply == QMessageBox.StandardButton.Yes:
+        state_name = self.state_machine.name(new_state_id)
+        if len(allowed) == 1:
+            message = f"Konteyner {allowed[0]} durumunu '{state_name}' olarak değiştirmek istediğinizden emin misiniz?"
+        else:
+            message = f"{len(allowed)} konteynerin durumunu '{state_name}' olarak değiştirmek istediğinizden emin misiniz?"
+        if rejected:
+            message += f"\n\n{len(rejected)} konteyner geçersiz geçiş nedeniyle atlanacak:\n{rejected_text}"
+        reply = QMessageBox.question(self, "Durum Değişikliği Onayı", message,
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        
+        if self.job_queue is not None:
+            from job_queue import LIFECYCLE_CHANGE, LIFECYCLE_QUEUE_KEY
+            payload = {'container_ids': allowed, 'state_id': new_state_id, 'reason': reason, 'changed_by': "USER"}
+            job_id = self.job_queue.submit(LIFECYCLE_CHANGE, payload, key=LIFECYCLE_QUEUE_KEY,
+                                           callback=lambda result: self._on_state_changed(allowed, result))
+            if job_id is None:
+                QMessageBox.warning(self, "Hata", "Durum değişikliği kuyruğa eklenemedi.")
+            else:
+                self.reason_input.clear()
+        else:
             try:
-                print(f"🔧 DEBUG: Calling change_container_lifecycle_state...")  # Debug
-                success = self.db_connection.change_container_lifecycle_state(
-                    container_id, new_state_id, reason, "USER"
-                )
-                print(f"🔧 DEBUG: Database result: {success}")  # Debug
-                
-                if success:
-                    QMessageBox.information(self, "Başarılı", "Konteyner durumu başarıyla değiştirildi.")
+                result = self.db_connection.change_containers_lifecycle_state(allowed, new_state_id, reason, "USER")
+                if result.get('success') and result.get('changed'):
                     self.reason_input.clear()
-                    self.load_data_async()
-                    self.load_container_timeline(container_id)
-                else:
-                    QMessageBox.warning(self, "Hata", "Durum değişikliği başarısız oldu.\n\nVeritabanı işlemi tamamlanamadı.")
-                    
+                self._on_state_changed(allowed, result)
             except Exception as e:
                 import traceback
-                error_details = traceback.format_exc()
-                print(f"🔧 DEBUG: Exception occurred: {e}")
-                print(f"🔧 DEBUG: Full traceback: {error_details}")
+                traceback.print_exc()
                 QMessageBox.critical(self, "Hata", f"Durum değişikliği sırasında hata oluştu:\n\n{str(e)}")
-                
-            except Exception as e:
-                import traceback
-                error_details = traceback.format_exc()
-                print(f"🔧 DEBUG: Exception occurred: {e}")
-                print(f"🔧 DEBUG: Full traceback: {error_details}")
-                QMessageBox.critical(self, "Hata", f"Durum değiştirme hatası:\n\n{str(e)}\n\nDetaylı hata konsola yazdırıldı.")
-                
-        print(f"🔧 DEBUG: Change container state completed")  # Debug
+
+    def _on_state_changed(self, container_ids, result):
+        """Durum değişikliği sonucu (iş kuyruğundan ya da doğrudan)"""
+        changed = result.get('changed', [])
+        rejected = result.get('rejected', [])
+        if result.get('success') and (changed or not rejected):
+            text = "Konteyner durumu başarıyla değiştirildi." if len(container_ids) == 1 else f"{len(changed)} konteynerin durumu değiştirildi."
+            if rejected:
+                text += f"\n\n{len(rejected)} konteyner reddedildi:\n" + "\n".join(f"• {r['container_id']}: {r['reason']}" for r in rejected[:5])
+            QMessageBox.information(self, "Başarılı", text)
+            self.load_data_async()
+            current = self.selected_container_id()
+            if current is not None and len(self.selected_containers()) == 1:
+                self.load_container_timeline(current)
+        else:
+            QMessageBox.warning(self, "Hata", f"Durum değişikliği başarısız oldu.\n\n{result.get('error') or 'Veritabanı işlemi tamamlanamadı.'}")
     
     def filter_containers(self):
-        """Konteyner listesini filtrele"""
-        search_text = self.search_input.text().lower()
+        """Konteyner listesini filtrele: metin sunucuda aranır, durum süzgeci hem aramaya hem listeye uygulanır"""
         status_filter = self.status_filter.currentText()
-        
-        for row in range(self.container_list.rowCount()):
-            should_show = True
-            
-            # Metin araması
-            if search_text:
-                container_id = self.container_list.item(row, 0).text().lower()
-                if search_text not in container_id:
-                    should_show = False
-            
-            # Durum filtresi
-            if should_show and status_filter != "Tümü":
-                container_status = self.container_list.item(row, 2).text()
-                if container_status != status_filter:
-                    should_show = False
-            
-            self.container_list.setRowHidden(row, not should_show)
+        status = None if status_filter == "Tümü" else status_filter
+        self.container_proxy.set_status(status)
+        self.search.set_query(self.search_input.text(), status)
     
     def search_container(self):
-        """Konteyner ara ve seç"""
-        search_text = self.search_input.text().strip()
-        if not search_text:
+        """Beklemeden ara ve ilk (en iyi) sonucu seç"""
+        if not self.search_input.text().strip():
             return
-        
-        # Listeyi temizle ve ara
-        self.filter_containers()
-        
-        # İlk görünen satırı seç
-        for row in range(self.container_list.rowCount()):
-            if not self.container_list.isRowHidden(row):
-                self.container_list.selectRow(row)
-                break
+        self._select_first_result = True
+        status_filter = self.status_filter.currentText()
+        self.search.set_query(self.search_input.text(), None if status_filter == "Tümü" else status_filter, immediate=True)
+    
+    def on_search_active_changed(self, active):
+        self.container_proxy.setSourceModel(self.search.model if active else self.container_model)
+        if not active: self.update_loaded_label()
+    
+    def on_search_results(self, text, count, elapsed_ms):
+        more = "+" if self.search.model.canFetchMore() else ""
+        self.page_label.setText(f"'{text}': {count}{more} sonuç ({elapsed_ms:.0f} ms)")
+        if self._select_first_result:
+            self._select_first_result = False
+            if self.container_proxy.rowCount():
+                self.container_list.selectRow(0)
     
     def load_statistics(self):
-        """İstatistikleri yükle"""
+        """İstatistikleri yükle (tek sorgu, kısa süreli önbellekli)"""
         try:
-            # Toplam konteyner
-            containers = self.db_connection.get_all_containers_detailed()
-            total_containers = len(containers) if containers else 0
-            self.stats_labels["Toplam Konteyner"].setText(str(total_containers))
-            
-            # Aktif lifecycle state sayısı
-            states = self.db_connection.get_lifecycle_states()
-            active_states = len([s for s in states if s['is_active']]) if states else 0
-            self.stats_labels["Aktif Lifecycle"].setText(str(active_states))
-            
-            # Toplam cycle count hesapla
-            try:
-                total_cycles_result = self.db_connection.execute_query(
-                    "SELECT SUM(lifecycle_cycle_count) as total_cycles FROM public.konteynerler", 
-                    fetchone=True
-                )
-                total_cycles = total_cycles_result['total_cycles'] if total_cycles_result and total_cycles_result['total_cycles'] else 0
-                self.stats_labels["Son 24 Saat Değişim"].setText(str(total_cycles))
-            except:
-                self.stats_labels["Son 24 Saat Değişim"].setText("0")
-            
-            # En çok kullanılan durum
-            try:
-                most_used_result = self.db_connection.execute_query("""
-                    SELECT current_lifecycle_state, COUNT(*) as count 
-                    FROM public.konteynerler 
-                    GROUP BY current_lifecycle_state 
-                    ORDER BY count DESC 
-                    LIMIT 1
-                """, fetchone=True)
-                
-                if most_used_result:
-                    state_id = most_used_result['current_lifecycle_state']
-                    state_name = self.db_connection._get_state_name(state_id)
-                    self.stats_labels["En Çok Kullanılan Durum"].setText(state_name)
-                else:
-                    self.stats_labels["En Çok Kullanılan Durum"].setText("SAHA")
-            except:
-                self.stats_labels["En Çok Kullanılan Durum"].setText("SAHA")
-            
+            dashboard = self.db_connection.get_lifecycle_dashboard_stats() or {}
+            self.populate_statistics(DataLoadingTask.load_statistics_data(dashboard))
         except Exception as e:
             print(f"İstatistik yükleme hatası: {e}")
     
@@ -1180,31 +971,8 @@ class ContainerLifecycleTab(QWidget):
             QMessageBox.warning(self, "Uyarı", "Lütfen düzenlemek için bir durum seçin.")
 
     def on_page_size_changed(self):
-        """Sayfa boyutu değiştiğinde"""
-        self.current_page = 1
-        self.load_data_async()
-    
-    def prev_page(self):
-        """Önceki sayfa"""
-        if self.current_page > 1:
-            self.current_page -= 1
-            self.load_data_async()
-    
-    def next_page(self):
-        """Sonraki sayfa"""
-        if self.current_page < self.total_pages:
-            self.current_page += 1
-            self.load_data_async()
-    
-    def update_pagination_controls(self, total_containers):
-        """Sayfalama kontrollerini güncelle"""
-        page_size = int(self.page_size_combo.currentText())
-        self.total_pages = max(1, (total_containers + page_size - 1) // page_size)
-        
-        self.page_label.setText(f"Sayfa {self.current_page} / {self.total_pages}")
-        self.prev_page_btn.setEnabled(self.current_page > 1)
-        self.next_page_btn.setEnabled(self.current_page < self.total_pages)
-
+        """Kaydırırken her seferinde yüklenecek satır sayısı"""
+        self.container_model.chunk_size = int(self.page_size_combo.currentText())
 
 if __name__ == "__main__":
     # Test için
@@ -1214,12 +982,17 @@ if __name__ == "__main__":
     class MockDB:
         def get_all_containers_detailed(self):
             return []
-        def get_lifecycle_states(self):
+        def get_containers_after(self, after_id=None, limit=500):
             return []
-        def get_container_lifecycle_history(self, container_id):
+        def get_lifecycle_state_machine(self):
+            from lifecycle_states import LifecycleStateMachine
+            return LifecycleStateMachine([])
+        def get_container_lifecycle_timeline(self, container_id, before=None, limit=50):
             return []
-        def change_container_lifecycle_state(self, container_id, new_state_id, reason, changed_by):
-            return True
+        def get_container_lifecycle_summary(self, container_id):
+            return None
+        def change_containers_lifecycle_state(self, container_ids, new_state_id, reason, changed_by):
+            return {'success': True, 'changed': list(container_ids), 'rejected': [], 'error': None}
     
     window = ContainerLifecycleTab(MockDB())
     window.show()
@@ -5,11 +5,15 @@ import string
 import re
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit,
-    QTableWidget, QTableWidgetItem, QHeaderView, QFormLayout, QMessageBox, QComboBox, QSizePolicy
+    QTableView, QHeaderView, QFormLayout, QMessageBox, QComboBox, QSizePolicy
 )
 from PyQt6.QtCore import Qt, QSize
 from PyQt6.QtGui import QFont, QValidator, QRegularExpressionValidator
 import qtawesome as qta
+from job_queue import ADD_CONTAINER
+from ui.common.container_models import ContainerTableModel, ContainerFilterProxy, MANAGEMENT_COLUMNS
+from ui.common.container_search import ContainerSearch, ContainerIdCompleter
+import container_index
 
 # --- YENİ FONKSİYONLAR ---
 def calculate_check_digit(owner_code, serial_number):
@@ -87,20 +91,38 @@ class ContainerManagementTab(QWidget):
 
         # Search layout
         search_layout = QHBoxLayout()
-        search_layout.addWidget(QLabel("Konteyner ID ile Ara:"))
+        search_layout.addWidget(QLabel("Konteyner ID / Liman ile Ara:"))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Aramak için yazın...")
         self.search_input.textChanged.connect(self.filter_table)
         search_layout.addWidget(self.search_input)
+        self.search_completer = ContainerIdCompleter(self.db, self.search_input)
+        self.search_status_label = QLabel("")
+        self.search_status_label.setStyleSheet("color: #95A5A6;")
+        search_layout.addWidget(self.search_status_label)
         main_layout.addLayout(search_layout)
 
-        self.container_table = QTableWidget()
-        self.container_table.setColumnCount(6)
-        self.container_table.setHorizontalHeaderLabels(["ID", "Tip", "Durum", "Konum", "Çıkış Limanı", "Varış Limanı"])
+        # Sanal model: satırlar kaydırdıkça veritabanından parça parça gelir; arama sunucuda yapılır,
+        # sonuçlar ayrı modelde tutulur ve arama açıkken proxy'nin kaynağı o olur
+        self.container_model = ContainerTableModel(
+            lambda after_id, limit: self.db.get_containers_after(after_id, limit), MANAGEMENT_COLUMNS, parent=self)
+        self.search = ContainerSearch(self.db, MANAGEMENT_COLUMNS, parent=self)
+        self.search.active_changed.connect(self.on_search_active_changed)
+        self.search.results_ready.connect(self.on_search_results)
+        self.search.search_failed.connect(lambda error: self.search_status_label.setText(f"❌ Arama hatası: {error}"))
+        self.container_proxy = ContainerFilterProxy(parent=self)
+        self.container_proxy.setSourceModel(self.container_model)
+
+        self.container_table = QTableView()
+        self.container_table.setModel(self.container_proxy)
+        self.container_table.setSortingEnabled(True)
+        self.container_table.sortByColumn(-1, Qt.SortOrder.AscendingOrder)
         self.container_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.container_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.container_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
-        self.container_table.itemSelectionChanged.connect(self.on_container_selected)
+        self.container_table.verticalHeader().setDefaultSectionSize(24)
+        self.container_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.container_table.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        self.container_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.container_table.selectionModel().selectionChanged.connect(self.on_container_selected)
         main_layout.addWidget(self.container_table)
 
         # Form layout
@@ -181,6 +203,8 @@ class ContainerManagementTab(QWidget):
             return
         
         is_valid, message = is_valid_container_id(text)
+        if is_valid and container_index.shared_index().contains(text):   # yerel indeks: veritabanına gitmeden
+            is_valid, message = False, "Bu ID zaten kayıtlı"
         if is_valid:
             self.id_feedback_label.setText(f"✓ {message}")
             self.id_feedback_label.setStyleSheet("color: #2ECC71;")  # Green
@@ -194,7 +218,7 @@ class ContainerManagementTab(QWidget):
         """ISO 6346 standardına uygun rastgele ve geçerli bir konteyner ID'si oluşturur."""
         try:
             # Database connection kontrolü
-            if not self.db or not hasattr(self.db, 'get_container_details_by_id'):
+            if not self.db or not hasattr(self.db, 'container_exists'):
                 QMessageBox.critical(self, "Hata", "Veritabanı bağlantısı mevcut değil!")
                 return
             
@@ -213,10 +237,8 @@ class ContainerManagementTab(QWidget):
                 check_digit = calculate_check_digit(owner_code, serial_number)
                 random_id = f"{owner_code}{serial_number}{check_digit}"
                 
-                # Konteyner ID'si daha önce kullanılmış mı kontrol et
-                existing = self.db.get_container_details_by_id(random_id)
-                
-                if not existing:
+                # Konteyner ID'si daha önce kullanılmış mı kontrol et (Bloom süzgeci çoğu zaman sorguyu atlar)
+                if not self.db.container_exists(random_id):
                     break
                 attempt += 1
             else:
@@ -261,105 +283,36 @@ class ContainerManagementTab(QWidget):
             return
 
     def filter_table(self):
-        """Enhanced search function that searches across multiple columns."""
-        search_text = self.search_input.text().lower().strip()
-        
-        if not search_text:
-            # If search is empty, show all rows
-            for row in range(self.container_table.rowCount()):
-                self.container_table.setRowHidden(row, False)
-            print(f"🔍 Showing all {self.container_table.rowCount()} containers")
-            return
-        
-        print(f"🔍 Searching for: '{search_text}' in {self.container_table.rowCount()} containers")
-        
-        visible_count = 0
-        for row in range(self.container_table.rowCount()):
-            # Search in multiple columns: ID, Tip, Durum, Konum, Çıkış, Varış
-            should_show = False
-            
-            for col in range(6):  # 6 columns total
-                item = self.container_table.item(row, col)
-                if item and search_text in item.text().lower():
-                    should_show = True
-                    # For debugging: show which column matched
-                    if visible_count < 3:  # Only log first 3 matches to avoid spam
-                        col_names = ["ID", "Tip", "Durum", "Konum", "Çıkış", "Varış"]
-                        print(f"  ✅ Match in {col_names[col]}: '{item.text()}'")
-                    break
-            
-            self.container_table.setRowHidden(row, not should_show)
-            if should_show:
-                visible_count += 1
-        
-        print(f"🔍 Search '{search_text}' found {visible_count} matching containers")
-        
-        if visible_count == 0:
-            print("⚠️  No matches found. Check:")
-            print("   - Is the search term spelled correctly?")
-            print("   - Try searching with partial terms")
-            print("   - Clear search to see all containers")
+        """ID ve liman adlarında sunucu araması (yazma durunca gönderilir, eski istekler iptal edilir)"""
+        self.search.set_query(self.search_input.text())
+
+    def on_search_active_changed(self, active):
+        self.container_proxy.setSourceModel(self.search.model if active else self.container_model)
+        if not active: self.search_status_label.setText("")
+
+    def on_search_results(self, text, count, elapsed_ms):
+        more = "+" if self.search.model.canFetchMore() else ""
+        self.search_status_label.setText(f"{count}{more} sonuç ({elapsed_ms:.0f} ms)")
 
     def refresh_container_list(self):
-        """Refresh the container list with enhanced logging."""
-        print("🔄 Refreshing container list...")
-        self.container_table.setRowCount(0)
-        
-        containers = self.db.get_all_containers_detailed()
-        print(f"🔄 Retrieved {len(containers) if containers else 0} containers from database")
-        
-        if not containers: 
-            self.clear_form()
-            print("⚠️  No containers found in database")
-            return
-        
-        self.container_table.setRowCount(len(containers))
-        print(f"🔄 Setting up table with {len(containers)} rows")
-        
-        for row, c in enumerate(containers):
-            # Column 0: ID
-            container_id = c.get('id', '')
-            self.container_table.setItem(row, 0, QTableWidgetItem(container_id))
-            
-            # Column 1: Type
-            container_type = c.get('tip', '')
-            self.container_table.setItem(row, 1, QTableWidgetItem(container_type))
-            
-            # Column 2: Status
-            durum = c.get('durum', 'Bilinmiyor')
-            self.container_table.setItem(row, 2, QTableWidgetItem(durum))
-            
-            # Column 3: Location
-            konum_str = ""
-            if durum == 'SAHA': 
-                konum_str = c.get('saha_konum') or 'Konum Hatası!'
-            elif durum == 'GEMI': 
-                konum_str = c.get('gemi_konum') or f"GEMI: {c.get('gemi_id', '?')}"
-            elif durum == 'ATANMAMIS': 
-                konum_str = 'Atanmamış'
-            self.container_table.setItem(row, 3, QTableWidgetItem(konum_str))
-            
-            # Column 4: Origin Port
-            origin = c.get('cikis_limani', '')
-            self.container_table.setItem(row, 4, QTableWidgetItem(origin))
-            
-            # Column 5: Destination Port
-            destination = c.get('varis_limani', '')
-            self.container_table.setItem(row, 5, QTableWidgetItem(destination))
-        
-        print(f"✅ Container table updated with {len(containers)} containers")
+        """Yüklü aralığı yeniden oku; sadece eklenen/silinen/değişen satırlar tabloya yansır."""
+        self.container_model.refresh()
+        self.search.refresh()
         self.clear_form()
 
+    def shutdown(self):
+        """Arama thread'ini durdur"""
+        self.search.shutdown()
+
     def on_container_selected(self):
         selected_rows = self.container_table.selectionModel().selectedRows()
         if not selected_rows: return
-        row = selected_rows[0].row()
-        self.id_input.setText(self.container_table.item(row, 0).text()); self.tip_input.setCurrentText(self.container_table.item(row, 1).text())
-        self.durum_combo.setCurrentText(self.container_table.item(row, 2).text())
-        konum_text = self.container_table.item(row, 3).text()
-        if self.container_table.item(row, 2).text() == 'SAHA': self.konum_input.setText(konum_text if konum_text != 'Konum Hatası!' else '')
+        c = self.container_proxy.row_data(selected_rows[0].row())
+        self.id_input.setText(c.get('id') or ''); self.tip_input.setCurrentText(c.get('tip') or '')
+        self.durum_combo.setCurrentText(c.get('durum') or '')
+        if c.get('durum') == 'SAHA': self.konum_input.setText(c.get('saha_konum') or '')
         else: self.konum_input.clear()
-        self.cikis_limani_input.setText(self.container_table.item(row, 4).text()); self.varis_limani_input.setText(self.container_table.item(row, 5).text())
+        self.cikis_limani_input.setText(c.get('cikis_limani') or ''); self.varis_limani_input.setText(c.get('varis_limani') or '')
         self.id_input.setReadOnly(True)
         self.id_feedback_label.setText("") # Seçim yapıldığında geri bildirimi temizle
         self.add_button.setEnabled(False); self.random_button.setEnabled(False)
@@ -389,28 +342,24 @@ class ContainerManagementTab(QWidget):
             QMessageBox.warning(self, "Eksik Bilgi", "Lütfen Tip, Çıkış ve Varış Limanı alanlarını doldurun.")
             return
 
-        if self.db.get_container_details_by_id(c_id): 
+        if self.db.container_exists(c_id): 
             QMessageBox.warning(self, "Mevcut ID", f"'{c_id}' ID'li bir konteyner zaten var.")
             return
         
-        try:
-            result = self.db.add_new_container(c_id, c_tip, c_cikis, c_varis, self.durum_combo.currentText())
-            if result is True:
-                QMessageBox.information(self, "Başarılı", f"'{c_id}' konteyneri eklendi.")
-                
-                # Refresh the list first
-                self.refresh_and_notify()
-                
-                # Then set search to the new container ID to help user find it
-                print(f"🔍 Setting search to new container ID: {c_id}")
-                self.search_input.setText(c_id)
-                
-                print(f"✅ Container {c_id} added and search set")
-            else:
-                raise Exception(result or "Bilinmeyen veritabanı hatası")
-        except Exception as e:
-            err = str(e)
-            QMessageBox.critical(self, "Hata", f"Konteyner eklenemedi!\n\nID: {c_id}\nHata: {err}")
+        # Kayıt arka plandaki iş kuyruğunda yapılır
+        payload = {'id': c_id, 'tip': c_tip, 'cikis_limani': c_cikis, 'varis_limani': c_varis, 'durum': self.durum_combo.currentText()}
+        job_id = self.main_window.job_queue.submit(ADD_CONTAINER, payload, key=c_id, callback=lambda result: self._on_container_added(c_id, result))
+        if job_id is None:
+            QMessageBox.critical(self, "Hata", f"Konteyner eklenemedi!\n\nID: {c_id}\nHata: İşlem kuyruğa eklenemedi")
+
+    def _on_container_added(self, c_id, result):
+        if not result.get('success'):
+            QMessageBox.critical(self, "Hata", f"Konteyner eklenemedi!\n\nID: {c_id}\nHata: {result.get('error')}")
+            return
+        QMessageBox.information(self, "Başarılı", f"'{c_id}' konteyneri eklendi.")
+        # Listeyi yenile ve yeni konteyneri bulmak için aramaya yaz (diğer sekmeler kuyruk tarafından yenilenir)
+        self.refresh_container_list()
+        self.search_input.setText(c_id)
 
     def update_container(self):
         c_id = self.id_input.text().strip(); c_tip = self.tip_input.currentText(); c_cikis = self.cikis_limani_input.text().strip(); c_varis = self.varis_limani_input.text().strip()
@@ -435,15 +384,11 @@ class ContainerManagementTab(QWidget):
         """Refresh container list and clear any active filters."""
         print("🔄 Refreshing and notifying...")
         
-        # Clear search filter to show all containers
-        current_search = self.search_input.text()
-        if current_search:
-            print(f"🔄 Clearing current search filter: '{current_search}'")
-        
-        # Temporarily disconnect to prevent recursive calls
-        self.search_input.textChanged.disconnect()
-        self.search_input.setText("")  # Clear search
-        self.search_input.textChanged.connect(self.filter_table)
+        # Clear search to show all containers (without waiting for the debounce)
+        self.search_input.blockSignals(True)
+        self.search_input.setText("")
+        self.search_input.blockSignals(False)
+        self.search.set_query("", immediate=True)
         
         # Refresh the container list
         self.refresh_container_list()
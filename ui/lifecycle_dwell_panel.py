@@ -0,0 +1,177 @@
+# ui/lifecycle_dwell_panel.py
+"""
+Konteyner yaşam döngüsü - durumda kalma (dwell) süresi paneli
+Geçmiş arka planda artımlı okunur; tablo ve eğilim grafiği Agg ile çizilip gösterilir.
+"""
+
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+import numpy as np
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QSizePolicy)
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+import matplotlib.dates as mdates
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from database import DatabaseConnection, OFFLINE_MODE
+from lifecycle_analytics import DWELL_BIN_EDGES_HOURS, TREND_BUCKETS, DwellEngine
+from report_renderer import configure_plot_style, figure_rgba
+
+PERIODS = {"Son 7 Gün": 7, "Son 30 Gün": 30, "Son 90 Gün": 90, "Tümü": None}
+TREND_COLORS = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6', '#1abc9c', '#e67e22', '#ecf0f1', '#95a5a6', '#d35400', '#16a085']
+
+def _hours_text(hours):
+    if hours is None or np.isnan(hours): return "-"
+    return f"{hours / 24:.1f} g" if hours >= 48 else f"{hours:.1f} sa"
+
+class DwellAnalyticsWorker(QThread):
+    """Kendi bağlantısıyla yeni geçmiş satırlarını okuyup özeti hesaplayan uzun ömürlü thread (en son istek işlenir)"""
+
+    summary_ready = pyqtSignal(object, object)   # DwellSummary, QImage
+    failed = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.engine = DwellEngine()
+        self.condition = threading.Condition()
+        self.pending = None
+        self._stop = False
+        self.state_names = {}
+
+    def request(self, since_days, bucket_sec, size):
+        with self.condition:
+            self.pending = (since_days, bucket_sec, size)
+            self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self._stop = True
+            self.condition.notify()
+        self.wait(5000)
+
+    def run(self):
+        db = DatabaseConnection()
+        try:
+            self.state_names = {s.id: s.name for s in db.get_lifecycle_state_machine().states.values()}
+            while True:
+                with self.condition:
+                    while self.pending is None and not self._stop: self.condition.wait()
+                    if self._stop: break
+                    request, self.pending = self.pending, None
+                self._process(db, *request)
+        finally:
+            db.close_connection()
+
+    def _process(self, db, since_days, bucket_sec, size):
+        try:
+            self.engine.update(db)
+            since = datetime.now() - timedelta(days=since_days) if since_days else None
+            summary = self.engine.summary(self.state_names, since=since, bucket_sec=bucket_sec)
+            figure = Figure(figsize=(size[0] / 100, size[1] / 100), dpi=100)
+            FigureCanvasAgg(figure)
+            self._draw(figure, summary)
+            figure.canvas.draw()
+            rgba, width, height = figure_rgba(figure)
+            self.summary_ready.emit(summary, QImage(rgba, width, height, QImage.Format.Format_RGBA8888).copy())
+        except Exception as e:
+            traceback.print_exc()
+            self.failed.emit(str(e))
+
+    @staticmethod
+    def _draw(figure, summary):
+        """Solda durum bazında medyan/P90, sağda medyan bekleme süresinin zaman içindeki eğilimi"""
+        figure.clear()
+        bar_ax, trend_ax = figure.add_subplot(121), figure.add_subplot(122)
+        for ax in (bar_ax, trend_ax): configure_plot_style(figure, ax)
+        states = [s for s in summary.states if s.visits]
+        x = np.arange(len(states))
+        bar_ax.bar(x - 0.2, [s.p50_hours for s in states], 0.4, color='#3498db', label="Medyan")
+        bar_ax.bar(x + 0.2, [s.p90_hours for s in states], 0.4, color='#e74c3c', label="P90")
+        bar_ax.set_xticks(x, [s.state_name for s in states], rotation=45, ha='right', fontsize=8)
+        bar_ax.set_ylabel("Saat"); bar_ax.set_title("Durumda kalma süresi")
+        bar_ax.legend(fontsize=7, framealpha=0.4)
+
+        if summary.trend_p50.size:
+            times = [datetime.fromtimestamp(t) for t in summary.trend_starts]
+            for i, state in enumerate(summary.states):
+                if not state.visits: continue
+                trend_ax.plot(times, summary.trend_p50[i], marker='.', linewidth=1, color=TREND_COLORS[i % len(TREND_COLORS)], label=state.state_name)
+            locator = mdates.AutoDateLocator(); trend_ax.xaxis.set_major_locator(locator)
+            trend_ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+            trend_ax.legend(fontsize=6, ncol=3, loc='best', framealpha=0.4)
+        trend_ax.set_ylabel("Medyan (saat)"); trend_ax.set_title("Medyan bekleme eğilimi")
+        figure.tight_layout()
+
+class LifecycleDwellPanel(QWidget):
+    COLUMNS = ["Durum", "Ziyaret", "Ortalama", "Medyan", "P90", "P95", "En Uzun", "Şu An", "Şu Anki Ort.", "En Sık Aralık"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.worker = None
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Dönem:"))
+        self.period_combo = QComboBox(); self.period_combo.addItems(list(PERIODS)); self.period_combo.setCurrentText("Son 30 Gün")
+        self.period_combo.currentIndexChanged.connect(self.refresh)
+        controls.addWidget(self.period_combo)
+        controls.addWidget(QLabel("Eğilim:"))
+        self.bucket_combo = QComboBox(); self.bucket_combo.addItems(list(TREND_BUCKETS)); self.bucket_combo.setCurrentText("Gün")
+        self.bucket_combo.currentIndexChanged.connect(self.refresh)
+        controls.addWidget(self.bucket_combo)
+        refresh_btn = QPushButton("🔄 Yenile"); refresh_btn.clicked.connect(self.refresh)
+        controls.addWidget(refresh_btn)
+        self.status_label = QLabel("")
+        controls.addWidget(self.status_label, 1)
+        layout.addLayout(controls)
+
+        content = QHBoxLayout()
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        content.addWidget(self.table, 1)
+        self.chart_label = QLabel()
+        self.chart_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.chart_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        self.chart_label.setMinimumHeight(180)
+        content.addWidget(self.chart_label, 1)
+        layout.addLayout(content)
+
+    def refresh(self):
+        """Sadece yeni geçmiş satırlarını okuyup özeti yeniden hesapla"""
+        if OFFLINE_MODE:
+            self.status_label.setText("Çevrimdışı modda bekleme süresi analizi kullanılamaz."); return
+        if self.worker is None:
+            self.worker = DwellAnalyticsWorker()
+            self.worker.summary_ready.connect(self.on_summary_ready)
+            self.worker.failed.connect(lambda error: self.status_label.setText(f"❌ Analiz hatası: {error}"))
+            self.worker.start()
+        self.status_label.setText("⏳ Hesaplanıyor...")
+        size = (max(self.chart_label.width(), 500), max(self.chart_label.height(), 220))
+        self.worker.request(PERIODS[self.period_combo.currentText()], TREND_BUCKETS[self.bucket_combo.currentText()], size)
+
+    def on_summary_ready(self, summary, image):
+        self.chart_label.setPixmap(QPixmap.fromImage(image))
+        self.table.setRowCount(len(summary.states))
+        bin_labels = [f"{a:g}-{b:g} sa" if np.isfinite(b) else f"{a:g}+ sa" for a, b in zip(DWELL_BIN_EDGES_HOURS[:-1], DWELL_BIN_EDGES_HOURS[1:])]
+        for row, s in enumerate(summary.states):
+            values = [s.state_name, str(s.visits), _hours_text(s.mean_hours), _hours_text(s.p50_hours), _hours_text(s.p90_hours),
+                      _hours_text(s.p95_hours), _hours_text(s.max_hours), str(s.current_count), _hours_text(s.current_mean_hours),
+                      bin_labels[int(np.argmax(s.histogram))] if s.visits else "-"]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col: item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, col, item)
+        self.status_label.setText(f"{summary.history_rows:,} geçmiş kaydı, {summary.segment_count:,} dilim — {summary.elapsed * 1000:.0f} ms")
+
+    def shutdown(self):
+        if self.worker is not None:
+            self.worker.stop()
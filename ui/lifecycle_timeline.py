@@ -0,0 +1,202 @@
+# ui/lifecycle_timeline.py
+"""
+Konteyner yaşam döngüsü timeline'ı
+Geçmiş en yeniden eskiye sayfa sayfa (change_timestamp, id keyset) okunur; aşağı kaydırdıkça eski kayıtlar
+eklenir. Üstteki özet (cycle sayısı, güncel durumda geçen süre) konteynerin özet satırından gelir.
+"""
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QScrollArea, QMessageBox
+from PyQt6.QtCore import Qt, QTimer
+
+TIMELINE_PAGE_SIZE = 50
+FETCH_MARGIN_PX = 150   # kaydırma çubuğu sona bu kadar yaklaşınca sonraki sayfa istenir
+
+def _duration_text(delta):
+    if delta is None: return "-"
+    seconds = max(int(delta.total_seconds()), 0)
+    days, hours, minutes = seconds // 86400, seconds % 86400 // 3600, seconds % 3600 // 60
+    if days: return f"{days} g {hours} sa"
+    return f"{hours} sa {minutes} dk" if hours else f"{minutes} dk"
+
+class LifecycleTimeline(QWidget):
+    """Seçili konteynerin özet başlığı ve kaydırdıkça büyüyen geçmiş listesi"""
+
+    def __init__(self, db_connection, page_size=TIMELINE_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.db_connection = db_connection
+        self.page_size = page_size
+        self.container_id = None
+        self._cursor = None       # en son yüklenen (en eski) satırın (change_timestamp, id) değeri
+        self._exhausted = True
+        self._loading = False
+        self._loaded = 0
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setStyleSheet("background-color: #ecf0f1; padding: 6px; border-radius: 4px; color: #2c3e50;")
+        self.summary_label.setWordWrap(True)
+        self.summary_label.setVisible(False)
+        layout.addWidget(self.summary_label)
+
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setMinimumHeight(300)
+        content = QWidget()
+        self.items_layout = QVBoxLayout(content)
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.status_label.setStyleSheet("color: #7f8c8d; font-style: italic; padding: 10px;")
+        self.items_layout.addWidget(self.status_label)
+        self.items_layout.addStretch()
+        self.scroll_area.setWidget(content)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        self.scroll_area.verticalScrollBar().rangeChanged.connect(lambda *_: self._on_scrolled())
+        layout.addWidget(self.scroll_area)
+
+    def set_container(self, container_id):
+        """Konteyneri değiştir (ya da aynı konteyneri baştan yükle)"""
+        self.clear()
+        self.container_id = container_id
+        self._exhausted = False
+        self._load_summary()
+        self.fetch_more()
+
+    def reload(self):
+        if self.container_id is not None:
+            self.set_container(self.container_id)
+
+    def clear(self):
+        self.container_id = None
+        self._cursor = None
+        self._exhausted = True
+        self._loaded = 0
+        while self.items_layout.count() > 2:   # durum etiketi ve esneme kalır
+            child = self.items_layout.takeAt(0)
+            if child.widget(): child.widget().deleteLater()
+        self.status_label.setText("")
+        self.summary_label.setVisible(False)
+        self.scroll_area.verticalScrollBar().setValue(0)
+
+    def fetch_more(self):
+        """Bir sonraki (daha eski) sayfayı oku ve listenin sonuna ekle"""
+        if self._exhausted or self._loading or self.container_id is None: return
+        self._loading = True
+        try:
+            rows = self.db_connection.get_container_lifecycle_timeline(self.container_id, before=self._cursor, limit=self.page_size) or []
+        except Exception as e:
+            self._exhausted = True
+            QMessageBox.warning(self, "Hata", f"Timeline yüklenirken hata: {e}")
+            return
+        finally:
+            self._loading = False
+        self._exhausted = len(rows) < self.page_size
+        for row in rows:
+            self.items_layout.insertWidget(self.items_layout.count() - 2, self.create_item(row, self._loaded == 0))
+            self._loaded += 1
+        if rows:
+            self._cursor = (rows[-1]['change_timestamp'], rows[-1]['id'])
+        if not self._loaded:
+            self.status_label.setText("🔍 Bu konteyner için lifecycle geçmişi bulunamadı.")
+        elif self._exhausted:
+            self.status_label.setText(f"— {self._loaded} kaydın tamamı gösteriliyor —")
+        else:
+            self.status_label.setText(f"⬇️ {self._loaded} kayıt gösteriliyor, eski kayıtlar için kaydırın")
+        # Liste görünür alanı doldurmuyorsa kaydırma olmayacağından sıradaki sayfa hemen istenir
+        QTimer.singleShot(0, self._fill_viewport)
+
+    def _on_scrolled(self, *_):
+        bar = self.scroll_area.verticalScrollBar()
+        if bar.maximum() > 0 and bar.value() >= bar.maximum() - FETCH_MARGIN_PX:
+            self.fetch_more()
+
+    def _fill_viewport(self):
+        if self.scroll_area.widget().sizeHint().height() <= self.scroll_area.viewport().height():
+            self.fetch_more()
+
+    def _load_summary(self):
+        try:
+            summary = self.db_connection.get_container_lifecycle_summary(self.container_id)
+        except Exception as e:
+            print(f"Timeline özeti yükleme hatası: {e}")
+            summary = None
+        if not summary:
+            return
+        state = summary.get('son_durum_adi') or '-'
+        first = summary.get('ilk_degisim')
+        self.summary_label.setText(
+            f"🔁 <b>{summary.get('tamamlanan_cycle', 0)}</b> cycle &nbsp;•&nbsp; "
+            f"📍 <b>{state}</b> durumunda {_duration_text(summary.get('durumda_gecen'))} &nbsp;•&nbsp; "
+            f"🔄 {summary.get('gecis_sayisi', 0):,} geçiş"
+            + (f" &nbsp;•&nbsp; 🗓️ {first.strftime('%d/%m/%Y')} tarihinden beri" if first else ""))
+        self.summary_label.setVisible(True)
+
+    def create_item(self, history_item, is_current=False):
+        """Timeline item widget'ı oluştur"""
+        frame = QFrame()
+        frame.setFrameStyle(QFrame.Shape.Box)
+        frame.setStyleSheet(f"""
+            QFrame {{
+                border: 2px solid {'#3498db' if is_current else '#bdc3c7'};
+                border-radius: 8px;
+                margin: 5px;
+                padding: 10px;
+                background-color: {'#ecf0f1' if is_current else '#ffffff'};
+            }}
+        """)
+
+        layout = QVBoxLayout(frame)
+
+        # Başlık
+        title_layout = QHBoxLayout()
+
+        # State badge
+        state_badge = QLabel(history_item['to_state_name'])
+        state_badge.setStyleSheet(f"""
+            background-color: {history_item.get('color_code') or '#95a5a6'};
+            color: white;
+            padding: 3px 8px;
+            border-radius: 4px;
+            font-weight: bold;
+        """)
+        title_layout.addWidget(state_badge)
+
+        if is_current:
+            current_badge = QLabel("📍 GÜNCEL")
+            current_badge.setStyleSheet("color: #e74c3c; font-weight: bold;")
+            title_layout.addWidget(current_badge)
+
+        title_layout.addStretch()
+
+        # Zaman
+        time_label = QLabel(history_item['change_timestamp'].strftime("%d/%m/%Y %H:%M"))
+        time_label.setStyleSheet("color: #7f8c8d; font-size: 12px;")
+        title_layout.addWidget(time_label)
+
+        layout.addLayout(title_layout)
+
+        # Detaylar
+        if history_item.get('from_state_name'):
+            change_label = QLabel(f"➡️ {history_item['from_state_name']} → {history_item['to_state_name']}")
+        else:
+            change_label = QLabel(f"🆕 İlk durum: {history_item['to_state_name']}")
+
+        change_label.setStyleSheet("margin: 5px 0px;")
+        layout.addWidget(change_label)
+
+        # Sebep
+        if history_item.get('change_reason'):
+            reason_label = QLabel(f"💬 Sebep: {history_item['change_reason']}")
+            reason_label.setStyleSheet("font-style: italic; color: #34495e;")
+            layout.addWidget(reason_label)
+
+        # Değiştiren kişi
+        if history_item.get('changed_by'):
+            user_label = QLabel(f"👤 Değiştiren: {history_item['changed_by']}")
+            user_label.setStyleSheet("font-size: 11px; color: #7f8c8d;")
+            layout.addWidget(user_label)
+
+        return frame
@@ -9,12 +9,17 @@ import sys
 import os
 
 import config_manager
-from database import DatabaseConnection
+from database import DatabaseConnection, OFFLINE_MODE
+from job_queue import JobQueue, MOVE_CONTAINERS, SHIP_PLACEMENTS, ADD_CONTAINER, LIFECYCLE_CHANGE
+from container_index import ContainerIndexListener
+from lifecycle_states import NOTIFY_CHANNEL as LIFECYCLE_STATES_CHANNEL, shared_state_cache
+from report_renderer import REPORT_NOTIFY_CHANNEL
 from ui.port_yard_tab import PortYardTab
 from ui.ship_planning_tab import ShipPlanningTab
 from ui.transport_tab import TransportTab
 from ui.reporting_tab import ReportingTab
 from ui.ship_management_tab import ShipManagementTab
+from ui.berth_planning_tab import BerthPlanningTab
 from ui.container_management_tab import ContainerManagementTab
 
 # Global değişkenleri başlangıçta tanımla
@@ -80,6 +85,8 @@ class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.db = DatabaseConnection()
+        # Konteyner hareketleri ve döngü değişiklikleri arka planda işlenir
+        self.job_queue = JobQueue(self.db)
         
         # YENİ: Gelişmiş özellik sistemlerini başlat
         self.advanced_systems = {}
@@ -123,6 +130,10 @@ class MainWindow(QMainWindow):
             
             toolbar.addSeparator()
 
+        transport_planning_action = QAction(qta.icon('fa5s.route', color='lightgreen'), "Taşıma Ağı Planlama", self)
+        transport_planning_action.triggered.connect(self.show_transport_planning)
+        toolbar.addAction(transport_planning_action)
+
         # Butonu sağa yaslamak için bir ayırıcı (spacer) ekle
         spacer = QWidget()
         spacer.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
@@ -141,17 +152,19 @@ class MainWindow(QMainWindow):
         self.transport_tab = TransportTab(self.db, self)
         self.container_management_tab = ContainerManagementTab(self.db, self)
         self.ship_management_tab = ShipManagementTab(self.db, self)
+        self.berth_planning_tab = BerthPlanningTab(self.db, self)
         self.reporting_tab = ReportingTab(self.db)
         
         # Yeni lifecycle tab'ını ekle
         if LIFECYCLE_TAB_AVAILABLE:
-            self.container_lifecycle_tab = ContainerLifecycleTab(self.db)
+            self.container_lifecycle_tab = ContainerLifecycleTab(self.db, self.job_queue)
 
         self.tabs.addTab(self.port_yard_tab, qta.icon('fa5s.th-large', color='orange'), "Saha Planı")
         self.tabs.addTab(self.ship_planning_tab, qta.icon('fa5s.ship', color='lightblue'), "Gemi Planlama")
         self.tabs.addTab(self.transport_tab, qta.icon('fa5s.truck', color='lightgreen'), "Taşıma Planlama")
         self.tabs.addTab(self.container_management_tab, qta.icon('fa5s.box-open', color='brown'), "Konteyner Yönetimi")
         self.tabs.addTab(self.ship_management_tab, qta.icon('fa5s.anchor', color='purple'), "Gemi Yönetimi")
+        self.tabs.addTab(self.berth_planning_tab, qta.icon('fa5s.calendar-alt', color='teal'), "Rıhtım Planı")
         self.tabs.addTab(self.reporting_tab, qta.icon('fa5s.chart-bar', color='yellow'), "Raporlama")
         
         # Lifecycle tab'ını ekle
@@ -159,6 +172,32 @@ class MainWindow(QMainWindow):
             self.tabs.addTab(self.container_lifecycle_tab, qta.icon('fa5s.recycle', color='cyan'), "Konteyner Döngüsü")
         
         self.tabs.currentChanged.connect(self.tab_changed)
+
+        # İş kuyruğu: tamamlanan işler sonrası sadece işin etkilediği sekmeler toplu olarak bir kez yenilenir
+        from PyQt6.QtCore import QTimer
+        self.job_refresh_tabs = {
+            MOVE_CONTAINERS: [self.port_yard_tab, self.ship_planning_tab, self.transport_tab, self.container_management_tab],
+            SHIP_PLACEMENTS: [self.port_yard_tab, self.ship_planning_tab, self.transport_tab, self.container_management_tab, self.ship_management_tab],
+            ADD_CONTAINER: [self.port_yard_tab, self.ship_planning_tab, self.transport_tab, self.container_management_tab],
+            LIFECYCLE_CHANGE: [self.container_management_tab],   # lifecycle sekmesi kendi sonucunu işler
+        }
+        self.pending_job_refresh = []
+        self.job_refresh_timer = QTimer(self)
+        self.job_refresh_timer.setSingleShot(True)
+        self.job_refresh_timer.setInterval(300)
+        self.job_refresh_timer.timeout.connect(self.refresh_job_tabs)
+        self.job_queue.job_completed.connect(lambda *_: self.reporting_tab.invalidate_cache())
+        self.job_queue.job_completed.connect(lambda job_id, job_type, result: self.schedule_job_refresh(job_type))
+        self.job_queue.job_failed.connect(self.on_job_failed)
+        self.job_queue.pending_changed.connect(self.on_job_queue_changed)
+        self.job_queue.start()
+        # Konteyner ID indeksi (önek tamamlama, varlık kontrolünde Bloom süzgeci) arka planda yüklenip güncel tutulur;
+        # aynı bağlantı lifecycle durum/geçiş tablolarındaki değişiklikleri dinleyip durum makinesi önbelleğini düşürür,
+        # rapor tablolarındaki yazmalarla da rapor önbelleğinin veri sürümünü artırır
+        self.container_index_listener = None if OFFLINE_MODE else ContainerIndexListener(
+            DatabaseConnection, channels={LIFECYCLE_STATES_CHANNEL: shared_state_cache().invalidate,
+                                          REPORT_NOTIFY_CHANNEL: self.reporting_tab.versions.bump})
+        if self.container_index_listener: self.container_index_listener.start()
         
         # YENİ: Ana pencere gösterildikten sonra düzeltme
         from PyQt6.QtCore import QTimer
@@ -315,25 +354,42 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.information(self, "Bilgi", "Veri içe/dışa aktarım sistemi henüz mevcut değil.")
 
-    # NOTE: Transport Planning geçici olarak devre dışı (QThread destroyed hatası)
-    # def show_transport_planning(self):
-    #     """Gelişmiş taşıma planlama sistemini göster."""
-    #     QMessageBox.information(self, "Geçici Olarak Devre Dışı", 
-    #         "Gelişmiş Taşıma Planlama özelliği şu anda QThread hatası nedeniyle\n"
-    #         "geçici olarak devre dışı bırakılmıştır.\n\n"
-    #         "Diğer özellikler normal şekilde çalışmaktadır.")
+    def show_transport_planning(self):
+        """Gelişmiş taşıma planlama sistemini göster."""
+        from transport_planner import TransportPlanner
+        from ui.transport_planning_dialog import TransportPlanningDialog
+        # Ağ ve rota önbelleği pencere kapansa da korunur
+        if 'transport_planner' not in self.advanced_systems:
+            self.advanced_systems['transport_planner'] = TransportPlanner(self.db)
+        dialog = TransportPlanningDialog(self.advanced_systems['transport_planner'], self)
+        dialog.exec()
 
     def refresh_all_tabs(self):
         print("Tüm sekmeler yenileniyor...")
         for i in range(self.tabs.count()):
-            widget = self.tabs.widget(i)
-            if hasattr(widget, 'refresh_all'): widget.refresh_all()
-            elif hasattr(widget, 'refresh_view'): widget.refresh_view()
-            elif hasattr(widget, 'refresh_lists'): widget.refresh_lists()
-            elif hasattr(widget, 'generate_report'): widget.generate_report()
-            elif hasattr(widget, 'refresh_ships_list'): widget.refresh_ships_list()
-            elif hasattr(widget, 'refresh_container_list'): widget.refresh_container_list()
-            elif hasattr(widget, 'load_data'): widget.load_data()  # Lifecycle tab için
+            self._refresh_tab(self.tabs.widget(i))
+
+    def _refresh_tab(self, widget):
+        if hasattr(widget, 'refresh_all'): widget.refresh_all()
+        elif hasattr(widget, 'refresh_view'): widget.refresh_view()
+        elif hasattr(widget, 'refresh_lists'): widget.refresh_lists()
+        elif hasattr(widget, 'generate_report'): widget.generate_report()
+        elif hasattr(widget, 'refresh_ships_list'): widget.refresh_ships_list()
+        elif hasattr(widget, 'refresh_container_list'): widget.refresh_container_list()
+        elif hasattr(widget, 'load_data'): widget.load_data()  # Lifecycle tab için
+
+    def schedule_job_refresh(self, job_type):
+        """İşin etkilediği sekmeleri biriktir; kısa süre içinde biten işler için tek yenileme yapılır"""
+        for widget in self.job_refresh_tabs.get(job_type, []):
+            if widget not in self.pending_job_refresh: self.pending_job_refresh.append(widget)
+        if self.pending_job_refresh: self.job_refresh_timer.start()
+
+    def refresh_job_tabs(self):
+        widgets, self.pending_job_refresh = self.pending_job_refresh, []
+        for widget in widgets:
+            # Otomatik yenileme kullanıcının planladığı (henüz kaydedilmemiş) işlemleri silmemeli
+            if hasattr(widget, 'refresh_after_job'): widget.refresh_after_job()
+            else: self._refresh_tab(widget)
         
     def tab_changed(self, index):
         """Tab değiştiğinde düzeltme yap"""
@@ -366,7 +422,26 @@ class MainWindow(QMainWindow):
         except Exception as e:
             print(f"⚠️  Show event hatası: {e}")
 
+    def on_job_queue_changed(self, pending):
+        if pending: self.statusBar().showMessage(f"⏳ {pending} işlem kuyrukta...")
+        else: self.statusBar().showMessage("✅ Kuyruktaki tüm işlemler tamamlandı.", 3000)
+
+    def on_job_failed(self, job_id, job_type, error):
+        print(f"❌ İş #{job_id} ({job_type}) başarısız: {error}")
+        self.statusBar().showMessage(f"❌ İşlem başarısız: {error}", 8000)
+        self.schedule_job_refresh(job_type)
+
     def closeEvent(self, event):
+        self.job_queue.stop()
+        self.reporting_tab.shutdown()
+        self.container_management_tab.shutdown()
+        self.transport_tab.shutdown()
+        self.ship_planning_tab.shutdown()
+        if self.container_index_listener: self.container_index_listener.stop()
+        if LIFECYCLE_TAB_AVAILABLE:
+            self.container_lifecycle_tab.shutdown()
+        if 'telemetry' in self.advanced_systems:
+            self.advanced_systems['telemetry'].stop()
         if self.db:
             self.db.close_connection()
         event.accept()
\ No newline at end of file
@@ -13,6 +13,7 @@ from PyQt6.QtCore import Qt, QRectF, QPoint
 import qtawesome as qta
 import config_manager
 from utils import parse_container_type
+from job_queue import MOVE_CONTAINERS
 from ui.common.dialogs import ContainerDetailDialog
 from ui.common.widgets import InteractiveRectItem
 
@@ -342,13 +343,20 @@ class PortYardTab(QWidget):
         container = self.pending_placement['container']
         coords = self.pending_placement.get('coords') or self.pending_placement.get('to_coords')
         new_loc = f"{coords[0]}-{coords[1]}-{coords[2]}"
-        if self.db.update_container_yard_location(container['id'], new_loc):
-            QMessageBox.information(self, "Başarılı", "İşlem başarıyla kaydedildi.")
-            self.main_window.refresh_all_tabs()
-        else:
-            QMessageBox.critical(self, "Hata", "İşlem sırasında bir veritabanı hatası oluştu.")
+        # Yazma işlemi arka plandaki iş kuyruğunda yapılır, sekmeler iş bitince yenilenir
+        job_id = self.main_window.job_queue.submit(MOVE_CONTAINERS, {'moves': [{'container_id': container['id'], 'destination': ['YARD', new_loc]}]},
+                                                   key=container['id'], callback=self._on_move_finished)
+        if job_id is None:
+            QMessageBox.critical(self, "Hata", "İşlem kuyruğa eklenemedi, veritabanı bağlantısını kontrol edin.")
         self.cancel_actions()
 
+    def _on_move_finished(self, result):
+        if not result.get('success'):
+            QMessageBox.critical(self, "Hata", f"İşlem sırasında bir veritabanı hatası oluştu.\n{result.get('error') or ''}")
+        elif result.get('conflicts'):
+            conflict = result['conflicts'][0]
+            QMessageBox.warning(self, "Çakışma", f"'{conflict['container_id']}' taşınamadı: {conflict['reason']}")
+
     def cancel_actions(self):
         self.pending_placement, self.active_relocation_container = {}, None
         self.refresh_view()
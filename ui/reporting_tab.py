@@ -1,26 +1,130 @@
 # ui/reporting_tab.py (Yeni Grafik Eklenmiş ve Hataları Giderilmiş Tam Hali)
 
-import io
+import threading
+import traceback
 from datetime import datetime
 import csv 
+import psycopg2
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QComboBox, 
     QPushButton, QLabel, QFileDialog, QMessageBox, QDateEdit, QGridLayout, QSizePolicy
 )
-from PyQt6.QtCore import QDate, Qt
+from PyQt6.QtCore import QDate, Qt, QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
 import qtawesome as qta
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas as pdf_canvas
-from reportlab.lib.utils import ImageReader
+from database import DatabaseConnection
+from report_renderer import (REPORT_NOTIFY_CHANNEL, REPORT_TYPES, REPORT_TABLES, RenderedReport, ReportCache, ReportDataVersions,
+                             export_report_pdf, fetch_report_data, figure_rgba, render_report, report_source_tables)
+
+_MISSING = object()
+
+class ReportWorker(QThread):
+    """
+    Rapor verisini kendi bağlantısıyla okuyup grafiği Agg ile çizen uzun ömürlü thread.
+    Sadece en son istek işlenir; yeni istek gelince süren sorgu connection.cancel() ile iptal edilir
+    ve eski sonuçlar gönderilmez.
+    """
+
+    report_ready = pyqtSignal(int, object, object)   # istek no, RenderedReport (değişmediyse None), QImage
+    report_failed = pyqtSignal(int, str)
+
+    def __init__(self, cache: ReportCache, versions: ReportDataVersions):
+        super().__init__()
+        self.cache = cache
+        self.versions = versions
+        self.condition = threading.Condition()
+        self.pending = None
+        self._fetching = False
+        self._cancel_sent = False   # okuma sürerken iptal gönderildi: okunan veri eksik olabilir
+        self._stop = False
+        self.db = None
+        self.last_rendered = None
+
+    def request(self, request_id, report_type, filters, size):
+        with self.condition:
+            self.pending = (request_id, report_type, filters, size)
+            self._cancel_fetch()
+            self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self._stop = True
+            self._cancel_fetch()
+            self.condition.notify()
+        self.wait(5000)
+
+    def _cancel_fetch(self):
+        if self._fetching and self.db is not None and self.db.conn:
+            self._cancel_sent = True
+            try: self.db.conn.cancel()
+            except psycopg2.Error: pass
+
+    def _is_stale(self):
+        with self.condition:
+            return self.pending is not None or self._stop
+
+    def run(self):
+        self.db = DatabaseConnection()
+        if self.db.conn and not self.db.ensure_report_change_events(report_source_tables(), REPORT_NOTIFY_CHANNEL):
+            self.versions = None   # sürüm izlenemiyor: her istek veritabanından okunur
+        try:
+            while True:
+                with self.condition:
+                    while self.pending is None and not self._stop: self.condition.wait()
+                    if self._stop: break
+                    request, self.pending = self.pending, None
+                self._process(*request)
+        finally:
+            self.db.close_connection()
+
+    def _process(self, request_id, report_type, filters, size):
+        try:
+            # Sürüm sorgudan önce alınır: okuma sırasında gelen değişiklik sürümü artırır, eski veri yeni anahtarla eşleşmez
+            version = self.versions.get(REPORT_TABLES.get(report_type, ())) if self.versions else None
+            key = ReportCache.make_key(report_type, filters, version) if version is not None else None
+            if key is not None and (key, size) == self.last_rendered:
+                self.report_ready.emit(request_id, None, None); return
+            data = self.cache.get(key, _MISSING) if key is not None else _MISSING
+            if data is _MISSING:
+                with self.condition: self._fetching, self._cancel_sent = True, False
+                try:
+                    data = fetch_report_data(self.db, report_type, filters)
+                finally:
+                    with self.condition: self._fetching, cancelled = False, self._cancel_sent
+                # İptal gönderildiyse sorgulardan biri yarıda kesilmiş ve hata yutulmuş olabilir: sonuç ne önbelleğe alınır ne çizilir
+                if cancelled: return
+                # False: sorgu hatası, None: veri yok/okunamadı; ikisi de önbelleğe alınmaz
+                if key is not None and data is not False and data is not None: self.cache.put(key, data)
+            if self._is_stale(): return
+            figure = render_report(report_type, data, filters, *size)
+            rgba, width, height = figure_rgba(figure)
+            image = QImage(rgba, width, height, QImage.Format.Format_RGBA8888).copy()
+            if self._is_stale(): return
+            self.last_rendered = (key, size) if key is not None and data is not False and data is not None else None
+            self.report_ready.emit(request_id, RenderedReport(report_type, filters, data, figure), image)
+        except psycopg2.extensions.QueryCanceledError:
+            pass   # yerine daha yeni bir istek geldi
+        except Exception as e:
+            traceback.print_exc()
+            self.report_failed.emit(request_id, str(e))
 
 class ReportingTab(QWidget):
+    REQUEST_DEBOUNCE_MS = 150
+
     def __init__(self, db_connection, parent=None):
         super().__init__(parent)
         self.db = db_connection
-        self.figure = Figure() 
-        self.canvas = FigureCanvas(self.figure) 
+        self.report = None               # son çizilen rapor (dışa aktarma için)
+        self.cache = ReportCache()
+        self.versions = ReportDataVersions()   # ana penceredeki dinleyici REPORT_NOTIFY_CHANNEL bildirimlerini buraya iletir
+        self.request_id = 0
+        self.worker = ReportWorker(self.cache, self.versions)
+        self.worker.report_ready.connect(self.on_report_ready)
+        self.worker.report_failed.connect(self.on_report_failed)
+        self.worker.start()
+        self.request_timer = QTimer(self); self.request_timer.setSingleShot(True)
+        self.request_timer.setInterval(self.REQUEST_DEBOUNCE_MS)
+        self.request_timer.timeout.connect(self._submit_request)
         self.init_ui()
 
     def init_ui(self):
@@ -32,10 +136,7 @@ class ReportingTab(QWidget):
         
         control_panel.addWidget(QLabel("Rapor Türü:"), 0, 0)
         self.report_combo = QComboBox()
-        self.report_combo.addItems([
-            "Saha Doluluk Oranı", "Gemi Bazında Doluluk Oranı", "Konteyner Tipi Dağılımı", 
-            "Liman Trafik Hacmi", "Varış Limanlarına Göre Dağılım", "Araç Kullanım Verileri" 
-        ])
+        self.report_combo.addItems(REPORT_TYPES)
         self.report_combo.currentIndexChanged.connect(self.update_filter_options)
         control_panel.addWidget(self.report_combo, 0, 1, 1, 3)
         
@@ -78,9 +179,17 @@ class ReportingTab(QWidget):
         self.export_pdf_button.clicked.connect(self.export_to_pdf)
         self.export_excel_button.clicked.connect(self.export_to_excel)
         
+        # Grafik arka planda Agg ile çizilir, burada sadece görüntüsü gösterilir
+        self.chart_label = QLabel()
+        self.chart_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.chart_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        self.chart_label.setStyleSheet("background-color: #2c3e50;")
+        self.status_label = QLabel("")
+
         layout.addLayout(control_panel)
         layout.addLayout(button_layout)
-        layout.addWidget(self.canvas) 
+        layout.addWidget(self.chart_label, 1)
+        layout.addWidget(self.status_label)
         self.update_filter_options() 
 
     def update_filter_options(self):
@@ -103,7 +212,7 @@ class ReportingTab(QWidget):
             self.filter_combo_label.setText("Yerleşim Yeri:"); self.filter_combo_label.show(); self.filter_combo.show()
             self.filter_combo.addItems(["SAHA", "GEMI", "ATANMAMIS"])
             self.filter_combo.currentIndexChanged.connect(self.on_location_type_changed_for_container_type)
-        elif report_type in ["Liman Trafik Hacmi", "Araç Kullanım Verileri"]:
+        elif report_type in ["Liman Trafik Hacmi", "Araç Kullanım Verileri", "Araç Verimlilik Analizi"]:
             self.start_date_label.show(); self.start_date_edit.show()
             self.end_date_label.show(); self.end_date_edit.show()
             if report_type == "Liman Trafik Hacmi":
@@ -130,95 +239,56 @@ class ReportingTab(QWidget):
             self.filter_combo_2_label.hide(); self.filter_combo_2.hide()
 
     def generate_report(self):
+        """Rapor isteğini kısa bir gecikmeyle arka plandaki çizim thread'ine gönder (art arda değişiklikler birleştirilir)"""
         if not self.db.conn: return
-        report_type = self.report_combo.currentText()
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        self._configure_plot_style(ax)
+        self.status_label.setText("⏳ Rapor hazırlanıyor...")
+        self.request_timer.start()
 
-        start_date = self.start_date_edit.date().toString(Qt.DateFormat.ISODate) 
-        end_date = self.end_date_edit.date().toString(Qt.DateFormat.ISODate) 
-        
-        filter1_data = self.filter_combo.currentData(); filter1_text = self.filter_combo.currentText()
-        filter2_data = self.filter_combo_2.currentData()
-
-        data = None
-        if report_type == "Saha Doluluk Oranı":
-            data = self.db.get_report_data(); self.plot_pie_chart(ax, data.get('occupancy_rate', 0), "Saha Doluluk Oranı")
-        elif report_type == "Gemi Bazında Doluluk Oranı":
-            data = self.db.get_ship_occupancy_data(ship_id=filter1_data)
-            if data and len(data) == 1: self.plot_pie_chart(ax, data[0]['doluluk_orani'], f"{data[0]['gemi_adi']} Doluluk Oranı")
-            elif data: self.plot_bar_chart(ax, [d['gemi_adi'] for d in data], [d['doluluk_orani'] for d in data], "Gemi Doluluk Oranları", "Doluluk Oranı (%)")
-        elif report_type == "Konteyner Tipi Dağılımı":
-            data = self.db.get_container_type_distribution_data(location_type=filter1_text, ship_id=filter2_data)
-            if data: self.plot_bar_chart(ax, [d['tip'] for d in data], [d['count'] for d in data], "Konteyner Tipi Dağılımı", "Konteyner Sayısı")
-        elif report_type == "Liman Trafik Hacmi":
-            data = self.db.get_port_traffic_data(start_date=start_date, end_date=end_date, traffic_type=filter1_text)
-            if data: self.plot_bar_chart(ax, [d.get('liman', 'Bilinmiyor') for d in data], [d['count'] for d in data], "Liman Trafik Hacmi", "Konteyner Sayısı")
-        elif report_type == "Varış Limanlarına Göre Dağılım":
-            data = self.db.get_destination_port_distribution()
-            if data: self.plot_bar_chart(ax, [d['varis_limani'] for d in data], [d['count'] for d in data], "Varış Limanlarına Göre Konteyner Dağılımı", "Konteyner Sayısı")
-        elif report_type == "Araç Kullanım Verileri":
-            data = self.db.get_vehicle_usage_data(start_date=start_date, end_date=end_date, vehicle_type=filter1_text)
-            if data:
-                # Eğer işlem sayısı sıfırsa (taşıma logu yoksa), araç durumunu göster
-                if all(d.get('islem_sayisi', 0) == 0 for d in data):
-                    # Araç durumuna göre sınıflandır
-                    durum_counts = {}
-                    for d in data:
-                        durum = d.get('durum', 'BİLİNMİYOR')
-                        if durum not in durum_counts:
-                            durum_counts[durum] = 0
-                        durum_counts[durum] += 1
-                    
-                    if durum_counts:
-                        self.plot_bar_chart(ax, list(durum_counts.keys()), list(durum_counts.values()), 
-                                          f"Araç Durumu Dağılımı ({filter1_text})", "Araç Sayısı")
-                    else:
-                        ax.text(0.5, 0.5, "Bu Rapor İçin Veri Bulunamadı", ha='center', va='center', transform=ax.transAxes, color='white', fontsize=14)
-                else:
-                    # İşlem sayısına göre göster
-                    labels = [f"{d.get('arac_tipi', 'Bilinmiyor')}-{d.get('arac_id', 'N/A')}" for d in data]
-                    self.plot_bar_chart(ax, labels, [d['islem_sayisi'] for d in data], 
-                                      f"Araç Kullanım İstatistikleri ({filter1_text})", "İşlem Sayısı")
-            else:
-                ax.text(0.5, 0.5, "Bu Rapor İçin Veri Bulunamadı", ha='center', va='center', transform=ax.transAxes, color='white', fontsize=14)
+    def current_filters(self):
+        return {
+            'start_date': self.start_date_edit.date().toString(Qt.DateFormat.ISODate),
+            'end_date': self.end_date_edit.date().toString(Qt.DateFormat.ISODate),
+            'filter1_data': self.filter_combo.currentData(), 'filter1_text': self.filter_combo.currentText(),
+            'filter2_data': self.filter_combo_2.currentData(),
+        }
+
+    def _submit_request(self):
+        self.request_id += 1
+        size = (max(self.chart_label.width(), 400), max(self.chart_label.height(), 300))
+        self.worker.request(self.request_id, self.report_combo.currentText(), self.current_filters(), size)
+
+    def on_report_ready(self, request_id, report, image):
+        if request_id != self.request_id: return   # eski istek
+        self.status_label.setText("")
+        if report is None: return                  # veri ve boyut değişmedi, mevcut görüntü geçerli
+        self.report = report
+        self.chart_label.setPixmap(QPixmap.fromImage(image))
 
-        if not data: ax.text(0.5, 0.5, "Bu Rapor İçin Veri Bulunamadı", ha='center', va='center', transform=ax.transAxes, color='white', fontsize=14)
-        self.canvas.draw()
+    def on_report_failed(self, request_id, error):
+        if request_id == self.request_id: self.status_label.setText(f"❌ Rapor oluşturulamadı: {error}")
 
-    def plot_pie_chart(self, ax, value, title):
-        value = value or 0
-        dolu = min(value, 100); bos = 100 - dolu
-        ax.pie([dolu, bos], labels=['Dolu', 'Boş'], autopct='%1.1f%%', startangle=90, colors=['#e74c3c', '#2ecc71'], textprops={'color':"w"})
-        ax.set_title(title); ax.axis('equal')
+    def invalidate_cache(self):
+        """Yazma işlemlerinden sonra önbelleği temizle"""
+        self.cache.invalidate()
+        self.worker.last_rendered = None
 
-    def plot_bar_chart(self, ax, labels, values, title, ylabel):
-        ax.bar(labels, values, color='#3498db')
-        ax.set_title(title); ax.set_ylabel(ylabel); ax.tick_params(axis='x', rotation=45)
-        self.figure.tight_layout()
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.db.conn: self.request_timer.start()
 
-    def _configure_plot_style(self, ax):
-        ax.set_facecolor('#34495e'); self.figure.set_facecolor('#2c3e50')
-        ax.tick_params(axis='x', colors='white'); ax.tick_params(axis='y', colors='white')
-        for spine in ax.spines.values(): spine.set_edgecolor('white')
-        ax.yaxis.label.set_color('white'); ax.xaxis.label.set_color('white'); ax.title.set_color('white')
+    def shutdown(self):
+        self.request_timer.stop()
+        self.worker.stop()
 
     def export_to_pdf(self):
         file_path, _ = QFileDialog.getSaveFileName(self, "PDF Olarak Kaydet", f"Rapor_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf", "PDF Dosyaları (*.pdf)")
         if not file_path: return
+        if self.report is None:
+            QMessageBox.warning(self, "Uyarı", "Dışa aktarılacak rapor henüz oluşturulmadı."); return
         try:
-            img_data = io.BytesIO()
-            self.figure.savefig(img_data, format='png', dpi=300, facecolor=self.figure.get_facecolor(), bbox_inches='tight')
-            img_data.seek(0); img_reader = ImageReader(img_data)
-            c = pdf_canvas.Canvas(file_path, pagesize=letter); width, height = letter
-            c.setFont("Helvetica-Bold", 18); c.drawCentredString(width / 2.0, height - 50, "Liman Yönetim Sistemi Raporu")
-            c.setFont("Helvetica", 12); c.drawString(72, height - 80, f"Rapor Türü: {self.report_combo.currentText()}")
-            c.drawString(72, height - 100, f"Oluşturma Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            img_width, img_height = 500, 350; img_x = (width - img_width) / 2; img_y = height - 150 - img_height - 50
-            c.drawImage(img_reader, img_x, img_y, width=img_width, height=img_height, preserveAspectRatio=True)
-            c.save()
-            QMessageBox.information(self, "Başarılı", f"Rapor başarıyla '{file_path}' adresine kaydedildi.")
+            # Vektörel, çok sayfalı PDF: grafik sayfası + veri tablosu sayfaları
+            pages = export_report_pdf(file_path, [(self.report.report_type, self.report.data, self.report.filters)])
+            QMessageBox.information(self, "Başarılı", f"Rapor ({pages} sayfa) başarıyla '{file_path}' adresine kaydedildi.")
         except Exception as e:
             QMessageBox.critical(self, "Hata", f"PDF oluşturulurken bir hata oluştu:\n{e}")
     def export_to_excel(self):
@@ -4,17 +4,35 @@ from PyQt6.QtWidgets import (
     QWidget, QHBoxLayout, QVBoxLayout, QSplitter, QLabel,
     QListWidget, QListWidgetItem, QGraphicsView, QGraphicsScene,
     QPushButton, QMessageBox, QFormLayout,QLineEdit, QGraphicsSimpleTextItem,
-    QMenu, QComboBox, QFrame
+    QMenu, QComboBox, QFrame, QSpinBox, QTreeWidget, QTreeWidgetItem
 )
 from PyQt6.QtGui import QFont, QBrush, QColor, QPen
-from PyQt6.QtCore import Qt, QRectF, QPoint
+from PyQt6.QtCore import Qt, QRectF, QPoint, QTimer
 
 import qtawesome as qta
 import config_manager
-from utils import parse_container_type
+from ship_occupancy import ShipOccupancyGrid
+from stowage_planner import StowagePlanner, default_port_rotation, stowage_plan_payload
+from overstow_analysis import analyze_overstows
+from crane_sequencer import CraneSequencer, ship_move_lists
+from job_queue import SHIP_PLACEMENTS
+from ui.common.background_tasks import BackgroundTaskRunner
 from ui.common.dialogs import ContainerDetailDialog
 from ui.common.widgets import InteractiveRectItem
 
+AUTO_PLAN_VIEW = 'auto_plan'
+
+class AutoPlanTask:
+    """Gemi slotlarını okuyup otomatik istif planını hesaplayan görev (BackgroundTaskRunner'da kendi bağlantısıyla çalışır)"""
+
+    def __init__(self, ship, port_rotation, candidates, time_budget=5.0):
+        self.ship, self.port_rotation, self.candidates, self.time_budget = ship, port_rotation, candidates, time_budget
+
+    def __call__(self, ctx):
+        slots = ctx.db.get_all_ship_slots(self.ship['gemi_id'])
+        ctx.checkpoint()
+        return StowagePlanner(self.ship, slots, self.port_rotation).plan(self.candidates, time_budget=self.time_budget)
+
 class ShipPlanningTab(QWidget):
     def __init__(self, db_connection, main_window, parent=None):
         super().__init__(parent)
@@ -22,10 +40,19 @@ class ShipPlanningTab(QWidget):
         self.BAYS, self.ROWS_PER_BAY, self.TIERS_PER_BAY = [], 0, 0
         self.current_view, self.current_bay = 'OVERVIEW', None
         self.all_loadable_containers, self.pending_placements = [], {}
-        self.filled_ship_slots = {} 
+        self.loadable_by_id = {}
+        self.filled_ship_slots = {}  # bay_id -> {(sıra, kat): konteyner}, bay açıldıkça doldurulan önbellek
+        self.bay_summary, self.ships_by_id = {}, {}
+        self.occupancy = None
+        self.overstow_report = None
+        self.crane_base_slots = None  # vinç planı için tüm gemi slotları (ilk ihtiyaçta yüklenir)
         self.active_container_for_placement = None
         self.active_relocation_container, self.pending_relocation_from_coords = None, None
+        self._refresh_deferred = False  # planlanmış işlem varken gelen iş sonu yenilemesi
         self.current_ship_id, self.current_ship_details = None, {}
+        self.tasks = BackgroundTaskRunner(db_connection, parent=self)
+        self.tasks.task_finished.connect(lambda view, plan: self._on_auto_plan_ready(plan) if view == AUTO_PLAN_VIEW else None)
+        self.tasks.task_failed.connect(lambda view, error: self._on_auto_plan_failed(error) if view == AUTO_PLAN_VIEW else None)
         self.init_ui()
 
     def init_ui(self):
@@ -45,10 +72,20 @@ class ShipPlanningTab(QWidget):
         filter_layout.addRow("Konteyner Tipi:", self.type_filter_combo); filter_layout.addRow("Varış Limanı:", self.dest_filter_combo)
         self.type_filter_combo.currentIndexChanged.connect(self._filter_and_populate_list)
         self.dest_filter_combo.currentIndexChanged.connect(self._filter_and_populate_list)
+        self.port_rotation_edit = QLineEdit(); self.port_rotation_edit.setPlaceholderText("Örn: HAMBURG, ROTTERDAM, ISTANBUL")
+        self.port_rotation_edit.editingFinished.connect(self.on_port_rotation_changed)
+        filter_layout.addRow("Liman Rotası:", self.port_rotation_edit)
         left_layout.addWidget(filter_frame)
         left_layout.addWidget(QLabel("Yüklenecek Konteyneri Seçin"))
         self.container_list = QListWidget(); self.container_list.itemClicked.connect(self.on_container_selected_for_planning)
         left_layout.addWidget(self.container_list)
+        self.auto_plan_button = QPushButton(qta.icon('fa5s.magic', color='orange'), " Otomatik Planla"); self.auto_plan_button.clicked.connect(self.auto_plan_ship)
+        left_layout.addWidget(self.auto_plan_button)
+        crane_layout = QHBoxLayout(); crane_layout.addWidget(QLabel("Vinç Sayısı:"))
+        self.crane_spin = QSpinBox(); self.crane_spin.setRange(1, 12); self.crane_spin.setValue(2); self.crane_spin.valueChanged.connect(self._refresh_crane_plan)
+        crane_layout.addWidget(self.crane_spin)
+        self.crane_plan_button = QPushButton(qta.icon('fa5s.stream', color='lightblue'), " Vinç Planı"); self.crane_plan_button.setCheckable(True); self.crane_plan_button.toggled.connect(self.toggle_crane_plan)
+        crane_layout.addWidget(self.crane_plan_button); left_layout.addLayout(crane_layout)
         right_panel = QWidget(); right_layout = QVBoxLayout(right_panel)
         header_layout = QHBoxLayout()
         self.back_button = QPushButton(qta.icon('fa5s.arrow-left', color='white'), " Geri"); self.back_button.clicked.connect(self.go_back); self.back_button.setVisible(False)
@@ -65,7 +102,11 @@ class ShipPlanningTab(QWidget):
         legend_layout.addWidget(self._create_legend_item(config_manager.get_color("filled"), "Standart"))
         legend_layout.addWidget(self._create_legend_item(config_manager.get_color("pending"), "Beklemede"))
         legend_layout.addWidget(self._create_legend_item(config_manager.get_color("placeable"), "Uygun Slot"))
+        legend_layout.addWidget(self._create_legend_item(config_manager.get_color("overstow"), "Overstow"))
         legend_layout.addStretch(); right_layout.addLayout(legend_layout)
+        self.overstow_label = QLabel(); self.overstow_label.setAlignment(Qt.AlignmentFlag.AlignCenter); right_layout.addWidget(self.overstow_label)
+        self.crane_tree = QTreeWidget(); self.crane_tree.setHeaderLabels(["Vinç / Sıra", "Bay", "Hareket", "Zaman"]); self.crane_tree.setMaximumHeight(220); self.crane_tree.setVisible(False)
+        right_layout.addWidget(self.crane_tree)
         action_button_layout = QHBoxLayout()
         self.confirm_button = QPushButton(qta.icon('fa5s.check', color='lightgreen'), " Planı Onayla"); self.confirm_button.clicked.connect(self.confirm_actions)
         self.cancel_button = QPushButton(qta.icon('fa5s.times', color='red'), " İptal"); self.cancel_button.clicked.connect(self.cancel_actions)
@@ -78,9 +119,17 @@ class ShipPlanningTab(QWidget):
         widget = QWidget(); layout = QHBoxLayout(widget); color_label = QLabel(); color_label.setFixedSize(15, 15)
         color_label.setStyleSheet(f"background-color: {color.name()}; border: 1px solid white;"); layout.addWidget(color_label); layout.addWidget(QLabel(text)); layout.setContentsMargins(0,0,0,0)
         return widget
+    def has_staged_actions(self):
+        return bool(self.pending_placements or self.active_relocation_container or self.active_container_for_placement)
+    def refresh_after_job(self):
+        # Arka plandaki iş bitince çağrılır: planlanmış işlem varsa yenileme, kullanıcı kaydedene/iptal edene kadar ertelenir
+        if self.has_staged_actions(): self._refresh_deferred = True; return
+        self.refresh_all()
     def refresh_all(self):
         if not self.db.conn: return
+        self._refresh_deferred = False
         self.all_loadable_containers = self.db.get_all_loadable_containers() or []
+        self.loadable_by_id = {c['id']: c for c in self.all_loadable_containers}
         self._populate_filters(); self._populate_ship_combo()
     def _populate_filters(self):
         self.type_filter_combo.blockSignals(True); self.dest_filter_combo.blockSignals(True)
@@ -102,6 +151,7 @@ class ShipPlanningTab(QWidget):
                 item = QListWidgetItem(f"{c['id']} ({c['tip']})"); item.setData(Qt.ItemDataRole.UserRole, c); self.container_list.addItem(item)
     def _populate_ship_combo(self):
         ships = self.db.get_all_ships(); current_id = self.current_ship_id
+        self.ships_by_id = {ship['gemi_id']: ship for ship in ships or []}
         self.ship_combo.blockSignals(True); self.ship_combo.clear()
         if not ships: self.ship_combo.addItem("Gemi Yok"); self.ship_combo.blockSignals(False); self.on_ship_selected(-1); return
         for ship in ships: self.ship_combo.addItem(f"{ship['gemi_adi']} ({ship['gemi_id']})", ship['gemi_id'])
@@ -111,17 +161,31 @@ class ShipPlanningTab(QWidget):
         if index == -1 or not self.db.conn: self.current_ship_id, self.current_ship_details = None, {}; self.BAYS, self.ROWS_PER_BAY, self.TIERS_PER_BAY = [], 0, 0
         else:
             self.current_ship_id = self.ship_combo.itemData(index)
-            self.current_ship_details = self.db.execute_query("SELECT * FROM public.gemiler WHERE gemi_id=%s", (self.current_ship_id,), fetchone=True)
+            self.current_ship_details = self.ships_by_id.get(self.current_ship_id) or self.db.execute_query("SELECT * FROM public.gemiler WHERE gemi_id=%s", (self.current_ship_id,), fetchone=True)
             if self.current_ship_details:
                 self.BAYS = [f"B{i:02d}" for i in range(1, self.current_ship_details.get('toplam_bay_sayisi', 0) + 1)]
                 self.ROWS_PER_BAY = self.current_ship_details.get('toplam_sira_sayisi', 0)
                 self.TIERS_PER_BAY = self.current_ship_details.get('toplam_kat_sayisi', 0)
+        # Gemi değişti ya da veriler yenilendi: bay önbelleğini boşalt, genel görünüm için sadece bay özetlerini çek
+        self.filled_ship_slots = {}; self.crane_base_slots = None
+        self.occupancy = ShipOccupancyGrid.from_ship(self.current_ship_details) if self.current_ship_id else None
+        self._refresh_bay_summary()
         self.cancel_actions()
+    def _refresh_bay_summary(self):
+        self.bay_summary = self.db.get_ship_bay_summary(self.current_ship_id, self.get_port_rotation()) if self.current_ship_id else {}
+    def on_port_rotation_changed(self):
+        self._refresh_bay_summary(); self.update_display()
+    def _load_bay(self, bay_id):
+        # Bay detayı ilk açılışta çekilir ve önbellekte tutulur; matristeki planlanmış değişiklikler önbellekten geri alınır
+        if not (self.current_ship_id and bay_id): return
+        if bay_id not in self.filled_ship_slots: self.filled_ship_slots[bay_id] = self.db.get_ship_bay_slots(self.current_ship_id, bay_id)
+        if self.occupancy: self.occupancy.load_bay(bay_id, self.filled_ship_slots[bay_id])
     def update_display(self):
         self.scene.clear()
         is_action_pending = bool(self.pending_placements or self.active_relocation_container)
         self.action_widget.setVisible(is_action_pending)
         current_ship_name = self.current_ship_details.get('gemi_adi', 'Seçilmedi') if self.current_ship_details else 'Seçilmedi'
+        self._update_overstow_analysis()
         if self.current_view == 'OVERVIEW':
             self.title_label.setText(f"{current_ship_name}: Genel Görünüm"); self.back_button.setVisible(False)
             if self.current_ship_id: self.draw_bay_overview()
@@ -130,15 +194,62 @@ class ShipPlanningTab(QWidget):
             if self.active_relocation_container: title = f"TAŞIMA: {self.active_relocation_container['id']} için yeni hedef seçin"
             elif self.active_container_for_placement: title += f" | Planlanan: {self.active_container_for_placement['id']}"
             self.title_label.setText(title); self.back_button.setVisible(True); self.draw_detailed_bay_view()
+        self._refresh_crane_plan()
+    def toggle_crane_plan(self, checked):
+        self.crane_tree.setVisible(checked); self._refresh_crane_plan()
+    def _refresh_crane_plan(self):
+        # Plan her değiştiğinde (planlanan yerleştirme, vinç sayısı) yeniden sıralanır; DB'den sadece ilk açılışta okunur
+        if not self.crane_tree.isVisible(): return
+        self.crane_tree.clear()
+        if not self.current_ship_id: return
+        if self.crane_base_slots is None: self.crane_base_slots = self.db.get_all_ship_slots(self.current_ship_id)
+        pending = [(c_id, self.current_bay, coords[0], coords[1]) for coords, c_id in self.pending_placements.items() if coords != 'RELOCATION']
+        discharge_port = self.get_port_rotation()[0] if self.port_rotation_edit.text().strip() else None
+        loads, discharges = ship_move_lists(self.crane_base_slots, pending, discharge_port)
+        if 'RELOCATION' in self.pending_placements and self.pending_relocation_from_coords:
+            to_coords, c_id = self.pending_placements['RELOCATION']
+            loads = [m for m in loads if m[0] != c_id] + [(c_id, self.current_bay, *to_coords)]
+            discharges = [m for m in discharges if m[0] != c_id] + [(c_id, self.current_bay, *self.pending_relocation_from_coords)]
+        plan = CraneSequencer(self.crane_spin.value()).sequence(loads, discharges)
+        self.crane_tree.setHeaderLabels(["Vinç / Sıra", "Bay", "Hareket", f"Zaman (Makespan: {plan.makespan / 3600:.1f} saat)"])
+        for schedule in plan.schedules:
+            crane_item = QTreeWidgetItem(self.crane_tree, [f"Vinç {schedule.crane_no}", f"{schedule.bays[0]} - {schedule.bays[-1]}", f"{len(schedule.moves)} hareket", f"{schedule.finish_time / 3600:.1f} saat"])
+            for i, move in enumerate(schedule.moves, start=1):
+                QTreeWidgetItem(crane_item, [str(i), move.bay_id, f"{move.move_type} {move.container_id} (R{move.row}-T{move.tier})", f"{move.start / 60:.0f}. dk"])
+    def _update_overstow_analysis(self):
+        # Detay görünümünde her yeniden çizimde (yani her planlanan yerleştirmede) açık bay'ler için vektörel analiz;
+        # overstow/restow kolon bazlı olduğundan bay sonucu tam gemi verisi gerektirmez
+        self.overstow_report = analyze_overstows(self.occupancy, self.get_port_rotation()) if (self.occupancy and self.current_view == 'DETAIL') else None
+        if self.overstow_report and self.current_bay in self.occupancy.bay_index:
+            b = self.occupancy.bay_index[self.current_bay]
+            restows = {port: int(mask[b].sum()) for port, mask in self.overstow_report.restow_mask_per_port.items()}
+            restow_text = ", ".join(f"{port}: {n}" for port, n in restows.items() if n)
+            self.overstow_label.setText(f"Bay {self.current_bay} - Overstow: {int(self.overstow_report.overstow_mask[b].sum())} | Restow: {sum(restows.values())}" + (f" ({restow_text})" if restow_text else ""))
+        elif self.bay_summary:
+            self.overstow_label.setText(f"Gemi Geneli - Dolu Slot: {sum(s['dolu_slot'] for s in self.bay_summary.values())} | Overstow: {sum(s['overstow'] for s in self.bay_summary.values())}")
+        else: self.overstow_label.setText("")
+    def _heatmap_color(self, ratio):
+        low, high = QColor("#0077b6"), config_manager.get_color("filled"); ratio = max(0.0, min(1.0, ratio))
+        return QColor(int(low.red() + (high.red() - low.red()) * ratio), int(low.green() + (high.green() - low.green()) * ratio), int(low.blue() + (high.blue() - low.blue()) * ratio))
     def draw_bay_overview(self):
         cols, w, h = 10, 80, 80
         if not self.BAYS: return
+        bay_capacity = max(self.ROWS_PER_BAY * self.TIERS_PER_BAY, 1)
         for i, bay_id in enumerate(self.BAYS):
             r, c = divmod(i, cols)
-            rect = InteractiveRectItem(c * (w + 10), r * (h + 10), w, h); rect.setBrush(QBrush(QColor("#0077b6")))
+            summary = self.bay_summary.get(bay_id, {}); filled = summary.get('dolu_slot', 0)
+            rect = InteractiveRectItem(c * (w + 10), r * (h + 10), w, h); rect.setBrush(QBrush(self._heatmap_color(filled / bay_capacity)))
             rect.setData(0, {'type': 'bay_overview', 'id': bay_id}); rect.clicked.connect(self.handle_item_click); self.scene.addItem(rect)
             text = QGraphicsSimpleTextItem(bay_id.replace("B", "")); text.setFont(QFont("Arial", 24, QFont.Weight.Bold)); text.setBrush(QBrush(Qt.GlobalColor.white))
-            text.setPos(rect.boundingRect().center() - text.boundingRect().center()); text.setParentItem(rect); rect.setToolTip(f"Bay {bay_id}")
+            text.setPos(rect.boundingRect().center() - text.boundingRect().center()); text.setParentItem(rect)
+            rect.setToolTip(f"Bay {bay_id} - Doluluk: {filled}/{bay_capacity} (%{filled * 100 / bay_capacity:.0f}), Reefer: {summary.get('reefer_slot', 0)}")
+            fill_text = QGraphicsSimpleTextItem(f"%{filled * 100 / bay_capacity:.0f}"); fill_text.setFont(QFont("Arial", 8)); fill_text.setBrush(QBrush(Qt.GlobalColor.white))
+            fill_text.setPos(w - fill_text.boundingRect().width() - 4, h - fill_text.boundingRect().height() - 2); fill_text.setParentItem(rect)
+            overstow_count = summary.get('overstow', 0)
+            if overstow_count:
+                rect.setPen(QPen(config_manager.get_color("overstow"), 4)); rect.setToolTip(rect.toolTip() + f", Overstow: {overstow_count}")
+                warn_text = QGraphicsSimpleTextItem(f"⚠ {overstow_count}"); warn_text.setFont(QFont("Arial", 9, QFont.Weight.Bold)); warn_text.setBrush(QBrush(Qt.GlobalColor.yellow))
+                warn_text.setPos(4, 2); warn_text.setParentItem(rect)
     def _get_container_color(self, container): return config_manager.get_color("reefer") if "REEFER" in container.get('tip', '').upper() else config_manager.get_color("filled")
     def draw_detailed_bay_view(self):
         slot_w, slot_h, x_off, y_off = 60, 40, 50, 50
@@ -152,13 +263,16 @@ class ShipPlanningTab(QWidget):
         display_slots = self.filled_ship_slots.get(self.current_bay, {}).copy()
         if self.pending_relocation_from_coords in display_slots: del display_slots[self.pending_relocation_from_coords]
         for coords, c_id in self.pending_placements.items():
-            if coords != 'RELOCATION': display_slots[coords] = next((c for c in self.all_loadable_containers if c['id'] == c_id), {})
+            if coords != 'RELOCATION': display_slots[coords] = self.loadable_by_id.get(c_id, {})
         if 'RELOCATION' in self.pending_placements:
-            coords, _ = self.pending_placements['RELOCATION']; display_slots[coords] = self.active_relocation_container
+            coords, c_id = self.pending_placements['RELOCATION']; display_slots[coords] = self.active_relocation_container or {'id': c_id}
         active_c_data = self.active_container_for_placement or self.active_relocation_container
+        # Yerçekimi ve uygunluk maskeleri tüm bay için tek geçişte hesaplanır
+        lowest_placeable = self.occupancy.lowest_free_tiers(self.current_bay) if self.occupancy else [0] * self.ROWS_PER_BAY
+        placeable_mask = self.occupancy.placeable_mask(active_c_data.get('tip'), self.current_bay) if (self.occupancy and active_c_data) else None
+        bay_idx = self.occupancy.bay_index.get(self.current_bay) if self.occupancy else None
+        overstow_mask = self.overstow_report.overstow_mask[bay_idx] if (self.overstow_report and bay_idx is not None) else None
         for r in range(self.ROWS_PER_BAY):
-            col_tiers = {t for r_k, t in display_slots.keys() if r_k == r}; lowest_placeable = 0
-            while lowest_placeable in col_tiers: lowest_placeable += 1
             for t in range(self.TIERS_PER_BAY):
                 coords, container = (r, t), display_slots.get((r, t))
                 rect = InteractiveRectItem(x_off + r * (slot_w + 5), y_off + (self.TIERS_PER_BAY - 1 - t) * (slot_h + 5), slot_w, slot_h)
@@ -178,18 +292,15 @@ class ShipPlanningTab(QWidget):
                     # <<< YENİ/DEĞİŞEN SATIRLAR BİTİŞİ >>>
 
                 else:
-                    is_gravity_ok = (t == lowest_placeable)
+                    is_gravity_ok = (t == lowest_placeable[r])
                     if not is_gravity_ok: color, tooltip = config_manager.get_color("empty"), "Yerleştirilemez (Altı Boş)"
-                    elif active_c_data:
-                        bottom_container = display_slots.get((r, t - 1))
-                        req_size, req_is_reefer = parse_container_type(bottom_container.get('tip')) if bottom_container else (None, None)
-                        c_size, c_is_reefer = parse_container_type(active_c_data.get('tip'))
-                        size_ok = (req_size is None) or (c_size == req_size)
-                        reefer_ok = (req_is_reefer is None) or (c_is_reefer == req_is_reefer)
-                        if size_ok and reefer_ok: is_placeable, color, tooltip = True, config_manager.get_color("placeable"), "Uygun Slot"
+                    elif placeable_mask is not None:
+                        if placeable_mask[r, t]: is_placeable, color, tooltip = True, config_manager.get_color("placeable"), "Uygun Slot"
                         else: is_placeable, color, tooltip = False, config_manager.get_color("incompatible"), "Uyumsuz! (Boyut veya Tip)"
                     else: color, tooltip = config_manager.get_color("empty"), "Slot Boş"
                 rect.setBrush(QBrush(color)); rect.setPen(QPen(Qt.GlobalColor.white, 0.5))
+                if container and overstow_mask is not None and overstow_mask[r, t]:
+                    rect.setPen(QPen(config_manager.get_color("overstow"), 3)); tooltip += f" | OVERSTOW ({container.get('varis_limani', '?')} altında daha erken liman var)"
                 rect.setData(0, {'type': 'slot', 'row': r, 'tier': t, 'filled': bool(container), 'placeable': is_placeable})
                 rect.setToolTip(tooltip); rect.clicked.connect(self.handle_item_click); self.scene.addItem(rect)
     def handle_item_click(self, data):
@@ -226,30 +337,79 @@ class ShipPlanningTab(QWidget):
         self.cancel_actions()
         self.active_relocation_container = container
         self.pending_relocation_from_coords = from_coords
+        if self.occupancy: self.occupancy.remove(self.current_bay, *from_coords)
         self._filter_and_populate_list()
         self.update_display()
     def stage_placement(self, container_id, coords):
         self.pending_placements[coords] = container_id
+        container = self.loadable_by_id.get(container_id, {})
+        if self.occupancy: self.occupancy.place(container_id, container.get('tip'), self.current_bay, *coords, container.get('varis_limani'))
         self.active_container_for_placement = None
         self._filter_and_populate_list(); self.update_display()
     def stage_relocation(self, to_coords):
         self.pending_placements['RELOCATION'] = (to_coords, self.active_relocation_container['id'])
+        if self.occupancy: self.occupancy.move(self.active_relocation_container['id'], self.active_relocation_container.get('tip'), self.current_bay, *to_coords, self.active_relocation_container.get('varis_limani'))
         self.active_relocation_container = None
         self.update_display()
     def confirm_actions(self):
         if not self.pending_placements: return
+        relocations = []
         if 'RELOCATION' in self.pending_placements:
-            to_coords, c_id = self.pending_placements.pop('RELOCATION')
-            self.db.update_container_ship_location(c_id, self.current_bay, to_coords[0], to_coords[1])
-        for coords, c_id in self.pending_placements.items():
-            self.db.add_container_to_ship(c_id, self.current_ship_id, coords[0], coords[1], self.current_bay)
-        QMessageBox.information(self, "Başarılı", "Tüm işlemler kaydedildi.")
-        self.main_window.refresh_all_tabs()
+            to_coords, c_id = self.pending_placements['RELOCATION']; relocations.append((c_id, self.current_bay, to_coords[0], to_coords[1]))
+        placements = [(c_id, self.current_bay, coords[0], coords[1]) for coords, c_id in self.pending_placements.items() if coords != 'RELOCATION']
+        # Kayıt arka plandaki iş kuyruğunda yapılır; aynı gemiye ait işler sırayla işlenir
+        payload = {'ship_id': self.current_ship_id, 'placements': placements, 'relocations': relocations}
+        job_id = self.main_window.job_queue.submit(SHIP_PLACEMENTS, payload, key=f"gemi:{self.current_ship_id}",
+                                                   callback=lambda result: self._show_commit_result(result, refresh=False))
+        if job_id is None: QMessageBox.critical(self, "Hata", "Plan kuyruğa eklenemedi, veritabanı bağlantısını kontrol edin.")
+        self.cancel_actions()
+    def _show_commit_result(self, result, refresh=True):
+        if not result or not result.get('success'):
+            QMessageBox.critical(self, "Hata", f"Plan kaydedilemedi, hiçbir değişiklik yapılmadı.\n{(result or {}).get('error', '')}")
+            if refresh: self.cancel_actions()   # kuyruktan gelen sonuçta kullanıcının o sırada planladıkları korunur
+            return
+        if result['conflicts']:
+            details = "\n".join(f"{c['container_id']} → {c['bay']}-R{c['row']}-T{c['tier']}: {c['reason']}" for c in result['conflicts'][:20])
+            more = f"\n... ve {len(result['conflicts']) - 20} çakışma daha" if len(result['conflicts']) > 20 else ""
+            QMessageBox.warning(self, "Kısmen Kaydedildi", f"{len(result['applied'])} işlem kaydedildi, {len(result['conflicts'])} işlem çakışma nedeniyle atlandı:\n\n{details}{more}")
+        else: QMessageBox.information(self, "Başarılı", f"Tüm işlemler kaydedildi ({len(result['applied'])} konteyner).")
+        if refresh: self.main_window.refresh_all_tabs()
     def cancel_actions(self):
         self.pending_placements.clear()
         self.active_container_for_placement, self.active_relocation_container, self.pending_relocation_from_coords = None, None, None
-        if self.current_ship_id: self.filled_ship_slots = self.db.get_all_ship_slots(self.current_ship_id)
-        else: self.filled_ship_slots = {}
+        if self.current_view == 'DETAIL': self._load_bay(self.current_bay)
         self._filter_and_populate_list(); self.update_display()
+        if self._refresh_deferred: QTimer.singleShot(0, self.refresh_after_job)
+    def get_port_rotation(self):
+        text = self.port_rotation_edit.text().strip()
+        if text: return [p.strip() for p in text.split(',') if p.strip()]   # karşılaştırmalar yazım farkı gözetmez (utils.port_key)
+        return default_port_rotation(self.all_loadable_containers)
+    def auto_plan_ship(self):
+        if not self.current_ship_id: QMessageBox.warning(self, "Uyarı", "Önce bir gemi seçin."); return
+        self.cancel_actions()
+        candidates = [self.container_list.item(i).data(Qt.ItemDataRole.UserRole) for i in range(self.container_list.count())]
+        if not candidates: QMessageBox.information(self, "Bilgi", "Filtreye uyan yüklenecek konteyner yok."); return
+        # Slot okuma ve planlama arka planda yapılır; sonuç gelene kadar buton kilitlenir
+        self.auto_plan_button.setEnabled(False); self.auto_plan_button.setText(" Planlanıyor...")
+        self.tasks.submit(AUTO_PLAN_VIEW, AutoPlanTask(dict(self.current_ship_details, gemi_id=self.current_ship_id), self.get_port_rotation(), candidates))
+    def _reset_auto_plan_button(self):
+        self.auto_plan_button.setEnabled(True); self.auto_plan_button.setText(" Otomatik Planla")
+    def _on_auto_plan_failed(self, error):
+        self._reset_auto_plan_button()
+        QMessageBox.critical(self, "Hata", f"Otomatik plan oluşturulamadı: {error}")
+    def _on_auto_plan_ready(self, plan):
+        self._reset_auto_plan_button()
+        if plan.ship_id != self.current_ship_id: return   # planlama sürerken başka gemi seçildi
+        if not plan.placements: QMessageBox.information(self, "Bilgi", "Uygun slot bulunamadı, plan oluşturulamadı."); return
+        summary = (f"{len(plan.placements)} konteyner yerleştirilecek, {len(plan.unplaced)} konteyner yerleştirilemedi.\n"
+                   f"Overstow: {plan.overstows} | Rota: {' → '.join(plan.port_rotation)}\n"
+                   f"Planlama süresi: {plan.elapsed * 1000:.0f} ms{' (süre limiti aşıldı)' if plan.timed_out else ''}\n\nPlan kaydedilsin mi?")
+        if QMessageBox.question(self, "Otomatik Plan", summary) != QMessageBox.StandardButton.Yes: return
+        # Kayıt, elle yapılan yerleştirmeler gibi aynı gemi anahtarıyla iş kuyruğunda sırayla işlenir
+        job_id = self.main_window.job_queue.submit(SHIP_PLACEMENTS, stowage_plan_payload(plan), key=f"gemi:{plan.ship_id}",
+                                                   callback=lambda result: self._show_commit_result(result, refresh=False))
+        if job_id is None: QMessageBox.critical(self, "Hata", "Plan kuyruğa eklenemedi, veritabanı bağlantısını kontrol edin.")
+    def shutdown(self):
+        self.tasks.shutdown()
     def go_back(self):
         self.current_view = 'OVERVIEW'; self.current_bay = None; self.cancel_actions()
\ No newline at end of file
@@ -208,7 +208,9 @@ class ShipSelectionPanel(QWidget):
         self.TIERS_PER_BAY = 0
 
         self.current_ship_details = {}
-        self.filled_ship_slots = {} 
+        self.ships_by_id = {}
+        self.filled_ship_slots = {}  # bay_id -> {(sıra, kat): konteyner}, seçilen bay'ler için önbellek
+        self.bay_summary = {}
 
         self.init_ui()
         self.refresh_data()
@@ -245,6 +247,7 @@ class ShipSelectionPanel(QWidget):
 
     def refresh_data(self):
         ships = self.db.get_all_ships()
+        self.ships_by_id = {ship['gemi_id']: ship for ship in ships or []}
         
         self.ship_combo.blockSignals(True)
         self.ship_combo.clear()
@@ -269,17 +272,17 @@ class ShipSelectionPanel(QWidget):
             selected_ship_id = None
         else:
             selected_ship_id = self.ship_combo.itemData(index)
-            ships = self.db.get_all_ships()
-            self.current_ship_details = next((s for s in ships if s['gemi_id'] == selected_ship_id), {})
+            self.current_ship_details = self.ships_by_id.get(selected_ship_id, {})
             
+        self.filled_ship_slots = {}
         if self.current_ship_details:
             self.BAYS = [f"B{str(i).zfill(2)}" for i in range(1, self.current_ship_details.get('toplam_bay_sayisi', 0) + 1)]
             self.ROWS_PER_BAY = self.current_ship_details.get('toplam_sira_sayisi', 0)
             self.TIERS_PER_BAY = self.current_ship_details.get('toplam_kat_sayisi', 0)
-            self.filled_ship_slots = self.db.get_all_ship_slots(selected_ship_id)
+            self.bay_summary = self.db.get_ship_bay_summary(selected_ship_id)
         else:
             self.BAYS, self.ROWS_PER_BAY, self.TIERS_PER_BAY = [], 0, 0
-            self.filled_ship_slots = {}
+            self.bay_summary = {}
 
         self.populate_bay_combo()
 
@@ -293,9 +296,19 @@ class ShipSelectionPanel(QWidget):
         self.bay_combo.clear()
         self.bay_combo.addItem("Bay Seçin")
         self.bay_combo.addItems(self.BAYS)
+        bay_capacity = max(self.ROWS_PER_BAY * self.TIERS_PER_BAY, 1)
+        for i, bay_id in enumerate(self.BAYS, start=1):
+            filled = self.bay_summary.get(bay_id, {}).get('dolu_slot', 0)
+            self.bay_combo.setItemData(i, f"Doluluk: {filled}/{bay_capacity} (%{filled * 100 / bay_capacity:.0f})", Qt.ItemDataRole.ToolTipRole)
         self.bay_combo.blockSignals(False)
         self.on_bay_selected()
 
+    def _get_bay_slots(self, bay_id):
+        # Bay detayı sadece ihtiyaç olduğunda çekilir
+        if bay_id not in self.filled_ship_slots:
+            self.filled_ship_slots[bay_id] = self.db.get_ship_bay_slots(self.ship_combo.currentData(), bay_id)
+        return self.filled_ship_slots[bay_id]
+
     def on_bay_selected(self):
         self.row_combo.blockSignals(True)
         self.row_combo.clear()
@@ -329,7 +342,7 @@ class ShipSelectionPanel(QWidget):
             return
         
         selected_row_int = int(selected_row_str)
-        current_bay_filled_slots_data = self.filled_ship_slots.get(selected_bay, {})
+        current_bay_filled_slots_data = self._get_bay_slots(selected_bay)
 
         lowest_placeable_tier_val = 0
         current_column_filled_tiers_set = {t_val for (r_val, t_val) in current_bay_filled_slots_data.keys() if r_val == selected_row_int}
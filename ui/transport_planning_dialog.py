@@ -13,8 +13,10 @@ import qtawesome as qta
 from datetime import datetime, timedelta
 import json
 
+from database import DatabaseConnection, OFFLINE_MODE
+
 class TransportPlanningThread(QThread):
-    """Background thread for transport planning operations."""
+    """Background thread for transport planning operations (kendi veritabanı bağlantısıyla çalışır)."""
     
     progress_updated = pyqtSignal(int)
     status_updated = pyqtSignal(str)
@@ -27,42 +29,55 @@ class TransportPlanningThread(QThread):
         self.operation_type = operation_type
         self.parameters = parameters
     
+    def _connect(self):
+        shared_db = self.transport_planner.db
+        if shared_db is None or OFFLINE_MODE or self.operation_type == 'load_statistics':
+            return shared_db   # veritabanısız ağ, offline modun sahte veritabanı ya da bellek içi işlem
+        return DatabaseConnection()
+
     def run(self):
+        db = None
         try:
-            if self.operation_type == 'create_plan':
-                self.status_updated.emit("Taşıma planı oluşturuluyor...")
-                self.progress_updated.emit(20)
-                
-                result = self.transport_planner.create_transport_plan(
-                    self.parameters.get('cargo_data', []),
-                    self.parameters.get('optimization_criteria', 'cost')
-                )
-                
-                self.progress_updated.emit(100)
-                self.operation_completed.emit(result)
-                
-            elif self.operation_type == 'load_plans':
-                self.status_updated.emit("Taşıma planları yükleniyor...")
-                self.progress_updated.emit(50)
-                
-                plans = self.transport_planner.get_transport_plans(
-                    self.parameters.get('status_filter')
-                )
-                
-                self.progress_updated.emit(100)
-                self.operation_completed.emit({'success': True, 'plans': plans})
-                
-            elif self.operation_type == 'load_statistics':
-                self.status_updated.emit("Network istatistikleri yükleniyor...")
-                self.progress_updated.emit(50)
-                
-                stats = self.transport_planner.get_network_statistics()
-                
-                self.progress_updated.emit(100)
-                self.operation_completed.emit({'success': True, 'statistics': stats})
-                
+            db = self._connect()
+            planner = self.transport_planner.with_connection(db)
+            self._run_operation(planner)
         except Exception as e:
             self.error_occurred.emit(str(e))
+        finally:
+            if db is not None and db is not self.transport_planner.db: db.close_connection()
+
+    def _run_operation(self, planner):
+        if self.operation_type == 'create_plan':
+            self.status_updated.emit("Taşıma planı oluşturuluyor...")
+            self.progress_updated.emit(20)
+            
+            result = planner.create_transport_plan(
+                self.parameters.get('cargo_data', []),
+                self.parameters.get('optimization_criteria', 'cost')
+            )
+            
+            self.progress_updated.emit(100)
+            self.operation_completed.emit(result)
+            
+        elif self.operation_type == 'load_plans':
+            self.status_updated.emit("Taşıma planları yükleniyor...")
+            self.progress_updated.emit(50)
+            
+            plans = planner.get_transport_plans(
+                self.parameters.get('status_filter')
+            )
+            
+            self.progress_updated.emit(100)
+            self.operation_completed.emit({'success': True, 'plans': plans})
+            
+        elif self.operation_type == 'load_statistics':
+            self.status_updated.emit("Network istatistikleri yükleniyor...")
+            self.progress_updated.emit(50)
+            
+            stats = planner.get_network_statistics()
+            
+            self.progress_updated.emit(100)
+            self.operation_completed.emit({'success': True, 'statistics': stats})
 
 class TransportPlanningDialog(QDialog):
     """Advanced transport planning system dialog."""
@@ -73,6 +88,7 @@ class TransportPlanningDialog(QDialog):
             self.transport_planner = transport_planner
             self.current_plans = []
             self.cargo_items = []
+            self.operation_threads = []  # çalışan işlemler (referans tutulmazsa QThread çalışırken yok edilir)
             
             self.setWindowTitle("Gelişmiş Taşıma Planlama Sistemi")
             try:
@@ -244,6 +260,19 @@ class TransportPlanningDialog(QDialog):
                 add_cargo_btn.setIcon(qta.icon('fa5s.plus'))
             except Exception as e:
                 print(f"DEBUG: Could not set icon for add cargo button: {e}")
+            add_cargo_btn.clicked.connect(self.add_cargo_item)
+            layout.addWidget(add_cargo_btn)
+            
+            # Cargo list
+            self.cargo_list = QListWidget()
+            layout.addWidget(self.cargo_list)
+            
+            # Remove cargo button
+            remove_cargo_btn = QPushButton("Seçili Öğeyi Kaldır")
+            remove_cargo_btn.setIcon(qta.icon('fa5s.trash'))
+            remove_cargo_btn.clicked.connect(self.remove_cargo_item)
+            layout.addWidget(remove_cargo_btn)
+            
             print("DEBUG: Cargo panel created successfully")
             return panel
         except Exception as e:
@@ -256,20 +285,6 @@ class TransportPlanningDialog(QDialog):
             fallback_layout = QVBoxLayout(fallback_panel)
             fallback_layout.addWidget(QLabel("Kargo paneli yüklenemedi"))
             return fallback_panel
-        add_cargo_btn.clicked.connect(self.add_cargo_item)
-        layout.addWidget(add_cargo_btn)
-        
-        # Cargo list
-        self.cargo_list = QListWidget()
-        layout.addWidget(self.cargo_list)
-        
-        # Remove cargo button
-        remove_cargo_btn = QPushButton("Seçili Öğeyi Kaldır")
-        remove_cargo_btn.setIcon(qta.icon('fa5s.trash'))
-        remove_cargo_btn.clicked.connect(self.remove_cargo_item)
-        layout.addWidget(remove_cargo_btn)
-        
-        return panel
 
     def create_plan_config_panel(self):
         """Create plan configuration panel."""
@@ -297,6 +312,19 @@ class TransportPlanningDialog(QDialog):
             config_layout.addRow(self.environmental_check)
             
             layout.addWidget(config_group)
+            
+            # Results display
+            results_group = QGroupBox("Plan Sonuçları")
+            results_layout = QVBoxLayout(results_group)
+            
+            self.plan_results_text = QTextEdit()
+            self.plan_results_text.setReadOnly(True)
+            self.plan_results_text.setMaximumHeight(200)
+            results_layout.addWidget(self.plan_results_text)
+            
+            layout.addWidget(results_group)
+            
+            layout.addStretch()
             print("DEBUG: Plan config panel created successfully")
             return panel
         except Exception as e:
@@ -309,20 +337,6 @@ class TransportPlanningDialog(QDialog):
             fallback_layout = QVBoxLayout(fallback_panel)
             fallback_layout.addWidget(QLabel("Plan yapılandırma paneli yüklenemedi"))
             return fallback_panel
-        
-        # Results display
-        results_group = QGroupBox("Plan Sonuçları")
-        results_layout = QVBoxLayout(results_group)
-        
-        self.plan_results_text = QTextEdit()
-        self.plan_results_text.setReadOnly(True)
-        self.plan_results_text.setMaximumHeight(200)
-        results_layout.addWidget(self.plan_results_text)
-        
-        layout.addWidget(results_group)
-        
-        layout.addStretch()
-        return panel
 
     def create_plan_management_tab(self):
         """Create plan management tab."""
@@ -353,6 +367,16 @@ class TransportPlanningDialog(QDialog):
             controls_layout.addWidget(refresh_plans_btn)
             
             layout.addLayout(controls_layout)
+            
+            # Plans table
+            self.plans_table = QTableWidget()
+            self.plans_table.setColumnCount(7)
+            self.plans_table.setHorizontalHeaderLabels([
+                "Plan ID", "Kargo Sayısı", "Toplam Maliyet", "Süre (saat)", 
+                "Mesafe (km)", "Durum", "İşlemler"
+            ])
+            self.plans_table.horizontalHeader().setStretchLastSection(True)
+            layout.addWidget(self.plans_table)
             print("DEBUG: Plan management tab created successfully")
             return tab
         except Exception as e:
@@ -365,18 +389,7 @@ class TransportPlanningDialog(QDialog):
             fallback_layout = QVBoxLayout(fallback_tab)
             fallback_layout.addWidget(QLabel("Plan yönetimi sekmesi yüklenemedi"))
             return fallback_tab
-        
-        # Plans table
-        self.plans_table = QTableWidget()
-        self.plans_table.setColumnCount(7)
-        self.plans_table.setHorizontalHeaderLabels([
-            "Plan ID", "Kargo Sayısı", "Toplam Maliyet", "Süre (saat)", 
-            "Mesafe (km)", "Durum", "İşlemler"
-        ])
-        self.plans_table.horizontalHeader().setStretchLastSection(True)
-        layout.addWidget(self.plans_table)
-        
-        return tab
+
 
     def create_network_overview_tab(self):
         """Create network overview tab."""
@@ -430,7 +443,7 @@ class TransportPlanningDialog(QDialog):
 
     def add_cargo_item(self):
         """Add a new cargo item."""
-        dialog = CargoItemDialog(self)
+        dialog = CargoItemDialog(self, self.transport_planner.get_node_ids())
         if dialog.exec() == QDialog.DialogCode.Accepted:
             cargo_data = dialog.get_cargo_data()
             self.cargo_items.append(cargo_data)
@@ -549,7 +562,17 @@ class TransportPlanningDialog(QDialog):
 
     def view_plan_details(self, plan_id):
         """View detailed plan information."""
-        QMessageBox.information(self, "Plan Detayları", f"Plan ID: {plan_id}\n\nDetaylar henüz implement edilmedi.")
+        plan = self.transport_planner.get_transport_plan(plan_id)
+        if not plan:
+            QMessageBox.warning(self, "Plan Detayları", f"Plan bulunamadı: {plan_id}")
+            return
+        lines = [f"Plan ID: {plan_id} ({plan['optimization_criteria']}, {plan['status']})", ""]
+        for route in plan['routes'][:50]:
+            lines.append(f"{route.get('container_id') or route.get('cargo_id')}: {' → '.join(route['path'])} "
+                         f"| {route['distance_km']:.2f} km, {route['time_hours'] * 60:.0f} dk, ${route['cost']:.2f}")
+        if len(plan['routes']) > 50:
+            lines.append(f"... ve {len(plan['routes']) - 50} rota daha")
+        QMessageBox.information(self, "Plan Detayları", "\n".join(lines))
 
     def update_plan_status(self, plan_id, new_status):
         """Update plan status."""
@@ -599,18 +622,21 @@ Network Kapsamı: {statistics['network_coverage']}%
             self.progress_bar.setValue(0)
             self.status_label.setText("İşlem başlatılıyor...")
             
-            self.operation_thread = TransportPlanningThread(
+            thread = TransportPlanningThread(
                 self.transport_planner,
                 operation_type,
                 parameters
             )
             
-            self.operation_thread.progress_updated.connect(self.progress_bar.setValue)
-            self.operation_thread.status_updated.connect(self.status_label.setText)
-            self.operation_thread.operation_completed.connect(self.on_operation_completed)
-            self.operation_thread.error_occurred.connect(self.on_error)
+            thread.progress_updated.connect(self.progress_bar.setValue)
+            thread.status_updated.connect(self.status_label.setText)
+            thread.operation_completed.connect(self.on_operation_completed)
+            thread.error_occurred.connect(self.on_error)
+            thread.finished.connect(lambda t=thread: self.operation_threads.remove(t) if t in self.operation_threads else None)
             
-            self.operation_thread.start()
+            # Açılışta plan ve istatistik yükleme aynı anda başlar; her thread ayrı tutulur
+            self.operation_threads.append(thread)
+            thread.start()
             
         except Exception as e:
             print(f"Error starting operation {operation_type}: {e}")
@@ -667,17 +693,18 @@ Rota Sayısı: {len(plan['routes'])}
 
     def closeEvent(self, event):
         """Handle dialog close."""
-        if hasattr(self, 'operation_thread') and self.operation_thread.isRunning():
-            self.operation_thread.terminate()
-            self.operation_thread.wait()
+        # Planlayıcı işlemleri kısa sürer; yarıda kesmek yerine bitmelerini bekle
+        for thread in list(getattr(self, 'operation_threads', [])):
+            thread.wait()
         event.accept()
 
 
 class CargoItemDialog(QDialog):
     """Dialog for adding/editing cargo items."""
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, node_ids=None):
         super().__init__(parent)
+        self.node_ids = list(node_ids or [])
         self.setWindowTitle("Kargo Öğesi Ekle")
         self.setModal(True)
         self.resize(400, 500)
@@ -731,12 +758,13 @@ class CargoItemDialog(QDialog):
         
         # Origin
         self.origin_combo = QComboBox()
-        self.origin_combo.addItems(['port_main', 'warehouse_a', 'rail_terminal', 'customer_site_1'])
+        self.origin_combo.addItems(self.node_ids)
         form_layout.addRow("Başlangıç:", self.origin_combo)
         
         # Destination
         self.destination_combo = QComboBox()
-        self.destination_combo.addItems(['warehouse_a', 'customer_site_1', 'rail_terminal', 'port_main'])
+        self.destination_combo.addItems(self.node_ids)
+        self.destination_combo.setCurrentIndex(min(1, len(self.node_ids) - 1))
         form_layout.addRow("Hedef:", self.destination_combo)
         
         # Pickup time window
@@ -785,8 +813,8 @@ class CargoItemDialog(QDialog):
             'temperature_controlled': self.temp_controlled_check.isChecked(),
             'origin_id': self.origin_combo.currentText(),
             'destination_id': self.destination_combo.currentText(),
-            'pickup_start': self.pickup_start_edit.dateTime().toPython().isoformat(),
-            'pickup_end': self.pickup_end_edit.dateTime().toPython().isoformat(),
-            'delivery_start': self.delivery_start_edit.dateTime().toPython().isoformat(),
-            'delivery_end': self.delivery_end_edit.dateTime().toPython().isoformat()
+            'pickup_start': self.pickup_start_edit.dateTime().toPyDateTime().isoformat(),
+            'pickup_end': self.pickup_end_edit.dateTime().toPyDateTime().isoformat(),
+            'delivery_start': self.delivery_start_edit.dateTime().toPyDateTime().isoformat(),
+            'delivery_end': self.delivery_end_edit.dateTime().toPyDateTime().isoformat()
         }
@@ -6,17 +6,51 @@ from PyQt6.QtWidgets import (
     QListWidget, QListWidgetItem, QPushButton, QMessageBox,
     QTreeWidget, QTreeWidgetItem, QMenu ,QDialog
 )
-from PyQt6.QtCore import Qt, QPoint
+from PyQt6.QtCore import Qt, QPoint, QTimer
 from PyQt6.QtGui import QFont, QBrush, QColor
 import qtawesome as qta
 
+import config_manager
+from database import DatabaseConnection
 from ui.transport_destination_dialog import TransportDestinationDialog 
+from dispatch_engine import DispatchEngine
+from job_queue import MOVE_CONTAINERS
+from ui.common.background_tasks import BackgroundTaskRunner
+from vehicle_telemetry import TelemetryBridge, create_hub_from_config, DEFAULT_UI_HZ
+
+DISPATCH_VIEW = 'dispatch'
+
+class DispatchTask:
+    """
+    Bir dağıtım turu (okuma, çözüm ve kayıt). BackgroundTaskRunner'da kendi bağlantısıyla çalışır;
+    motor ilk turda o bağlantıyla kurulur ve sonraki turlarda yeniden kullanılır.
+    """
+
+    def __init__(self, planner=None):
+        self.planner = planner
+        self.engine = None
+
+    def __call__(self, ctx):
+        if self.engine is None or self.engine.db is not ctx.db:
+            self.engine = DispatchEngine(ctx.db, self.planner)
+        return self.engine.dispatch()
 
 class TransportTab(QWidget):
+    AUTO_DISPATCH_INTERVAL_MS = 10000
+
     def __init__(self, db_connection, main_window, parent=None):
         super().__init__(parent)
         self.db = db_connection
         self.main_window = main_window
+        self.dispatch_task = None
+        self._dispatch_silent = True
+        self._dispatch_running = False
+        self.tasks = BackgroundTaskRunner(db_connection, parent=self)
+        self.tasks.task_finished.connect(lambda view, result: self._on_dispatch_finished(result) if view == DISPATCH_VIEW else None)
+        self.tasks.task_failed.connect(lambda view, error: self._on_dispatch_failed(error) if view == DISPATCH_VIEW else None)
+        self.vehicle_items = {}          # arac_id -> QTreeWidgetItem (telemetri güncellemeleri için)
+        self.telemetry_bridge = None
+        self.dispatch_timer = QTimer(self); self.dispatch_timer.timeout.connect(lambda: self.run_dispatch_cycle(silent=True))
         self.init_ui()
 
     def init_ui(self):
@@ -36,7 +70,7 @@ class TransportTab(QWidget):
         
         # Standart QTreeWidget kullanılıyor
         self.vehicle_tree = QTreeWidget()
-        self.vehicle_tree.setHeaderLabels(["Araç", "Durum"])
+        self.vehicle_tree.setHeaderLabels(["Araç", "Durum", "Konum (m)", "Hız (km/sa)"])
         self.vehicle_tree.setColumnWidth(0, 200)
         self.vehicle_tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.vehicle_tree.customContextMenuRequested.connect(self.open_vehicle_menu)
@@ -46,10 +80,28 @@ class TransportTab(QWidget):
         self.plan_button.setToolTip("Bir konteyner ve boşta bir araç seçerek iş emri oluşturun.")
         self.plan_button.clicked.connect(self.create_transport_plan)
         
+        self.dispatch_button = QPushButton(qta.icon('fa5s.random', color='white'), " Toplu Araç Dağıtımı")
+        self.dispatch_button.setToolTip("Bekleyen tüm iş emirlerini boştaki araçlarla en düşük toplam mesafeyle eşleştirir.")
+        self.dispatch_button.clicked.connect(lambda: self.run_dispatch_cycle(silent=False))
+        self.auto_dispatch_button = QPushButton(qta.icon('fa5s.sync-alt', color='white'), " Otomatik Dağıtım")
+        self.auto_dispatch_button.setCheckable(True)
+        self.auto_dispatch_button.setToolTip("Açıkken dağıtım periyodik olarak ve bir araç boşa çıktığında yeniden çalışır.")
+        self.auto_dispatch_button.toggled.connect(self.toggle_auto_dispatch)
+        self.dispatch_status_label = QLabel("")
+        self.telemetry_button = QPushButton(qta.icon('fa5s.satellite-dish', color='white'), " Canlı Telemetri")
+        self.telemetry_button.setCheckable(True)
+        self.telemetry_button.setToolTip("Araç konum/hız telemetrisini dinler (kaynak: ayarlardaki 'telemetry' bölümü).")
+        self.telemetry_button.toggled.connect(self.toggle_telemetry)
+
+        dispatch_layout = QHBoxLayout()
+        dispatch_layout.addWidget(self.dispatch_button); dispatch_layout.addWidget(self.auto_dispatch_button); dispatch_layout.addWidget(self.telemetry_button)
+
         main_panel = QWidget()
         main_layout = QVBoxLayout(main_panel)
         main_layout.addWidget(splitter)
         main_layout.addWidget(self.plan_button)
+        main_layout.addLayout(dispatch_layout)
+        main_layout.addWidget(self.dispatch_status_label)
         
         splitter.addWidget(container_panel)
         splitter.addWidget(vehicle_panel)
@@ -85,33 +137,109 @@ class TransportTab(QWidget):
             if not selected_destination:
                 return
 
-            dest_type = selected_destination[0]
-            current_location = container_data.get('saha_konum')
-            if current_location:
-                self.db.update_container_yard_location(container_data['id'], None)
-
-            success = False
-            operation_message = ""
-            if dest_type == 'YARD':
-                location_str = selected_destination[1]
-                success = self.db.update_container_yard_location(container_data['id'], location_str)
-                operation_message = f"Konteyner '{container_data['id']}' sahadaki '{location_str}' konumuna taşındı."
-            elif dest_type == 'SHIP':
-                ship_id, bay, row, tier = selected_destination[1:]
-                success = self.db.add_container_to_ship(container_id=container_data['id'], ship_id=ship_id, row=row, tier=tier, bay_id=bay)
-                operation_message = f"Konteyner '{container_data['id']}' gemiye yüklendi."
-            
-            if success:
-                if self.db.assign_vehicle_to_transport(vehicle_data['id'], container_data['id']):
-                    QMessageBox.information(self.main_window, "Başarılı", operation_message)
-                    self.main_window.refresh_all_tabs()
-                else:
-                    QMessageBox.critical(self.main_window, "Hata", "İş emri oluşturulamadı.")
+            # Konum, gemi yüklemesi, araç durumu ve taşıma logu arka planda tek transaction'da yazılır
+            move = {'container_id': container_data['id'], 'destination': list(selected_destination), 'vehicle_id': vehicle_data['id']}
+            job_id = self.main_window.job_queue.submit(MOVE_CONTAINERS, {'moves': [move]}, key=container_data['id'], callback=self._on_transport_finished)
+            if job_id is None:
+                QMessageBox.critical(self.main_window, "Veritabanı Hatası", "Taşıma işlemi kuyruğa eklenemedi.")
+
+    def _on_transport_finished(self, result):
+        if result.get('moved'):
+            moved = result['moved'][0]
+            if moved['durum'] == 'SAHA':
+                operation_message = f"Konteyner '{moved['id']}' sahadaki '{moved['saha_konum']}' konumuna taşındı."
             else:
-                QMessageBox.critical(self.main_window, "Veritabanı Hatası", "Konteyner taşınamadı.")
-                if current_location:
-                    self.db.update_container_yard_location(container_data['id'], current_location)
+                operation_message = f"Konteyner '{moved['id']}' gemiye yüklendi ({moved['gemi_konum']})."
+            self.main_window.statusBar().showMessage(f"✅ {operation_message}", 5000)
+        else:
+            error = result['conflicts'][0]['reason'] if result.get('conflicts') else result.get('error', "Bilinmeyen hata")
+            QMessageBox.critical(self.main_window, "Veritabanı Hatası", f"Konteyner taşınamadı: {error}")
     
+    def _get_dispatch_task(self):
+        # Taşıma planlama penceresi açıldıysa aynı ağ ve rota önbelleği paylaşılır (yoksa ağ worker bağlantısıyla kurulur)
+        planner = getattr(self.main_window, 'advanced_systems', {}).get('transport_planner')
+        if self.dispatch_task is None or (planner is not None and self.dispatch_task.planner is not planner):
+            self.dispatch_task = DispatchTask(planner)
+        return self.dispatch_task
+
+    def toggle_auto_dispatch(self, enabled):
+        if enabled:
+            self.dispatch_timer.start(self.AUTO_DISPATCH_INTERVAL_MS)
+            self.run_dispatch_cycle(silent=True)
+        else:
+            self.dispatch_timer.stop()
+
+    def run_dispatch_cycle(self, silent=False):
+        """Bekleyen iş emirleri ile boştaki araçları toplu olarak eşleştir ve kaydet (arka planda)"""
+        if silent and self._dispatch_running: return   # periyodik tur, süren turun yerine geçmez
+        self._dispatch_silent = silent
+        self._dispatch_running = True
+        self.dispatch_status_label.setText("⏳ Dağıtım hesaplanıyor...")
+        self.tasks.submit(DISPATCH_VIEW, self._get_dispatch_task())
+
+    def _on_dispatch_finished(self, result):
+        silent, self._dispatch_silent, self._dispatch_running = self._dispatch_silent, True, False
+        self.dispatch_status_label.setText(
+            f"Son dağıtım: {len(result.assignments)} atama, {result.unassigned_orders} bekleyen iş emri, "
+            f"{result.idle_vehicles} boşta araç ({result.solver}, {result.elapsed * 1000:.0f} ms)")
+        if result.assignments:
+            self.refresh_lists()
+        if not silent:
+            message = f"{len(result.assignments)} iş emri araçlara atandı."
+            if result.conflicts: message += f"\n{result.conflicts} atama başka bir işlemle çakıştığı için atlandı."
+            QMessageBox.information(self, "Toplu Araç Dağıtımı", message)
+
+    def _on_dispatch_failed(self, error):
+        silent, self._dispatch_silent, self._dispatch_running = self._dispatch_silent, True, False
+        self.dispatch_status_label.setText(f"❌ Dağıtım başarısız: {error}")
+        if not silent:
+            QMessageBox.critical(self, "Toplu Araç Dağıtımı", f"Dağıtım yapılamadı: {error}")
+
+    def shutdown(self):
+        """Pencere kapanırken dağıtım zamanlayıcısını ve worker'ı durdur"""
+        self.dispatch_timer.stop()
+        self.tasks.shutdown()
+
+    def toggle_telemetry(self, enabled):
+        systems = self.main_window.advanced_systems
+        if enabled:
+            config = config_manager.get_config()
+            hub = systems.get('telemetry')
+            if hub is None or not hub.running:
+                vehicle_ids = [v['id'] for v in self.db.get_vehicles() or []]
+                try:
+                    # UDP kaynağı soketi oluştururken bağlar: port doluysa hata burada gelir
+                    hub = create_hub_from_config(config, vehicle_ids, db_factory=DatabaseConnection)
+                    hub.start()
+                except OSError as e:
+                    QMessageBox.critical(self, "Telemetri", f"Telemetri kaynağı açılamadı: {e}")
+                    self.telemetry_button.setChecked(False)
+                    return
+                systems['telemetry'] = hub
+            self.telemetry_bridge = TelemetryBridge(hub, config.get('telemetry', {}).get('ui_hz', DEFAULT_UI_HZ), self)
+            self.telemetry_bridge.states_updated.connect(self.apply_telemetry)
+            self.apply_telemetry(hub.store.snapshot())
+            self.telemetry_bridge.start()
+        else:
+            if self.telemetry_bridge: self.telemetry_bridge.stop(); self.telemetry_bridge = None
+            hub = systems.pop('telemetry', None)
+            if hub: hub.stop()
+            for item in self.vehicle_items.values():   # Durum sütunu veritabanı durumuna döner
+                item.setText(1, (item.data(0, Qt.ItemDataRole.UserRole) or {}).get('durum', ''))
+
+    def apply_telemetry(self, states):
+        """Birleştirilmiş telemetri değişikliklerini araç ağacına uygula (sadece değişen satırlar)"""
+        self.vehicle_tree.setUpdatesEnabled(False)
+        try:
+            for vehicle_id, sample in states.items():
+                item = self.vehicle_items.get(vehicle_id)
+                if item is None: continue
+                item.setText(1, f"{(item.data(0, Qt.ItemDataRole.UserRole) or {}).get('durum', '')} • {sample.status}")
+                item.setText(2, f"{sample.x:.0f}, {sample.y:.0f}")
+                item.setText(3, f"{sample.speed * 3.6:.1f}")
+        finally:
+            self.vehicle_tree.setUpdatesEnabled(True)
+
     def open_vehicle_menu(self, position: QPoint):
         item = self.vehicle_tree.itemAt(position)
         if not item or item.childCount() > 0:
@@ -132,9 +260,10 @@ class TransportTab(QWidget):
     def complete_task(self, vehicle_id):
         reply = QMessageBox.question(self, "Onay", f"'{vehicle_id}' aracının görevini tamamlayıp 'BOŞTA' duruma getirmek istediğinizden emin misiniz?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
-            if self.db.update_vehicle_status(vehicle_id, 'BOŞTA'):
+            if self.db.complete_vehicle_task(vehicle_id):
                 QMessageBox.information(self, "Başarılı", f"'{vehicle_id}' aracı boşa çıkarıldı.")
                 self.main_window.refresh_all_tabs()
+                if self.auto_dispatch_button.isChecked(): self.run_dispatch_cycle(silent=True)
             else:
                 QMessageBox.critical(self, "Hata", "Araç durumu güncellenemedi.")
 
@@ -148,6 +277,7 @@ class TransportTab(QWidget):
                 self.container_list.addItem(item)
             
         self.vehicle_tree.clear()
+        self.vehicle_items = {}
         vehicles = self.db.get_vehicles()
         if not vehicles: return
 
@@ -164,10 +294,14 @@ class TransportTab(QWidget):
                 child_item = QTreeWidgetItem(parent_item, [v['id'], v['durum']])
                 child_item.setIcon(0, icon)
                 child_item.setData(0, Qt.ItemDataRole.UserRole, v)
+                self.vehicle_items[v['id']] = child_item
                 
                 if not is_available:
                     child_item.setForeground(1, QBrush(QColor("#E74C3C")))
                 else:
                     child_item.setFlags(child_item.flags() | Qt.ItemFlag.ItemIsSelectable)
         
-        self.vehicle_tree.expandAll()
\ No newline at end of file
+        self.vehicle_tree.expandAll()
+        hub = self.main_window.advanced_systems.get('telemetry')
+        if hub is not None and self.telemetry_bridge is not None:
+            self.apply_telemetry(hub.store.snapshot())
\ No newline at end of file
@@ -1,5 +1,8 @@
 import re
 
+# port_key ile aynı anahtar, SQL tarafında (chr(775): İ'nin küçük harfe çevrilince kalan birleşik noktası)
+PORT_KEY_SQL = "translate(lower(btrim({column}::text)), 'ı' || chr(775), 'i')"
+
 def parse_container_type(c_type_str):
     """
     Verilen konteyner tipi string'ini (örn: "40 REEFER") analiz eder
@@ -12,4 +15,14 @@ def parse_container_type(c_type_str):
     size = int(size_match.group(1)) if size_match else 0
     is_reefer = "REEFER" in c_type_str.upper()
     
-    return size, is_reefer
\ No newline at end of file
+    return size, is_reefer
+
+def port_key(port):
+    """
+    Liman adlarını büyük/küçük harf farkı gözetmeden karşılaştırmak için anahtar.
+    Veride "Hamburg", "İstanbul" gibi karışık yazımlar var; operatör rotayı "HAMBURG, ISTANBUL" diye girebilir.
+    Türkçe İ/ı da i'ye indirgenir (veritabanı tarafında PORT_KEY_SQL ile aynı kural).
+    """
+    if not port:
+        return None
+    return str(port).strip().casefold().replace('\u0307', '').replace('ı', 'i')
\ No newline at end of file
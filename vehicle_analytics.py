@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# vehicle_analytics.py - tasima_loglari üzerinden vektörel araç kullanım analizi
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+ASSIGN_EVENTS = ('ATAMA YAPILDI',)
+COMPLETE_EVENTS = ('GOREV TAMAMLANDI',)
+DEFAULT_TASK_MINUTES = 30.0      # tamamlanma kaydı olmayan görevler için varsayılan süre
+LOOKBACK_HOURS = 24              # aralık başında süren görevleri yakalamak için geriye bakış
+IDLE_GAP_MINUTES = 60.0          # bu süreden uzun boşluklar "boşta kalma" sayılır
+
+@dataclass
+class VehicleUtilization:
+    """Tek araç için özet"""
+    vehicle_id: str
+    vehicle_type: str
+    busy_hours: float
+    utilization: float           # 0-1
+    moves: int
+    moves_per_hour: float
+    idle_gaps: int               # IDLE_GAP_MINUTES'ten uzun boşluk sayısı
+    longest_idle_hours: float
+
+@dataclass
+class UtilizationReport:
+    """Araç kullanım analizinin sonucu"""
+    start: datetime
+    end: datetime
+    bucket_hours: float
+    bucket_starts: np.ndarray = field(default_factory=lambda: np.array([]))     # epoch saniye
+    fleet_busy: np.ndarray = field(default_factory=lambda: np.array([]))        # kova başına ortalama eşzamanlı meşgul araç
+    fleet_moves: np.ndarray = field(default_factory=lambda: np.array([]))       # kova başına başlayan görev
+    vehicle_timeline: np.ndarray = field(default_factory=lambda: np.zeros((0, 0)))  # araç × kova doluluk (0-1)
+    vehicles: List[VehicleUtilization] = field(default_factory=list)
+    peak_concurrency: int = 0
+    peak_time: Optional[datetime] = None
+    event_count: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def fleet_utilization(self) -> float:
+        if not self.vehicles: return 0.0
+        return float(np.mean([v.utilization for v in self.vehicles]))
+
+    @property
+    def moves_per_hour(self) -> float:
+        span = (self.end - self.start).total_seconds() / 3600
+        return float(self.fleet_moves.sum()) / span if span > 0 else 0.0
+
+def _to_epoch(value) -> float:
+    if isinstance(value, (int, float)): return float(value)
+    if isinstance(value, str): value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime): value = datetime.combine(value, datetime.min.time())
+    return value.timestamp()
+
+def events_to_arrays(chunks: Iterable[List[Tuple]]):
+    """
+    (arac_id, arac_tipi, epoch, islem_tipi) satır parçalarını NumPy dizilerine çevirir.
+    Dönüş: (araç kodları, araç id'leri, araç tipleri, zamanlar, olay türü [1=başlangıç, 0=bitiş])
+    """
+    ids, types, times, kinds = [], [], [], []
+    for chunk in chunks:
+        if not chunk: continue
+        c_ids, c_types, c_times, c_kinds = zip(*chunk)
+        ids.extend(c_ids); types.extend(c_types); times.extend(c_times); kinds.extend(c_kinds)
+    if not ids:
+        return np.zeros(0, dtype=np.int64), np.array([], dtype=object), np.array([], dtype=object), np.zeros(0), np.zeros(0, dtype=np.int8)
+    vehicle_ids, codes = np.unique(np.asarray(ids, dtype=object).astype(str), return_inverse=True)
+    type_lookup = dict(zip(ids, types))
+    vehicle_types = np.array([type_lookup.get(v) or '' for v in vehicle_ids], dtype=object)
+    kinds_arr = np.isin(np.asarray(kinds, dtype=object).astype(str), ASSIGN_EVENTS).astype(np.int8)
+    return codes.astype(np.int64), vehicle_ids, vehicle_types, np.asarray(times, dtype=np.float64), kinds_arr
+
+def build_busy_intervals(codes, times, kinds, default_task_sec=DEFAULT_TASK_MINUTES * 60):
+    """
+    Olaylardan meşgul aralıkları: her atama bir sonraki tamamlanma kaydında biter;
+    arada yeni atama varsa veya kayıt yoksa en geç varsayılan görev süresi sonunda biter.
+    Dönüş: (araç kodu, başlangıç, bitiş) dizileri (araç ve zamana göre sıralı)
+    """
+    order = np.lexsort((kinds, times, codes))   # aynı anda tamamlanma ve yeni atama varsa önce tamamlanma
+    codes, times, kinds = codes[order], times[order], kinds[order]
+    starts = np.nonzero(kinds == 1)[0]
+    nxt = np.minimum(starts + 1, len(times) - 1)
+    same_vehicle = (starts + 1 < len(times)) & (codes[nxt] == codes[starts])
+    default_end = times[starts] + default_task_sec
+    end = np.where(same_vehicle & (kinds[nxt] == 0), times[nxt], default_end)
+    end = np.where(same_vehicle & (kinds[nxt] == 1), np.minimum(times[nxt], default_end), end)
+    return codes[starts], times[starts], np.maximum(end, times[starts])
+
+def _cumulative_busy(starts, ends, points):
+    """Her nokta t için sum(clip(t - s, 0, e - s)) — sıralı diziler ve önek toplamlarıyla O((n+m) log n)"""
+    s_sorted, e_sorted = np.sort(starts), np.sort(ends)
+    s_prefix = np.concatenate(([0.0], np.cumsum(s_sorted)))
+    e_prefix = np.concatenate(([0.0], np.cumsum(e_sorted)))
+    s_count = np.searchsorted(s_sorted, points, side='right')
+    e_count = np.searchsorted(e_sorted, points, side='right')
+    return (s_count * points - s_prefix[s_count]) - (e_count * points - e_prefix[e_count])
+
+def compute_utilization(codes, vehicle_ids, vehicle_types, times, kinds, start, end, bucket_hours=1.0,
+                        idle_gap_minutes=IDLE_GAP_MINUTES) -> UtilizationReport:
+    """Olay dizilerinden kullanım zaman çizelgesi, boşta kalma, saatlik hareket ve en yüksek eşzamanlılık"""
+    t0 = time.perf_counter()
+    start_ts, end_ts = _to_epoch(start), _to_epoch(end)
+    report = UtilizationReport(datetime.fromtimestamp(start_ts), datetime.fromtimestamp(end_ts), bucket_hours, event_count=len(times))
+    bucket_sec = bucket_hours * 3600
+    n_buckets = max(int(np.ceil((end_ts - start_ts) / bucket_sec)), 1)
+    boundaries = np.minimum(start_ts + np.arange(n_buckets + 1) * bucket_sec, end_ts)
+    report.bucket_starts = boundaries[:-1]
+    n_vehicles = len(vehicle_ids)
+    if n_vehicles == 0 or end_ts <= start_ts:
+        report.fleet_busy = np.zeros(n_buckets); report.fleet_moves = np.zeros(n_buckets, dtype=np.int64)
+        report.vehicle_timeline = np.zeros((n_vehicles, n_buckets)); report.elapsed = time.perf_counter() - t0
+        return report
+
+    v_code, s, e = build_busy_intervals(codes, times, kinds)
+    s, e = np.clip(s, start_ts, end_ts), np.clip(e, start_ts, end_ts)
+    keep = e > s
+    v_code, s, e = v_code[keep], s[keep], e[keep]
+    span = end_ts - start_ts + 1.0
+
+    # Araç başına kova doluluğu: zamanları araç koduna göre ayrık eksenlere kaydırıp tek seferde hesapla
+    offset = v_code * span - start_ts
+    points = (np.arange(n_vehicles)[:, None] * span + (boundaries - start_ts)[None, :]).ravel()
+    cumulative = _cumulative_busy(s + offset, e + offset, points).reshape(n_vehicles, n_buckets + 1)
+    busy_per_bucket = np.diff(cumulative, axis=1)
+    widths = np.diff(boundaries)
+    report.vehicle_timeline = np.divide(busy_per_bucket, widths, out=np.zeros_like(busy_per_bucket), where=widths > 0)
+    report.fleet_busy = busy_per_bucket.sum(axis=0) / np.where(widths > 0, widths, 1)
+
+    # Başlayan görevler (aralık içinde atanan)
+    in_range = (times >= start_ts) & (times < end_ts) & (kinds == 1)
+    bucket_idx = np.minimum(((times[in_range] - start_ts) // bucket_sec).astype(np.int64), n_buckets - 1)
+    report.fleet_moves = np.bincount(bucket_idx, minlength=n_buckets)
+    vehicle_moves = np.bincount(codes[in_range], minlength=n_vehicles)
+
+    # En yüksek eşzamanlılık: +1 başlangıç / -1 bitiş olaylarının kümülatif toplamı (eşitlikte önce bitiş)
+    if len(s):
+        ev_t = np.concatenate((s, e)); ev_d = np.concatenate((np.ones(len(s), dtype=np.int64), -np.ones(len(e), dtype=np.int64)))
+        order = np.lexsort((ev_d, ev_t))
+        running = np.cumsum(ev_d[order])
+        peak_i = int(np.argmax(running))
+        report.peak_concurrency = int(running[peak_i])
+        report.peak_time = datetime.fromtimestamp(ev_t[order][peak_i])
+
+    # Boşta kalma: aynı araçta ardışık aralıklar arası boşluklar + pencerenin baş/son boşlukları
+    busy_total = cumulative[:, -1] - cumulative[:, 0]
+    if len(s):
+        order = np.lexsort((s, v_code))
+        v_sorted, s_sorted, e_sorted = v_code[order], s[order], e[order]
+        first = np.r_[True, v_sorted[1:] != v_sorted[:-1]]
+        last = np.r_[v_sorted[1:] != v_sorted[:-1], True]
+        # Araç sınırlarında sıfırlanan kümülatif en geç bitiş (çakışan aralıklar boşluk sayılmaz)
+        running_end = np.maximum.accumulate(e_sorted + v_sorted * span) - v_sorted * span
+        prev_end = np.where(first, start_ts, np.r_[start_ts, running_end[:-1]])
+        gap_vehicle = np.concatenate((v_sorted, v_sorted[last]))
+        all_gaps = np.concatenate((np.maximum(s_sorted - prev_end, 0), end_ts - running_end[last]))
+    else:
+        gap_vehicle, all_gaps = np.zeros(0, dtype=np.int64), np.zeros(0)
+    has_interval = np.bincount(v_code, minlength=n_vehicles) > 0
+    longest = np.zeros(n_vehicles)
+    np.maximum.at(longest, gap_vehicle, all_gaps)
+    longest[~has_interval] = end_ts - start_ts
+    long_gaps = np.bincount(gap_vehicle, weights=(all_gaps > idle_gap_minutes * 60).astype(float), minlength=n_vehicles).astype(int)
+    long_gaps[~has_interval] = 1
+
+    hours = (end_ts - start_ts) / 3600
+    report.vehicles = [VehicleUtilization(str(vehicle_ids[i]), str(vehicle_types[i]), round(busy_total[i] / 3600, 2),
+                                          float(busy_total[i] / (end_ts - start_ts)), int(vehicle_moves[i]),
+                                          round(vehicle_moves[i] / hours, 3), int(long_gaps[i]), round(longest[i] / 3600, 2))
+                       for i in range(n_vehicles)]
+    report.elapsed = time.perf_counter() - t0
+    return report
+
+def analyze_vehicle_utilization(db, start, end, vehicle_type=None, bucket_hours=None) -> UtilizationReport:
+    """Veritabanından (sunucu taraflı cursor ile parça parça) okuyup analiz et"""
+    t0 = time.perf_counter()
+    start_ts, end_ts = _to_epoch(start), _to_epoch(end)
+    if bucket_hours is None:
+        # Uzun aralıklarda kova boyu büyütülür (grafikte ~500 noktadan fazla olmasın)
+        bucket_hours = max(1.0, float(np.ceil((end_ts - start_ts) / 3600 / 500)))
+    chunks = db.iter_transport_log_events(datetime.fromtimestamp(start_ts) - timedelta(hours=LOOKBACK_HOURS),
+                                          datetime.fromtimestamp(end_ts), vehicle_type)
+    report = compute_utilization(*events_to_arrays(chunks), start_ts, end_ts, bucket_hours)
+    report.elapsed = time.perf_counter() - t0
+    return report
+
+if __name__ == "__main__":
+    # Benchmark: aylarca log (200 araç, ~6 ay, ~1.5M olay)
+    print("🧪 Benchmarking Vehicle Analytics...")
+
+    rng = np.random.default_rng(5)
+    n_vehicles, days = 200, 180
+    start_ts = datetime(2025, 1, 1).timestamp(); end_ts = start_ts + days * 86400
+    rows = []
+    for v in range(n_vehicles):
+        n_tasks = rng.integers(2000, 5000)
+        starts = np.sort(rng.uniform(start_ts, end_ts, n_tasks))
+        durations = rng.uniform(300, 2400, n_tasks)
+        completed = rng.random(n_tasks) < 0.9
+        rows.extend((f"ARAC-{v:03d}", 'TIR', float(t), 'ATAMA YAPILDI') for t in starts)
+        rows.extend((f"ARAC-{v:03d}", 'TIR', float(t), 'GOREV TAMAMLANDI') for t in (starts + durations)[completed])
+    chunks = [rows[i:i + 50000] for i in range(0, len(rows), 50000)]
+
+    t0 = time.perf_counter(); arrays = events_to_arrays(chunks); load_s = time.perf_counter() - t0
+    report = compute_utilization(*arrays, start_ts, end_ts, bucket_hours=6)
+    print(f"✅ {len(rows):,} olay, {n_vehicles} araç, {days} gün: dizilere çevirme {load_s:.2f} s, analiz {report.elapsed:.2f} s")
+    print(f"   Filo kullanımı %{report.fleet_utilization * 100:.1f}, {report.moves_per_hour:.1f} hareket/saat, "
+          f"en yüksek eşzamanlılık {report.peak_concurrency} ({report.peak_time:%Y-%m-%d %H:%M})")
+
+    print("\n🎉 Vehicle analytics benchmark completed!")
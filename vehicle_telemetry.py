@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# vehicle_telemetry.py - Saha araçlarından gelen konum/durum telemetrisinin alınması, tamponlanması ve kaydı
+
+import json
+import math
+import os
+import random
+import socket
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+DEFAULT_UDP_PORT = 47800
+RING_CAPACITY = 200000           # tampon dolarsa en eski mesajlar düşürülür
+INGEST_BATCH = 5000              # bir turda tampondan alınan en fazla mesaj
+INGEST_INTERVAL_SEC = 0.02
+FLUSH_INTERVAL_SEC = 1.0         # veritabanına toplu yazma aralığı
+DEFAULT_UI_HZ = 10
+YARD_WIDTH_M, YARD_HEIGHT_M = 1200.0, 600.0
+MOVING_SPEED_MS = 0.5            # bu hızın üstü 'HAREKETLI' sayılır
+
+class TelemetrySample(NamedTuple):
+    """Tek telemetri mesajı (zaman epoch saniye, hız m/s, yön derece)"""
+    vehicle_id: str
+    ts: float
+    x: float
+    y: float
+    speed: float
+    heading: float
+    status: str
+
+def parse_message(raw) -> Optional[TelemetrySample]:
+    """
+    JSON satırını örneğe çevir. Beklenen alanlar:
+    {"arac_id": "TIR-01", "ts": 1700000000.1, "x": 120.5, "y": 40.2, "hiz": 4.1, "yon": 90, "durum": "HAREKETLI"}
+    ts verilmezse alınma zamanı kullanılır. Hatalı satırlar için None.
+    """
+    try:
+        data = json.loads(raw)
+        vehicle_id = str(data.get('arac_id') or data['vehicle_id'])
+        speed = float(data.get('hiz', data.get('speed', 0.0)))
+        status = data.get('durum') or data.get('status') or ('HAREKETLI' if speed > MOVING_SPEED_MS else 'DURUYOR')
+        return TelemetrySample(vehicle_id, float(data.get('ts') or time.time()), float(data['x']), float(data['y']),
+                               speed, float(data.get('yon', data.get('heading', 0.0))), str(status))
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def format_message(sample: TelemetrySample) -> str:
+    return json.dumps({'arac_id': sample.vehicle_id, 'ts': round(sample.ts, 3), 'x': round(sample.x, 2), 'y': round(sample.y, 2),
+                       'hiz': round(sample.speed, 2), 'yon': round(sample.heading, 1), 'durum': sample.status})
+
+class TelemetryRingBuffer:
+    """Sabit kapasiteli tampon: üreticiler ekler, alım thread'i toplu boşaltır; taşmada en eskiler düşer"""
+
+    def __init__(self, capacity: int = RING_CAPACITY):
+        self.items = deque(maxlen=capacity)
+        self.lock = threading.Lock()
+        self.received = 0
+        self.dropped = 0
+
+    def extend(self, samples: Iterable[TelemetrySample]):
+        with self.lock:
+            before = len(self.items)
+            samples = list(samples)
+            self.items.extend(samples)
+            self.received += len(samples)
+            self.dropped += max(before + len(samples) - self.items.maxlen, 0)
+
+    def drain(self, max_items: int = INGEST_BATCH) -> List[TelemetrySample]:
+        with self.lock:
+            count = min(len(self.items), max_items)
+            return [self.items.popleft() for _ in range(count)]
+
+    def __len__(self):
+        return len(self.items)
+
+class VehicleStateStore:
+    """Araç başına en son durum; değişen araçlar ekran ve kayıt için ayrı ayrı işaretlenir"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latest: Dict[str, TelemetrySample] = {}
+        self._ui_dirty = set()
+        self._db_dirty = set()
+
+    def update(self, samples: Iterable[TelemetrySample]):
+        with self.lock:
+            for sample in samples:
+                current = self.latest.get(sample.vehicle_id)
+                if current is None or sample.ts >= current.ts:
+                    self.latest[sample.vehicle_id] = sample
+                    self._ui_dirty.add(sample.vehicle_id)
+                    self._db_dirty.add(sample.vehicle_id)
+
+    def _take(self, dirty: set) -> Dict[str, TelemetrySample]:
+        with self.lock:
+            changed = {v_id: self.latest[v_id] for v_id in dirty}
+            dirty.clear()
+            return changed
+
+    def take_ui_changes(self) -> Dict[str, TelemetrySample]:
+        return self._take(self._ui_dirty)
+
+    def take_db_changes(self) -> Dict[str, TelemetrySample]:
+        return self._take(self._db_dirty)
+
+    def snapshot(self) -> Dict[str, TelemetrySample]:
+        with self.lock:
+            return dict(self.latest)
+
+class _SourceThread(threading.Thread):
+    def __init__(self, buffer: TelemetryRingBuffer):
+        super().__init__(daemon=True)
+        self.buffer = buffer
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _push_lines(self, lines: Iterable[str]):
+        samples = [s for s in (parse_message(line) for line in lines if line.strip()) if s]
+        if samples:
+            self.buffer.extend(samples)
+
+class UdpTelemetrySource(_SourceThread):
+    """Yerel UDP soketi: her datagram bir veya daha fazla JSON satırı içerebilir"""
+
+    def __init__(self, buffer, host='127.0.0.1', port=DEFAULT_UDP_PORT):
+        super().__init__(buffer)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+            self.sock.bind((host, port))
+        except OSError:
+            self.sock.close()   # port doluysa soket açık kalmasın
+            raise
+        self.sock.settimeout(0.2)
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    data, _ = self.sock.recvfrom(65535)
+                except socket.timeout:
+                    continue
+                self._push_lines(data.decode('utf-8', errors='replace').splitlines())
+        finally:
+            self.sock.close()
+
+class FileTailSource(_SourceThread):
+    """Dosya sonunu takip eder (tail -f); dosya kesilirse veya döndürülürse baştan okur"""
+
+    def __init__(self, buffer, path, from_start=False):
+        super().__init__(buffer)
+        self.path = path
+        self.from_start = from_start
+
+    def run(self):
+        while not self._stop_event.is_set() and not os.path.exists(self.path):
+            time.sleep(0.5)
+        handle = None
+        try:
+            handle = open(self.path, 'r', encoding='utf-8', errors='replace')
+            if not self.from_start:
+                handle.seek(0, os.SEEK_END)
+            pending = ''
+            while not self._stop_event.is_set():
+                chunk = handle.read(1 << 20)
+                if chunk:
+                    lines = (pending + chunk).split('\n')
+                    pending = lines.pop()
+                    self._push_lines(lines)
+                    continue
+                if os.path.getsize(self.path) < handle.tell():
+                    handle.seek(0); pending = ''
+                time.sleep(0.05)
+        except OSError as e:
+            print(f"⚠️  Telemetri dosyası okunamadı: {e}")
+        finally:
+            if handle: handle.close()
+
+class TelemetrySimulator(_SourceThread):
+    """
+    Gerçek araç yerine test verisi üretir: her araç saha içinde rastgele hedeflere gidip bekler.
+    udp_target verilirse mesajlar JSON olarak sokete gönderilir (UDP kaynağını da sınamak için),
+    yoksa doğrudan tampona eklenir.
+    """
+
+    def __init__(self, buffer, vehicle_ids: List[str], rate_hz: float = 5.0, udp_target=None, seed=None):
+        super().__init__(buffer)
+        self.rng = random.Random(seed)
+        self.rate_hz = rate_hz
+        self.udp_target = udp_target
+        self.state = {v_id: [self.rng.uniform(0, YARD_WIDTH_M), self.rng.uniform(0, YARD_HEIGHT_M), None, 0.0] for v_id in vehicle_ids}
+
+    def _step(self, v_id, dt, now) -> TelemetrySample:
+        x, y, target, wait = self.state[v_id]
+        if target is None and wait <= 0 and self.rng.random() < 0.2:
+            target = (self.rng.uniform(0, YARD_WIDTH_M), self.rng.uniform(0, YARD_HEIGHT_M))
+        speed = heading = 0.0
+        if target is not None:
+            dx, dy = target[0] - x, target[1] - y
+            dist = math.hypot(dx, dy)
+            speed = 6.0
+            if dist <= speed * dt:
+                x, y, target, wait = target[0], target[1], None, self.rng.uniform(2, 10)
+            else:
+                x, y = x + dx / dist * speed * dt, y + dy / dist * speed * dt
+            heading = math.degrees(math.atan2(dy, dx)) % 360
+        self.state[v_id] = [x, y, target, wait - dt]
+        return TelemetrySample(v_id, now, x, y, speed, heading, 'HAREKETLI' if speed > MOVING_SPEED_MS else 'DURUYOR')
+
+    def run(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM) if self.udp_target else None
+        interval = 1.0 / self.rate_hz
+        last = time.time()
+        while not self._stop_event.wait(interval):
+            now = time.time()
+            samples = [self._step(v_id, now - last, now) for v_id in self.state]
+            last = now
+            if sock:
+                for i in range(0, len(samples), 50):
+                    sock.sendto('\n'.join(format_message(s) for s in samples[i:i + 50]).encode('utf-8'), self.udp_target)
+            else:
+                self.buffer.extend(samples)
+        if sock: sock.close()
+
+class TelemetryHub:
+    """
+    Kaynaklar -> halka tampon -> alım thread'i -> araç başına son durum.
+    Alım thread'i FLUSH_INTERVAL_SEC'de bir, o aralıkta değişen araçların son durumunu
+    kendi bağlantısıyla tek transaction'da yazar (araç başına saniyede en fazla bir kayıt).
+    """
+
+    def __init__(self, db_factory: Optional[Callable] = None, capacity: int = RING_CAPACITY):
+        self.buffer = TelemetryRingBuffer(capacity)
+        self.store = VehicleStateStore()
+        self.sources: List[_SourceThread] = []
+        self.db_factory = db_factory
+        self.persisted = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def add_source(self, source: _SourceThread):
+        self.sources.append(source)
+        if self._thread is not None:
+            source.start()
+        return source
+
+    def start(self):
+        if self._thread is not None: return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        for source in self.sources:
+            source.start()
+
+    def stop(self):
+        for source in self.sources:
+            source.stop()
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+        self.sources.clear()
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def _run(self):
+        db = self.db_factory() if self.db_factory else None
+        if db is not None and not getattr(db, 'conn', None):
+            print("⚠️  Telemetri kaydı devre dışı: veritabanı bağlantısı yok")
+            db = None
+        if db is not None and not db.ensure_telemetry_tables():
+            db = None
+        next_flush = time.monotonic() + FLUSH_INTERVAL_SEC
+        try:
+            while not self._stop_event.is_set():
+                batch = self.buffer.drain()
+                if batch:
+                    self.store.update(batch)
+                elif self._stop_event.wait(INGEST_INTERVAL_SEC):
+                    break
+                if time.monotonic() >= next_flush:
+                    next_flush = time.monotonic() + FLUSH_INTERVAL_SEC
+                    self._flush(db)
+            self.store.update(self.buffer.drain(len(self.buffer)))
+            self._flush(db)
+        finally:
+            if db is not None: db.close_connection()
+
+    def _flush(self, db):
+        changes = self.store.take_db_changes()
+        if db is not None and changes and db.save_telemetry_batch(list(changes.values())):
+            self.persisted += len(changes)
+
+    def stats(self) -> Dict:
+        return {'received': self.buffer.received, 'dropped': self.buffer.dropped, 'buffered': len(self.buffer),
+                'vehicles': len(self.store.latest), 'persisted': self.persisted}
+
+class TelemetryBridge(QObject):
+    """GUI thread'inde sabit hızda (varsayılan 10 Hz) değişen araçları tek sinyalde iletir"""
+
+    states_updated = pyqtSignal(object)   # {arac_id: TelemetrySample}
+
+    def __init__(self, hub: TelemetryHub, hz: float = DEFAULT_UI_HZ, parent=None):
+        super().__init__(parent)
+        self.hub = hub
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(1000 / max(hz, 1)))
+        self.timer.timeout.connect(self._emit_changes)
+
+    def start(self):
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def _emit_changes(self):
+        changes = self.hub.store.take_ui_changes()
+        if changes:
+            self.states_updated.emit(changes)
+
+def create_hub_from_config(config: Dict, vehicle_ids: List[str], db_factory: Optional[Callable] = None) -> TelemetryHub:
+    """config['telemetry'] ayarına göre kaynakları bağlanmış bir hub oluştur (source: simulator/udp/file)"""
+    settings = config.get('telemetry', {}) if config else {}
+    hub = TelemetryHub(db_factory)
+    source = settings.get('source', 'simulator')
+    if source == 'udp':
+        hub.add_source(UdpTelemetrySource(hub.buffer, settings.get('host', '127.0.0.1'), int(settings.get('port', DEFAULT_UDP_PORT))))
+    elif source == 'file' and settings.get('file'):
+        hub.add_source(FileTailSource(hub.buffer, settings['file']))
+    else:
+        hub.add_source(TelemetrySimulator(hub.buffer, vehicle_ids, float(settings.get('simulator_hz', 5))))
+    return hub
+
+if __name__ == "__main__":
+    # Benchmark: ayrıştırma ve alım hızı, UDP üzerinden uçtan uca
+    print("🧪 Benchmarking Vehicle Telemetry...")
+
+    rng = random.Random(1)
+    lines = [format_message(TelemetrySample(f"ARAC-{i % 500:03d}", time.time() + i * 1e-4, rng.uniform(0, 1000), rng.uniform(0, 600),
+                                            rng.uniform(0, 8), rng.uniform(0, 360), 'HAREKETLI')) for i in range(100000)]
+    t0 = time.perf_counter(); parsed = [parse_message(line) for line in lines]; parse_s = time.perf_counter() - t0
+    print(f"✅ Ayrıştırma: {len(parsed) / parse_s:,.0f} mesaj/s")
+
+    hub = TelemetryHub()
+    t0 = time.perf_counter()
+    for i in range(0, len(parsed), 1000):
+        hub.buffer.extend(parsed[i:i + 1000])
+        hub.store.update(hub.buffer.drain())
+    ingest_s = time.perf_counter() - t0
+    print(f"✅ Tampon + son durum: {len(parsed) / ingest_s:,.0f} mesaj/s, {len(hub.store.take_ui_changes())} araç")
+
+    port = DEFAULT_UDP_PORT + 1
+    hub = TelemetryHub()
+    hub.add_source(UdpTelemetrySource(hub.buffer, port=port))
+    hub.add_source(TelemetrySimulator(hub.buffer, [f"ARAC-{i:03d}" for i in range(500)], rate_hz=10, udp_target=('127.0.0.1', port), seed=2))
+    hub.start(); time.sleep(3); stats = hub.stats(); hub.stop()
+    print(f"✅ UDP uçtan uca (500 araç × 10 Hz): {stats['received'] / 3:,.0f} mesaj/s, düşen {stats['dropped']}, araç {stats['vehicles']}")
+
+    print("\n🎉 Vehicle telemetry benchmark completed!")